@@ -11,42 +11,637 @@ ArXiv Agent - 自动搜索和分析ArXiv论文
     --no-analysis      仅搜索，不进行AI分析
     --min-relevance    最小相关性级别: high/medium/low (默认: medium)
     --max-concurrent   最大并发请求数 (默认: 5)
+    --profile PATH     额外的研究画像配置文件 (可重复指定)
+    --trace            记录各步骤耗时并输出 Chrome Trace 时间线
     --help             显示帮助信息
 """
 import os
 import sys
+import time
+import contextlib
 import asyncio
 import argparse
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
 
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+# 只在模块加载时导入轻量模块；LLM分析（httpx）、邮件发送以及各数据源的
+# 重量级依赖（arxiv/feedparser/bs4/tweepy/selenium）在对应步骤启用时才导入
 from config_loader import ConfigLoader
-from arxiv_searcher import ArxivSearcher
-from llm_analyzer import LLMAnalyzer
-from report_generator import ReportGenerator
-from email_sender import EmailSender
-from journal_fetcher import JournalFetcher
-try:
-    from twitter_api_v2_fetcher import TwitterAPIv2Fetcher
-    TWITTER_API_AVAILABLE = True
-except ImportError:
-    TWITTER_API_AVAILABLE = False
-
-try:
-    from twitter_rss_fetcher import TwitterRSSFetcher
-    TWITTER_RSS_AVAILABLE = True
-except ImportError:
-    TWITTER_RSS_AVAILABLE = False
-
-try:
-    from twitter_selenium_scraper import TwitterSeleniumScraper
-    TWITTER_SELENIUM_AVAILABLE = True
-except ImportError:
-    TWITTER_SELENIUM_AVAILABLE = False
-
-from twitter_analyzer import TwitterAnalyzer
+from profiles import ResearchProfile, load_profiles, merge_source_scope
+from report_generator import EMAIL_MAX_BYTES, ReportGenerator
+from settings import ConfigError
+from source_orchestrator import SourceOrchestrator
+from tracing import NULL_TRACER, RunTracer
+from usage_metrics import UsageTracker
+
+
+def _get_llm_settings(config: ConfigLoader, args: argparse.Namespace) -> Optional[Dict[str, Any]]:
+    """
+    读取LLM客户端配置（论文分析与推文分析共用）
+
+    Returns:
+        LLMAnalyzer/TwitterAnalyzer 的公共参数；未配置API密钥时返回None
+    """
+    # 获取API配置（优先从config.yaml，然后从.env）
+    api_key = config.get_api_key()
+    endpoints = config.get_endpoints()
+    if not api_key and not endpoints:
+        print("错误: 未找到API密钥")
+        print("请在config.yaml中设置api_key，或设置环境变量")
+        print("  - Anthropic: ANTHROPIC_API_KEY")
+        print("  - OpenAI兼容: OPENAI_API_KEY 或 API_KEY")
+        return None
+
+    return {
+        'api_key': api_key,
+        'model': config.get_model_name(),
+        'max_tokens': config.get_max_tokens(),
+        'base_url': config.get_api_base_url(),
+        'api_type': config.get_api_type(),
+        'hedging': config.get_hedging_config(),
+        'endpoints': endpoints or None,
+        # 获取并发配置（命令行参数覆盖配置文件）
+        'max_concurrent': args.max_concurrent if args.max_concurrent != 5 else config.get_max_concurrent(),
+    }
+
+
+async def _fetch_and_analyze_async(args: argparse.Namespace, config: ConfigLoader, days_back: int,
+                                   profiles: List[ResearchProfile], usage: UsageTracker,
+                                   warm: Optional[Dict[str, Any]] = None, tracer=NULL_TRACER) -> Optional[Dict[str, Any]]:
+    """
+    获取并分析内容（步骤1与步骤2在同一个事件循环中完成）
+
+    论文分析与推文分析共享一个HTTP连接池和一份公平分配的并发额度。
+    常驻模式下分析流水线（含HTTP连接池）保存在 warm 中，后续运行直接复用。
+    多个研究画像时内容只获取一次，再按画像分别分析。
+
+    Returns:
+        {'papers', 'tweets', 'analyzer', 'analyzed': {画像名称: (已分析论文, 已分析推文)}}；
+        未找到内容或缺少API密钥时返回None
+    """
+    enabled_sources = config.get_enabled_sources()
+    print(f"启用的数据源: {', '.join(enabled_sources)}\n")
+
+    # 各数据源相互独立，并发获取；单个数据源超时不会拖住整个流程
+    orchestrator = SourceOrchestrator(config, days_back=days_back, tracer=tracer)
+
+    analyzer = None
+    pipeline = None
+    if not args.no_analysis and warm is not None and 'pipeline' in warm:
+        pipeline = warm['pipeline']
+        analyzer = pipeline.paper_analyzer
+    elif not args.no_analysis:
+        from llm_analyzer import LLMAnalyzer
+        from twitter_analyzer import TwitterAnalyzer
+        from analysis_pipeline import AnalysisPipeline
+        from llm_client import open_async_client
+
+        llm_settings = _get_llm_settings(config, args)
+        if llm_settings is None:
+            return None
+        llm_settings['metrics'] = usage
+        analyzer = LLMAnalyzer(
+            **llm_settings,
+            batch_size=config.get_batch_size(),
+            detail_batch_size=config.get_detail_batch_size(),
+            stage_settings={stage: config.get_stage_llm_config(stage) for stage in ('screen', 'detail')},
+            escalate_medium=config.is_escalation_enabled(),
+            stream_responses=config.is_response_streaming_enabled(),
+            stream_usage=config.is_stream_usage_enabled()
+        )
+        twitter_analyzer = None
+        if 'twitter' in enabled_sources:
+            tweet_settings = dict(config.get_stage_llm_config('tweets'))
+            tweet_max_tokens = tweet_settings.pop('max_tokens')
+            tweet_temperature = float(tweet_settings.pop('temperature'))
+            if tweet_settings.keys() & {'api_type', 'api_key', 'base_url'}:
+                # 推文分析指定了自己的连接信息，不使用全局的多端点配置
+                tweet_settings['endpoints'] = None
+            twitter_analyzer = TwitterAnalyzer(
+                **{**llm_settings, **tweet_settings},
+                temperature=tweet_temperature,
+                response_max_tokens=tweet_max_tokens
+            )
+        # 常驻模式下使用长期存活的HTTP客户端，保持连接池跨运行复用
+        client = open_async_client(llm_settings['max_concurrent']) if warm is not None else None
+        pipeline = AnalysisPipeline(analyzer, twitter_analyzer, max_concurrent=llm_settings['max_concurrent'],
+                                    client=client, shared_screening=config.is_shared_screening_enabled())
+        if warm is not None:
+            warm['pipeline'] = pipeline
+
+    if pipeline is not None:
+        # 计时器每次运行新建，常驻模式下复用的分析器也要换成本次的计时器
+        pipeline.paper_analyzer.tracer = tracer
+        if pipeline.tweet_analyzer is not None:
+            pipeline.tweet_analyzer.tracer = tracer
+
+    analyzed = {}
+    # 流式分析只针对单个画像；多画像需要先拿到完整论文集再按画像分发
+    streaming = pipeline is not None and config.is_streaming_enabled() and len(profiles) == 1
+
+    if streaming:
+        # 流式模式：论文边获取边分析，推文获取完成后立即开始分析
+        print("流式模式：论文边获取边分析\n")
+        profile = profiles[0]
+        tweets_task = asyncio.create_task(orchestrator.fetch_tweets_async())
+        with tracer.span('fetch+analysis', capture=True):
+            analyzed[profile.name] = await pipeline.analyze_stream_async(
+                orchestrator.stream_papers_async(), tweets_task, profile.research_interests, profile.research_prompt,
+                flush_timeout=config.get_flush_timeout()
+            )
+        papers = analyzed[profile.name][0]
+        tweets = tweets_task.result()
+    else:
+        with tracer.span('fetch', capture=True):
+            fetched = await orchestrator.fetch_all_async()
+        papers = fetched['papers']
+        tweets = fetched['tweets']
+    print()
+
+    if not papers:
+        print("未找到任何内容。")
+        return None
+
+    print(f"{'=' * 60}")
+    print(f"总计: 论文/文章 {len(papers)} 篇")
+    print("=" * 60)
+
+    # 2. 分析内容（可选，流式模式下已在获取时完成）
+    if pipeline is not None and not streaming:
+        print(f"\n{'=' * 60}")
+        print("步骤 2: 使用LLM分析内容相关性")
+        print("=" * 60)
+
+        with tracer.span('analysis', capture=True, profiles=len(profiles)):
+            if len(profiles) == 1:
+                profile = profiles[0]
+                analyzed[profile.name] = await pipeline.analyze_async(
+                    papers, tweets, profile.research_interests, profile.research_prompt
+                )
+            else:
+                analyzed = await pipeline.analyze_profiles_async(papers, tweets, profiles)
+
+    return {
+        'papers': papers,
+        'tweets': tweets,
+        'analyzed': analyzed,
+        'analyzer': analyzer,
+    }
+
+
+async def run_async(args: argparse.Namespace, config: ConfigLoader, warm: Optional[Dict[str, Any]] = None):
+    """
+    执行一次完整流程：获取、分析、生成报告、发送邮件
+
+    Args:
+        args: 命令行参数
+        config: 已加载的配置
+        warm: 常驻模式下跨运行复用的对象（HTTP连接池、分析器等），单次运行时为None
+    """
+    started_at = datetime.now()
+    metrics_config = config.get_metrics_config()
+    # 用量统计器与分析器绑定，常驻模式下随分析器复用，每次运行开始时清零
+    if warm is not None:
+        usage = warm.setdefault('usage', UsageTracker(pricing=metrics_config.get('pricing')))
+    else:
+        usage = UsageTracker(pricing=metrics_config.get('pricing'))
+    usage.reset()
+    if args.trace or args.trace_profiler or args.trace_memory:
+        tracer = RunTracer(profiler=args.trace_profiler, memory=args.trace_memory)
+    else:
+        tracer = NULL_TRACER
+
+    profiles = load_profiles(config, args.profile)
+    if config.get_profiles() or args.profile:
+        # 合并各画像关注的数据源范围，保证只获取一次
+        merge_source_scope(config, profiles)
+
+    research_interests = profiles[0].research_interests
+    research_prompt = profiles[0].research_prompt
+    arxiv_categories = config.get_arxiv_categories()
+    max_results = config.get_max_results()
+    days_back = args.days if args.days else config.get_days_back()
+    output_dir = config.get_output_dir()
+    min_relevance_config = profiles[0].min_relevance
+
+    # 添加详细的参数日志
+    print("\n配置参数：")
+    print(f"  - max_results: {max_results} (每个类别)")
+    print(f"  - days_back: {days_back} (搜索天数)")
+    print(f"  - model: {config.get_model_name()}")
+    print(f"  - base_url: {config.get_api_base_url()}")
+    print(f"  - max_concurrent: {config.get_max_concurrent()}")
+    print(f"  - batch_size: {config.get_batch_size()}")
+    print(f"  - detail_batch_size: {config.get_detail_batch_size()}")
+    print(f"  - min_relevance: {args.min_relevance or min_relevance_config}")
+
+    if len(profiles) > 1:
+        print(f"\n研究画像: {len(profiles)} 个")
+        for profile in profiles:
+            print(f"  - {profile.name}: {', '.join(profile.research_interests)}")
+    else:
+        print(f"\n研究方向: {', '.join(research_interests)}")
+        if research_prompt:
+            print("研究兴趣描述: 已设置（使用自定义描述进行相关性分析）")
+    print(f"ArXiv类别: {', '.join(arxiv_categories)}")
+    print(f"搜索最近 {days_back} 天的论文")
+    print(f"最大结果数: {max_results}")
+    relevance_label = {'high': '高', 'medium': '中', 'low': '低'}.get(min_relevance_config, min_relevance_config)
+    print(f"相关性阈值: {relevance_label}相关及以上")
+
+    # 1. 从启用的数据源获取内容
+    print(f"\n{'=' * 60}")
+    print("步骤 1: 从数据源获取内容")
+    print("=" * 60)
+
+    # 所有画像共用一个邮件发送器：会话内复用已登录的SMTP连接，多画像只握手、登录一次
+    email_sender = None
+    outbox = None
+    outbox_task = None
+    if config.is_email_enabled():
+        from email_sender import EmailSender
+        email_sender = EmailSender.from_config(config.get_email_config())
+        if config.settings.email.outbox.enabled:
+            from email_outbox import EmailOutbox
+            outbox = EmailOutbox.from_config(config.get_outbox_config(), output_dir)
+            due = outbox.due()
+            if due:
+                # 上次运行没发出去的邮件在获取和分析期间投递
+                print(f"📮 发件箱中有 {len(due)} 封待投递邮件，后台重试")
+                outbox_task = asyncio.create_task(outbox.deliver(email_sender))
+
+    results = await _fetch_and_analyze_async(args, config, days_back, profiles, usage, warm=warm, tracer=tracer)
+    if results is None:
+        await _wait_outbox(outbox_task, config.settings.email.outbox.flush_timeout)
+        return
+
+    # 渲染、压缩和SMTP发送是阻塞的，放到线程中执行，不阻塞发件箱投递和常驻模式的HTTP接口
+    profile_summaries = await asyncio.to_thread(
+        _report_profiles, args, config, profiles, results, output_dir,
+        tracer=tracer, email_sender=email_sender, outbox=outbox
+    )
+
+    if outbox is not None:
+        # 新放入发件箱的邮件在后台投递，归档、统计等后续步骤不等待SMTP
+        outbox_task = asyncio.create_task(_deliver_outbox_after(outbox, email_sender, outbox_task))
+
+    if config.settings.archive.enabled:
+        with tracer.span('archive', cat='report', capture=True):
+            await asyncio.to_thread(build_archives, config)
+
+    if outbox_task is not None:
+        # 在写出时间线之前等待，发件箱投递的耗时（和峰值内存）才会记录在 trace 中
+        with tracer.span('email:outbox', capture=True):
+            await _wait_outbox(outbox_task, config.settings.email.outbox.flush_timeout)
+
+    if not args.no_analysis:
+        print(f"\n{'=' * 60}")
+        print("LLM 用量统计")
+        print("=" * 60)
+        print(usage.format_table())
+
+    trace_path = None
+    if tracer.enabled:
+        print(f"\n{'=' * 60}")
+        print("步骤耗时")
+        print("=" * 60)
+        print(tracer.format_table())
+        trace_path = os.path.join(output_dir, f"trace_{started_at.strftime('%Y-%m-%d_%H%M%S')}.json")
+        written = tracer.write(trace_path)
+        tracer.close()
+        print(f"时间线已保存到: {trace_path}（在 chrome://tracing 或 https://ui.perfetto.dev 中打开）")
+        if len(written) > 1:
+            print(f"性能分析结果已保存到: {os.path.dirname(written[1])}")
+
+    finished_at = datetime.now()
+    if config.settings.metrics.manifest:
+        os.makedirs(output_dir, exist_ok=True)
+        manifest_path = os.path.join(output_dir, f"run_manifest_{started_at.strftime('%Y-%m-%d')}.json")
+        usage.write_manifest(manifest_path, {
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'finished_at': finished_at.isoformat(timespec='seconds'),
+            'elapsed_seconds': round((finished_at - started_at).total_seconds(), 1),
+            'config_fingerprint': config.fingerprint(),
+            'analysis_fingerprint': config.analysis_fingerprint(),
+            'parameters': {
+                'days_back': days_back,
+                'sources': config.get_enabled_sources(),
+                'model': config.get_model_name(),
+                'stage_models': {stage: config.get_stage_llm_config(stage).get('model', config.get_model_name())
+                                 for stage in ('screen', 'detail', 'tweets')},
+                'batch_size': config.get_batch_size(),
+                'detail_batch_size': config.get_detail_batch_size(),
+                'max_concurrent': args.max_concurrent if args.max_concurrent != 5 else config.get_max_concurrent(),
+                'streaming': config.is_streaming_enabled(),
+                'analysis': not args.no_analysis,
+            },
+            'papers': len(results['papers']),
+            'tweets': len(results['tweets']),
+            'profiles': profile_summaries,
+            'trace': trace_path,
+        })
+        print(f"运行清单已保存到: {manifest_path}")
+
+    prometheus_file = config.settings.metrics.prometheus_file
+    if prometheus_file:
+        usage.write_prometheus(prometheus_file)
+        print(f"Prometheus 指标已写入: {prometheus_file}")
+
+
+def _report_profiles(args: argparse.Namespace, config: ConfigLoader, profiles: List[ResearchProfile],
+                     results: Dict[str, Any], output_dir: str, tracer=NULL_TRACER, email_sender=None,
+                     outbox=None) -> List[Dict[str, Any]]:
+    """
+    依次为每个研究画像生成报告并发送邮件（阻塞，在线程中执行）
+
+    所有画像共用 email_sender 的一个SMTP会话；会话在本线程中打开和关闭，
+    调用方的等待被取消时不会在发送途中关闭连接
+
+    Returns:
+        各画像的运行摘要
+    """
+    summaries = []
+    with email_sender.session() if email_sender else contextlib.nullcontext():
+        for profile in profiles:
+            if len(profiles) > 1:
+                print(f"\n{'#' * 60}")
+                print(f"研究画像: {profile.name}")
+                print("#" * 60)
+                profile_output_dir = os.path.join(output_dir, profile.slug)
+            else:
+                profile_output_dir = output_dir
+            summaries.append(
+                _report_profile(args, config, profile, results, profile_output_dir, multi_profile=len(profiles) > 1,
+                                tracer=tracer, email_sender=email_sender, outbox=outbox)
+            )
+    return summaries
+
+
+def _report_profile(args: argparse.Namespace, config: ConfigLoader, profile: ResearchProfile,
+                    results: Dict[str, Any], output_dir: str, multi_profile: bool = False,
+                    tracer=NULL_TRACER, email_sender=None, outbox=None) -> Dict[str, Any]:
+    """
+    为单个研究画像过滤结果、生成报告并发送邮件（步骤3、4）
+
+    Args:
+        args: 命令行参数
+        config: 已加载的配置
+        profile: 研究画像
+        results: _fetch_and_analyze_async 的返回值
+        output_dir: 报告输出目录
+        multi_profile: 是否为多画像运行（邮件主题附带画像名称）
+        tracer: 运行计时器
+        email_sender: 邮件发送器（多画像共用同一个SMTP会话；为None时按配置新建）
+        outbox: 发件箱（不为None时邮件只放入发件箱，由后台任务投递）
+
+    Returns:
+        该画像的运行摘要（写入运行清单）
+    """
+    research_interests = profile.research_interests
+    papers = [p for p in results['papers'] if profile.accepts(p)] if multi_profile else results['papers']
+    all_tweets = [t for t in results['tweets'] if profile.accepts_tweet(t)] if multi_profile else results['tweets']
+
+    if not args.no_analysis:
+        analyzer = results['analyzer']
+        analyzed_papers, analyzed_tweets = results['analyzed'].get(profile.name, ([], []))
+
+        # 获取相关性阈值（命令行参数覆盖配置文件）
+        min_relevance = args.min_relevance if args.min_relevance else profile.min_relevance
+
+        # 过滤相关论文
+        relevant_papers = analyzer.filter_relevant_papers(
+            analyzed_papers,
+            min_relevance=min_relevance
+        ) if analyzed_papers else []
+
+        # 过滤相关推文
+        relevant_tweets = [t for t in analyzed_tweets if t.get('relevance_level') in ['high', 'medium']] if analyzed_tweets else []
+
+        relevance_label = {'high': '高', 'medium': '中', 'low': '低'}.get(min_relevance, min_relevance)
+        print(f"\n根据阈值（{relevance_label}相关及以上）:")
+        print(f"  - 相关论文/文章: {len(relevant_papers)} 篇")
+        print(f"  - 相关推文: {len(relevant_tweets)} 条")
+
+        papers_to_report = relevant_papers
+        tweets_to_report = relevant_tweets
+    else:
+        print("\n跳过AI分析")
+        papers_to_report = papers
+        tweets_to_report = all_tweets
+
+    # 3. 生成报告
+    print(f"\n{'=' * 60}")
+    print("步骤 3: 生成报告")
+    print("=" * 60)
+
+    generator = ReportGenerator(output_dir=output_dir, topic_keywords=config.get_report_topic_keywords())
+    with tracer.span('report:markdown', cat='report', capture=True, profile=profile.name):
+        # 分组、统计、主题索引只构建一次，HTML 邮件报告复用同一个模型
+        report_model = generator.build_model(papers_to_report, research_interests, tweets_to_report)
+        report_path = generator.generate_report(papers_to_report, research_interests, tweets_to_report,
+                                                model=report_model)
+
+    # 结构化导出（JSONL / Parquet，供看板等下游程序使用）
+    export_paths = []
+    export_formats = config.get_report_formats()
+    if export_formats:
+        try:
+            with tracer.span('report:export', cat='report', capture=True, profile=profile.name):
+                export_paths = generator.export(report_model, export_formats)
+            for path in export_paths:
+                print(f"结构化报告已导出: {path}")
+        except (ImportError, ValueError) as e:
+            print(f"⚠️  结构化报告导出失败: {e}")
+
+    print(f"\n{'=' * 60}")
+    print("完成!")
+    print("=" * 60)
+    print(f"报告已保存到: {report_path}")
+    print(f"总论文/文章数: {len(papers)}")
+    if all_tweets:
+        print(f"总推文数: {len(all_tweets)}")
+    if not args.no_analysis:
+        print(f"相关论文/文章数: {len(papers_to_report)}")
+        if tweets_to_report:
+            print(f"相关推文数: {len(tweets_to_report)}")
+
+    # 4. 发送邮件（如果启用）
+    if config.is_email_enabled():
+        print(f"\n{'=' * 60}")
+        print("步骤 4: 发送邮件通知")
+        print("=" * 60)
+
+        email_config = config.get_email_config()
+
+        try:
+            from email_sender import EmailSender
+
+            sender = email_sender or EmailSender.from_config(email_config)
+
+            # 收件人邮箱（画像未单独配置时使用全局配置，支持多个，用逗号分隔）
+            receiver_emails = profile.receiver_emails
+            if not receiver_emails:
+                receiver_str = email_config.get('receiver_email', '')
+                receiver_emails = [email.strip() for email in receiver_str.split(',') if email.strip()]
+
+            if not receiver_emails:
+                print("⚠️  未配置收件人邮箱，跳过邮件发送")
+            else:
+                # 构建邮件主题
+                subject_prefix = email_config.get('subject_prefix', '[ArXiv每日论文]')
+                subject = f"{subject_prefix} {datetime.now().strftime('%Y-%m-%d')}"
+                if multi_profile:
+                    subject += f" [{profile.name}]"
+
+                # 生成HTML格式的报告文件（逐段写入）
+                print("正在生成HTML格式报告...")
+                with tracer.span('report:html', cat='report', capture=True, profile=profile.name):
+                    html_path = generator.generate_html_file(
+                        papers_to_report,
+                        research_interests,
+                        tweets_to_report,
+                        model=report_model
+                    )
+
+                # 邮件正文：样式内联并控制大小，超出上限时前N条完整、其余精简，完整报告压缩后作为附件
+                attachments = [report_path]
+                with tracer.span('report:email_html', cat='report', capture=True, profile=profile.name):
+                    email_html, truncated = generator.generate_email_html(
+                        papers_to_report,
+                        research_interests,
+                        tweets_to_report,
+                        model=report_model,
+                        max_bytes=email_config.get('max_html_bytes', EMAIL_MAX_BYTES),
+                        attachment=os.path.basename(html_path) + '.gz'
+                    )
+                    if truncated:
+                        attachments = [generator.gzip_file(html_path), generator.gzip_file(report_path)]
+                if truncated:
+                    print(f"邮件正文超过 {email_config.get('max_html_bytes', EMAIL_MAX_BYTES)} 字节，已精简"
+                          f"（{len(email_html.encode('utf-8')) / 1024:.0f} KB），完整报告以 gzip 附件发送")
+
+                # 发送HTML格式邮件（MD报告作为附件）
+                with tracer.span('email', capture=True, profile=profile.name, receivers=len(receiver_emails)):
+                    if outbox is not None:
+                        messages = sender.build_html_messages(
+                            receiver_emails=receiver_emails,
+                            subject=subject,
+                            html_content=email_html,
+                            attachments=attachments
+                        )
+                        for msg, receivers in messages:
+                            outbox.enqueue(msg, receivers, label=subject)
+                        print(f"📮 邮件已放入发件箱（{len(messages)} 封），后台投递: {outbox.spool_dir}")
+                    else:
+                        sender.send_html_report(
+                            receiver_emails=receiver_emails,
+                            subject=subject,
+                            html_content=email_html,
+                            attachments=attachments
+                        )
+
+        except Exception as e:
+            print(f"❌ 邮件发送配置错误: {e}")
+            import traceback
+            traceback.print_exc()
+
+    return {
+        'name': profile.name,
+        'report': report_path,
+        'exports': export_paths,
+        'papers': len(papers),
+        'reported_papers': len(papers_to_report),
+        'reported_tweets': len(tweets_to_report),
+    }
+
+
+async def _deliver_outbox_after(outbox, sender, previous: Optional[asyncio.Task] = None) -> Dict[str, int]:
+    """等前一轮投递结束后再投递一轮（同一封邮件不会被两轮同时发送）"""
+    if previous is not None:
+        await previous
+    return await outbox.deliver(sender)
+
+
+async def _wait_outbox(task: Optional[asyncio.Task], timeout: float):
+    """
+    等待后台邮件投递结束，最多等待 timeout 秒；超时的邮件仍在发件箱中，下次运行或常驻模式定时重试
+
+    Args:
+        task: 投递任务
+        timeout: 最长等待时间（秒）
+    """
+    if task is None:
+        return
+    try:
+        await asyncio.wait_for(task, timeout=float(timeout))
+    except asyncio.TimeoutError:
+        print(f"⚠️  邮件投递 {timeout} 秒内未完成，未发出的邮件留在发件箱中，下次运行时继续投递")
+    except Exception as e:
+        print(f"⚠️  邮件投递出错: {e}（邮件留在发件箱中，下次运行时继续投递）")
+
+
+async def deliver_outbox(config: ConfigLoader, force: bool = False) -> Optional[Dict[str, int]]:
+    """
+    投递发件箱中的邮件（outbox 命令与常驻模式的定时重试）
+
+    Args:
+        config: 配置
+        force: 是否忽略退避时间，立即投递所有待发邮件
+
+    Returns:
+        各结果的邮件数，未启用邮件或发件箱时返回None
+    """
+    if not config.is_email_enabled() or not config.settings.email.outbox.enabled:
+        return None
+    from email_sender import EmailSender
+    from email_outbox import EmailOutbox
+
+    outbox = EmailOutbox.from_config(config.get_outbox_config(), config.get_output_dir())
+    counts = await outbox.deliver(EmailSender.from_config(config.get_email_config()), force=force)
+    if any(counts.values()):
+        print(f"📮 发件箱投递: 成功 {counts['sent']} 封，等待重试 {counts['retry']} 封，"
+              f"放弃 {counts['failed']} 封")
+    return counts
+
+
+def build_archives(config: ConfigLoader, force: bool = False, reports_dirs: List[str] = None):
+    """
+    增量更新报告归档站点
+
+    Args:
+        config: 配置
+        force: 是否重新生成所有日期
+        reports_dirs: 报告目录列表（默认为输出目录及其下包含报告的画像子目录）
+    """
+    from archive_builder import ArchiveBuilder, REPORT_FILE_RE
+
+    output_dir = config.get_output_dir()
+    site_dir = config.settings.archive.site_dir
+    if reports_dirs is None:
+        reports_dirs = [output_dir]
+        if os.path.isdir(output_dir):
+            for name in sorted(os.listdir(output_dir)):
+                path = os.path.join(output_dir, name)
+                if os.path.isdir(path) and any(REPORT_FILE_RE.match(f) for f in os.listdir(path)):
+                    reports_dirs.append(path)
+
+    for reports_dir in reports_dirs:
+        # 画像子目录的站点放在 site_dir/<画像目录名> 下
+        target = None
+        if site_dir:
+            relative = os.path.relpath(reports_dir, output_dir)
+            target = site_dir if relative == '.' else os.path.join(site_dir, relative)
+        builder = ArchiveBuilder(reports_dir, target)
+        started = time.perf_counter()
+        stats = builder.build(force=force)
+        if stats['days']:
+            print(f"归档站点已更新: {os.path.join(builder.site_dir, 'index.html')} "
+                  f"（新生成 {stats['built']} 天，未变化 {stats['skipped']} 天，共 {stats['days']} 天，"
+                  f"耗时 {time.perf_counter() - started:.2f}s）")
 
 
 def main():
@@ -56,6 +651,9 @@ def main():
 
     # 解析命令行参数
     parser = argparse.ArgumentParser(description='ArXiv Agent - 自动搜索和分析ArXiv论文')
+    parser.add_argument('command', nargs='?', default='run', choices=['run', 'serve', 'archive', 'outbox'],
+                        help='run: 运行一次（默认）；serve: 常驻模式，按计划定时运行并提供本地触发接口；'
+                             'archive: 增量更新报告归档站点；outbox: 立即投递发件箱中的邮件')
     parser.add_argument('--config', type=str, default='config.yaml', help='配置文件路径')
     parser.add_argument('--days', type=int, help='搜索最近N天的论文')
     parser.add_argument('--no-analysis', action='store_true', help='仅搜索，不进行AI分析')
@@ -64,6 +662,16 @@ def main():
                         help='最小相关性级别（覆盖配置文件）')
     parser.add_argument('--max-concurrent', type=int, default=5,
                         help='最大并发请求数（默认: 5）')
+    parser.add_argument('--profile', action='append', metavar='PATH',
+                        help='额外的研究画像配置文件（可重复指定，内容只获取一次，按画像分别分析和发送）')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='archive 命令：忽略已有状态，重新生成所有日期')
+    parser.add_argument('--trace', action='store_true',
+                        help='记录各步骤（各数据源获取、第一/二阶段、推文分析、报告渲染、邮件）耗时，输出 Chrome Trace 时间线')
+    parser.add_argument('--trace-profiler', choices=['cprofile', 'pyinstrument'],
+                        help='为各主要步骤保存 cProfile / pyinstrument 结果（隐含 --trace）')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='用 tracemalloc 记录各主要步骤的峰值内存（隐含 --trace，会明显拖慢运行）')
 
     args = parser.parse_args()
 
@@ -76,313 +684,25 @@ def main():
 
         config = ConfigLoader(args.config)
 
-        research_interests = config.get_research_interests()
-        research_prompt = config.get_research_prompt()
-        arxiv_categories = config.get_arxiv_categories()
-        max_results = config.get_max_results()
-        days_back = args.days if args.days else config.get_days_back()
-        output_dir = config.get_output_dir()
-        min_relevance_config = config.get_min_relevance()
-
-        # 添加详细的参数日志
-        print(f"\n配置参数：")
-        print(f"  - max_results: {max_results} (每个类别)")
-        print(f"  - days_back: {days_back} (搜索天数)")
-        print(f"  - model: {config.get_model_name()}")
-        print(f"  - base_url: {config.get_api_base_url()}")
-        print(f"  - max_concurrent: {config.get_max_concurrent()}")
-        print(f"  - batch_size: {config.get_batch_size()}")
-        print(f"  - detail_batch_size: {config.get_detail_batch_size()}")
-        print(f"  - min_relevance: {args.min_relevance or min_relevance_config}")
-
-        print(f"\n研究方向: {', '.join(research_interests)}")
-        if research_prompt:
-            print(f"研究兴趣描述: 已设置（使用自定义描述进行相关性分析）")
-        print(f"ArXiv类别: {', '.join(arxiv_categories)}")
-        print(f"搜索最近 {days_back} 天的论文")
-        print(f"最大结果数: {max_results}")
-        relevance_label = {'high': '高', 'medium': '中', 'low': '低'}.get(min_relevance_config, min_relevance_config)
-        print(f"相关性阈值: {relevance_label}相关及以上")
-
-        # 1. 从启用的数据源获取内容
-        print(f"\n{'=' * 60}")
-        print("步骤 1: 从数据源获取内容")
-        print("=" * 60)
-
-        enabled_sources = config.get_enabled_sources()
-        print(f"启用的数据源: {', '.join(enabled_sources)}\n")
-
-        all_papers = []
-        all_tweets = []
-
-        # ArXiv 论文
-        if 'arxiv' in enabled_sources:
-            print(f"{'=' * 60}")
-            print("1.1 搜索 ArXiv 论文")
-            print("=" * 60)
-
-            searcher = ArxivSearcher(
-                categories=arxiv_categories,
-                max_results=max_results
-            )
-            papers = searcher.search_recent_papers(days_back=days_back)
-            all_papers.extend(papers)
-            print(f"✅ ArXiv: 找到 {len(papers)} 篇论文")
-            if len(papers) == 0:
-                print("  ⚠️  警告：ArXiv 搜索返回 0 篇论文！")
-                print("  可能的原因：")
-                print("  1. 配置问题（参数类型错误）")
-                print("  2. 日期范围问题")
-                print("  3. ArXiv API 访问问题")
-            print()
-
-        # CNS 期刊文章
-        if 'journals' in enabled_sources:
-            print(f"{'=' * 60}")
-            print("1.2 获取 CNS 期刊文章")
-            print("=" * 60)
-
-            journal_config = config.get('sources', {}).get('journals', {})
-            journal_days = journal_config.get('days_back', 7)
-            selected_journals = journal_config.get('selected_journals', None)
-
-            journal_fetcher = JournalFetcher(selected_journals=selected_journals)
-            journal_articles = journal_fetcher.fetch_recent_articles(days_back=journal_days)
-            all_papers.extend(journal_articles)
-            print(f"✅ 期刊: 找到 {len(journal_articles)} 篇文章\n")
-
-        # Twitter 推文（支持API v2、RSS、Selenium三种方式）
-        if 'twitter' in enabled_sources:
-            print(f"{'=' * 60}")
-            print("1.3 获取 Twitter 推文")
-            print("=" * 60)
-
-            twitter_config = config.get_twitter_config()
-            following_usernames = twitter_config.get('following_usernames', [])
-
-            if not following_usernames:
-                print("⚠️  未配置 following_usernames，跳过\n")
-            else:
-                # 优先使用Twitter API v2（如果配置了bearer_token）
-                bearer_token = twitter_config.get('bearer_token') or os.getenv('TWITTER_BEARER_TOKEN')
-
-                if bearer_token and TWITTER_API_AVAILABLE:
-                    print("使用方式：Twitter API v2（官方API）")
-                    try:
-                        twitter_fetcher = TwitterAPIv2Fetcher(bearer_token=bearer_token)
-                        tweets = twitter_fetcher.get_tweets_from_list(
-                            usernames=following_usernames,
-                            tweets_per_user=twitter_config.get('tweets_per_user', 3),
-                            days_back=twitter_config.get('days_back', 1)
-                        )
-                        all_tweets = tweets
-                        print(f"✅ Twitter API: 找到 {len(tweets)} 条推文\n")
-                    except Exception as e:
-                        print(f"⚠️  Twitter API 获取失败: {e}\n")
-
-                elif TWITTER_RSS_AVAILABLE:
-                    print("使用方式：Nitter RSS（免费爬虫）")
-                    print("⚠️  注意：Nitter实例可能不稳定\n")
-                    try:
-                        twitter_fetcher = TwitterRSSFetcher()
-                        tweets = twitter_fetcher.get_tweets_from_list(
-                            usernames=following_usernames,
-                            tweets_per_user=twitter_config.get('tweets_per_user', 3),
-                            days_back=twitter_config.get('days_back', 1)
-                        )
-                        all_tweets = tweets
-                        if tweets:
-                            print(f"✅ Twitter RSS: 找到 {len(tweets)} 条推文\n")
-                        else:
-                            print("⚠️  未获取到推文（Nitter实例可能不可用）\n")
-                    except Exception as e:
-                        print(f"⚠️  Twitter RSS 获取失败: {e}\n")
-
-                elif TWITTER_SELENIUM_AVAILABLE:
-                    print("使用方式：Selenium浏览器爬虫")
-                    print("⚠️  注意：需要Chrome浏览器，速度较慢\n")
-                    try:
-                        twitter_fetcher = TwitterSeleniumScraper(headless=True)
-                        tweets = twitter_fetcher.get_tweets_from_list(
-                            usernames=following_usernames,
-                            tweets_per_user=twitter_config.get('tweets_per_user', 3),
-                            days_back=twitter_config.get('days_back', 1)
-                        )
-                        all_tweets = tweets
-                        print(f"✅ Selenium: 找到 {len(tweets)} 条推文\n")
-                    except Exception as e:
-                        print(f"⚠️  Selenium 获取失败: {e}\n")
-
-                else:
-                    print("⚠️  Twitter功能未配置：")
-                    print("   方案1：配置 Twitter API v2（推荐，免费10,000条/月）")
-                    print("         在 config.yaml 或 .env 中设置 bearer_token")
-                    print("   方案2：安装 feedparser（RSS方式，不稳定）")
-                    print("         运行: pip install feedparser")
-                    print("   方案3：安装 selenium（浏览器爬虫，较慢但可用）")
-                    print("         运行: pip install selenium webdriver-manager\n")
-
-        if not all_papers:
-            print("未找到任何内容。")
-            return
-
-        print(f"{'=' * 60}")
-        print(f"总计: 论文/文章 {len(all_papers)} 篇")
-        print("=" * 60)
-
-        papers = all_papers
-
-        # 2. 分析内容（可选）
-        if not args.no_analysis:
-            print(f"\n{'=' * 60}")
-            print("步骤 2: 使用LLM分析内容相关性")
-            print("=" * 60)
-
-            # 获取API配置（优先从config.yaml，然后从.env）
-            api_key = config.get_api_key()
-            api_base_url = config.get_api_base_url()
-            api_type = config.get_api_type()
-
-            if not api_key:
-                print("错误: 未找到API密钥")
-                print("请在config.yaml中设置api_key，或设置环境变量")
-                print("  - Anthropic: ANTHROPIC_API_KEY")
-                print("  - OpenAI兼容: OPENAI_API_KEY 或 API_KEY")
-                return
-
-            # 获取并发配置（命令行参数覆盖配置文件）
-            max_concurrent = args.max_concurrent if args.max_concurrent != 5 else config.get_max_concurrent()
-
-            analyzer = LLMAnalyzer(
-                api_key=api_key,
-                model=config.get_model_name(),
-                max_tokens=config.get_max_tokens(),
-                base_url=api_base_url,
-                api_type=api_type,
-                max_concurrent=max_concurrent,
-                batch_size=config.get_batch_size(),
-                detail_batch_size=config.get_detail_batch_size()
-            )
-
-            # 分析论文和文章
-            if papers:
-                print(f"\n分析 {len(papers)} 篇论文/文章...")
-                analyzed_papers = asyncio.run(
-                    analyzer.two_stage_analyze_papers_async(papers, research_interests, research_prompt)
-                )
-            else:
-                analyzed_papers = []
-
-            # 分析推文
-            analyzed_tweets = []
-            if all_tweets:
-                print(f"\n分析 {len(all_tweets)} 条推文...")
-                twitter_analyzer = TwitterAnalyzer(
-                    api_key=api_key,
-                    model=config.get_model_name(),
-                    max_tokens=config.get_max_tokens(),
-                    base_url=api_base_url,
-                    api_type=api_type,
-                    max_concurrent=max_concurrent
-                )
-                analyzed_tweets = asyncio.run(
-                    twitter_analyzer.analyze_tweets_async(all_tweets, research_interests, research_prompt)
-                )
-
-            # 获取相关性阈值（命令行参数覆盖配置文件）
-            min_relevance = args.min_relevance if args.min_relevance else config.get_min_relevance()
-
-            # 过滤相关论文
-            relevant_papers = analyzer.filter_relevant_papers(
-                analyzed_papers,
-                min_relevance=min_relevance
-            ) if analyzed_papers else []
-
-            # 过滤相关推文
-            relevant_tweets = [t for t in analyzed_tweets if t.get('relevance_level') in ['high', 'medium']] if analyzed_tweets else []
-
-            relevance_label = {'high': '高', 'medium': '中', 'low': '低'}.get(min_relevance, min_relevance)
-            print(f"\n根据阈值（{relevance_label}相关及以上）:")
-            print(f"  - 相关论文/文章: {len(relevant_papers)} 篇")
-            print(f"  - 相关推文: {len(relevant_tweets)} 条")
-
-            papers_to_report = relevant_papers
-            tweets_to_report = relevant_tweets
+        if args.command == 'archive':
+            build_archives(config, force=args.rebuild)
+        elif args.command == 'outbox':
+            counts = asyncio.run(deliver_outbox(config, force=True))
+            if counts is None:
+                print("未启用邮件发件箱")
+            elif not any(counts.values()):
+                print("发件箱中没有待投递的邮件")
+        elif args.command == 'serve':
+            from agent_server import AgentServer
+            AgentServer(config, lambda warm: run_async(args, config, warm),
+                        outbox_factory=lambda: deliver_outbox(config)).serve_forever()
         else:
-            print("\n跳过AI分析")
-            papers_to_report = papers
-            tweets_to_report = all_tweets
-
-        # 3. 生成报告
-        print(f"\n{'=' * 60}")
-        print("步骤 3: 生成报告")
-        print("=" * 60)
-
-        generator = ReportGenerator(output_dir=output_dir)
-        report_path = generator.generate_report(papers_to_report, research_interests, tweets_to_report)
-
-        print(f"\n{'=' * 60}")
-        print("完成!")
-        print("=" * 60)
-        print(f"报告已保存到: {report_path}")
-        print(f"总论文/文章数: {len(papers)}")
-        if all_tweets:
-            print(f"总推文数: {len(all_tweets)}")
-        if not args.no_analysis:
-            print(f"相关论文/文章数: {len(papers_to_report)}")
-            if tweets_to_report:
-                print(f"相关推文数: {len(tweets_to_report)}")
-
-        # 4. 发送邮件（如果启用）
-        if config.is_email_enabled():
-            print(f"\n{'=' * 60}")
-            print("步骤 4: 发送邮件通知")
-            print("=" * 60)
-
-            email_config = config.get_email_config()
-
-            try:
-                sender = EmailSender(
-                    smtp_server=email_config.get('smtp_server'),
-                    smtp_port=email_config.get('smtp_port', 587),
-                    sender_email=email_config.get('sender_email'),
-                    sender_password=email_config.get('sender_password'),
-                    use_ssl=email_config.get('use_ssl', False)
-                )
-
-                # 收件人邮箱（支持多个，用逗号分隔）
-                receiver_str = email_config.get('receiver_email', '')
-                receiver_emails = [email.strip() for email in receiver_str.split(',') if email.strip()]
-
-                if not receiver_emails:
-                    print("⚠️  未配置收件人邮箱，跳过邮件发送")
-                else:
-                    # 构建邮件主题
-                    from datetime import datetime
-                    subject_prefix = email_config.get('subject_prefix', '[ArXiv每日论文]')
-                    subject = f"{subject_prefix} {datetime.now().strftime('%Y-%m-%d')}"
-
-                    # 生成HTML格式的报告内容
-                    print("正在生成HTML格式报告...")
-                    html_content = generator.generate_html_report(
-                        papers_to_report,
-                        research_interests,
-                        tweets_to_report
-                    )
-
-                    # 发送HTML格式邮件（MD报告作为附件）
-                    sender.send_html_report(
-                        receiver_emails=receiver_emails,
-                        subject=subject,
-                        html_content=html_content,
-                        attachments=[report_path]
-                    )
-
-            except Exception as e:
-                print(f"❌ 邮件发送配置错误: {e}")
-                import traceback
-                traceback.print_exc()
+            asyncio.run(run_async(args, config))
 
+    except ConfigError as e:
+        # 配置在加载时一次性校验，任何获取、分析开始之前就退出
+        print(f"错误: {e}")
+        sys.exit(2)
     except FileNotFoundError as e:
         print(f"错误: {e}")
         sys.exit(1)
@@ -0,0 +1,250 @@
+"""
+常驻运行模块
+按计划定时运行，并提供本地HTTP接口触发临时运行
+"""
+import json
+import time
+import asyncio
+import threading
+import traceback
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config_loader import ConfigLoader
+
+
+class AgentServer:
+    """
+    常驻服务
+
+    所有运行都提交到同一个常驻事件循环中执行，配置只解析一次，
+    分析流水线、HTTP连接池等对象保存在 warm 中跨运行复用，
+    避免每次运行都重新付出冷启动开销。同一时间只允许一个运行。
+    """
+
+    def __init__(self, config: ConfigLoader, run_factory: Callable[[Dict[str, Any]], Awaitable[None]],
+                 outbox_factory: Optional[Callable[[], Awaitable[Any]]] = None):
+        """
+        初始化常驻服务
+
+        Args:
+            config: 已加载的配置
+            run_factory: 接收 warm 字典并返回一次运行协程的函数
+            outbox_factory: 返回一次发件箱投递协程的函数（两次运行之间定时重试未发出的邮件）
+        """
+        serve = config.settings.serve
+        self.schedule = self._parse_schedule(list(serve.schedule))
+        self.host = serve.host
+        self.port = serve.port
+        self.run_factory = run_factory
+        self.outbox_factory = outbox_factory
+        self.outbox_interval = serve.outbox_interval
+
+        self.warm: Dict[str, Any] = {}
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, name='agent-loop', daemon=True)
+        self._lock = threading.Lock()
+        self._current = None
+        self._outbox = None
+        self._outbox_checked = 0.0
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.run_count = 0
+
+    @staticmethod
+    def _parse_schedule(schedule: List[str]) -> List[tuple]:
+        """
+        解析 "HH:MM" 格式的计划时间列表（本地时间）
+
+        Returns:
+            [(小时, 分钟), ...]
+        """
+        if isinstance(schedule, str):
+            schedule = [schedule]
+        times = []
+        for item in schedule:
+            try:
+                hour, minute = str(item).split(':')
+                times.append((int(hour), int(minute)))
+            except ValueError:
+                raise ValueError(f"无效的计划时间: {item}（应为 HH:MM 格式）")
+        return sorted(times)
+
+    def next_run_time(self, now: datetime = None) -> Optional[datetime]:
+        """计算下一次计划运行时间"""
+        if not self.schedule:
+            return None
+        now = now or datetime.now()
+        for day_offset in (0, 1):
+            day = now + timedelta(days=day_offset)
+            for hour, minute in self.schedule:
+                candidate = day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+                if candidate > now:
+                    return candidate
+        return None
+
+    def trigger(self, reason: str) -> bool:
+        """
+        触发一次运行（非阻塞）
+
+        Args:
+            reason: 触发原因（schedule / http）
+
+        Returns:
+            是否已提交；已有运行在进行时返回False
+        """
+        with self._lock:
+            if self._current is not None and not self._current.done():
+                print(f"⚠️  已有运行正在进行，忽略本次触发（{reason}）")
+                return False
+
+            self.run_count += 1
+            run_id = self.run_count
+            started = datetime.now()
+            print(f"\n{'=' * 60}")
+            print(f"▶️  第 {run_id} 次运行（触发方式: {reason}）")
+            print("=" * 60)
+
+            future = asyncio.run_coroutine_threadsafe(self.run_factory(self.warm), self.loop)
+            future.add_done_callback(lambda f: self._on_done(f, run_id, reason, started))
+            self._current = future
+            return True
+
+    def flush_outbox(self):
+        """定时投递发件箱（每 outbox_interval 秒最多一次；运行中或上一轮投递未结束时跳过）"""
+        if self.outbox_factory is None or time.monotonic() - self._outbox_checked < self.outbox_interval:
+            return
+        with self._lock:
+            if self._current is not None and not self._current.done():
+                return
+            if self._outbox is not None and not self._outbox.done():
+                return
+            self._outbox_checked = time.monotonic()
+            self._outbox = asyncio.run_coroutine_threadsafe(self.outbox_factory(), self.loop)
+            self._outbox.add_done_callback(self._on_outbox_done)
+
+    @staticmethod
+    def _on_outbox_done(future):
+        try:
+            future.result()
+        except BaseException as e:
+            print(f"⚠️  发件箱投递出错: {type(e).__name__}: {e}")
+
+    def _on_done(self, future, run_id: int, reason: str, started: datetime):
+        """记录运行结果"""
+        error = None
+        try:
+            future.result()
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+
+        elapsed = (datetime.now() - started).total_seconds()
+        self.last_run = {
+            'id': run_id,
+            'reason': reason,
+            'started_at': started.isoformat(timespec='seconds'),
+            'elapsed_seconds': round(elapsed, 1),
+            'status': 'failed' if error else 'ok',
+            'error': error,
+        }
+        print(f"⏹️  第 {run_id} 次运行结束（{'失败' if error else '成功'}，用时 {elapsed:.1f} 秒）")
+
+    def status(self) -> Dict[str, Any]:
+        """当前状态（供HTTP接口返回）"""
+        next_run = self.next_run_time()
+        return {
+            'running': self._current is not None and not self._current.done(),
+            'run_count': self.run_count,
+            'last_run': self.last_run,
+            'next_scheduled_run': next_run.isoformat(timespec='minutes') if next_run else None,
+            'warm': sorted(self.warm.keys()),
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send_json(self, code: int, payload: Dict[str, Any]):
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path in ('/', '/status'):
+                    self._send_json(200, server.status())
+                elif self.path == '/metrics':
+                    # 最近一次（或正在进行的）运行的LLM用量
+                    usage = server.warm.get('usage')
+                    body = (usage.to_prometheus() if usage is not None else '').encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self._send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if self.path == '/run':
+                    if server.trigger('http'):
+                        self._send_json(202, {'accepted': True, 'run_id': server.run_count})
+                    else:
+                        self._send_json(409, {'accepted': False, 'error': 'a run is already in progress'})
+                else:
+                    self._send_json(404, {'error': 'not found'})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def serve_forever(self):
+        """启动常驻服务，直到 Ctrl+C"""
+        self._loop_thread.start()
+        httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        http_thread = threading.Thread(target=httpd.serve_forever, name='agent-http', daemon=True)
+        http_thread.start()
+
+        schedule_str = ', '.join(f"{h:02d}:{m:02d}" for h, m in self.schedule) or '无'
+        print(f"\n{'=' * 60}")
+        print("常驻模式已启动")
+        print("=" * 60)
+        print(f"  - 计划运行时间: {schedule_str}")
+        print(f"  - 状态接口: GET  http://{self.host}:{self.port}/status")
+        print(f"  - 触发运行: POST http://{self.host}:{self.port}/run")
+        print(f"  - 用量指标: GET  http://{self.host}:{self.port}/metrics")
+
+        try:
+            next_run = self.next_run_time()
+            while True:
+                if next_run:
+                    print(f"\n下一次计划运行: {next_run.strftime('%Y-%m-%d %H:%M')}")
+                while next_run and datetime.now() < next_run:
+                    self.flush_outbox()
+                    time.sleep(min(30.0, max((next_run - datetime.now()).total_seconds(), 0.1)))
+                if next_run is None:
+                    self.flush_outbox()
+                    time.sleep(min(3600.0, self.outbox_interval if self.outbox_factory else 3600.0))
+                    continue
+                self.trigger('schedule')
+                next_run = self.next_run_time()
+        except KeyboardInterrupt:
+            print("\n正在停止常驻服务...")
+        finally:
+            httpd.shutdown()
+            self._shutdown_loop()
+
+    def _shutdown_loop(self):
+        """关闭常驻事件循环和复用的连接"""
+        pipeline = self.warm.get('pipeline')
+        if pipeline is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(pipeline.aclose(), self.loop).result(timeout=10)
+            except Exception as e:
+                print(f"⚠️  关闭HTTP连接池失败: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._loop_thread.join(timeout=10)
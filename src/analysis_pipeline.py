@@ -0,0 +1,163 @@
+"""
+分析流水线
+在同一个事件循环中并发运行论文分析与推文分析
+"""
+import asyncio
+import httpx
+from typing import List, Dict, Tuple, Optional, AsyncIterator, Awaitable
+
+from concurrency import FairLimiter
+from llm_analyzer import LLMAnalyzer
+from llm_client import open_async_client
+from profiles import ResearchProfile
+from twitter_analyzer import TwitterAnalyzer
+
+
+class AnalysisPipeline:
+    """分析流水线：论文与推文共享一个HTTP连接池和一份公平分配的并发额度"""
+
+    def __init__(self, paper_analyzer: LLMAnalyzer, tweet_analyzer: Optional[TwitterAnalyzer] = None,
+                 max_concurrent: int = 5, client: httpx.AsyncClient = None, shared_screening: bool = True):
+        """
+        初始化流水线
+
+        Args:
+            paper_analyzer: 论文分析器
+            tweet_analyzer: 推文分析器（可选）
+            max_concurrent: 论文与推文合计的最大并发请求数
+            client: 长期复用的httpx异步客户端（可选，常驻模式使用；不提供则每次分析新建）
+            shared_screening: 多画像时是否在一次调用中同时为所有画像筛选论文
+        """
+        self.paper_analyzer = paper_analyzer
+        self.tweet_analyzer = tweet_analyzer
+        self.max_concurrent = max_concurrent
+        self.client = client
+        self.shared_screening = shared_screening
+
+    async def aclose(self):
+        """关闭长期复用的HTTP客户端"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def analyze_async(self, papers: List[Dict], tweets: List[Dict], research_interests: List[str],
+                            research_prompt: str = None) -> Tuple[List[Dict], List[Dict]]:
+        """
+        并发分析论文和推文
+
+        Args:
+            papers: 论文列表
+            tweets: 推文列表
+            research_interests: 研究方向列表
+            research_prompt: 研究兴趣描述（可选）
+
+        Returns:
+            (已分析的论文列表, 已分析的推文列表)
+        """
+        limiter = FairLimiter(self.max_concurrent)
+
+        async with open_async_client(self.max_concurrent, self.client) as client:
+            paper_task = self._analyze_papers(papers, research_interests, research_prompt, client, limiter)
+            tweet_task = self._analyze_tweets(tweets, research_interests, research_prompt, client, limiter)
+            return tuple(await asyncio.gather(paper_task, tweet_task))
+
+    async def analyze_stream_async(self, paper_stream: AsyncIterator[Dict], tweets_future: Awaitable[List[Dict]],
+                                   research_interests: List[str], research_prompt: str = None,
+                                   flush_timeout: float = 30.0) -> Tuple[List[Dict], List[Dict]]:
+        """
+        流式分析论文，推文获取完成后立即开始分析推文
+
+        Args:
+            paper_stream: 论文异步迭代器
+            tweets_future: 返回推文列表的可等待对象（推文获取任务）
+            research_interests: 研究方向列表
+            research_prompt: 研究兴趣描述（可选）
+            flush_timeout: 未满批次的最长等待时间（秒）
+
+        Returns:
+            (已分析的论文列表, 已分析的推文列表)
+        """
+        limiter = FairLimiter(self.max_concurrent)
+
+        async with open_async_client(self.max_concurrent, self.client) as client:
+            async def tweets_then_analyze():
+                tweets = await tweets_future
+                return await self._analyze_tweets(tweets, research_interests, research_prompt, client, limiter)
+
+            paper_task = self.paper_analyzer.two_stage_analyze_stream_async(
+                paper_stream, research_interests, research_prompt, flush_timeout=flush_timeout,
+                client=client, semaphore=limiter.lane('papers')
+            )
+            return tuple(await asyncio.gather(paper_task, tweets_then_analyze()))
+
+    async def analyze_profiles_async(self, papers: List[Dict], tweets: List[Dict],
+                                     profiles: List[ResearchProfile]) -> Dict[str, Tuple[List[Dict], List[Dict]]]:
+        """
+        为多个研究画像分别分析同一批论文和推文
+
+        每个画像分析属于自己数据源范围的论文副本，共享的论文集不会被改写；
+        所有画像共享一个HTTP连接池和一份并发额度，各画像的批次轮转获得额度。
+        开启 shared_screening 时，论文摘要只发送一次：一次调用同时为所有画像筛选，
+        详细分析对任一画像相关的论文只做一次。
+
+        Args:
+            papers: 共享的论文列表
+            tweets: 共享的推文列表
+            profiles: 研究画像列表
+
+        Returns:
+            {画像名称: (已分析的论文列表, 已分析的推文列表)}
+        """
+        limiter = FairLimiter(self.max_concurrent)
+
+        async with open_async_client(self.max_concurrent, self.client) as client:
+            async def analyze_profile(profile: ResearchProfile):
+                profile_papers = [dict(p) for p in papers if profile.accepts(p)]
+                profile_tweets = [dict(t) for t in tweets if profile.accepts_tweet(t)]
+                print(f"\n[{profile.name}] 待分析: 论文/文章 {len(profile_papers)} 篇, 推文 {len(profile_tweets)} 条")
+                return tuple(await asyncio.gather(
+                    self._analyze_papers(profile_papers, profile.research_interests, profile.research_prompt,
+                                         client, limiter, lane=f'{profile.name}:papers'),
+                    self._analyze_tweets(profile_tweets, profile.research_interests, profile.research_prompt,
+                                         client, limiter, lane=f'{profile.name}:tweets'),
+                ))
+
+            if not self.shared_screening:
+                results = await asyncio.gather(*[analyze_profile(profile) for profile in profiles])
+                return {profile.name: result for profile, result in zip(profiles, results)}
+
+            async def tweets_for(profile: ResearchProfile):
+                return await self._analyze_tweets([dict(t) for t in tweets if profile.accepts_tweet(t)],
+                                                  profile.research_interests,
+                                                  profile.research_prompt, client, limiter,
+                                                  lane=f'{profile.name}:tweets')
+
+            paper_results, *tweet_results = await asyncio.gather(
+                self.paper_analyzer.multi_profile_analyze_papers_async(
+                    papers, profiles, client=client, semaphore=limiter.lane('papers')
+                ),
+                *[tweets_for(profile) for profile in profiles],
+            )
+
+        return {profile.name: (paper_results[profile.name], profile_tweets)
+                for profile, profile_tweets in zip(profiles, tweet_results)}
+
+    async def _analyze_papers(self, papers: List[Dict], research_interests: List[str], research_prompt: Optional[str],
+                              client, limiter: FairLimiter, lane: str = 'papers') -> List[Dict]:
+        """分析论文（论文通道）"""
+        if not papers:
+            return []
+        print(f"\n分析 {len(papers)} 篇论文/文章...")
+        return await self.paper_analyzer.two_stage_analyze_papers_async(
+            papers, research_interests, research_prompt, client=client, semaphore=limiter.lane(lane)
+        )
+
+    async def _analyze_tweets(self, tweets: List[Dict], research_interests: List[str], research_prompt: Optional[str],
+                              client, limiter: FairLimiter, lane: str = 'tweets') -> List[Dict]:
+        """分析推文（推文通道）"""
+        if not tweets or self.tweet_analyzer is None:
+            return []
+        print(f"\n分析 {len(tweets)} 条推文...")
+        return await self.tweet_analyzer.analyze_tweets_async(
+            tweets, research_interests, research_prompt, client=client, semaphore=limiter.lane(lane)
+        )
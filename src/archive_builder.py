@@ -0,0 +1,350 @@
+"""
+报告归档站点
+把 reports/ 目录下历次的日报增量生成为静态 HTML 站点，附带预先计算的客户端搜索索引
+
+站点结构（默认在 <报告目录>/site/ 下）：
+- index.html：按日期倒序的归档列表和搜索框
+- days/YYYY-MM-DD.html：每天一页
+- search/manifest.json：搜索分片列表；search/YYYY-MM-DD.json：当天的倒排索引分片
+- archive_state.json：已生成日期的来源文件状态（用于增量构建）
+
+每次构建只重新生成来源文件有变化的日期，耗时与新增内容成正比；
+index.html 和 manifest.json 只包含日期列表，每次都会重写。
+"""
+import os
+import re
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from templating import Template
+from report_model import paper_anchor
+from report_templates import REPORT_CSS
+
+REPORT_FILE_RE = re.compile(r'^arxiv_papers_(\d{4}-\d{2}-\d{2})\.(jsonl|md)$')
+
+# 搜索词：英文/数字按单词，中日韩文字按相邻两字（单字的片段保留单字）
+_WORD_RE = re.compile(r'[a-z0-9]+|[㐀-鿿]+')
+_CJK_RE = re.compile(r'[㐀-鿿]')
+
+SNIPPET_LENGTH = 120
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    搜索分词（与 index.html 中的 JavaScript 分词保持一致）
+
+    Args:
+        text: 文本
+
+    Returns:
+        去重后的词列表
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text.lower()):
+        if _CJK_RE.match(word):
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        elif len(word) > 1:
+            tokens.append(word)
+    return list(dict.fromkeys(tokens))
+
+
+def parse_markdown_report(text: str) -> List[Dict[str, Any]]:
+    """
+    从 Markdown 日报中解析论文（用于没有 JSONL 导出的历史报告）
+
+    Args:
+        text: Markdown 报告内容
+
+    Returns:
+        论文列表（title / url / pdf_url / source / published / matched_interests / abstract_zh / summary）
+    """
+    # Twitter 部分之后不是论文
+    text = text.split('\n# Twitter 学术动态', 1)[0]
+    papers = []
+    for block in re.split(r'\n---\n', text):
+        match = re.search(r'^### (.+)$', block, re.M)
+        if not match:
+            continue
+        paper: Dict[str, Any] = {'title': match.group(1).strip()}
+        body = block[match.end():]
+        fields = {
+            'published': r'\*\*发布日期:\*\* ([^\n(]+)',
+            'primary_category': r'\*\*类别:\*\* ([^\n]+)',
+            'journal': r'\*\*期刊:\*\* ([^\n]+)',
+            'url': r'\*\*论文链接:\*\* (\S+)',
+            'pdf_url': r'\*\*PDF链接:\*\* (\S+)',
+            'matched_interests': r'\*\*相关领域:\*\* ([^\n]+)',
+            'abstract_zh': r'\*\*摘要（中文）:\*\*\n(.+?)(?=\n\n\*\*|\Z)',
+            'summary': r'\*\*核心内容:\*\*\n(.+?)(?=\n\n\*\*|\Z)',
+        }
+        for key, pattern in fields.items():
+            found = re.search(pattern, body, re.S)
+            if found:
+                paper[key] = found.group(1).strip()
+        if 'matched_interests' in paper:
+            paper['matched_interests'] = [item.strip() for item in paper['matched_interests'].split(',')]
+        papers.append(paper)
+    return papers
+
+
+def load_jsonl_report(path: str) -> List[Dict[str, Any]]:
+    """读取 JSONL 导出中的论文记录"""
+    papers = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record.get('type') == 'paper':
+                    papers.append(record)
+    return papers
+
+
+def _source(paper: Dict[str, Any]) -> str:
+    if paper.get('source'):
+        return paper['source']
+    return paper.get('journal') or f"ArXiv {paper.get('primary_category', 'unknown')}"
+
+
+def _snippet(paper: Dict[str, Any]) -> str:
+    text = (paper.get('summary') or paper.get('abstract_zh') or '').replace('\n', ' ').strip()
+    return text[:SNIPPET_LENGTH] + ('...' if len(text) > SNIPPET_LENGTH else '')
+
+
+DAY_HTML = Template("""\
+<!DOCTYPE html>
+<html lang='zh-CN'>
+<head>
+<meta charset='UTF-8'>
+<meta name='viewport' content='width=device-width, initial-scale=1.0'>
+<title>学术内容日报 - {{ date }}</title>
+{{ REPORT_CSS }}
+</head>
+<body>
+<div class='container'>
+<p><a href='../index.html'>← 返回归档</a></p>
+<h1>学术内容日报 - {{ date }}</h1>
+<p>共 {{ len(papers) }} 篇</p>
+{% for paper in papers %}
+<div class='paper {{ paper.get('relevance_level') or 'medium' }}-relevance' id='{{ paper['anchor_id'] }}'>
+<h3>{{ paper.get('title', '未知标题') }}</h3>
+<div class='paper-info'><strong>来源:</strong> {{ source_of(paper) }}{% if paper.get('relevance_level') %} · <strong>相关性:</strong> {{ paper['relevance_level'] }}{% endif %}</div>
+{% if paper.get('matched_interests') %}
+<div class='paper-info'><strong>相关领域:</strong> {{ ', '.join(paper['matched_interests']) }}</div>
+{% endif %}
+{% if paper.get('url') %}
+<div class='paper-info'><strong>论文链接:</strong> <a href='{{ paper['url'] }}' target='_blank'>{{ paper['url'] }}</a></div>
+{% endif %}
+{% if paper.get('summary') or paper.get('abstract_zh') %}
+<div class='paper-abstract'>
+{% if paper.get('summary') %}
+<strong>核心内容:</strong>
+<div class='abstract-content'>{{ paper['summary'] }}</div>
+{% endif %}
+{% if paper.get('abstract_zh') %}
+<strong>摘要:</strong>
+<div class='abstract-content'>{{ paper['abstract_zh'] }}</div>
+{% endif %}
+</div>
+{% endif %}
+</div>
+{% endfor %}
+</div>
+</body>
+</html>
+""", params=('date', 'papers'), name='archive_day', REPORT_CSS=REPORT_CSS, source_of=_source)
+
+INDEX_HTML = Template("""\
+<!DOCTYPE html>
+<html lang='zh-CN'>
+<head>
+<meta charset='UTF-8'>
+<meta name='viewport' content='width=device-width, initial-scale=1.0'>
+<title>学术内容日报归档</title>
+{{ REPORT_CSS }}
+</head>
+<body>
+<div class='container'>
+<h1>学术内容日报归档</h1>
+<p><input id='q' type='search' placeholder='搜索标题、核心内容、中文摘要' style='width:100%;padding:8px;font-size:1em'></p>
+<div id='results'></div>
+<div id='days'>
+<h2>全部日期（{{ len(days) }} 天，{{ total }} 篇）</h2>
+<ul>
+{% for date, count in days %}
+<li><a href='days/{{ date }}.html'>{{ date }}</a>（{{ count }} 篇）</li>
+{% endfor %}
+</ul>
+</div>
+</div>
+<script>
+// 分词规则与 archive_builder.tokenize 一致
+function tokenize(text) {
+  var tokens = [], words = text.toLowerCase().match(/[a-z0-9]+|[\\u3400-\\u9fff]+/g) || [];
+  words.forEach(function (w) {
+    if (/[\\u3400-\\u9fff]/.test(w[0])) {
+      if (w.length === 1) tokens.push(w);
+      for (var i = 0; i + 1 < w.length; i++) tokens.push(w.substr(i, 2));
+    } else if (w.length > 1) tokens.push(w);
+  });
+  return tokens.filter(function (t, i) { return tokens.indexOf(t) === i; });
+}
+var shards = null;
+function loadShards() {
+  if (shards) return Promise.resolve(shards);
+  return fetch('search/manifest.json').then(function (r) { return r.json(); }).then(function (m) {
+    return Promise.all(m.shards.map(function (s) {
+      return fetch('search/' + s + '.json').then(function (r) { return r.json(); });
+    }));
+  }).then(function (loaded) { shards = loaded; return shards; });
+}
+function escapeHtml(s) {
+  return s.replace(/[&<>"']/g, function (c) {
+    return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'}[c];
+  });
+}
+function search(query) {
+  var terms = tokenize(query), box = document.getElementById('results');
+  document.getElementById('days').style.display = terms.length ? 'none' : '';
+  if (!terms.length) { box.innerHTML = ''; return; }
+  loadShards().then(function (all) {
+    var hits = [];
+    all.forEach(function (shard) {
+      var docs = null;
+      for (var i = 0; i < terms.length; i++) {
+        var posting = shard.index[terms[i]];
+        if (!posting) { docs = []; break; }
+        docs = docs === null ? posting.slice() : docs.filter(function (d) { return posting.indexOf(d) >= 0; });
+        if (!docs.length) break;
+      }
+      (docs || []).forEach(function (d) { hits.push([shard.date].concat(shard.docs[d])); });
+    });
+    box.innerHTML = '<h2>搜索结果（' + hits.length + '）</h2>' + hits.slice(0, 200).map(function (h) {
+      return "<div class='paper'><h3><a href='days/" + h[0] + ".html#" + h[2] + "'>" + escapeHtml(h[1]) + "</a></h3>"
+        + "<div class='paper-info'>" + h[0] + " · " + escapeHtml(h[3]) + "</div>"
+        + "<div class='paper-info'>" + escapeHtml(h[4]) + "</div></div>";
+    }).join('');
+  });
+}
+document.getElementById('q').addEventListener('input', function (e) { search(e.target.value); });
+</script>
+</body>
+</html>
+""", params=('days', 'total'), name='archive_index', REPORT_CSS=REPORT_CSS)
+
+
+class ArchiveBuilder:
+    """增量归档站点生成器"""
+
+    def __init__(self, reports_dir: str, site_dir: Optional[str] = None):
+        """
+        初始化归档生成器
+
+        Args:
+            reports_dir: 报告目录（包含 arxiv_papers_YYYY-MM-DD.jsonl / .md）
+            site_dir: 站点输出目录（默认为 <报告目录>/site）
+        """
+        self.reports_dir = reports_dir
+        self.site_dir = site_dir or os.path.join(reports_dir, 'site')
+        self.state_path = os.path.join(self.site_dir, 'archive_state.json')
+
+    def _discover(self) -> Dict[str, str]:
+        """每个日期的来源文件（有 JSONL 导出时优先使用，否则解析 Markdown）"""
+        sources: Dict[str, str] = {}
+        if not os.path.isdir(self.reports_dir):
+            return sources
+        for name in os.listdir(self.reports_dir):
+            match = REPORT_FILE_RE.match(name)
+            if not match:
+                continue
+            date, ext = match.groups()
+            if ext == 'jsonl' or date not in sources:
+                sources[date] = name
+        return sources
+
+    def _load_state(self) -> Dict[str, Any]:
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'days': {}}
+
+    def _load_day(self, filename: str) -> List[Dict[str, Any]]:
+        path = os.path.join(self.reports_dir, filename)
+        if filename.endswith('.jsonl'):
+            papers = load_jsonl_report(path)
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                papers = parse_markdown_report(f.read())
+        for i, paper in enumerate(papers):
+            if not paper.get('anchor_id'):
+                paper['anchor_id'] = paper_anchor(paper, i)
+        return papers
+
+    @staticmethod
+    def _build_shard(date: str, papers: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """当天的搜索分片：docs 为 [标题, 锚点, 来源, 摘要片段]，index 为 词 → 文档序号列表"""
+        docs = []
+        index: Dict[str, List[int]] = {}
+        for doc_id, paper in enumerate(papers):
+            docs.append([paper.get('title', ''), paper['anchor_id'], _source(paper), _snippet(paper)])
+            text = ' '.join(str(paper.get(key) or '') for key in ('title', 'summary', 'abstract_zh'))
+            for token in tokenize(text):
+                index.setdefault(token, []).append(doc_id)
+        return {'date': date, 'docs': docs, 'index': index}
+
+    def _write_json(self, path: str, data: Any):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+    def build(self, force: bool = False) -> Dict[str, int]:
+        """
+        增量构建站点
+
+        Args:
+            force: 是否忽略已有状态，重新生成所有日期
+
+        Returns:
+            统计信息 {'built': 新生成的天数, 'skipped': 未变化的天数, 'removed': 删除的天数, 'days': 总天数}
+        """
+        days_dir = os.path.join(self.site_dir, 'days')
+        search_dir = os.path.join(self.site_dir, 'search')
+        os.makedirs(days_dir, exist_ok=True)
+        os.makedirs(search_dir, exist_ok=True)
+
+        state = {'days': {}} if force else self._load_state()
+        sources = self._discover()
+        built = skipped = 0
+
+        for date, filename in sorted(sources.items()):
+            stat = os.stat(os.path.join(self.reports_dir, filename))
+            signature = {'source': filename, 'mtime': stat.st_mtime, 'size': stat.st_size}
+            previous = state['days'].get(date)
+            if previous and all(previous.get(key) == value for key, value in signature.items()):
+                skipped += 1
+                continue
+
+            papers = self._load_day(filename)
+            with open(os.path.join(days_dir, f"{date}.html"), 'w', encoding='utf-8') as f:
+                DAY_HTML.stream(f.write, date=date, papers=papers)
+            self._write_json(os.path.join(search_dir, f"{date}.json"), self._build_shard(date, papers))
+            state['days'][date] = dict(signature, count=len(papers))
+            built += 1
+
+        # 来源报告已删除的日期
+        removed = [date for date in state['days'] if date not in sources]
+        for date in removed:
+            del state['days'][date]
+            for path in (os.path.join(days_dir, f"{date}.html"), os.path.join(search_dir, f"{date}.json")):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        days: List[Tuple[str, int]] = sorted(((date, info['count']) for date, info in state['days'].items()),
+                                             reverse=True)
+        self._write_json(os.path.join(search_dir, 'manifest.json'), {'shards': [date for date, _ in days]})
+        with open(os.path.join(self.site_dir, 'index.html'), 'w', encoding='utf-8') as f:
+            INDEX_HTML.stream(f.write, days=days, total=sum(count for _, count in days))
+        self._write_json(self.state_path, state)
+
+        return {'built': built, 'skipped': skipped, 'removed': len(removed), 'days': len(days)}
@@ -3,7 +3,7 @@ ArXiv论文搜索模块
 """
 import arxiv
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Iterator
 from dateutil import parser as date_parser
 
 
@@ -31,6 +31,44 @@ class ArxivSearcher:
         Returns:
             论文信息列表
         """
+        # 去重（有些论文可能属于多个类别）
+        unique_papers = self._deduplicate_papers(list(self.iter_recent_papers(days_back=days_back)))
+
+        # 按日期统计论文数量
+        date_stats = {}
+        for paper in unique_papers:
+            date = paper.get('updated', paper['published'])
+            date_stats[date] = date_stats.get(date, 0) + 1
+
+        print(f"\n共找到 {len(unique_papers)} 篇论文")
+
+        if len(unique_papers) == 0:
+            print("⚠️  WARNING: ArXiv returned 0 papers!")
+            print("   Possible causes:")
+            print("   1. Configuration error (days_back is a string instead of int)")
+            print("   2. Date range calculation error")
+            print("   3. ArXiv API issue")
+            print("   4. No papers published in the specified date range")
+            print(f"   Search parameters: days_back={days_back}, categories={self.categories}")
+        else:
+            print("按日期分布:")
+            for date in sorted(date_stats.keys(), reverse=True):
+                print(f"  {date}: {date_stats[date]} 篇")
+
+        return unique_papers
+
+    def iter_recent_papers(self, days_back: int = 1) -> Iterator[Dict]:
+        """
+        逐篇产出最近几天的论文（边翻页边产出，供流式分析使用）
+
+        同一篇论文出现在多个类别中时只产出一次。
+
+        Args:
+            days_back: 向前搜索的天数
+
+        Yields:
+            论文信息
+        """
         # 验证参数类型
         if not isinstance(days_back, int):
             print(f"⚠️  Warning: days_back should be int, got {type(days_back).__name__}: '{days_back}'")
@@ -60,7 +98,7 @@ class ArxivSearcher:
         print(f"参数: days_back={days_back}, 缓冲时间: {buffer_hours}小时")
         print(f"当前时间: {now.strftime('%Y-%m-%d %H:%M:%S')} UTC")
 
-        papers = []
+        seen_urls = set()
         total_fetched = 0
 
         for category in self.categories:
@@ -111,9 +149,11 @@ class ArxivSearcher:
                             'categories': result.categories,
                             'primary_category': result.primary_category
                         }
-                        papers.append(paper_info)
                         category_count += 1
                         consecutive_skips = 0  # 重置连续跳过计数器
+                        if paper_info['url'] not in seen_urls:
+                            seen_urls.add(paper_info['url'])
+                            yield paper_info
                     else:
                         skipped_count += 1
                         consecutive_skips += 1  # 增加连续跳过计数器
@@ -148,32 +188,6 @@ class ArxivSearcher:
             print(f"  找到 {category_count} 篇论文 (从 {fetched_count} 篇中筛选，匹配率 {match_rate:.1f}%)")
             total_fetched += category_count
 
-        # 去重（有些论文可能属于多个类别）
-        unique_papers = self._deduplicate_papers(papers)
-
-        # 按日期统计论文数量
-        date_stats = {}
-        for paper in unique_papers:
-            date = paper.get('updated', paper['published'])
-            date_stats[date] = date_stats.get(date, 0) + 1
-
-        print(f"\n共找到 {len(unique_papers)} 篇论文")
-
-        if len(unique_papers) == 0:
-            print("⚠️  WARNING: ArXiv returned 0 papers!")
-            print("   Possible causes:")
-            print("   1. Configuration error (days_back is a string instead of int)")
-            print("   2. Date range calculation error")
-            print("   3. ArXiv API issue")
-            print("   4. No papers published in the specified date range")
-            print(f"   Search parameters: days_back={days_back}, categories={self.categories}")
-        else:
-            print("按日期分布:")
-            for date in sorted(date_stats.keys(), reverse=True):
-                print(f"  {date}: {date_stats[date]} 篇")
-
-        return unique_papers
-
     def _deduplicate_papers(self, papers: List[Dict]) -> List[Dict]:
         """
         根据URL去重论文
@@ -0,0 +1,94 @@
+"""
+并发控制工具
+在多个分析任务之间公平分配LLM并发额度
+"""
+import asyncio
+from collections import deque
+from typing import Dict, Deque
+
+
+class FairLimiter:
+    """
+    公平并发限流器
+
+    总并发数不超过 limit；当多个通道（如论文分析、推文分析）同时排队时，
+    空出的额度按通道轮转分配，避免某一方的大量批次把另一方饿死。
+    """
+
+    def __init__(self, limit: int):
+        """
+        初始化限流器
+
+        Args:
+            limit: 总并发上限
+        """
+        self.limit = max(int(limit), 1)
+        self._active = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {}
+        self._order: Deque[str] = deque()
+
+    def lane(self, name: str) -> 'FairLane':
+        """
+        获取指定通道，可直接用于 `async with`，与 asyncio.Semaphore 用法一致
+
+        Args:
+            name: 通道名称
+        """
+        if name not in self._waiters:
+            self._waiters[name] = deque()
+            self._order.append(name)
+        return FairLane(self, name)
+
+    def _has_waiters(self) -> bool:
+        return any(fut for queue in self._waiters.values() for fut in queue if not fut.done())
+
+    async def acquire(self, name: str):
+        """在指定通道上获取一个并发额度"""
+        if self._active < self.limit and not self._has_waiters():
+            self._active += 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters[name].append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # 额度已转交给本任务但任务被取消，归还额度
+                self.release()
+            else:
+                try:
+                    self._waiters[name].remove(fut)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self):
+        """归还一个并发额度，并按轮转顺序唤醒下一个通道的等待者"""
+        for _ in range(len(self._order)):
+            name = self._order[0]
+            self._order.rotate(-1)
+            queue = self._waiters[name]
+            while queue:
+                fut = queue.popleft()
+                if not fut.done():
+                    # 额度直接转交，不减少 _active
+                    fut.set_result(None)
+                    return
+        self._active -= 1
+
+
+class FairLane:
+    """FairLimiter 的单个通道"""
+
+    def __init__(self, limiter: FairLimiter, name: str):
+        self.limiter = limiter
+        self.name = name
+
+    async def __aenter__(self):
+        await self.limiter.acquire(self.name)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.limiter.release()
+        return False
@@ -2,8 +2,11 @@
 配置文件加载器
 """
 import os
+import copy
 import yaml
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from settings import Settings, apply_env_overlays
 
 
 class ConfigLoader:
@@ -18,10 +21,11 @@ class ConfigLoader:
         """
         self.config_path = config_path
         self.config = self._load_config()
+        self.settings = Settings.from_dict(self.config, self.config_path)
 
     def _load_config(self) -> Dict[str, Any]:
         """
-        加载配置文件
+        加载配置文件并应用环境变量覆盖（见 settings.apply_env_overlays）
 
         Returns:
             配置字典
@@ -32,7 +36,26 @@ class ConfigLoader:
         with open(self.config_path, 'r', encoding='utf-8') as f:
             config = yaml.safe_load(f)
 
-        return config
+        return apply_env_overlays(config if config is not None else {})
+
+    def refresh(self):
+        """原始配置字典被修改后（如合并画像的数据源范围）重新校验并生成配置对象"""
+        self.settings = Settings.from_dict(self.config, self.config_path)
+
+    def fingerprint(self) -> str:
+        """整个配置的指纹（不含密钥），配置内容不变则指纹不变"""
+        return self.settings.fingerprint()
+
+    def analysis_fingerprint(self) -> str:
+        """影响分析结果的配置的指纹，可作为分析结果缓存的键"""
+        return self.settings.analysis_fingerprint()
+
+    def _section(self, *path: str) -> Dict[str, Any]:
+        """原始配置中的某一节（副本，调用方修改不影响配置）"""
+        section = self.config
+        for key in path:
+            section = section.get(key) if isinstance(section, dict) else None
+        return copy.deepcopy(section) if isinstance(section, dict) else {}
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -49,183 +72,166 @@ class ConfigLoader:
 
     def get_research_interests(self) -> list:
         """获取研究方向列表"""
-        return self.get('research_interests', [])
+        return list(self.settings.research.interests)
 
     def get_research_prompt(self) -> str:
         """获取研究兴趣的详细描述"""
-        prompt = self.get('research_prompt', None)
-        # 如果prompt存在且不为空字符串，返回去除首尾空白后的内容
-        if prompt and isinstance(prompt, str) and prompt.strip():
-            return prompt.strip()
-        return None
+        return self.settings.research.prompt
 
     def get_arxiv_categories(self) -> list:
         """获取arxiv类别列表"""
-        # 优先从sources.arxiv.categories读取
-        arxiv_config = self.get('sources', {}).get('arxiv', {})
-        categories = arxiv_config.get('categories', None)
-        if categories:
-            return categories
-        # 向后兼容旧配置
-        return self.get('arxiv_categories', [])
+        return list(self.settings.sources.arxiv.categories)
 
     def get_max_results(self) -> int:
         """获取最大结果数"""
-        # 优先从sources.arxiv.max_results读取
-        arxiv_config = self.get('sources', {}).get('arxiv', {})
-        max_results = arxiv_config.get('max_results', None)
-        if max_results:
-            try:
-                return int(max_results)
-            except (ValueError, TypeError) as e:
-                print(f"⚠️  Warning: Invalid max_results value '{max_results}' ({type(max_results).__name__}), using default 100")
-                print(f"   Error: {e}")
-                return 100
-        # 向后兼容旧配置
-        return int(self.get('max_results', 100))
+        return self.settings.sources.arxiv.max_results
 
     def get_days_back(self) -> int:
         """获取搜索天数（ArXiv）"""
-        # 优先从sources.arxiv.days_back读取
-        arxiv_config = self.get('sources', {}).get('arxiv', {})
-        days_back = arxiv_config.get('days_back', None)
-        if days_back:
-            try:
-                return int(days_back)
-            except (ValueError, TypeError) as e:
-                print(f"⚠️  Warning: Invalid days_back value '{days_back}' ({type(days_back).__name__}), using default 1")
-                print(f"   Error: {e}")
-                return 1
-        # 向后兼容旧配置
-        return int(self.get('days_back', 1))
+        return self.settings.sources.arxiv.days_back
 
     def get_api_type(self) -> str:
         """获取API类型 (anthropic 或 openai)"""
-        return self.get('api_type', 'anthropic')
+        return self.settings.llm.api_type
 
     def get_model_name(self) -> str:
         """获取模型名称（兼容新旧配置）"""
-        # 优先使用新的 model 配置
-        model = self.get('model', None)
-        if model:
-            return model
-        # 向后兼容旧的 claude_model 配置
-        return self.get('claude_model', 'claude-sonnet-4-5-20250929')
+        return self.settings.llm.model
 
     def get_max_tokens(self) -> int:
         """获取最大token数"""
-        # 优先使用新的 max_tokens 配置
-        max_tokens = self.get('max_tokens', None)
-        if max_tokens:
-            return max_tokens
-        # 向后兼容旧的 claude_max_tokens 配置
-        return self.get('claude_max_tokens', 1024)
+        return self.settings.llm.max_tokens
+
+    def get_stage_llm_config(self, stage: str) -> Dict[str, Any]:
+        """
+        获取分阶段模型配置（models.screen / models.detail / models.tweets）
+
+        只返回该阶段明确设置的 api_type、api_key、base_url、model（其余沿用全局配置）；
+        max_tokens 未设置时为None（使用各阶段调用处的默认值），temperature 默认0.7。
+        """
+        stage_settings = getattr(self.settings.llm, stage)
+        settings = {key: getattr(stage_settings, key) for key in ('api_type', 'api_key', 'base_url', 'model')
+                    if getattr(stage_settings, key)}
+        settings['max_tokens'] = stage_settings.max_tokens
+        settings['temperature'] = stage_settings.temperature
+        return settings
+
+    def is_escalation_enabled(self) -> bool:
+        """是否将第一阶段的"中相关"结果交给详细分析模型复核"""
+        return self.settings.llm.escalate_medium
+
+    def is_response_streaming_enabled(self) -> bool:
+        """第二阶段详细分析是否使用流式响应（SSE）"""
+        return self.settings.llm.stream_responses
+
+    def is_stream_usage_enabled(self) -> bool:
+        """流式响应是否要求 OpenAI 兼容接口返回用量（stream_options.include_usage）"""
+        return self.settings.llm.stream_usage
+
+    def get_metrics_config(self) -> Dict[str, Any]:
+        """获取用量统计配置（运行清单、Prometheus 文件、模型单价）"""
+        return self._section('metrics')
+
+    def get_report_topic_keywords(self) -> Dict[str, List[str]]:
+        """获取报告速览的额外主题关键词 {主题: [关键词, ...]}"""
+        return {topic: list(keywords) for topic, keywords in self.settings.report.topic_keywords.items()}
+
+    def get_report_formats(self) -> List[str]:
+        """获取结构化报告的导出格式（jsonl / parquet），默认不导出"""
+        return list(self.settings.report.formats)
+
+    def get_archive_config(self) -> Dict[str, Any]:
+        """获取归档站点配置（每次运行后是否更新、站点目录）"""
+        return self._section('archive')
+
+    def get_endpoints(self) -> List[Dict[str, Any]]:
+        """获取多端点配置（负载均衡与故障切换），未配置时为空列表"""
+        return copy.deepcopy(self.get('endpoints', []) or [])
+
+    def get_hedging_config(self) -> Optional[Dict[str, Any]]:
+        """获取对冲请求配置，未启用时返回None"""
+        if self.settings.hedging is None:
+            return None
+        return self._section('hedging')
 
     def get_output_dir(self) -> str:
         """获取输出目录"""
-        return self.get('output_dir', 'reports')
+        return self.settings.report.output_dir
 
     def get_api_base_url(self) -> str:
         """获取API端点"""
-        return self.get('api_base_url', None)
+        return self.settings.llm.base_url
 
     def get_api_key(self) -> str:
-        """获取API密钥（优先从环境变量读取）"""
-        # 优先从环境变量读取（支持多种变量名）
-        api_key = (os.getenv('ANTHROPIC_API_KEY') or
-                   os.getenv('OPENAI_API_KEY') or
-                   os.getenv('API_KEY'))
-        if api_key:
-            return api_key.strip()
-
-        # 其次从配置文件读取
-        api_key = self.get('api_key', None)
-        return api_key.strip() if api_key else None
+        """获取API密钥（环境变量 ANTHROPIC_API_KEY / OPENAI_API_KEY / API_KEY 优先于配置文件）"""
+        return self.settings.llm.api_key
 
     def get_max_concurrent(self) -> int:
         """获取最大并发请求数"""
-        max_concurrent = self.get('max_concurrent', 5)
-        try:
-            return int(max_concurrent)
-        except (ValueError, TypeError) as e:
-            print(f"⚠️  Warning: Invalid max_concurrent value '{max_concurrent}' ({type(max_concurrent).__name__}), using default 5")
-            print(f"   Error: {e}")
-            return 5
+        return self.settings.analysis.max_concurrent
 
     def get_batch_size(self) -> int:
         """获取批量筛选时每批论文数量"""
-        return self.get('batch_size', 25)
+        return self.settings.analysis.batch_size
 
     def get_detail_batch_size(self) -> int:
         """获取详细分析时每批论文数量"""
-        return self.get('detail_batch_size', 8)
+        return self.settings.analysis.detail_batch_size
+
+    def is_streaming_enabled(self) -> bool:
+        """判断是否启用流式分析（边获取边分析）"""
+        return self.settings.analysis.streaming
+
+    def get_flush_timeout(self) -> float:
+        """获取流式分析中未满批次的最长等待时间（秒）"""
+        return self.settings.analysis.flush_timeout
 
     def get_min_relevance(self) -> str:
         """获取最小相关性级别"""
-        return self.get('min_relevance', 'medium')
+        return self.settings.research.min_relevance
 
     def get_email_config(self) -> Dict[str, Any]:
-        """获取邮件配置（支持环境变量覆盖）"""
-        email_config = self.get('email', {}).copy()
-
-        # 从环境变量覆盖敏感信息
-        if os.getenv('EMAIL_SENDER'):
-            email_config['sender_email'] = os.getenv('EMAIL_SENDER')
-        if os.getenv('EMAIL_PASSWORD'):
-            email_config['sender_password'] = os.getenv('EMAIL_PASSWORD')
-        if os.getenv('EMAIL_RECEIVER'):
-            email_config['receiver_email'] = os.getenv('EMAIL_RECEIVER')
+        """获取邮件配置（已应用环境变量覆盖）"""
+        return self._section('email')
 
-        return email_config
+    def get_outbox_config(self) -> Dict[str, Any]:
+        """获取邮件发件箱配置（目录、重试次数、退避时间、运行结束时的最长等待）"""
+        return self._section('email', 'outbox')
 
     def is_email_enabled(self) -> bool:
         """判断是否启用邮件发送"""
-        email_config = self.get_email_config()
-        return email_config.get('enabled', False)
+        return self.settings.email.enabled
 
     def get_twitter_config(self) -> Dict[str, Any]:
-        """获取Twitter配置（支持环境变量覆盖）"""
-        # 从新配置结构读取（sources.twitter）
-        source_twitter = self.get('sources', {}).get('twitter', {}) or {}
-        # 从顶层twitter配置读取（bearer_token等）
-        top_twitter = self.get('twitter', {}) or {}
-
-        # 合并配置（sources.twitter优先）
-        twitter_config = {**top_twitter, **source_twitter}
-
-        # 从环境变量覆盖敏感信息
-        if os.getenv('TWITTER_USERNAME'):
-            twitter_config['username'] = os.getenv('TWITTER_USERNAME')
-        if os.getenv('TWITTER_EMAIL'):
-            twitter_config['email'] = os.getenv('TWITTER_EMAIL')
-        if os.getenv('TWITTER_PASSWORD'):
-            twitter_config['password'] = os.getenv('TWITTER_PASSWORD')
-
-        return twitter_config
+        """获取Twitter配置（已应用环境变量覆盖）"""
+        # 顶层twitter配置（bearer_token等）与 sources.twitter 合并，sources.twitter 优先
+        return {**self._section('twitter'), **self._section('sources', 'twitter')}
 
     def is_twitter_enabled(self) -> bool:
         """判断是否启用Twitter功能"""
-        twitter_config = self.get_twitter_config()
-        return twitter_config.get('enabled', False)
+        return self.settings.sources.twitter.enabled
 
     def get_enabled_sources(self) -> list:
         """获取启用的数据源列表"""
-        sources = []
+        sources = self.settings.sources
+        return [name for name in ('arxiv', 'journals', 'twitter') if getattr(sources, name).enabled]
 
-        # ArXiv 默认启用
-        if self.get('sources', {}).get('arxiv', {}).get('enabled', True):
-            sources.append('arxiv')
+    def get_journal_config(self) -> Dict[str, Any]:
+        """获取期刊配置"""
+        return self._section('sources', 'journals')
 
-        # CNS 期刊
-        if self.get('sources', {}).get('journals', {}).get('enabled', False):
-            sources.append('journals')
+    def get_serve_config(self) -> Dict[str, Any]:
+        """获取常驻模式配置（计划时间、本地接口地址）"""
+        return self._section('serve')
 
-        # Twitter
-        if self.get('sources', {}).get('twitter', {}).get('enabled', False):
-            sources.append('twitter')
+    def get_profiles(self) -> List[Any]:
+        """获取研究画像列表（每项为画像配置字典或另一个配置文件路径）"""
+        return copy.deepcopy(self.get('profiles', []) or [])
 
-        return sources
+    def is_shared_screening_enabled(self) -> bool:
+        """多研究画像时是否在一次LLM调用中同时为所有画像筛选论文"""
+        return self.settings.analysis.shared_screening
 
-    def get_journal_config(self) -> Dict[str, Any]:
-        """获取期刊配置"""
-        return self.get('sources', {}).get('journals', {})
+    def get_source_timeout(self, source: str) -> float:
+        """获取单个数据源的获取超时时间（秒）"""
+        return getattr(self.settings.sources, source).timeout
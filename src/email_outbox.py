@@ -0,0 +1,239 @@
+"""
+邮件发件箱
+渲染好的邮件先持久化到发件箱目录，再由异步任务投递；失败的邮件按指数退避重试，
+本次运行没发出去的留给下一次运行（或常驻模式的定时重试），不需要为了重发邮件重新分析
+"""
+import os
+import json
+import time
+import random
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from email.mime.multipart import MIMEMultipart
+
+
+class EmailOutbox:
+    """
+    基于目录的发件箱
+
+    每封邮件保存为 pending/<id>.eml（原始邮件）和 pending/<id>.json（收件人、重试次数、
+    下次重试时间、最近错误），两个文件都先写临时文件再原子替换，.json 写入后才算入队。
+    投递成功后删除文件；超过最大重试次数的邮件移到 failed/ 目录保留。
+    投递时对每封邮件建立 <id>.lock（O_EXCL），同时运行的单次运行与常驻服务不会重复发送同一封邮件。
+    """
+
+    # 超过该时间（秒）的锁视为进程异常退出遗留
+    STALE_LOCK_SECONDS = 900
+
+    def __init__(self, spool_dir: str, max_attempts: int = 8, backoff_base: float = 60.0,
+                 backoff_max: float = 6 * 3600):
+        """
+        初始化发件箱
+
+        Args:
+            spool_dir: 发件箱目录
+            max_attempts: 最大投递次数，超过后移入 failed/
+            backoff_base: 第一次失败后的重试间隔（秒），之后每次翻倍
+            backoff_max: 重试间隔上限（秒）
+        """
+        self.spool_dir = spool_dir
+        self.pending_dir = os.path.join(spool_dir, 'pending')
+        self.failed_dir = os.path.join(spool_dir, 'failed')
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+
+    @classmethod
+    def from_config(cls, outbox_config: Dict[str, Any], output_dir: str) -> 'EmailOutbox':
+        """
+        由发件箱配置（ConfigLoader.get_outbox_config()）创建发件箱
+
+        Args:
+            outbox_config: 发件箱配置字典
+            output_dir: 报告输出目录（未配置 dir 时发件箱位于 output_dir/outbox）
+
+        Returns:
+            发件箱
+        """
+        return cls(
+            spool_dir=outbox_config.get('dir') or os.path.join(output_dir, 'outbox'),
+            max_attempts=outbox_config.get('max_attempts', 8),
+            backoff_base=outbox_config.get('backoff_base', 60),
+            backoff_max=outbox_config.get('backoff_max', 6 * 3600),
+        )
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _write_meta(self, directory: str, meta: Dict[str, Any]):
+        data = json.dumps(meta, ensure_ascii=False, indent=2).encode('utf-8')
+        self._write_atomic(os.path.join(directory, f"{meta['id']}.json"), data)
+
+    def enqueue(self, msg: Union[MIMEMultipart, bytes], receiver_emails: List[str], label: str = '') -> str:
+        """
+        把一封邮件放入发件箱（立即可投递）
+
+        Args:
+            msg: 邮件对象或原始邮件
+            receiver_emails: 收件人列表
+            label: 便于识别的说明（如邮件主题），只用于日志
+
+        Returns:
+            邮件ID
+        """
+        os.makedirs(self.pending_dir, exist_ok=True)
+        message_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.urandom(4).hex()}"
+        data = msg if isinstance(msg, bytes) else msg.as_bytes()
+        self._write_atomic(os.path.join(self.pending_dir, f"{message_id}.eml"), data)
+        self._write_meta(self.pending_dir, {
+            'id': message_id,
+            'label': label,
+            'receivers': list(receiver_emails),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'attempts': 0,
+            'next_attempt_at': 0,
+            'last_error': None,
+        })
+        return message_id
+
+    def _load(self, directory: str) -> List[Dict[str, Any]]:
+        if not os.path.isdir(directory):
+            return []
+        entries = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  发件箱记录无法读取，已跳过: {name}（{e}）")
+        return entries
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """待投递的邮件记录（按入队时间排序）"""
+        return self._load(self.pending_dir)
+
+    def failed(self) -> List[Dict[str, Any]]:
+        """超过最大重试次数的邮件记录"""
+        return self._load(self.failed_dir)
+
+    def due(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """已到重试时间的待投递邮件"""
+        now = time.time() if now is None else now
+        return [entry for entry in self.pending() if entry.get('next_attempt_at', 0) <= now]
+
+    def backoff(self, attempts: int) -> float:
+        """第 attempts 次失败后的重试间隔（秒，指数退避，带 ±20% 抖动）"""
+        delay = min(self.backoff_base * (2 ** max(attempts - 1, 0)), self.backoff_max)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _lock(self, message_id: str) -> Optional[str]:
+        """占用一封邮件（其他进程正在投递时返回None）"""
+        lock_path = os.path.join(self.pending_dir, f"{message_id}.lock")
+        for _ in range(2):
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return lock_path
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) < self.STALE_LOCK_SECONDS:
+                        return None
+                    os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+        return None
+
+    def _remove(self, directory: str, message_id: str):
+        for suffix in ('.eml', '.json'):
+            try:
+                os.remove(os.path.join(directory, f"{message_id}{suffix}"))
+            except FileNotFoundError:
+                pass
+
+    def _deliver_one(self, sender, entry: Dict[str, Any]) -> str:
+        """投递一封邮件（阻塞），返回 sent / retry / failed / skipped"""
+        message_id = entry['id']
+        lock_path = self._lock(message_id)
+        if lock_path is None:
+            return 'skipped'
+        try:
+            # 加锁后重新读取记录：等锁期间其他进程可能已经发出或更新了这封邮件
+            eml_path = os.path.join(self.pending_dir, f"{message_id}.eml")
+            try:
+                with open(os.path.join(self.pending_dir, f"{message_id}.json"), 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                with open(eml_path, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return 'skipped'
+            try:
+                sender.send_message(data, entry['receivers'])
+            except Exception as e:
+                entry['attempts'] = entry.get('attempts', 0) + 1
+                entry['last_error'] = f"{type(e).__name__}: {e}"
+                entry['last_attempt_at'] = datetime.now().isoformat(timespec='seconds')
+                if entry['attempts'] >= self.max_attempts:
+                    os.makedirs(self.failed_dir, exist_ok=True)
+                    os.replace(eml_path, os.path.join(self.failed_dir, f"{message_id}.eml"))
+                    self._write_meta(self.failed_dir, entry)
+                    self._remove(self.pending_dir, message_id)
+                    print(f"❌ 邮件投递失败 {entry['attempts']} 次，已移入 {self.failed_dir}: "
+                          f"{entry.get('label') or message_id}（{entry['last_error']}）")
+                    return 'failed'
+                delay = self.backoff(entry['attempts'])
+                entry['next_attempt_at'] = time.time() + delay
+                self._write_meta(self.pending_dir, entry)
+                print(f"⚠️  邮件投递失败（第 {entry['attempts']} 次），{delay / 60:.1f} 分钟后重试: "
+                      f"{entry.get('label') or message_id}（{entry['last_error']}）")
+                return 'retry'
+            self._remove(self.pending_dir, message_id)
+            print(f"✅ 邮件发送成功！{entry.get('label') or message_id} → {', '.join(entry['receivers'])}")
+            return 'sent'
+        finally:
+            os.remove(lock_path)
+
+    def _deliver_all(self, sender, entries: List[Dict[str, Any]]) -> List[str]:
+        """
+        在同一个SMTP会话中投递多封邮件（阻塞），最多同时使用 sender.max_connections 个连接
+
+        会话与发送线程都在这里开启和结束：调用方的等待被取消时，会话会保持到所有在途邮件发完为止，
+        不会在发送途中被关闭
+        """
+        with sender.session():
+            workers = min(sender.max_connections, len(entries))
+            if workers <= 1:
+                return [self._deliver_one(sender, entry) for entry in entries]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(lambda entry: self._deliver_one(sender, entry), entries))
+
+    async def deliver(self, sender, force: bool = False) -> Dict[str, int]:
+        """
+        投递发件箱中已到重试时间的邮件，最多同时使用 sender.max_connections 个SMTP连接
+
+        Args:
+            sender: EmailSender（在同一个SMTP会话中发送，复用已登录的连接）
+            force: 是否忽略退避时间，投递所有待发邮件
+
+        Returns:
+            {'sent': 成功数, 'retry': 等待重试数, 'failed': 移入 failed/ 数, 'skipped': 其他进程正在投递数}
+        """
+        entries = self.pending() if force else self.due()
+        counts = {'sent': 0, 'retry': 0, 'failed': 0, 'skipped': 0}
+        if not entries:
+            return counts
+        # smtplib 是阻塞的：整批投递（含发件箱记录的更新）放到线程中执行，事件循环继续处理其他任务；
+        # 等待被取消（如运行结束时超时）时线程仍会发完已开始的邮件并更新记录
+        results = await asyncio.to_thread(self._deliver_all, sender, entries)
+        for result in results:
+            counts[result] += 1
+        return counts
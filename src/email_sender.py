@@ -1,20 +1,34 @@
 """
 邮件发送模块
+同一个发送器在会话（session）内复用已登录的SMTP连接：连续发送多封邮件时只握手、登录一次，
+连接断开时自动重连；逐个收件人发送时最多同时使用 max_connections 个连接
 """
 import smtplib
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
-from typing import Optional, List
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+def _is_disconnect(server: smtplib.SMTP, error: Exception) -> bool:
+    """发送失败是否由连接断开引起（服务器空闲超时、421 关闭连接、网络中断等）"""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)):
+        return True
+    # smtplib 收到 421 时会先关闭连接再抛出 SMTPSenderRefused / SMTPDataError 等
+    return isinstance(error, smtplib.SMTPException) and getattr(server, 'sock', None) is None
 
 
 class EmailSender:
     """邮件发送器"""
 
     def __init__(self, smtp_server: str, smtp_port: int, sender_email: str,
-                 sender_password: str, use_ssl: bool = False):
+                 sender_password: str, use_ssl: bool = False, max_connections: int = 1,
+                 per_recipient: bool = False):
         """
         初始化邮件发送器
 
@@ -24,15 +38,214 @@ class EmailSender:
             sender_email: 发件人邮箱
             sender_password: 发件人密码或应用专用密码
             use_ssl: 是否使用SSL
+            max_connections: 逐个收件人发送时最多同时使用的SMTP连接数
+            per_recipient: 是否给每个收件人单独发送一封邮件（收件人之间互不可见）
         """
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.sender_email = sender_email
         self.sender_password = sender_password
         self.use_ssl = use_ssl
+        self.max_connections = max(1, int(max_connections or 1))
+        self.per_recipient = per_recipient
+
+        # 会话内空闲的已登录连接；会话嵌套计数归零时全部关闭
+        self._lock = threading.Lock()
+        self._idle: List[smtplib.SMTP] = []
+        self._sessions = 0
+
+    @classmethod
+    def from_config(cls, email_config: Dict[str, Any]) -> 'EmailSender':
+        """
+        由邮件配置（ConfigLoader.get_email_config()）创建发送器
+
+        Args:
+            email_config: 邮件配置字典
+
+        Returns:
+            邮件发送器
+        """
+        return cls(
+            smtp_server=email_config.get('smtp_server'),
+            smtp_port=email_config.get('smtp_port', 587),
+            sender_email=email_config.get('sender_email'),
+            sender_password=email_config.get('sender_password'),
+            use_ssl=email_config.get('use_ssl', False),
+            max_connections=email_config.get('max_connections', 1),
+            per_recipient=email_config.get('per_recipient', False),
+        )
+
+    @contextmanager
+    def session(self):
+        """
+        SMTP会话：会话内发送的邮件复用已登录的连接，退出最外层会话时关闭所有连接
+
+        用法::
+
+            with sender.session():
+                sender.send_html_report(...)
+                sender.send_html_report(...)   # 不再重新握手、登录
+
+        不在会话中调用 send_* 时，每次调用结束即关闭连接（与单独发送一封邮件相同）。
+        """
+        with self._lock:
+            self._sessions += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._sessions -= 1
+                idle = self._idle if self._sessions == 0 else []
+                if self._sessions == 0:
+                    self._idle = []
+            for server in idle:
+                self._quit(server)
+
+    def _connect(self) -> smtplib.SMTP:
+        """建立新的SMTP连接并登录"""
+        if self.use_ssl:
+            # 使用SSL连接
+            print(f"正在连接到 {self.smtp_server}:{self.smtp_port} (SSL)...")
+            server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=30)
+        else:
+            # 使用TLS连接
+            print(f"正在连接到 {self.smtp_server}:{self.smtp_port} (STARTTLS)...")
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30)
+        try:
+            server.set_debuglevel(0)  # 设置为1可以看到详细的SMTP交互日志
+            if not self.use_ssl:
+                server.starttls()
+            server.login(self.sender_email, self.sender_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _quit(self, server: smtplib.SMTP):
+        """礼貌地关闭连接（QUIT），连接已断开时直接关闭"""
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _acquire(self) -> smtplib.SMTP:
+        """取一个空闲的已登录连接，没有时新建"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def _release(self, server: smtplib.SMTP):
+        """发送完成后归还连接：会话内放回空闲列表，否则关闭"""
+        with self._lock:
+            if self._sessions:
+                self._idle.append(server)
+                return
+        self._quit(server)
+
+    def send_message(self, msg: Union[MIMEMultipart, bytes], receiver_emails: List[str]):
+        """
+        通过已登录的连接发送一封已构建好的邮件；复用的连接已断开时重连一次再发送
+        （出错时直接抛出异常，由调用方决定是否重试）
+
+        Args:
+            msg: 邮件对象，或序列化后的原始邮件（如发件箱中保存的 .eml）
+            receiver_emails: 收件人列表
+        """
+        for attempt in range(2):
+            server = self._acquire() if attempt == 0 else self._connect()
+            try:
+                if isinstance(msg, bytes):
+                    refused = server.sendmail(self.sender_email, receiver_emails, msg)
+                else:
+                    refused = server.send_message(msg, to_addrs=receiver_emails)
+            except Exception as e:
+                if not _is_disconnect(server, e):
+                    self._release(server)
+                    raise
+                server.close()
+                if attempt:
+                    raise
+                print(f"⚠️  SMTP连接已断开（{e}），正在重新连接...")
+                continue
+            self._release(server)
+            if refused:
+                print(f"⚠️  以下收件人被服务器拒收: {', '.join(refused)}")
+            return
+
+    def _deliver(self, messages: List[Tuple[MIMEMultipart, List[str]]]) -> List[Tuple[List[str], Exception]]:
+        """
+        发送多封邮件：只有一个连接时依次发送，否则最多 max_connections 个连接并行发送
+
+        Args:
+            messages: [(邮件对象, 收件人列表), ...]
+
+        Returns:
+            发送失败的 [(收件人列表, 异常), ...]
+        """
+        def send(item):
+            msg, receivers = item
+            try:
+                self.send_message(msg, receivers)
+            except Exception as e:
+                return receivers, e
+            return None
+
+        with self.session():
+            workers = min(self.max_connections, len(messages))
+            if workers <= 1:
+                results = [send(item) for item in messages]
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(send, messages))
+        return [result for result in results if result is not None]
+
+    def _recipient_groups(self, receiver_emails: List[str], per_recipient: Optional[bool]) -> List[List[str]]:
+        """收件人分组：逐个发送时每人一组，否则所有收件人合并为一封"""
+        if per_recipient is None:
+            per_recipient = self.per_recipient
+        return [[email] for email in receiver_emails] if per_recipient else [receiver_emails]
+
+    def _deliver_report(self, messages: List[Tuple[MIMEMultipart, List[str]]]) -> bool:
+        """
+        发送报告邮件（一封或逐个收件人的多封）
+
+        Args:
+            messages: [(邮件对象, 收件人列表), ...]
+
+        Returns:
+            是否全部发送成功（全部失败时抛出第一个错误）
+        """
+        failures = self._deliver(messages)
+        if failures and len(failures) == len(messages):
+            raise failures[0][1]
+        for receivers, error in failures:
+            print(f"❌ 发送给 {', '.join(receivers)} 失败: {error}")
+        return not failures
+
+    @staticmethod
+    def _read_attachments(paths: List[str]) -> List[Tuple[str, bytes]]:
+        """读取附件内容（逐个收件人发送时只读一次）"""
+        attachments = []
+        for file_path in paths:
+            if os.path.exists(file_path):
+                with open(file_path, 'rb') as f:
+                    attachments.append((os.path.basename(file_path), f.read()))
+        return attachments
+
+    @staticmethod
+    def _attach(msg: MIMEMultipart, attachments: List[Tuple[str, bytes]]):
+        """把附件加入邮件"""
+        for filename, data in attachments:
+            attachment = MIMEBase('application', 'octet-stream')
+            attachment.set_payload(data)
+            encoders.encode_base64(attachment)
+            attachment.add_header('Content-Disposition',
+                                  f'attachment; filename={filename}')
+            msg.attach(attachment)
 
     def send_report(self, receiver_emails: List[str], subject: str,
-                    report_path: str, summary: str) -> bool:
+                    report_path: str, summary: str, per_recipient: Optional[bool] = None) -> bool:
         """
         发送报告邮件
 
@@ -41,17 +254,12 @@ class EmailSender:
             subject: 邮件主题
             report_path: 报告文件路径
             summary: 邮件正文摘要
+            per_recipient: 是否逐个收件人发送（默认使用构造时的设置）
 
         Returns:
             是否发送成功
         """
         try:
-            # 创建邮件对象
-            msg = MIMEMultipart()
-            msg['From'] = self.sender_email
-            msg['To'] = ', '.join(receiver_emails)
-            msg['Subject'] = subject
-
             # 邮件正文
             body = f"""
 您好！
@@ -63,42 +271,23 @@ class EmailSender:
 ---
 此邮件由 ArXiv Agent 自动发送
 """
-            msg.attach(MIMEText(body, 'plain', 'utf-8'))
+            attachments = self._read_attachments([report_path])
 
-            # 添加附件
-            if os.path.exists(report_path):
-                with open(report_path, 'rb') as f:
-                    attachment = MIMEBase('application', 'octet-stream')
-                    attachment.set_payload(f.read())
-                    encoders.encode_base64(attachment)
-
-                    filename = os.path.basename(report_path)
-                    attachment.add_header('Content-Disposition',
-                                        f'attachment; filename={filename}')
-                    msg.attach(attachment)
-
-            # 发送邮件
-            if self.use_ssl:
-                # 使用SSL连接
-                print(f"正在连接到 {self.smtp_server}:{self.smtp_port} (SSL)...")
-                with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=30) as server:
-                    server.set_debuglevel(0)  # 设置为1可以看到详细的SMTP交互日志
-                    print("正在登录...")
-                    server.login(self.sender_email, self.sender_password)
-                    print("正在发送邮件...")
-                    server.send_message(msg)
-            else:
-                # 使用TLS连接
-                print(f"正在连接到 {self.smtp_server}:{self.smtp_port} (STARTTLS)...")
-                with smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30) as server:
-                    server.set_debuglevel(0)
-                    print("正在启动TLS加密...")
-                    server.starttls()
-                    print("正在登录...")
-                    server.login(self.sender_email, self.sender_password)
-                    print("正在发送邮件...")
-                    server.send_message(msg)
+            def build(receivers: List[str]) -> MIMEMultipart:
+                # 创建邮件对象
+                msg = MIMEMultipart()
+                msg['From'] = self.sender_email
+                msg['To'] = ', '.join(receivers)
+                msg['Subject'] = subject
+                msg.attach(MIMEText(body, 'plain', 'utf-8'))
+                # 添加附件
+                self._attach(msg, attachments)
+                return msg
 
+            print("正在发送邮件...")
+            groups = self._recipient_groups(receiver_emails, per_recipient)
+            if not self._deliver_report([(build(group), group) for group in groups]):
+                return False
             print(f"✅ 邮件发送成功！收件人: {', '.join(receiver_emails)}")
             return True
 
@@ -119,8 +308,41 @@ class EmailSender:
             print(f"详细错误:\n{traceback.format_exc()}")
             return False
 
+    def build_html_messages(self, receiver_emails: List[str], subject: str,
+                            html_content: Optional[str] = None, attachments: Optional[List[str]] = None,
+                            html_path: Optional[str] = None,
+                            per_recipient: Optional[bool] = None) -> List[Tuple[MIMEMultipart, List[str]]]:
+        """
+        构建HTML格式的报告邮件（不发送），参数同 send_html_report
+
+        Returns:
+            [(邮件对象, 收件人列表), ...]，逐个收件人发送时每人一封
+        """
+        if html_content is None:
+            if not html_path:
+                raise ValueError("需要提供 html_content 或 html_path")
+            with open(html_path, 'r', encoding='utf-8') as f:
+                html_content = f.read()
+
+        attachment_data = self._read_attachments(attachments or [])
+
+        messages = []
+        for receivers in self._recipient_groups(receiver_emails, per_recipient):
+            # 创建邮件对象
+            msg = MIMEMultipart('alternative')
+            msg['From'] = self.sender_email
+            msg['To'] = ', '.join(receivers)
+            msg['Subject'] = subject
+            # 添加HTML内容
+            msg.attach(MIMEText(html_content, 'html', 'utf-8'))
+            # 添加附件
+            self._attach(msg, attachment_data)
+            messages.append((msg, receivers))
+        return messages
+
     def send_html_report(self, receiver_emails: List[str], subject: str,
-                         html_content: str, attachments: Optional[List[str]] = None) -> bool:
+                         html_content: Optional[str] = None, attachments: Optional[List[str]] = None,
+                         html_path: Optional[str] = None, per_recipient: Optional[bool] = None) -> bool:
         """
         发送HTML格式的报告邮件
 
@@ -129,45 +351,17 @@ class EmailSender:
             subject: 邮件主题
             html_content: HTML格式的邮件内容
             attachments: 附件文件路径列表
+            html_path: HTML报告文件路径（不传 html_content 时，发送前从该文件读取邮件内容）
+            per_recipient: 是否逐个收件人发送（默认使用构造时的设置）
 
         Returns:
             是否发送成功
         """
         try:
-            # 创建邮件对象
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.sender_email
-            msg['To'] = ', '.join(receiver_emails)
-            msg['Subject'] = subject
-
-            # 添加HTML内容
-            msg.attach(MIMEText(html_content, 'html', 'utf-8'))
-
-            # 添加附件
-            if attachments:
-                for file_path in attachments:
-                    if os.path.exists(file_path):
-                        with open(file_path, 'rb') as f:
-                            attachment = MIMEBase('application', 'octet-stream')
-                            attachment.set_payload(f.read())
-                            encoders.encode_base64(attachment)
-
-                            filename = os.path.basename(file_path)
-                            attachment.add_header('Content-Disposition',
-                                                f'attachment; filename={filename}')
-                            msg.attach(attachment)
-
-            # 发送邮件
-            if self.use_ssl:
-                with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as server:
-                    server.login(self.sender_email, self.sender_password)
-                    server.send_message(msg)
-            else:
-                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                    server.starttls()
-                    server.login(self.sender_email, self.sender_password)
-                    server.send_message(msg)
-
+            messages = self.build_html_messages(receiver_emails, subject, html_content, attachments,
+                                                html_path, per_recipient)
+            if not self._deliver_report(messages):
+                return False
             print(f"✅ HTML邮件发送成功！收件人: {', '.join(receiver_emails)}")
             return True
 
@@ -4,7 +4,7 @@
 """
 import feedparser
 import httpx
-from typing import List, Dict
+from typing import List, Dict, Iterator
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 
@@ -68,6 +68,25 @@ class JournalFetcher:
         Returns:
             文章列表
         """
+        all_articles = list(self.iter_recent_articles(days_back=days_back))
+
+        print(f"\n✅ 共找到 {len(all_articles)} 篇文章")
+
+        # 按发表时间降序排序
+        all_articles.sort(key=lambda x: x.get('published_date', ''), reverse=True)
+
+        return all_articles
+
+    def iter_recent_articles(self, days_back: int = 7) -> Iterator[Dict]:
+        """
+        逐个期刊获取并产出最近的文章（供流式分析使用）
+
+        Args:
+            days_back: 获取最近几天的文章
+
+        Yields:
+            文章信息
+        """
         cutoff_date = datetime.now() - timedelta(days=days_back)
 
         print(f"\n正在从学术期刊获取最近 {days_back} 天的文章...")
@@ -85,25 +104,18 @@ class JournalFetcher:
 
         print(f"将从 {len(journals_to_fetch)} 个期刊获取文章:\n  {', '.join(journals_to_fetch.keys())}\n")
 
-        all_articles = []
-
         for journal_name, rss_url in journals_to_fetch.items():
             print(f"  正在获取 {journal_name}...")
 
             try:
                 articles = self._fetch_from_rss(journal_name, rss_url, cutoff_date)
-                all_articles.extend(articles)
                 print(f"    ✓ 找到 {len(articles)} 篇文章")
 
             except Exception as e:
                 print(f"    ✗ 获取失败: {e}")
+                continue
 
-        print(f"\n✅ 共找到 {len(all_articles)} 篇文章")
-
-        # 按发表时间降序排序
-        all_articles.sort(key=lambda x: x.get('published_date', ''), reverse=True)
-
-        return all_articles
+            yield from articles
 
     def _fetch_from_rss(self, journal_name: str, rss_url: str, cutoff_date: datetime) -> List[Dict]:
         """
@@ -3,10 +3,22 @@
 支持多种LLM API
 """
 import os
+import re
+import time
 import asyncio
 import httpx
-from typing import Dict, List, Tuple, Optional
-from llm_client import LLMClient
+from typing import Dict, List, Tuple, Optional, AsyncIterator, Callable
+from llm_client import LLMClient, open_async_client
+from profiles import ResearchProfile
+from stream_parser import PaperBlockParser, StreamInterrupted
+from tracing import NULL_TRACER
+from usage_metrics import UsageTracker
+
+# 多画像筛选每个（论文, 画像）组合约输出一行（按50 token估计），输出上限为 8192 token
+PROFILE_SCREEN_TOKENS_PER_PAIR = 50
+PROFILE_SCREEN_MAX_TOKENS = 8192
+# 多画像筛选的回复中缺少的（论文, 画像）组合最多重新筛选的轮数
+PROFILE_RESCREEN_ROUNDS = 2
 
 
 class LLMAnalyzer:
@@ -21,7 +33,15 @@ class LLMAnalyzer:
         api_type: str = "anthropic",
         max_concurrent: int = 5,
         batch_size: int = 25,
-        detail_batch_size: int = 8
+        detail_batch_size: int = 8,
+        stage_settings: Optional[Dict[str, Dict]] = None,
+        escalate_medium: bool = False,
+        hedging: Optional[Dict] = None,
+        endpoints: Optional[List[Dict]] = None,
+        stream_responses: bool = False,
+        stream_usage: bool = True,
+        metrics: Optional[UsageTracker] = None,
+        tracer=None
     ):
         """
         初始化LLM分析器
@@ -35,40 +55,192 @@ class LLMAnalyzer:
             max_concurrent: 最大并发请求数 (默认5)
             batch_size: 第一阶段批量筛选时每批论文数量 (默认25)
             detail_batch_size: 第二阶段批量详细分析时每批论文数量 (默认8)
+            stage_settings: 分阶段模型配置 {'screen': {...}, 'detail': {...}}（可选），
+                每项可包含 api_type/api_key/base_url/model/max_tokens/temperature，未设置的字段使用上面的参数
+            escalate_medium: 是否将第一阶段判为"中相关"的论文交给详细分析模型复核
+            hedging: 对冲请求配置（可选，见 LLMClient）
+            endpoints: 多端点配置（可选，见 LLMClient）
+            stream_responses: 第二阶段是否使用流式响应（逐篇解析，中断时保留已完成的论文）
+            stream_usage: 流式响应是否要求 OpenAI 兼容接口返回用量（见 LLMClient）
+            metrics: 用量统计器（可选，按 screen / detail 阶段记录）
+            tracer: 运行计时器（可选，记录第一/二阶段及每个批次的区间）
         """
         # 创建LLM客户端
-        self.llm_client = LLMClient(
-            api_type=api_type,
-            api_key=api_key,
-            base_url=base_url,
-            model=model,
-            max_tokens=max_tokens
-        )
+        self._client_settings = {
+            'api_type': api_type,
+            'api_key': api_key,
+            'base_url': base_url,
+            'model': model,
+            'max_tokens': max_tokens,
+            'hedging': hedging,
+            'endpoints': endpoints,
+            'metrics': metrics,
+            'stream_usage': stream_usage,
+        }
+        self.llm_client = LLMClient(**self._client_settings)
 
         self.max_concurrent = max_concurrent
         self.batch_size = batch_size
         self.detail_batch_size = detail_batch_size
+        self.stream_responses = stream_responses
+        self.tracer = tracer or NULL_TRACER
+
+        # 分阶段模型：筛选用小而快的模型，详细分析（及复核）用强模型
+        self.stages = {
+            stage: self._make_stage((stage_settings or {}).get(stage))
+            for stage in ('screen', 'detail')
+        }
+        self.escalate_medium = escalate_medium and self.stages['detail'][0] is not self.stages['screen'][0]
+        if escalate_medium and not self.escalate_medium:
+            print("⚠️  筛选与详细分析使用同一模型，已忽略 escalate_medium")
+
+    def _make_stage(self, settings: Optional[Dict]) -> Tuple[LLMClient, Optional[int], float]:
+        """
+        构建单个阶段的模型配置
+
+        Args:
+            settings: 阶段配置（为空时使用默认客户端）
 
-    async def _call_api_async(self, prompt: str, client: httpx.AsyncClient, max_tokens: int = None) -> str:
+        Returns:
+            (LLM客户端, 该阶段的最大输出token数（None表示使用调用处的默认值）, 温度)
+        """
+        settings = dict(settings or {})
+        max_tokens = settings.pop('max_tokens', None)
+        temperature = float(settings.pop('temperature', 0.7))
+
+        overrides = {key: value for key, value in settings.items()
+                     if value is not None and value != self._client_settings.get(key)}
+        if not overrides:
+            return self.llm_client, max_tokens, temperature
+
+        client_settings = {**self._client_settings, **overrides}
+        if overrides.keys() & {'api_type', 'api_key', 'base_url'}:
+            # 阶段指定了自己的连接信息，不再使用全局的多端点配置
+            client_settings['endpoints'] = None
+        return LLMClient(**client_settings), max_tokens, temperature
+
+    async def _call_api_async(self, prompt: str, client: httpx.AsyncClient, max_tokens: int = None,
+                              stage: str = 'screen') -> str:
         """
         异步调用LLM API
 
         Args:
             prompt: 提示词
             client: httpx异步客户端
-            max_tokens: 最大token数（如果不指定，使用默认值）
+            max_tokens: 最大token数（如果不指定，使用默认值；阶段配置了 max_tokens 时以阶段配置为准）
+            stage: 调用所属阶段（screen / detail），决定使用的模型
 
         Returns:
             API响应文本
         """
-        return await self.llm_client.chat_completion(
+        llm_client, stage_max_tokens, temperature = self.stages[stage]
+        return await llm_client.chat_completion(
             prompt=prompt,
             client=client,
-            max_tokens=max_tokens,
-            temperature=0.7
+            max_tokens=stage_max_tokens or max_tokens,
+            temperature=temperature,
+            stage=stage
         )
 
-    async def _batch_filter_relevance_async(self, papers_batch: List[Dict], research_interests: List[str], client: httpx.AsyncClient, semaphore: asyncio.Semaphore, research_prompt: str = None) -> List[Tuple[int, str, List[str]]]:
+    async def _screen_batch_async(self, papers_batch: List[Tuple[int, Dict]], research_interests: List[str],
+                                  client: httpx.AsyncClient, semaphore, research_prompt: str = None) -> List[Tuple[int, str, List[str]]]:
+        """
+        第一阶段筛选一批论文；开启 escalate_medium 时，"中相关"的论文交给详细分析模型复核
+
+        Returns:
+            [(论文索引, 相关性级别, 匹配领域), ...]
+        """
+        with self.tracer.span('screen batch', cat='llm', papers=len(papers_batch)):
+            results = await self._batch_filter_relevance_async(papers_batch, research_interests, client, semaphore, research_prompt)
+            if not self.escalate_medium:
+                return results
+
+            medium = {idx for idx, relevance, _ in results if relevance == 'medium'}
+            if not medium:
+                return results
+
+            print(f"  ↗️  {len(medium)} 篇中相关论文交给强模型复核")
+            rejudged = await self._batch_filter_relevance_async(
+                [(idx, paper) for idx, paper in papers_batch if idx in medium],
+                research_interests, client, semaphore, research_prompt, stage='detail'
+            )
+            if rejudged is None:
+                # 复核失败时保留第一阶段的判断
+                return results
+            updates = {item[0]: item for item in rejudged if item[0] in medium}
+            return [updates.get(item[0], item) for item in results]
+
+    async def _screen_profiles_batch_async(self, papers_batch: List[Tuple[int, Dict]], profiles: List[ResearchProfile],
+                                           client: httpx.AsyncClient, semaphore) -> Dict[str, List[Tuple[int, str, List[str]]]]:
+        """
+        多画像第一阶段筛选一批论文；开启 escalate_medium 时，"中相关"的（论文, 画像）组合交给详细分析模型复核
+
+        Returns:
+            {画像名称: [(论文索引, 相关性级别, 匹配领域), ...]}
+        """
+        with self.tracer.span('screen batch', cat='llm', papers=len(papers_batch), profiles=len(profiles)):
+            results = await self._screen_profiles_complete_async(papers_batch, profiles, client, semaphore)
+            if not self.escalate_medium:
+                return results
+
+            medium = {(idx, name) for name, items in results.items() for idx, relevance, _ in items if relevance == 'medium'}
+            if not medium:
+                return results
+
+            print(f"  ↗️  {len(medium)} 个中相关的（论文, 画像）组合交给强模型复核")
+            indices = {idx for idx, _ in medium}
+            names = {name for _, name in medium}
+            rejudged = await self._screen_profiles_complete_async(
+                [(idx, paper) for idx, paper in papers_batch if idx in indices],
+                [profile for profile in profiles if profile.name in names], client, semaphore, stage='detail'
+            )
+            if rejudged is None:
+                return results
+            for name, items in rejudged.items():
+                updates = {item[0]: item for item in items if (item[0], name) in medium}
+                results[name] = [updates.get(item[0], item) for item in results[name]]
+            return results
+
+    async def _screen_profiles_complete_async(self, papers_batch: List[Tuple[int, Dict]], profiles: List[ResearchProfile],
+                                              client: httpx.AsyncClient, semaphore,
+                                              stage: str = 'screen') -> Optional[Dict[str, List[Tuple[int, str, List[str]]]]]:
+        """
+        多画像筛选一批论文，回复中缺少的（论文, 画像）组合（如回复被截断）重新筛选
+
+        重新筛选 PROFILE_RESCREEN_ROUNDS 轮后仍缺少的组合：常规筛选标记为低相关性以保留，复核时保持原结果
+
+        Returns:
+            {画像名称: [(论文索引, 相关性级别, 匹配领域), ...]}；复核全部失败时返回None
+        """
+        results = await self._batch_filter_profiles_async(papers_batch, profiles, client, semaphore, stage=stage)
+        if results is None:
+            return None
+        in_scope = {(idx, profile.name) for idx, paper in papers_batch for profile in profiles if profile.accepts(paper)}
+
+        for _ in range(PROFILE_RESCREEN_ROUNDS):
+            missing = in_scope - {(item[0], name) for name, items in results.items() for item in items}
+            if not missing:
+                return results
+            print(f"  ↻ 回复中缺少 {len(missing)} 个（论文, 画像）组合的结果，重新筛选")
+            indices = {idx for idx, _ in missing}
+            names = {name for _, name in missing}
+            retried = await self._batch_filter_profiles_async(
+                [(idx, paper) for idx, paper in papers_batch if idx in indices],
+                [profile for profile in profiles if profile.name in names], client, semaphore, stage=stage
+            )
+            if retried is None:
+                break
+            for name, items in retried.items():
+                results[name].extend(item for item in items if (item[0], name) in missing)
+
+        missing = in_scope - {(item[0], name) for name, items in results.items() for item in items}
+        if missing and stage == 'screen':
+            print(f"  ⚠️  {len(missing)} 个（论文, 画像）组合多次筛选仍无结果，标记为低相关性以保留")
+            for idx, name in sorted(missing):
+                results[name].append((idx, 'low', []))
+        return results
+
+    async def _batch_filter_relevance_async(self, papers_batch: List[Dict], research_interests: List[str], client: httpx.AsyncClient, semaphore: asyncio.Semaphore, research_prompt: str = None, stage: str = 'screen') -> Optional[List[Tuple[int, str, List[str]]]]:
         """
         批量快速筛选论文相关性（第一阶段）
 
@@ -78,9 +250,10 @@ class LLMAnalyzer:
             client: httpx异步客户端
             semaphore: 并发控制信号量
             research_prompt: 研究兴趣的详细描述（可选，如果提供则优先使用）
+            stage: 使用的模型阶段（screen 为常规筛选，detail 为强模型复核）
 
         Returns:
-            [(论文索引, 相关性级别, 匹配领域), ...]
+            [(论文索引, 相关性级别, 匹配领域), ...]；复核全部失败时返回None
         """
         async with semaphore:
             # 构建批量筛选的提示词
@@ -125,7 +298,7 @@ class LLMAnalyzer:
             max_retries = 3
             for retry in range(max_retries):
                 try:
-                    response_text = await self._call_api_async(prompt, client, max_tokens=3072)
+                    response_text = await self._call_api_async(prompt, client, max_tokens=3072, stage=stage)
 
                     # 解析批量响应
                     results = []
@@ -177,37 +350,144 @@ class LLMAnalyzer:
                         await asyncio.sleep(wait_time)
                     else:
                         print(f"  详细错误信息:\n{traceback.format_exc()}")
+                        if stage != 'screen':
+                            return None
                         # 最后一次失败，返回所有论文标记为low而非unknown，避免丢失
                         print(f"  ⚠️  {len(papers_batch)}篇论文批量筛选失败，标记为低相关性以保留")
                         return [(idx, 'low', []) for idx, _ in papers_batch]
 
-    async def _batch_analyze_detailed_async(self, papers_batch: List[Tuple[int, Dict]], client: httpx.AsyncClient, semaphore: asyncio.Semaphore) -> List[Tuple[int, Dict]]:
+    async def _batch_filter_profiles_async(self, papers_batch: List[Tuple[int, Dict]], profiles: List[ResearchProfile],
+                                           client: httpx.AsyncClient, semaphore,
+                                           stage: str = 'screen') -> Optional[Dict[str, List[Tuple[int, str, List[str]]]]]:
         """
-        批量详细分析论文（第二阶段）
+        一次调用为多个研究画像批量筛选论文相关性（多画像第一阶段）
+
+        所有画像的简要描述和同一批论文放在同一个提示词中，模型对每个（论文, 画像）组合给出相关性，
+        摘要只需发送一次。
 
         Args:
             papers_batch: 一批论文 [(索引, 论文), ...]
+            profiles: 研究画像列表
             client: httpx异步客户端
             semaphore: 并发控制信号量
+            stage: 使用的模型阶段（screen 为常规筛选，detail 为强模型复核）
 
         Returns:
-            [(论文索引, 详细分析结果), ...]
+            {画像名称: [(论文索引, 相关性级别, 匹配领域), ...]}（只包含画像关注范围内的论文）；复核全部失败时返回None
         """
         async with semaphore:
-            # 构建批量详细分析的提示词
+            profiles_text = ""
+            for k, profile in enumerate(profiles, 1):
+                description = profile.research_prompt or ', '.join(profile.research_interests)
+                profiles_text += f"\n【画像{k}】{description.strip()}\n"
+
             papers_text = ""
             for idx, paper in papers_batch:
-                authors_str = ', '.join(paper.get('authors', [])[:5])
-                if len(paper.get('authors', [])) > 5:
-                    authors_str += f' 等 ({len(paper.get("authors", []))}位作者)'
+                papers_text += f"\n【论文{idx}】\n"
+                papers_text += f"标题: {paper['title']}\n"
+                papers_text += f"摘要: {paper['abstract'][:800]}...\n"
+
+            prompt = f"""你是一个AI研究助手。以下有 {len(profiles)} 位用户（研究画像），请分别判断每篇论文与每位用户研究方向的相关性。
+
+用户研究画像：
+{profiles_text}
+
+论文列表：
+{papers_text}
+
+请对每篇论文、每个画像各输出一行（务必包含论文编号和画像编号）：
+
+【论文X】【画像Y】相关性: 高/中/低/无关  |  匹配领域: XXX, XXX（如果无关则写"无"）
+
+相关性判断标准：
+- **高相关**：论文核心内容直接服务于该用户的研究方向，方法和应用场景高度契合
+- **中相关**：论文涉及该用户关注的技术或方法，虽然应用场景不完全相同，但有借鉴价值或潜在迁移可能
+- **低相关**：论文提到了相关的概念或技术，但不是核心内容，仅有间接联系
+- **无关**：论文内容与该用户研究方向完全无关
+
+重要提示：
+- 每一行必须同时包含【论文X】和【画像Y】标记，各画像独立判断
+- 采用**宽松的标准**：只要论文涉及相关技术、方法或应用场景，即使不是完全匹配，也应标记为"中相关"或"高相关"
+- 顶级期刊（Nature、Science、Cell等）的创新方法通常有迁移价值，应给予更高评分
+- 不要过于严格，宁可多筛选出一些潜在相关的论文"""
+
+            # 输出行数为 论文数 × 画像数，按行数放宽输出上限（批次大小已按画像数缩小，见 profile_batch_size）
+            max_tokens = min(PROFILE_SCREEN_MAX_TOKENS,
+                             max(3072, PROFILE_SCREEN_TOKENS_PER_PAIR * len(papers_batch) * len(profiles)))
+            in_scope = {(idx, profile.name) for idx, paper in papers_batch for profile in profiles if profile.accepts(paper)}
+
+            max_retries = 3
+            for retry in range(max_retries):
+                try:
+                    response_text = await self._call_api_async(prompt, client, max_tokens=max_tokens, stage=stage)
+
+                    results = {profile.name: [] for profile in profiles}
+                    seen = set()
+                    for line in response_text.strip().split('\n'):
+                        match = re.search(r'【论文(\d+)】\s*【画像(\d+)】(.*)', line.strip())
+                        if not match:
+                            continue
+                        paper_idx, profile_no, rest = int(match.group(1)), int(match.group(2)), match.group(3)
+                        if not 1 <= profile_no <= len(profiles):
+                            continue
+                        name = profiles[profile_no - 1].name
+                        if (paper_idx, name) not in in_scope or (paper_idx, name) in seen:
+                            continue
+                        seen.add((paper_idx, name))
+
+                        # 只在匹配领域之前的部分判断相关性，避免领域名称中的“高”“低”等字干扰
+                        parts = re.split(r'(?:匹配领域|相关领域)\s*[:：]', rest, maxsplit=1)
+                        label_text = parts[0]
+                        fields_text = parts[1].strip() if len(parts) > 1 else ''
+                        relevance = 'none'
+                        if '高' in label_text:
+                            relevance = 'high'
+                        elif '中' in label_text:
+                            relevance = 'medium'
+                        elif '低' in label_text:
+                            relevance = 'low'
+
+                        matched = []
+                        if fields_text and '无' not in fields_text:
+                            matched = [f.strip() for f in fields_text.replace('、', ',').split(',') if f.strip()]
+
+                        results[name].append((paper_idx, relevance, matched))
+
+                    return results
 
-                papers_text += f"\n{'='*60}\n"
-                papers_text += f"【论文{idx}】\n"
-                papers_text += f"标题：{paper['title']}\n"
-                papers_text += f"作者：{authors_str}\n"
-                papers_text += f"摘要（英文）：{paper['abstract']}\n"
+                except Exception as e:
+                    import traceback
+                    error_msg = f"{type(e).__name__}: {str(e)}"
+                    print(f"  ⚠️  多画像批量筛选时出错（尝试 {retry+1}/{max_retries}）: {error_msg}")
 
-            prompt = f"""请对以下论文进行详细分析。
+                    if retry < max_retries - 1:
+                        wait_time = (retry + 1) * 2  # 指数退避
+                        print(f"  等待 {wait_time} 秒后重试...")
+                        await asyncio.sleep(wait_time)
+                    else:
+                        print(f"  详细错误信息:\n{traceback.format_exc()}")
+                        if stage != 'screen':
+                            return None
+                        print(f"  ⚠️  {len(papers_batch)}篇论文多画像筛选失败，标记为低相关性以保留")
+                        return {profile.name: [(idx, 'low', []) for idx, paper in papers_batch if profile.accepts(paper)]
+                                for profile in profiles}
+
+    def _build_detail_prompt(self, papers_batch: List[Tuple[int, Dict]]) -> str:
+        """构建第二阶段批量详细分析的提示词"""
+        # 构建批量详细分析的提示词
+        papers_text = ""
+        for idx, paper in papers_batch:
+            authors_str = ', '.join(paper.get('authors', [])[:5])
+            if len(paper.get('authors', [])) > 5:
+                authors_str += f' 等 ({len(paper.get("authors", []))}位作者)'
+
+            papers_text += f"\n{'='*60}\n"
+            papers_text += f"【论文{idx}】\n"
+            papers_text += f"标题：{paper['title']}\n"
+            papers_text += f"作者：{authors_str}\n"
+            papers_text += f"摘要（英文）：{paper['abstract']}\n"
+
+        return f"""请对以下论文进行详细分析。
 
 {papers_text}
 
@@ -224,126 +504,208 @@ class LLMAnalyzer:
 - 中文翻译要完整、准确、流畅
 - 核心内容要突出创新点"""
 
-            # 添加重试机制
-            max_retries = 3
-            for retry in range(max_retries):
-                try:
-                    response_text = await self._call_api_async(prompt, client, max_tokens=4096)
+    def _parse_detail_response(self, response_text: str) -> List[Tuple[int, Dict]]:
+        """
+        解析第二阶段的批量详细分析响应（也用于流式响应中单篇论文的文本块）
 
-                    # 解析批量响应
-                    results = []
-                    current_paper_idx = None
+        Returns:
+            [(论文索引, 详细分析结果), ...]
+        """
+        # 解析批量响应
+        results = []
+        current_paper_idx = None
+        current_data = {'affiliations': None, 'abstract_zh': '', 'summary': ''}
+        current_section = None
+        current_content = []
+
+        lines = response_text.strip().split('\n')
+
+        for line in lines:
+            line_stripped = line.strip()
+
+            # 检测新论文开始
+            if '【论文' in line_stripped and '】' in line_stripped:
+                # 保存上一篇论文的数据
+                if current_paper_idx is not None:
+                    if current_section and current_content:
+                        content_text = '\n'.join(current_content).strip()
+                        if current_section == 'abstract_zh':
+                            current_data['abstract_zh'] = content_text
+                        elif current_section == 'summary':
+                            current_data['summary'] = content_text
+                        elif current_section == 'affiliations' and '未在摘要中说明' not in content_text:
+                            current_data['affiliations'] = content_text
+                    results.append((current_paper_idx, current_data.copy()))
+
+                # 开始新论文
+                try:
+                    current_paper_idx = int(line_stripped.split('【论文')[1].split('】')[0])
                     current_data = {'affiliations': None, 'abstract_zh': '', 'summary': ''}
                     current_section = None
                     current_content = []
+                except (ValueError, IndexError):
+                    continue
+
+            # 检测章节
+            elif current_paper_idx is not None:
+                if '作者单位' in line_stripped or ('单位' in line_stripped and ':' in line_stripped):
+                    if current_section and current_content:
+                        content_text = '\n'.join(current_content).strip()
+                        if current_section == 'abstract_zh':
+                            current_data['abstract_zh'] = content_text
+                        elif current_section == 'summary':
+                            current_data['summary'] = content_text
+                    current_section = 'affiliations'
+                    current_content = []
+                    if '：' in line_stripped or ':' in line_stripped:
+                        separator = '：' if '：' in line_stripped else ':'
+                        content = line_stripped.split(separator, 1)[-1].strip()
+                        if content and '未在摘要中说明' not in content:
+                            current_data['affiliations'] = content
+
+                elif '摘要中文翻译' in line_stripped or ('摘要' in line_stripped and '翻译' in line_stripped):
+                    if current_section and current_content:
+                        content_text = '\n'.join(current_content).strip()
+                        if current_section == 'summary':
+                            current_data['summary'] = content_text
+                        elif current_section == 'affiliations' and '未在摘要中说明' not in content_text:
+                            current_data['affiliations'] = content_text
+                    current_section = 'abstract_zh'
+                    current_content = []
+                    if '：' in line_stripped:
+                        content = line_stripped.split('：', 1)[-1].strip()
+                        if content:
+                            current_content.append(content)
+
+                elif '核心内容' in line_stripped or ('核心' in line_stripped and '创新' in line_stripped):
+                    if current_section and current_content:
+                        content_text = '\n'.join(current_content).strip()
+                        if current_section == 'abstract_zh':
+                            current_data['abstract_zh'] = content_text
+                        elif current_section == 'affiliations' and '未在摘要中说明' not in content_text:
+                            current_data['affiliations'] = content_text
+                    current_section = 'summary'
+                    current_content = []
+                    if '：' in line_stripped:
+                        content = line_stripped.split('：', 1)[-1].strip()
+                        if content:
+                            current_content.append(content)
+
+                elif current_section and line_stripped and not line_stripped.startswith(('1.', '2.', '3.', '注意', '=')):
+                    current_content.append(line_stripped)
+
+        # 保存最后一篇论文
+        if current_paper_idx is not None:
+            if current_section and current_content:
+                content_text = '\n'.join(current_content).strip()
+                if current_section == 'abstract_zh':
+                    current_data['abstract_zh'] = content_text
+                elif current_section == 'summary':
+                    current_data['summary'] = content_text
+                elif current_section == 'affiliations' and '未在摘要中说明' not in content_text:
+                    current_data['affiliations'] = content_text
+            results.append((current_paper_idx, current_data))
+
+        return results
+
+    async def _stream_details_async(self, prompt: str, client: httpx.AsyncClient,
+                                    on_result: Optional[Callable[[int, Dict], None]] = None) -> List[Tuple[int, Dict]]:
+        """
+        以流式响应进行详细分析，每篇论文的文本块完整后立即解析
 
-                    lines = response_text.strip().split('\n')
-
-                    for line in lines:
-                        line_stripped = line.strip()
-
-                        # 检测新论文开始
-                        if '【论文' in line_stripped and '】' in line_stripped:
-                            # 保存上一篇论文的数据
-                            if current_paper_idx is not None:
-                                if current_section and current_content:
-                                    content_text = '\n'.join(current_content).strip()
-                                    if current_section == 'abstract_zh':
-                                        current_data['abstract_zh'] = content_text
-                                    elif current_section == 'summary':
-                                        current_data['summary'] = content_text
-                                    elif current_section == 'affiliations' and '未在摘要中说明' not in content_text:
-                                        current_data['affiliations'] = content_text
-                                results.append((current_paper_idx, current_data.copy()))
-
-                            # 开始新论文
-                            try:
-                                current_paper_idx = int(line_stripped.split('【论文')[1].split('】')[0])
-                                current_data = {'affiliations': None, 'abstract_zh': '', 'summary': ''}
-                                current_section = None
-                                current_content = []
-                            except (ValueError, IndexError):
-                                continue
-
-                        # 检测章节
-                        elif current_paper_idx is not None:
-                            if '作者单位' in line_stripped or ('单位' in line_stripped and ':' in line_stripped):
-                                if current_section and current_content:
-                                    content_text = '\n'.join(current_content).strip()
-                                    if current_section == 'abstract_zh':
-                                        current_data['abstract_zh'] = content_text
-                                    elif current_section == 'summary':
-                                        current_data['summary'] = content_text
-                                current_section = 'affiliations'
-                                current_content = []
-                                if '：' in line_stripped or ':' in line_stripped:
-                                    separator = '：' if '：' in line_stripped else ':'
-                                    content = line_stripped.split(separator, 1)[-1].strip()
-                                    if content and '未在摘要中说明' not in content:
-                                        current_data['affiliations'] = content
-
-                            elif '摘要中文翻译' in line_stripped or ('摘要' in line_stripped and '翻译' in line_stripped):
-                                if current_section and current_content:
-                                    content_text = '\n'.join(current_content).strip()
-                                    if current_section == 'summary':
-                                        current_data['summary'] = content_text
-                                    elif current_section == 'affiliations' and '未在摘要中说明' not in content_text:
-                                        current_data['affiliations'] = content_text
-                                current_section = 'abstract_zh'
-                                current_content = []
-                                if '：' in line_stripped:
-                                    content = line_stripped.split('：', 1)[-1].strip()
-                                    if content:
-                                        current_content.append(content)
-
-                            elif '核心内容' in line_stripped or ('核心' in line_stripped and '创新' in line_stripped):
-                                if current_section and current_content:
-                                    content_text = '\n'.join(current_content).strip()
-                                    if current_section == 'abstract_zh':
-                                        current_data['abstract_zh'] = content_text
-                                    elif current_section == 'affiliations' and '未在摘要中说明' not in content_text:
-                                        current_data['affiliations'] = content_text
-                                current_section = 'summary'
-                                current_content = []
-                                if '：' in line_stripped:
-                                    content = line_stripped.split('：', 1)[-1].strip()
-                                    if content:
-                                        current_content.append(content)
-
-                            elif current_section and line_stripped and not line_stripped.startswith(('1.', '2.', '3.', '注意', '=')):
-                                current_content.append(line_stripped)
-
-                    # 保存最后一篇论文
-                    if current_paper_idx is not None:
-                        if current_section and current_content:
-                            content_text = '\n'.join(current_content).strip()
-                            if current_section == 'abstract_zh':
-                                current_data['abstract_zh'] = content_text
-                            elif current_section == 'summary':
-                                current_data['summary'] = content_text
-                            elif current_section == 'affiliations' and '未在摘要中说明' not in content_text:
-                                current_data['affiliations'] = content_text
-                        results.append((current_paper_idx, current_data))
+        流中途失败时抛出 StreamInterrupted，其中带有已完成的论文结果。
 
-                    return results
+        Args:
+            prompt: 提示词
+            client: httpx异步客户端
+            on_result: 单篇论文结果就绪时的回调（可选）
 
-                except Exception as e:
-                    import traceback
-                    error_msg = f"{type(e).__name__}: {str(e)}"
-                    print(f"  ⚠️  批量详细分析时出错（尝试 {retry+1}/{max_retries}）: {error_msg}")
+        Returns:
+            [(论文索引, 详细分析结果), ...]
+        """
+        llm_client, stage_max_tokens, temperature = self.stages['detail']
+        parser = PaperBlockParser()
+        results = []
+
+        def emit(blocks):
+            for _, block in blocks:
+                for paper_idx, details in self._parse_detail_response(block):
+                    results.append((paper_idx, details))
+                    if on_result is not None:
+                        on_result(paper_idx, details)
+
+        try:
+            async for text in llm_client.stream_completion(prompt, client, max_tokens=stage_max_tokens or 4096,
+                                                           temperature=temperature, stage='detail'):
+                emit(parser.feed(text))
+        except Exception as e:
+            raise StreamInterrupted(results, e) from e
+
+        emit(parser.close())
+        return results
+
+    async def _batch_analyze_detailed_async(self, papers_batch: List[Tuple[int, Dict]], client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                                            on_result: Optional[Callable[[int, Dict], None]] = None) -> List[Tuple[int, Dict]]:
+        """
+        批量详细分析论文（第二阶段）
 
-                    if retry < max_retries - 1:
-                        wait_time = (retry + 1) * 2  # 指数退避
-                        print(f"  等待 {wait_time} 秒后重试...")
-                        await asyncio.sleep(wait_time)
-                    else:
-                        print(f"  详细错误信息:\n{traceback.format_exc()}")
-                        # 返回基本结果，保留论文
-                        print(f"  ⚠️  {len(papers_batch)}篇论文详细分析失败，返回基本信息")
-                        return [(idx, {'affiliations': None, 'abstract_zh': '', 'summary': '分析失败但论文已保留', 'reason': f'分析失败: {error_msg}'}) for idx, _ in papers_batch]
+        开启 stream_responses 时以流式响应接收结果，每篇论文完成即回调 on_result；
+        流中途中断时保留已完成的论文，重试只针对剩余论文。
 
+        Args:
+            papers_batch: 一批论文 [(索引, 论文), ...]
+            client: httpx异步客户端
+            semaphore: 并发控制信号量
+            on_result: 单篇论文结果就绪时的回调（可选，仅流式响应时逐篇调用）
 
-    async def two_stage_analyze_papers_async(self, papers: List[Dict], research_interests: List[str], research_prompt: str = None) -> List[Dict]:
+        Returns:
+            [(论文索引, 详细分析结果), ...]
+        """
+        with self.tracer.span('detail batch', cat='llm', papers=len(papers_batch)):
+            async with semaphore:
+                finished = []
+                remaining = list(papers_batch)
+
+                # 添加重试机制
+                max_retries = 3
+                for retry in range(max_retries):
+                    prompt = self._build_detail_prompt(remaining)
+                    try:
+                        if self.stream_responses:
+                            results = await self._stream_details_async(prompt, client, on_result)
+                        else:
+                            response_text = await self._call_api_async(prompt, client, max_tokens=4096, stage='detail')
+                            results = self._parse_detail_response(response_text)
+                        return finished + results
+
+                    except Exception as e:
+                        import traceback
+                        if isinstance(e, StreamInterrupted):
+                            wanted = {idx for idx, _ in remaining}
+                            finished.extend(item for item in e.results if item[0] in wanted)
+                            done = {idx for idx, _ in finished}
+                            remaining = [(idx, paper) for idx, paper in remaining if idx not in done]
+                            if e.results:
+                                print(f"  ⚠️  流式响应中断，已保留 {len(e.results)} 篇已完成的论文")
+                            e = e.error
+                            if not remaining:
+                                return finished
+                        error_msg = f"{type(e).__name__}: {str(e)}"
+                        print(f"  ⚠️  批量详细分析时出错（尝试 {retry+1}/{max_retries}）: {error_msg}")
+
+                        if retry < max_retries - 1:
+                            wait_time = (retry + 1) * 2  # 指数退避
+                            print(f"  等待 {wait_time} 秒后重试...")
+                            await asyncio.sleep(wait_time)
+                        else:
+                            print(f"  详细错误信息:\n{traceback.format_exc()}")
+                            # 返回基本结果，保留论文
+                            print(f"  ⚠️  {len(remaining)}篇论文详细分析失败，返回基本信息")
+                            return finished + [(idx, {'affiliations': None, 'abstract_zh': '', 'summary': '分析失败但论文已保留', 'reason': f'分析失败: {error_msg}'}) for idx, _ in remaining]
+
+
+    async def two_stage_analyze_papers_async(self, papers: List[Dict], research_interests: List[str], research_prompt: str = None,
+                                             client: httpx.AsyncClient = None, semaphore=None) -> List[Dict]:
         """
         两阶段异步分析论文（优化版）
 
@@ -354,6 +716,8 @@ class LLMAnalyzer:
             papers: 论文列表
             research_interests: 研究方向列表
             research_prompt: 研究兴趣的详细描述（可选，如果提供则优先使用）
+            client: 共享的httpx异步客户端（可选，不提供则自行创建）
+            semaphore: 共享的并发控制器（可选，不提供则按 max_concurrent 自行创建）
 
         Returns:
             带有分析结果的论文列表
@@ -363,6 +727,7 @@ class LLMAnalyzer:
         print(f"🚀 第一阶段：批量快速筛选 {total} 篇论文的相关性")
         print(f"   - 批次大小: {self.batch_size} 篇/批")
         print(f"   - 并发数: {self.max_concurrent}")
+        self._print_stage_models()
         if research_prompt:
             print(f"   - 使用模式: 自定义研究兴趣描述")
         else:
@@ -370,13 +735,11 @@ class LLMAnalyzer:
         print(f"{'='*60}")
 
         # 第一阶段：批量筛选相关性
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrent)
         all_papers_with_relevance = papers.copy()
+        stage_start = time.perf_counter()
 
-        async with httpx.AsyncClient(
-            limits=httpx.Limits(max_connections=self.max_concurrent * 2, max_keepalive_connections=self.max_concurrent),
-            timeout=httpx.Timeout(60.0, connect=10.0)
-        ) as client:
+        async with open_async_client(self.max_concurrent, client) as client:
             # 将论文分批
             batches = []
             for i in range(0, total, self.batch_size):
@@ -387,7 +750,7 @@ class LLMAnalyzer:
 
             # 并发处理所有批次
             tasks = [
-                self._batch_filter_relevance_async(batch, research_interests, client, semaphore, research_prompt)
+                self._screen_batch_async(batch, research_interests, client, semaphore, research_prompt)
                 for batch in batches
             ]
 
@@ -398,15 +761,12 @@ class LLMAnalyzer:
                 print(f"  [{i}/{len(batches)}] ✓ 完成批次 {i}")
 
             # 合并筛选结果到论文数据
-            for paper_idx, relevance, matched in batch_results:
-                if 0 <= paper_idx < len(all_papers_with_relevance):
-                    all_papers_with_relevance[paper_idx]['relevance_level'] = relevance
-                    all_papers_with_relevance[paper_idx]['matched_interests'] = matched
-                    all_papers_with_relevance[paper_idx]['is_relevant'] = relevance in ['high', 'medium']
+            self._merge_screen_results(all_papers_with_relevance, batch_results)
 
             # 统计相关论文
             relevant_papers = [p for p in all_papers_with_relevance if p.get('is_relevant', False)]
             print(f"\n✅ 第一阶段完成！筛选出 {len(relevant_papers)}/{total} 篇相关论文")
+            stage_start = self._trace_stage('stage1', stage_start, papers=total, batches=len(batches))
 
             if not relevant_papers:
                 print("未找到相关论文，跳过第二阶段")
@@ -446,15 +806,283 @@ class LLMAnalyzer:
             for paper_idx, details in all_details:
                 if 0 <= paper_idx < len(relevant_papers):
                     relevant_papers[paper_idx].update(details)
+            self._trace_stage('stage2', stage_start, papers=len(relevant_papers), batches=len(detail_batches))
 
-        print(f"\n✅ 分析完成！")
-        print(f"   - 总论文数: {total}")
-        print(f"   - 相关论文: {len(relevant_papers)}")
-        print(f"   - 高相关: {sum(1 for p in all_papers_with_relevance if p.get('relevance_level') == 'high')}")
-        print(f"   - 中相关: {sum(1 for p in all_papers_with_relevance if p.get('relevance_level') == 'medium')}")
+        self._print_analysis_summary(all_papers_with_relevance, len(relevant_papers))
 
         return all_papers_with_relevance
 
+    async def two_stage_analyze_stream_async(self, paper_stream: AsyncIterator[Dict], research_interests: List[str],
+                                             research_prompt: str = None, flush_timeout: float = 30.0,
+                                             client: httpx.AsyncClient = None, semaphore=None) -> List[Dict]:
+        """
+        流式两阶段分析：边获取边分析
+
+        论文到达后累积到 batch_size 篇即发起第一阶段筛选；筛选出的相关论文累积到
+        detail_batch_size 篇即发起第二阶段详细分析。数据源长时间没有新论文时，
+        超过 flush_timeout 秒会把未满的批次提前发出，避免尾部论文一直等待。
+
+        Args:
+            paper_stream: 论文异步迭代器
+            research_interests: 研究方向列表
+            research_prompt: 研究兴趣的详细描述（可选，如果提供则优先使用）
+            flush_timeout: 未满批次的最长等待时间（秒）
+            client: 共享的httpx异步客户端（可选，不提供则自行创建）
+            semaphore: 共享的并发控制器（可选，不提供则按 max_concurrent 自行创建）
+
+        Returns:
+            带有分析结果的论文列表（按到达顺序）
+        """
+        print(f"\n{'='*60}")
+        print("🚀 流式分析：边获取边筛选")
+        print(f"   - 筛选批次大小: {self.batch_size} 篇/批")
+        print(f"   - 详细分析批次大小: {self.detail_batch_size} 篇/批")
+        print(f"   - 并发数: {self.max_concurrent}")
+        print(f"   - 未满批次等待上限: {flush_timeout} 秒")
+        self._print_stage_models()
+        print(f"{'='*60}")
+
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrent)
+        papers = []
+        pending_screen = []
+        pending_detail = []
+        detail_tasks = []
+        screen_tasks = []
+        relevant_count = 0
+
+        # 单独的读取任务把数据流转入队列，等待超时时只取消 queue.get()，不会打断数据源
+        queue = asyncio.Queue()
+        finished = object()
+
+        async def pump():
+            try:
+                async for paper in paper_stream:
+                    await queue.put(paper)
+            finally:
+                await queue.put(finished)
+
+        async with open_async_client(self.max_concurrent, client) as client:
+
+            def apply_details(paper_idx: int, details: Dict):
+                # 流式响应时每篇论文完成即写回，报告可逐步组装
+                if 0 <= paper_idx < len(papers):
+                    papers[paper_idx].update(details)
+
+            def dispatch_detail(force: bool = False):
+                while pending_detail and (force or len(pending_detail) >= self.detail_batch_size):
+                    batch = pending_detail[:self.detail_batch_size]
+                    del pending_detail[:self.detail_batch_size]
+                    detail_tasks.append(asyncio.create_task(
+                        self._batch_analyze_detailed_async(batch, client, semaphore, on_result=apply_details)
+                    ))
+
+            async def screen(batch):
+                nonlocal relevant_count
+                results = await self._screen_batch_async(batch, research_interests, client, semaphore, research_prompt)
+                self._merge_screen_results(papers, results)
+                relevant = [(idx, paper) for idx, paper in batch if paper.get('is_relevant', False)]
+                relevant_count += len(relevant)
+                print(f"  ✓ 筛选完成 {len(batch)} 篇，其中相关 {len(relevant)} 篇（累计到达 {len(papers)} 篇）")
+                pending_detail.extend(relevant)
+                dispatch_detail()
+
+            def dispatch_screen():
+                batch = list(pending_screen)
+                pending_screen.clear()
+                screen_tasks.append(asyncio.create_task(screen(batch)))
+
+            pump_task = asyncio.create_task(pump())
+            try:
+                while True:
+                    try:
+                        paper = await asyncio.wait_for(queue.get(), timeout=flush_timeout)
+                    except asyncio.TimeoutError:
+                        if pending_screen:
+                            print(f"  ⏳ {flush_timeout} 秒内无新论文，提前发出 {len(pending_screen)} 篇的筛选批次")
+                            dispatch_screen()
+                        continue
+
+                    if paper is finished:
+                        break
+
+                    pending_screen.append((len(papers), paper))
+                    papers.append(paper)
+                    if len(pending_screen) >= self.batch_size:
+                        dispatch_screen()
+
+                if pending_screen:
+                    dispatch_screen()
+                await asyncio.gather(*screen_tasks)
+                print(f"\n✅ 第一阶段完成！筛选出 {relevant_count}/{len(papers)} 篇相关论文")
+
+                dispatch_detail(force=True)
+                if detail_tasks:
+                    print(f"🔍 等待 {len(detail_tasks)} 个详细分析批次完成...")
+                all_details = []
+                for batch_details in await asyncio.gather(*detail_tasks):
+                    all_details.extend(batch_details)
+            finally:
+                pump_task.cancel()
+
+        # 更新论文详细信息（详细分析使用的是论文在到达顺序中的全局索引）
+        for paper_idx, details in all_details:
+            if 0 <= paper_idx < len(papers):
+                papers[paper_idx].update(details)
+
+        self._print_analysis_summary(papers, relevant_count)
+
+        return papers
+
+    async def multi_profile_analyze_papers_async(self, papers: List[Dict], profiles: List[ResearchProfile],
+                                                 client: httpx.AsyncClient = None, semaphore=None) -> Dict[str, List[Dict]]:
+        """
+        多画像两阶段分析：第一阶段一次调用同时为所有画像筛选，第二阶段对任一画像相关的论文只分析一次
+
+        第二阶段的结果（作者单位、中文翻译、核心内容）与画像无关，按论文共享；
+        相关性、匹配领域等第一阶段结果写入各画像自己的论文副本。
+
+        Args:
+            papers: 共享的论文列表（不会被修改）
+            profiles: 研究画像列表
+            client: 共享的httpx异步客户端（可选，不提供则自行创建）
+            semaphore: 共享的并发控制器（可选，不提供则按 max_concurrent 自行创建）
+
+        Returns:
+            {画像名称: 带有分析结果的论文列表（只包含画像关注范围内的论文）}
+        """
+        scoped = [(i, paper) for i, paper in enumerate(papers) if any(profile.accepts(paper) for profile in profiles)]
+        batch_size = self.profile_batch_size(len(profiles))
+        print(f"\n{'='*60}")
+        print(f"🚀 第一阶段：{len(profiles)} 个研究画像共享筛选 {len(scoped)} 篇论文")
+        print(f"   - 批次大小: {batch_size} 篇/批")
+        print(f"   - 并发数: {self.max_concurrent}")
+        self._print_stage_models()
+        print(f"{'='*60}")
+
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrent)
+        # 每个画像使用自己的论文副本，按全局索引定位
+        profile_papers = {
+            profile.name: {i: dict(paper) for i, paper in scoped if profile.accepts(paper)}
+            for profile in profiles
+        }
+        stage_start = time.perf_counter()
+
+        async with open_async_client(self.max_concurrent, client) as client:
+            batches = [scoped[i:i + batch_size] for i in range(0, len(scoped), batch_size)]
+            print(f"分为 {len(batches)} 个批次进行筛选...\n")
+
+            tasks = []
+            for batch in batches:
+                batch_profiles = [profile for profile in profiles
+                                  if any(profile.accepts(paper) for _, paper in batch)]
+                tasks.append(self._screen_profiles_batch_async(batch, batch_profiles, client, semaphore))
+
+            for i, task in enumerate(asyncio.as_completed(tasks), 1):
+                for name, results in (await task).items():
+                    copies = profile_papers[name]
+                    for paper_idx, relevance, matched in results:
+                        if paper_idx in copies:
+                            copies[paper_idx]['relevance_level'] = relevance
+                            copies[paper_idx]['matched_interests'] = matched
+                            copies[paper_idx]['is_relevant'] = relevance in ['high', 'medium']
+                print(f"  [{i}/{len(batches)}] ✓ 完成批次 {i}")
+
+            relevant_indices = sorted({i for copies in profile_papers.values()
+                                       for i, paper in copies.items() if paper.get('is_relevant', False)})
+            for profile in profiles:
+                count = sum(1 for paper in profile_papers[profile.name].values() if paper.get('is_relevant', False))
+                print(f"  - [{profile.name}] 相关 {count}/{len(profile_papers[profile.name])} 篇")
+            print(f"\n✅ 第一阶段完成！任一画像相关的论文共 {len(relevant_indices)} 篇")
+            stage_start = self._trace_stage('stage1', stage_start, papers=len(scoped), profiles=len(profiles),
+                                            batches=len(batches))
+
+            all_details = []
+            if relevant_indices:
+                print(f"\n{'='*60}")
+                print(f"🔍 第二阶段：批量详细分析 {len(relevant_indices)} 篇相关论文（各画像共享）")
+                print(f"   - 批次大小: {self.detail_batch_size} 篇/批")
+                print(f"{'='*60}\n")
+
+                detail_batches = [[(i, papers[i]) for i in relevant_indices[j:j + self.detail_batch_size]]
+                                  for j in range(0, len(relevant_indices), self.detail_batch_size)]
+                detail_tasks = [self._batch_analyze_detailed_async(batch, client, semaphore) for batch in detail_batches]
+                for i, task in enumerate(asyncio.as_completed(detail_tasks), 1):
+                    batch_details = await task
+                    all_details.extend(batch_details)
+                    print(f"  [{i}/{len(detail_batches)}] ✓ 完成批次 {i} ({len(batch_details)} 篇)")
+                self._trace_stage('stage2', stage_start, papers=len(relevant_indices), batches=len(detail_batches))
+
+        # 详细分析结果写入所有认为该论文相关的画像副本
+        for paper_idx, details in all_details:
+            for copies in profile_papers.values():
+                if paper_idx in copies and copies[paper_idx].get('is_relevant', False):
+                    copies[paper_idx].update(details)
+
+        return {name: list(copies.values()) for name, copies in profile_papers.items()}
+
+    def profile_batch_size(self, profile_count: int) -> int:
+        """
+        多画像共享筛选的每批论文数：回复行数为 论文数 × 画像数，画像越多每批论文越少，保证回复不超过输出上限
+
+        Args:
+            profile_count: 画像数量
+
+        Returns:
+            每批论文数（不超过 batch_size）
+        """
+        max_pairs = PROFILE_SCREEN_MAX_TOKENS // PROFILE_SCREEN_TOKENS_PER_PAIR
+        return max(1, min(self.batch_size, max_pairs // max(1, profile_count)))
+
+    def _trace_stage(self, name: str, start: float, **args) -> float:
+        """
+        记录从 start 到现在的阶段区间
+
+        Returns:
+            当前时间（作为下一阶段的开始时间）
+        """
+        end = time.perf_counter()
+        self.tracer.add_span(name, start, end, cat='stage', **args)
+        return end
+
+    def _merge_screen_results(self, papers: List[Dict], results: List[Tuple[int, str, List[str]]]):
+        """
+        将第一阶段筛选结果写回论文数据
+
+        Args:
+            papers: 论文列表
+            results: [(论文索引, 相关性级别, 匹配领域), ...]
+        """
+        for paper_idx, relevance, matched in results:
+            if 0 <= paper_idx < len(papers):
+                papers[paper_idx]['relevance_level'] = relevance
+                papers[paper_idx]['matched_interests'] = matched
+                papers[paper_idx]['is_relevant'] = relevance in ['high', 'medium']
+
+    def _print_stage_models(self):
+        """打印各阶段使用的模型"""
+        screen_model = self.stages['screen'][0].model
+        detail_model = self.stages['detail'][0].model
+        if screen_model != detail_model:
+            print(f"   - 筛选模型: {screen_model}，详细分析模型: {detail_model}")
+            if self.escalate_medium:
+                print("   - 中相关论文由详细分析模型复核")
+
+    def _print_analysis_summary(self, papers: List[Dict], relevant_count: int):
+        """打印分析结果统计"""
+        print("\n✅ 分析完成！")
+        print(f"   - 总论文数: {len(papers)}")
+        print(f"   - 相关论文: {relevant_count}")
+        print(f"   - 高相关: {sum(1 for p in papers if p.get('relevance_level') == 'high')}")
+        print(f"   - 中相关: {sum(1 for p in papers if p.get('relevance_level') == 'medium')}")
+        for llm_client in {id(c): c for c, _, _ in self.stages.values()}.values():
+            if llm_client.hedge_count:
+                stats = llm_client.hedge_stats()
+                print(f"   - 对冲请求（{llm_client.model}）: {stats['hedged']}/{stats['requests']}，备份先返回 {stats['hedge_wins']} 次")
+            if len(llm_client.endpoints) > 1:
+                for stats in llm_client.endpoint_stats():
+                    ejected = "（已熔断）" if stats['ejected'] else ""
+                    print(f"   - 端点 {stats['endpoint']}: 请求 {stats['requests']} 次，失败 {stats['failures']} 次{ejected}")
+
     def filter_relevant_papers(self, analyzed_papers: List[Dict], min_relevance: str = 'medium') -> List[Dict]:
         """
         过滤出相关的论文
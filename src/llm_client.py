@@ -2,8 +2,170 @@
 通用LLM客户端 - 支持多种API提供商
 """
 import os
+import json
+import math
+import time
+import asyncio
+import contextlib
 import httpx
-from typing import Optional, Dict, Any
+from collections import deque
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
+
+from usage_metrics import UsageTracker
+
+
+class LLMAPIError(Exception):
+    """LLM API返回非200状态码"""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _request_status(error: BaseException) -> str:
+    """用于用量统计的请求状态"""
+    if isinstance(error, asyncio.CancelledError):
+        return 'cancelled'
+    status_code = getattr(error, 'status_code', None)
+    return str(status_code) if status_code else type(error).__name__
+
+
+# Anthropic 流式响应中 error 事件的类型对应的HTTP状态码（流开始后无法再通过状态码返回错误）
+ANTHROPIC_STREAM_ERRORS = {
+    'invalid_request_error': 400,
+    'authentication_error': 401,
+    'permission_error': 403,
+    'not_found_error': 404,
+    'request_too_large': 413,
+    'rate_limit_error': 429,
+    'api_error': 500,
+    'overloaded_error': 529,
+}
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """
+    错误是否与端点状态有关（计入熔断、换用其他端点重试）
+
+    429、5xx 和连接/超时错误是端点的问题；其他 4xx（如提示词过长、请求格式错误）换哪个端点结果都一样
+    """
+    if isinstance(error, LLMAPIError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+
+def _parse_usage(api_type: str, usage: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    统一两种API的 usage 字段
+
+    Returns:
+        {'input_tokens', 'output_tokens', 'cached_tokens'}
+    """
+    usage = usage or {}
+    if api_type == 'anthropic':
+        cached = usage.get('cache_read_input_tokens') or 0
+        return {
+            # Anthropic 的 input_tokens 不含缓存读取部分
+            'input_tokens': (usage.get('input_tokens') or 0) + cached + (usage.get('cache_creation_input_tokens') or 0),
+            'output_tokens': usage.get('output_tokens') or 0,
+            'cached_tokens': cached,
+        }
+    return {
+        'input_tokens': usage.get('prompt_tokens') or 0,
+        'output_tokens': usage.get('completion_tokens') or 0,
+        'cached_tokens': (usage.get('prompt_tokens_details') or {}).get('cached_tokens') or 0,
+    }
+
+
+def open_async_client(max_concurrent: int, client: Optional[httpx.AsyncClient] = None):
+    """
+    获取用于 `async with` 的HTTP客户端
+
+    传入已有客户端时直接复用且退出时不关闭（由创建方负责关闭），
+    否则按并发数新建一个带连接池的客户端。
+
+    Args:
+        max_concurrent: 最大并发请求数
+        client: 已有的httpx异步客户端（可选）
+    """
+    if client is not None:
+        return contextlib.nullcontext(client)
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_concurrent * 2, max_keepalive_connections=max_concurrent),
+        timeout=httpx.Timeout(60.0, connect=10.0)
+    )
+
+
+class Endpoint:
+    """
+    单个API端点：连接信息、权重、在途请求数与熔断状态
+
+    连续失败 failure_threshold 次后熔断 cooldown 秒；冷却结束后进入半开状态，
+    只放行一个探测请求，成功则恢复，失败则再次熔断。
+    """
+
+    def __init__(self, api_type: str, api_key: str, base_url: Optional[str], model: str, weight: float = 1.0,
+                 failure_threshold: int = 3, cooldown: float = 30.0, stream_usage: bool = True):
+        """
+        初始化端点
+
+        Args:
+            api_type: API类型 ("anthropic" 或 "openai")
+            api_key: API密钥
+            base_url: API基础URL（为空时使用官方地址）
+            model: 该端点使用的模型名称
+            weight: 负载均衡权重
+            failure_threshold: 连续失败多少次后熔断
+            cooldown: 熔断持续时间（秒）
+            stream_usage: 流式请求是否要求返回用量（OpenAI 兼容接口的 stream_options.include_usage）
+        """
+        self.api_type = api_type.lower()
+        self.api_key = api_key.strip()
+
+        # 设置默认base_url (处理空字符串的情况)
+        self.base_url = base_url.strip() if base_url else None
+        if not self.base_url:
+            if self.api_type == "anthropic":
+                self.base_url = "https://api.anthropic.com"
+            elif self.api_type == "openai":
+                self.base_url = "https://api.openai.com/v1"
+
+        self.model = model
+        self.weight = max(float(weight), 0.01)
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.cooldown = float(cooldown)
+        self.stream_usage = bool(stream_usage)
+
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0   # 0 表示未熔断
+        self.probing = False
+
+    @property
+    def name(self) -> str:
+        return f"{self.api_type}:{self.base_url}"
+
+    def available(self, now: float) -> bool:
+        """端点当前能否接收请求"""
+        if not self.open_until:
+            return True
+        return now >= self.open_until and not self.probing
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probing = False
+
+    def record_failure(self, now: float):
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.probing = False
+        if self.open_until or self.consecutive_failures >= self.failure_threshold:
+            if not self.open_until or now >= self.open_until:
+                print(f"  ⛔ 端点 {self.name} 连续失败 {self.consecutive_failures} 次，暂停使用 {self.cooldown:.0f} 秒")
+            self.open_until = now + self.cooldown
 
 
 class LLMClient:
@@ -16,6 +178,10 @@ class LLMClient:
         base_url: Optional[str] = None,
         model: str = "claude-sonnet-4-5-20250929",
         max_tokens: int = 1024,
+        hedging: Optional[Dict[str, Any]] = None,
+        endpoints: Optional[List[Dict[str, Any]]] = None,
+        metrics: Optional[UsageTracker] = None,
+        stream_usage: bool = True,
     ):
         """
         初始化LLM客户端
@@ -26,36 +192,69 @@ class LLMClient:
             base_url: API基础URL（可选）
             model: 模型名称
             max_tokens: 最大token数
+            hedging: 对冲请求配置（可选）：
+                delay: 发出备份请求前的等待时间（秒），"auto" 表示使用已观测延迟的分位数
+                percentile: delay 为 auto 时使用的分位数（默认90）
+                min_samples: delay 为 auto 时至少需要的延迟样本数（默认10，样本不足时不对冲）
+                budget: 备份请求数占总请求数的上限（默认0.1）
+            endpoints: 多端点配置（可选）。每项包含 api_type、base_url、api_key（或 api_key_env）、
+                model、weight、failure_threshold、cooldown、stream_usage，未设置的字段使用上面的参数。
+                请求按权重分配给在途请求最少的端点，失败时换另一个端点重试，连续失败的端点会被熔断
+            metrics: 用量统计器（可选），记录每次请求的token、延迟和状态
+            stream_usage: OpenAI 兼容接口的流式请求是否带 stream_options.include_usage 以返回用量
+                （默认开启；个别不接受该参数的代理可关闭，此时流式请求的token记为0）
         """
-        self.api_type = api_type.lower()
-
         # 安全地获取 API key
-        self.api_key = (api_key or
+        default_key = (api_key or
                        os.getenv('API_KEY') or
                        os.getenv('ANTHROPIC_API_KEY') or
                        os.getenv('OPENAI_API_KEY'))
 
-        if self.api_key:
-            self.api_key = self.api_key.strip()
-
-        if not self.api_key:
-            raise ValueError(f"未提供API密钥，请设置 api_key 参数或环境变量")
-
-        # 设置默认base_url (处理空字符串的情况)
-        self.base_url = base_url.strip() if base_url else None
-
-        if not self.base_url:
-            if self.api_type == "anthropic":
-                self.base_url = "https://api.anthropic.com"
-            elif self.api_type == "openai":
-                self.base_url = "https://api.openai.com/v1"
+        self.endpoint_configs = [dict(e) for e in endpoints] if endpoints else None
+        self.endpoints: List[Endpoint] = []
+        for config in self.endpoint_configs or [{}]:
+            key = config.get('api_key') or (os.getenv(config['api_key_env']) if config.get('api_key_env') else None)
+            key = key or default_key
+            if not key or not key.strip():
+                raise ValueError("未提供API密钥，请设置 api_key 参数或环境变量")
+            self.endpoints.append(Endpoint(
+                api_type=config.get('api_type', api_type),
+                api_key=key,
+                base_url=config.get('base_url', base_url),
+                model=config.get('model', model),
+                weight=config.get('weight', 1.0),
+                failure_threshold=config.get('failure_threshold', 3),
+                cooldown=config.get('cooldown', 30.0),
+                stream_usage=config.get('stream_usage', stream_usage),
+            ))
 
-        self.model = model
+        # 第一个端点的连接信息作为客户端的默认值
+        primary = self.endpoints[0]
+        self.api_type = primary.api_type
+        self.api_key = primary.api_key
+        self.base_url = primary.base_url
+        self.model = primary.model
         self.max_tokens = max_tokens
+        self.metrics = metrics
+
+        # 对冲请求：慢请求超过延迟阈值后再发一份，先返回者胜出，另一份取消
+        self.hedging = dict(hedging) if hedging and hedging.get('enabled', True) else None
+        # 延迟样本按阶段分开：共用一个客户端的筛选和详细分析请求耗时差别很大，混在一起算出的阈值对两者都不准
+        self._latencies: Dict[Optional[str], deque] = {}
+        self.request_count = 0
+        self.hedge_count = 0
+        self.hedge_wins = 0
 
-        print(f"✓ 使用 {self.api_type.upper()} API")
-        print(f"  - 模型: {self.model}")
-        print(f"  - 端点: {self.base_url}")
+        if len(self.endpoints) == 1:
+            print(f"✓ 使用 {self.api_type.upper()} API")
+            print(f"  - 模型: {self.model}")
+            print(f"  - 端点: {self.base_url}")
+        else:
+            print(f"✓ 使用 {len(self.endpoints)} 个API端点（按在途请求数负载均衡，失败自动切换）")
+            for endpoint in self.endpoints:
+                print(f"  - {endpoint.name}  模型: {endpoint.model}  权重: {endpoint.weight:g}")
+        if self.hedging:
+            print(f"  - 对冲请求: 延迟 {self.hedging.get('delay', 'auto')}，额外请求上限 {self._hedge_budget():.0%}")
 
     async def chat_completion(
         self,
@@ -63,6 +262,7 @@ class LLMClient:
         client: httpx.AsyncClient,
         max_tokens: Optional[int] = None,
         temperature: float = 0.7,
+        stage: Optional[str] = None,
     ) -> str:
         """
         调用LLM API进行对话补全
@@ -72,49 +272,363 @@ class LLMClient:
             client: httpx异步客户端
             max_tokens: 最大token数（可选，覆盖默认值）
             temperature: 温度参数
+            stage: 调用所属阶段（用于用量统计）
 
         Returns:
             API响应文本
         """
-        if self.api_type == "anthropic":
-            return await self._call_anthropic(prompt, client, max_tokens, temperature)
-        elif self.api_type == "openai":
-            return await self._call_openai(prompt, client, max_tokens, temperature)
-        else:
-            raise ValueError(f"不支持的API类型: {self.api_type}")
+        for endpoint in self.endpoints:
+            if endpoint.api_type not in ("anthropic", "openai"):
+                raise ValueError(f"不支持的API类型: {endpoint.api_type}")
 
-    async def _call_anthropic(
+        self.request_count += 1
+        if self.metrics is not None:
+            self.metrics.record_call(stage)
+        delay = self._hedge_delay(stage)
+        if delay is None:
+            return await self._timed_call(prompt, client, max_tokens, temperature, stage)
+
+        primary = asyncio.ensure_future(self._timed_call(prompt, client, max_tokens, temperature, stage))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+
+            if not self._hedge_allowed():
+                return await primary
+
+            # 主请求已超过延迟阈值，发出备份请求
+            self.hedge_count += 1
+            backup = asyncio.ensure_future(self._timed_call(prompt, client, max_tokens, temperature, stage))
+            tasks.add(backup)
+
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.hedge_wins += 1
+                        return task.result()
+            # 两份请求都失败，抛出主请求的错误
+            return primary.result()
+        finally:
+            for task in (primary, *tasks):
+                if not task.done():
+                    task.cancel()
+
+    async def _timed_call(self, prompt: str, client: httpx.AsyncClient, max_tokens: Optional[int],
+                          temperature: float, stage: Optional[str] = None) -> str:
+        """
+        发送一次请求，成功时记录延迟（每次HTTP请求都会记入用量统计）
+
+        依次选择尚未尝试过的端点，单个端点失败时换下一个端点重试，所有端点都失败后抛出最后一个错误。
+        只有 429、5xx 和连接/超时错误计入熔断并换端点重试，其他 4xx 错误直接抛出。
+        """
+        tried = set()
+        last_error = None
+        while True:
+            endpoint = self._select_endpoint(tried)
+            if endpoint is None:
+                raise last_error
+            tried.add(id(endpoint))
+
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            started = time.perf_counter()
+            try:
+                if endpoint.api_type == "anthropic":
+                    text, usage = await self._call_anthropic(prompt, client, max_tokens, temperature, endpoint)
+                else:
+                    text, usage = await self._call_openai(prompt, client, max_tokens, temperature, endpoint)
+            except asyncio.CancelledError as e:
+                endpoint.probing = False
+                self._record_request(stage, endpoint, _request_status(e), started)
+                raise
+            except Exception as e:
+                self._record_request(stage, endpoint, _request_status(e), started)
+                if not _is_retryable(e):
+                    endpoint.probing = False
+                    raise
+                endpoint.record_failure(time.monotonic())
+                last_error = e
+                if len(tried) < len(self.endpoints):
+                    print(f"  ⚠️  端点 {endpoint.name} 请求失败（{type(e).__name__}），换用其他端点重试")
+                continue
+            finally:
+                endpoint.outstanding -= 1
+
+            endpoint.record_success()
+            self._record_latency(stage, time.perf_counter() - started)
+            self._record_request(stage, endpoint, 'ok', started, usage)
+            return text
+
+    def _record_request(self, stage: Optional[str], endpoint: Endpoint, status: str, started: float,
+                        usage: Optional[Dict[str, int]] = None):
+        """把一次HTTP请求记入用量统计"""
+        if self.metrics is not None:
+            self.metrics.record_request(stage, endpoint.model, status, time.perf_counter() - started, usage)
+
+    async def stream_completion(
+        self,
+        prompt: str,
+        client: httpx.AsyncClient,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        stage: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        以SSE流式调用LLM API，逐段产出生成的文本
+
+        收到第一段文本之前失败时换其他端点重试；开始输出后失败则直接抛出，已产出的文本由调用方保留。
+        流式请求不使用对冲。
+
+        Args:
+            prompt: 提示词
+            client: httpx异步客户端
+            max_tokens: 最大token数（可选，覆盖默认值）
+            temperature: 温度参数
+            stage: 调用所属阶段（用于用量统计）
+
+        Yields:
+            文本片段
+        """
+        self.request_count += 1
+        if self.metrics is not None:
+            self.metrics.record_call(stage)
+        tried = set()
+        last_error = None
+        while True:
+            endpoint = self._select_endpoint(tried)
+            if endpoint is None:
+                raise last_error
+            tried.add(id(endpoint))
+
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            started = time.perf_counter()
+            produced = False
+            usage = {}
+            try:
+                async for text in self._stream_endpoint(prompt, client, max_tokens, temperature, endpoint, usage):
+                    produced = True
+                    yield text
+            except (asyncio.CancelledError, GeneratorExit):
+                endpoint.probing = False
+                self._record_request(stage, endpoint, 'cancelled', started)
+                raise
+            except Exception as e:
+                self._record_request(stage, endpoint, _request_status(e), started)
+                if not _is_retryable(e):
+                    endpoint.probing = False
+                    raise
+                endpoint.record_failure(time.monotonic())
+                if produced:
+                    raise
+                last_error = e
+                if len(tried) < len(self.endpoints):
+                    print(f"  ⚠️  端点 {endpoint.name} 流式请求失败（{type(e).__name__}），换用其他端点重试")
+                continue
+            finally:
+                endpoint.outstanding -= 1
+
+            endpoint.record_success()
+            self._record_latency(stage, time.perf_counter() - started)
+            self._record_request(stage, endpoint, 'ok', started, _parse_usage(endpoint.api_type, usage))
+            return
+
+    async def _stream_endpoint(
         self,
         prompt: str,
         client: httpx.AsyncClient,
         max_tokens: Optional[int],
         temperature: float,
-    ) -> str:
-        """调用 Anthropic Claude API"""
-        endpoint = f"{self.base_url}/v1/messages"
-        headers = {
-            "x-api-key": self.api_key,
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json"
-        }
+        target: Endpoint,
+        usage: Dict[str, Any],
+    ) -> AsyncIterator[str]:
+        """
+        向单个端点发起流式请求并解析SSE事件
+
+        流中携带的 usage 字段会写入传入的 usage 字典
+        """
+        url, headers, data = self._build_request(prompt, max_tokens, temperature, target)
+        data['stream'] = True
+        if target.api_type == 'openai' and target.stream_usage:
+            # OpenAI 兼容接口默认不在流中返回用量，需显式要求（在 [DONE] 前多发一个只含 usage 的块）
+            data['stream_options'] = {'include_usage': True}
+        provider = 'Anthropic' if target.api_type == 'anthropic' else 'OpenAI'
+
+        async with client.stream('POST', url, json=data, headers=headers, timeout=60.0) as response:
+            if response.status_code != 200:
+                body = (await response.aread()).decode('utf-8', errors='replace')
+                raise LLMAPIError(f"{provider} API错误: {response.status_code} - {body[:500]}"
+                                  f"\n请求端点: {url}\n模型: {target.model}", response.status_code)
+
+            async for line in response.aiter_lines():
+                if not line.startswith('data:'):
+                    continue
+                payload = line[5:].strip()
+                if not payload or payload == '[DONE]':
+                    continue
+                event = json.loads(payload)
+
+                if target.api_type == 'anthropic':
+                    if event.get('type') == 'message_start':
+                        usage.update(event.get('message', {}).get('usage') or {})
+                    elif event.get('type') == 'message_delta':
+                        usage.update(event.get('usage') or {})
+                    if event.get('type') == 'error':
+                        error = event.get('error') or {}
+                        raise LLMAPIError(f"{provider} API流式错误: {error}\n请求端点: {url}\n模型: {target.model}",
+                                          ANTHROPIC_STREAM_ERRORS.get(error.get('type'), 500))
+                    if event.get('type') == 'content_block_delta':
+                        text = event.get('delta', {}).get('text')
+                        if text:
+                            yield text
+                else:
+                    if event.get('usage'):
+                        usage.update(event['usage'])
+                    for choice in event.get('choices') or []:
+                        text = (choice.get('delta') or {}).get('content')
+                        if text:
+                            yield text
+
+    def _build_request(self, prompt: str, max_tokens: Optional[int], temperature: float,
+                       target: Endpoint) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """
+        构建请求
+
+        Returns:
+            (请求URL, 请求头, 请求体)
+        """
         data = {
-            "model": self.model,
+            "model": target.model,
             "max_tokens": max_tokens or self.max_tokens,
             "temperature": temperature,
             "messages": [{"role": "user", "content": prompt}]
         }
+        if target.api_type == "anthropic":
+            headers = {
+                "x-api-key": target.api_key,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json"
+            }
+            return f"{target.base_url}/v1/messages", headers, data
+
+        headers = {
+            "Authorization": f"Bearer {target.api_key}",
+            "Content-Type": "application/json"
+        }
+        return f"{target.base_url}/chat/completions", headers, data
+
+    def _select_endpoint(self, exclude: set) -> Optional[Endpoint]:
+        """
+        选择下一个端点：在可用端点中按权重选择在途请求最少的一个
+
+        所有端点都已熔断时选择最早恢复的端点，避免整个运行停滞。
+
+        Args:
+            exclude: 本次请求已尝试过的端点（id）
+
+        Returns:
+            端点；所有端点都已尝试过时返回None
+        """
+        now = time.monotonic()
+        remaining = [e for e in self.endpoints if id(e) not in exclude]
+        if not remaining:
+            return None
+
+        candidates = [e for e in remaining if e.available(now)]
+        if not candidates:
+            return min(remaining, key=lambda e: e.open_until)
+
+        endpoint = min(candidates, key=lambda e: ((e.outstanding + 1) / e.weight, e.requests / e.weight))
+        if endpoint.open_until:
+            # 冷却结束，半开状态下只放行这一个探测请求
+            endpoint.probing = True
+        return endpoint
+
+    def endpoint_stats(self) -> List[Dict[str, Any]]:
+        """各端点的请求统计"""
+        now = time.monotonic()
+        return [{
+            'endpoint': e.name,
+            'model': e.model,
+            'requests': e.requests,
+            'failures': e.failures,
+            'outstanding': e.outstanding,
+            'ejected': bool(e.open_until) and now < e.open_until,
+        } for e in self.endpoints]
+
+    def _hedge_budget(self) -> float:
+        return float(self.hedging.get('budget', 0.1)) if self.hedging else 0.0
+
+    def _record_latency(self, stage: Optional[str], seconds: float):
+        """记录一次成功请求的延迟（按阶段分开保存最近200个样本）"""
+        samples = self._latencies.get(stage)
+        if samples is None:
+            samples = self._latencies[stage] = deque(maxlen=200)
+        samples.append(seconds)
+
+    def _hedge_delay(self, stage: Optional[str] = None) -> Optional[float]:
+        """
+        计算发出备份请求前的等待时间
+
+        Args:
+            stage: 调用所属阶段（按该阶段的延迟样本计算分位数）
+
+        Returns:
+            等待秒数；未开启对冲或延迟样本不足时返回None
+        """
+        if not self.hedging:
+            return None
+        delay = self.hedging.get('delay', 'auto')
+        if delay != 'auto':
+            return float(delay)
+
+        samples = self._latencies.get(stage, ())
+        if len(samples) < int(self.hedging.get('min_samples', 10)):
+            return None
+        samples = sorted(samples)
+        percentile = float(self.hedging.get('percentile', 90))
+        rank = max(math.ceil(percentile / 100 * len(samples)) - 1, 0)
+        return samples[min(rank, len(samples) - 1)]
+
+    def _hedge_allowed(self) -> bool:
+        """备份请求数是否仍在预算之内"""
+        return self.hedge_count + 1 <= self._hedge_budget() * self.request_count
+
+    def hedge_stats(self) -> Dict[str, Any]:
+        """对冲请求统计"""
+        return {
+            'requests': self.request_count,
+            'hedged': self.hedge_count,
+            'hedge_wins': self.hedge_wins,
+            'current_delay': {stage: self._hedge_delay(stage) for stage in self._latencies},
+        }
+
+    async def _call_anthropic(
+        self,
+        prompt: str,
+        client: httpx.AsyncClient,
+        max_tokens: Optional[int],
+        temperature: float,
+        target: Endpoint,
+    ) -> Tuple[str, Dict[str, int]]:
+        """调用 Anthropic Claude API"""
+        endpoint, headers, data = self._build_request(prompt, max_tokens, temperature, target)
 
         response = await client.post(endpoint, json=data, headers=headers, timeout=60.0)
 
         if response.status_code == 200:
             result = response.json()
-            return result['content'][0]['text']
+            return result['content'][0]['text'], _parse_usage('anthropic', result.get('usage'))
         else:
             error_msg = f"Anthropic API错误: {response.status_code} - {response.text[:500]}"
             error_msg += f"\n请求端点: {endpoint}"
-            error_msg += f"\n模型: {self.model}"
-            error_msg += f"\nAPI密钥前缀: {self.api_key[:10]}..." if len(self.api_key) > 10 else ""
-            raise Exception(error_msg)
+            error_msg += f"\n模型: {target.model}"
+            error_msg += f"\nAPI密钥前缀: {target.api_key[:10]}..." if len(target.api_key) > 10 else ""
+            raise LLMAPIError(error_msg, response.status_code)
 
     async def _call_openai(
         self,
@@ -122,28 +636,19 @@ class LLMClient:
         client: httpx.AsyncClient,
         max_tokens: Optional[int],
         temperature: float,
-    ) -> str:
+        target: Endpoint,
+    ) -> Tuple[str, Dict[str, int]]:
         """调用 OpenAI 兼容 API（支持第三方代理和国产模型）"""
-        endpoint = f"{self.base_url}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        data = {
-            "model": self.model,
-            "max_tokens": max_tokens or self.max_tokens,
-            "temperature": temperature,
-            "messages": [{"role": "user", "content": prompt}]
-        }
+        endpoint, headers, data = self._build_request(prompt, max_tokens, temperature, target)
 
         response = await client.post(endpoint, json=data, headers=headers, timeout=60.0)
 
         if response.status_code == 200:
             result = response.json()
-            return result['choices'][0]['message']['content']
+            return result['choices'][0]['message']['content'], _parse_usage('openai', result.get('usage'))
         else:
             error_msg = f"OpenAI API错误: {response.status_code} - {response.text[:500]}"
             error_msg += f"\n请求端点: {endpoint}"
-            error_msg += f"\n模型: {self.model}"
-            error_msg += f"\nAPI密钥前缀: {self.api_key[:15]}..." if len(self.api_key) > 15 else f"\nAPI密钥: {self.api_key}"
-            raise Exception(error_msg)
+            error_msg += f"\n模型: {target.model}"
+            error_msg += f"\nAPI密钥前缀: {target.api_key[:15]}..." if len(target.api_key) > 15 else f"\nAPI密钥: {target.api_key}"
+            raise LLMAPIError(error_msg, response.status_code)
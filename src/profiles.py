@@ -0,0 +1,219 @@
+"""
+研究画像（多用户）配置
+一次获取，多个研究画像分别分析、生成报告并发送邮件
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+from config_loader import ConfigLoader
+from settings import ConfigError
+
+
+class ResearchProfile:
+    """单个研究画像：研究方向、相关性阈值、收件人及关注的数据源范围"""
+
+    def __init__(self, name: str, research_interests: List[str], research_prompt: Optional[str] = None,
+                 min_relevance: str = 'medium', receiver_emails: Optional[List[str]] = None,
+                 arxiv_categories: Optional[List[str]] = None, journals: Optional[List[str]] = None,
+                 twitter_usernames: Optional[List[str]] = None, sources: Optional[List[str]] = None):
+        """
+        初始化研究画像
+
+        Args:
+            name: 画像名称（用于报告目录和日志）
+            research_interests: 研究方向列表
+            research_prompt: 研究兴趣详细描述（可选）
+            min_relevance: 最小相关性级别
+            receiver_emails: 收件人列表（为空时使用全局邮件配置）
+            arxiv_categories: 关注的ArXiv类别（None表示不限制）
+            journals: 关注的期刊（None表示不限制）
+            twitter_usernames: 关注的Twitter账号（None表示不限制）
+            sources: 画像配置文件中启用的数据源（None表示沿用主配置，如内联画像）
+        """
+        self.name = name
+        self.research_interests = research_interests or []
+        self.research_prompt = research_prompt
+        self.min_relevance = min_relevance
+        self.receiver_emails = receiver_emails or []
+        # None 表示不限制；空集合表示该画像不关注此类数据源
+        self.arxiv_categories = set(arxiv_categories) if arxiv_categories is not None else None
+        self.journals = set(journals) if journals is not None else None
+        self.twitter_usernames = set(twitter_usernames) if twitter_usernames is not None else None
+        self.sources = set(sources) if sources is not None else None
+
+    @property
+    def slug(self) -> str:
+        """用作目录名的画像名称"""
+        return re.sub(r'[^\w.-]+', '_', self.name).strip('_') or 'profile'
+
+    def accepts(self, paper: Dict) -> bool:
+        """
+        判断共享论文集中的某篇论文是否属于本画像关注的数据源
+
+        Args:
+            paper: 论文/文章信息
+
+        Returns:
+            是否需要为本画像分析该论文
+        """
+        if paper.get('source_type') == 'journal':
+            return self.journals is None or paper.get('journal') in self.journals
+        if self.arxiv_categories is None:
+            return True
+        return bool(self.arxiv_categories.intersection(paper.get('categories') or [paper.get('primary_category')]))
+
+    def accepts_tweet(self, tweet: Dict) -> bool:
+        """判断共享推文集中的某条推文是否来自本画像关注的账号"""
+        return self.twitter_usernames is None or tweet.get('author_username') in self.twitter_usernames
+
+    @classmethod
+    def from_config(cls, config: ConfigLoader, name: Optional[str] = None) -> 'ResearchProfile':
+        """
+        从配置文件构建画像（单画像运行，或 --profile 指定的其他用户配置）
+
+        Args:
+            config: 配置加载器
+            name: 画像名称（默认取配置中的 profile_name，否则为 default）
+        """
+        enabled_sources = config.get_enabled_sources()
+        if 'journals' in enabled_sources:
+            journals = config.get_journal_config().get('selected_journals')
+        else:
+            journals = []
+        if 'twitter' in enabled_sources:
+            twitter_usernames = config.get_twitter_config().get('following_usernames') or None
+        else:
+            twitter_usernames = []
+        return cls(
+            name=name or config.get('profile_name', 'default'),
+            research_interests=config.get_research_interests(),
+            research_prompt=config.get_research_prompt(),
+            min_relevance=config.get_min_relevance(),
+            receiver_emails=_split_emails(config.get_email_config().get('receiver_email', '')),
+            arxiv_categories=config.get_arxiv_categories() if 'arxiv' in enabled_sources else [],
+            journals=journals,
+            twitter_usernames=twitter_usernames,
+            sources=enabled_sources,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], defaults: ConfigLoader, index: int) -> 'ResearchProfile':
+        """
+        从主配置 profiles 列表中的条目构建画像，未设置的字段继承主配置
+
+        Args:
+            data: 画像配置
+            defaults: 主配置
+            index: 条目序号（用于默认名称）
+        """
+        prompt = data.get('research_prompt')
+        return cls(
+            name=data.get('name', f'profile{index}'),
+            research_interests=data.get('research_interests', defaults.get_research_interests()),
+            research_prompt=prompt.strip() if isinstance(prompt, str) and prompt.strip() else (
+                None if 'research_interests' in data else defaults.get_research_prompt()),
+            min_relevance=data.get('min_relevance', defaults.get_min_relevance()),
+            receiver_emails=_split_emails(data.get('receiver_email', '')),
+            arxiv_categories=data.get('arxiv_categories'),
+            journals=data.get('journals'),
+            twitter_usernames=data.get('twitter_usernames'),
+        )
+
+
+def _split_emails(value) -> List[str]:
+    """解析逗号分隔或列表形式的收件人"""
+    if isinstance(value, list):
+        return [str(email).strip() for email in value if str(email).strip()]
+    return [email.strip() for email in str(value or '').split(',') if email.strip()]
+
+
+def load_profiles(config: ConfigLoader, profile_paths: Optional[List[str]] = None) -> List[ResearchProfile]:
+    """
+    加载所有研究画像
+
+    来源：主配置中的 profiles 列表（条目可以是字典或另一个配置文件路径），以及命令行 --profile 指定的配置文件。
+    都没有时，使用主配置本身作为唯一画像（与单用户运行完全一致）。
+
+    Args:
+        config: 主配置
+        profile_paths: 命令行指定的画像配置文件路径
+
+    Returns:
+        画像列表
+    """
+    profiles = []
+    for i, entry in enumerate(config.get_profiles(), 1):
+        if isinstance(entry, str):
+            profile_config = ConfigLoader(entry)
+            profiles.append(ResearchProfile.from_config(profile_config, profile_config.get('profile_name', entry)))
+        else:
+            profiles.append(ResearchProfile.from_dict(entry, config, i))
+
+    for path in profile_paths or []:
+        profile_config = ConfigLoader(path)
+        profiles.append(ResearchProfile.from_config(profile_config, profile_config.get('profile_name', path)))
+
+    if not profiles:
+        profiles.append(ResearchProfile.from_config(config))
+
+    names = [p.name for p in profiles]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"研究画像名称重复: {', '.join(duplicates)}")
+
+    return profiles
+
+
+def merge_source_scope(config: ConfigLoader, profiles: List[ResearchProfile]):
+    """
+    将所有画像关注的数据源范围合并进主配置，保证只获取一次即可覆盖所有画像
+
+    合并明确列出的ArXiv类别、期刊和Twitter账号；画像配置文件启用了期刊但未指定 selected_journals 时
+    主配置改为获取全部期刊，启用了Twitter时主配置也启用Twitter
+
+    Args:
+        config: 主配置（会被原地修改）
+        profiles: 画像列表
+    """
+    sources = config.config.setdefault('sources', {})
+
+    extra_categories = sorted({c for p in profiles for c in (p.arxiv_categories or [])})
+    if extra_categories:
+        arxiv_config = sources.setdefault('arxiv', {})
+        categories = list(config.get_arxiv_categories())
+        categories += [c for c in extra_categories if c not in categories]
+        arxiv_config['categories'] = categories
+        arxiv_config['enabled'] = True
+
+    journal_config = sources.setdefault('journals', {})
+    if any(p.sources is not None and 'journals' in p.sources and p.journals is None for p in profiles):
+        # 画像要求全部期刊：selected_journals 为空表示获取全部期刊
+        journal_config['enabled'] = True
+        journal_config['selected_journals'] = []
+    else:
+        extra_journals = sorted({j for p in profiles for j in (p.journals or [])})
+        if extra_journals:
+            selected = journal_config.get('selected_journals')
+            if not journal_config.get('enabled', False):
+                journal_config['enabled'] = True
+                journal_config['selected_journals'] = extra_journals
+            elif selected:
+                # selected_journals 为空表示已获取全部期刊，无需合并
+                journal_config['selected_journals'] = list(selected) + [j for j in extra_journals if j not in selected]
+
+    extra_usernames = sorted({u for p in profiles for u in (p.twitter_usernames or [])})
+    if extra_usernames or any(p.sources is not None and 'twitter' in p.sources for p in profiles):
+        twitter_config = sources.setdefault('twitter', {})
+        was_enabled = twitter_config.get('enabled', False)
+        configured = list(config.get_twitter_config().get('following_usernames') or [])
+        usernames = configured if was_enabled else []
+        usernames += [u for u in extra_usernames if u not in usernames]
+        if not usernames:
+            # 画像只启用了Twitter、没有列出账号时，使用主配置中的账号
+            usernames = configured
+        if not usernames:
+            raise ConfigError(["研究画像启用了 Twitter，但画像和主配置中都没有 following_usernames"], '研究画像')
+        twitter_config['enabled'] = True
+        twitter_config['following_usernames'] = usernames
+
+    config.refresh()
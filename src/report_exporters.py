@@ -0,0 +1,168 @@
+"""
+结构化报告导出
+把报告模型中的论文和推文（含相关性、匹配方向、翻译、锚点等全部字段）导出为 JSONL 和 Parquet，
+供看板等下游程序直接读取，不必再解析 Markdown
+"""
+import os
+import json
+from typing import Any, Dict, Iterator, List, Tuple
+
+from report_model import ReportModel, source_label
+from settings import EXPORT_FORMATS
+
+# Parquet 固定列：(字段名, 类型)，类型为 'str' / 'list' / 'int' / 'bool'
+# 不在固定列中的字段整体以 JSON 字符串写入 extra 列，不会丢失
+PAPER_COLUMNS: List[Tuple[str, str]] = [
+    ('anchor_id', 'str'),
+    ('title', 'str'),
+    ('authors', 'list'),
+    ('affiliations', 'str'),
+    ('url', 'str'),
+    ('pdf_url', 'str'),
+    ('source', 'str'),
+    ('published', 'str'),
+    ('published_date', 'str'),
+    ('updated', 'str'),
+    ('primary_category', 'str'),
+    ('categories', 'list'),
+    ('journal', 'str'),
+    ('source_type', 'str'),
+    ('relevance_level', 'str'),
+    ('is_relevant', 'bool'),
+    ('matched_interests', 'list'),
+    ('why_relevant', 'str'),
+    ('abstract', 'str'),
+    ('abstract_zh', 'str'),
+    ('summary', 'str'),
+]
+
+TWEET_COLUMNS: List[Tuple[str, str]] = [
+    ('id', 'str'),
+    ('author_username', 'str'),
+    ('author_name', 'str'),
+    ('author_followers', 'int'),
+    ('created_at', 'str'),
+    ('url', 'str'),
+    ('text', 'str'),
+    ('favorite_count', 'int'),
+    ('retweet_count', 'int'),
+    ('reply_count', 'int'),
+    ('source_type', 'str'),
+    ('relevance_level', 'str'),
+    ('why_relevant', 'str'),
+]
+
+
+def _paper_record(model: ReportModel, paper: Dict) -> Dict[str, Any]:
+    return {'type': 'paper', 'date': model.date_str, 'source': source_label(paper), **paper}
+
+
+def _tweet_record(model: ReportModel, tweet: Dict) -> Dict[str, Any]:
+    return {'type': 'tweet', 'date': model.date_str, **tweet}
+
+
+def _iter_records(model: ReportModel) -> Iterator[Dict[str, Any]]:
+    for paper in model.papers:
+        yield _paper_record(model, paper)
+    for tweet in model.tweets:
+        yield _tweet_record(model, tweet)
+
+
+def _convert(value, kind: str):
+    """把字段值转换为列类型（缺失为 None）"""
+    if value is None:
+        return None
+    if kind != 'str' and value == '':
+        return None
+    if kind == 'list':
+        return [str(item) for item in value] if isinstance(value, (list, tuple)) else [str(value)]
+    if kind == 'int':
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    if kind == 'bool':
+        return bool(value)
+    return str(value)
+
+
+class _ColumnBuffer:
+    """按列收集记录；固定列以外的字段写入 extra（JSON字符串）"""
+
+    def __init__(self, columns: List[Tuple[str, str]]):
+        self.columns = columns
+        self.known = {name for name, _ in columns} | {'type', 'date'}
+        self.data: Dict[str, list] = {'date': [], **{name: [] for name, _ in columns}, 'extra': []}
+
+    def add(self, record: Dict[str, Any]):
+        for name, kind in self.columns:
+            self.data[name].append(_convert(record.get(name), kind))
+        self.data['date'].append(record['date'])
+        extra = {key: value for key, value in record.items() if key not in self.known}
+        self.data['extra'].append(json.dumps(extra, ensure_ascii=False, default=str) if extra else None)
+
+    def __len__(self) -> int:
+        return len(self.data['date'])
+
+    def write_parquet(self, path: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {'str': pa.string(), 'list': pa.list_(pa.string()), 'int': pa.int64(), 'bool': pa.bool_()}
+        schema = pa.schema([pa.field('date', pa.string())]
+                           + [pa.field(name, types[kind]) for name, kind in self.columns]
+                           + [pa.field('extra', pa.string())])
+        pq.write_table(pa.Table.from_pydict(self.data, schema=schema), path)
+
+
+def export_report(model: ReportModel, output_dir: str, formats: List[str]) -> List[str]:
+    """
+    导出结构化报告，所有格式在同一次遍历中写出
+
+    - jsonl: arxiv_papers_<日期>.jsonl，每行一条记录，type 字段区分论文（paper）和推文（tweet）
+    - parquet: 论文和推文分别写入 arxiv_papers_<日期>.parquet / arxiv_tweets_<日期>.parquet
+      （列式存储，便于跨多次运行做聚合分析；没有推文时不写推文文件）
+
+    Args:
+        model: 报告数据模型
+        output_dir: 输出目录
+        formats: 导出格式列表（jsonl / parquet）
+
+    Returns:
+        写入的文件路径列表
+    """
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"不支持的导出格式: {', '.join(unknown)}（可选: {', '.join(EXPORT_FORMATS)}）")
+
+    columnar = None
+    if 'parquet' in formats:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("导出 Parquet 需要先安装: pip install pyarrow")
+        columnar = {'paper': _ColumnBuffer(PAPER_COLUMNS), 'tweet': _ColumnBuffer(TWEET_COLUMNS)}
+
+    jsonl_path = os.path.join(output_dir, f"arxiv_papers_{model.date_str}.jsonl")
+    jsonl = open(jsonl_path, 'w', encoding='utf-8') if 'jsonl' in formats else None
+    try:
+        for record in _iter_records(model):
+            if jsonl is not None:
+                jsonl.write(json.dumps(record, ensure_ascii=False, default=str))
+                jsonl.write('\n')
+            if columnar is not None:
+                columnar[record['type']].add(record)
+    finally:
+        if jsonl is not None:
+            jsonl.close()
+
+    written = [jsonl_path] if jsonl is not None else []
+    if columnar is not None:
+        papers_path = os.path.join(output_dir, f"arxiv_papers_{model.date_str}.parquet")
+        columnar['paper'].write_parquet(papers_path)
+        written.append(papers_path)
+        if len(columnar['tweet']):
+            tweets_path = os.path.join(output_dir, f"arxiv_tweets_{model.date_str}.parquet")
+            columnar['tweet'].write_parquet(tweets_path)
+            written.append(tweets_path)
+    return written
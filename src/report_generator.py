@@ -2,24 +2,111 @@
 生成Markdown格式的论文报告
 """
 import os
+import gzip
+import shutil
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional, TextIO, Tuple
+
+from report_model import ReportModel, TWEET_TOPIC_KEYWORDS, markdown_anchor, brief_of, source_label
+from topic_matcher import TopicMatcher
+from report_templates import (REPORT_HTML, EMAIL_REPORT_HTML, EMAIL_PAPER_HTML, EMAIL_TWEET_HTML,
+                              EMAIL_COMPACT_PAPER_HTML, EMAIL_COMPACT_TWEET_HTML, ReportLayout)
+from report_exporters import export_report
+
+
+# 邮件正文HTML的默认字节上限（Gmail 对超过约 102KB 的正文会截断显示）
+EMAIL_MAX_BYTES = 100_000
+# 精简时至少完整展示的条目数（放不下所有紧凑卡片时，优先保证排在最前的条目完整）
+EMAIL_MIN_FULL = 10
+# 按条目大小估算精简方案时，为各部分标题等预留的字节数
+_EMAIL_HEADROOM = 1024
+
+
+def _utf8_len(text: str) -> int:
+    return len(text.encode('utf-8'))
+
+
+class _EmailTooLarge(Exception):
+    """邮件正文超出字节上限（提前结束渲染）"""
+
+
+class _ByteBudgetWriter:
+    """
+    统计渲染输出字节数（UTF-8）的写入回调，只在不超过上限时保留内容，内存占用不超过上限
+
+    stop=True 时一超出上限就抛出 _EmailTooLarge 结束渲染；否则丢弃已保留的内容，只继续计数，
+    渲染结束后 size 为完整输出的字节数
+    """
+
+    def __init__(self, limit: int, stop: bool = True):
+        self.limit = limit
+        self.stop = stop
+        self.size = 0
+        self.parts: Optional[List[str]] = []
+
+    def __call__(self, text: str):
+        self.size += _utf8_len(text)
+        if self.parts is None:
+            return
+        if self.size > self.limit:
+            self.parts = None
+            if self.stop:
+                raise _EmailTooLarge
+        else:
+            self.parts.append(text)
+
+    @property
+    def overflowed(self) -> bool:
+        return self.parts is None
+
+    def getvalue(self) -> str:
+        return ''.join(self.parts)
 
 
 class ReportGenerator:
     """Markdown报告生成器"""
 
-    def __init__(self, output_dir: str = "reports"):
+    def __init__(self, output_dir: str = "reports", topic_keywords: Dict[str, List[str]] = None):
         """
         初始化报告生成器
 
         Args:
             output_dir: 输出目录
+            topic_keywords: 额外的速览主题关键词 {主题: [关键词, ...]}（可选），
+                补充推文热点话题，也用于归类没有 matched_interests 的高相关论文
         """
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
 
-    def generate_report(self, papers: List[Dict], research_interests: List[str], tweets: List[Dict] = None) -> str:
+        self.topic_keywords = topic_keywords or {}
+        tweet_topics = {topic: list(keywords) for topic, keywords in TWEET_TOPIC_KEYWORDS.items()}
+        for topic, keywords in self.topic_keywords.items():
+            tweet_topics.setdefault(topic, []).extend(keywords)
+        self.tweet_matcher = TopicMatcher(tweet_topics)
+        # {研究方向元组: 论文主题匹配器}
+        self._paper_matchers: Dict[tuple, TopicMatcher] = {}
+
+    def build_model(self, papers: List[Dict], research_interests: List[str], tweets: List[Dict] = None) -> ReportModel:
+        """
+        构建报告数据模型（Markdown 与 HTML 报告可共用同一个模型）
+
+        Args:
+            papers: 论文列表（已包含分析结果）
+            research_interests: 研究方向列表
+            tweets: 推文列表（可选）
+
+        Returns:
+            报告数据模型
+        """
+        date_str = datetime.now().strftime('%Y-%m-%d')
+        key = tuple(research_interests)
+        if key not in self._paper_matchers:
+            self._paper_matchers[key] = TopicMatcher.from_interests(research_interests, self.topic_keywords)
+        return ReportModel(papers, research_interests, date_str, tweets or [],
+                           tweet_matcher=self.tweet_matcher, paper_matcher=self._paper_matchers[key])
+
+    def generate_report(self, papers: List[Dict], research_interests: List[str], tweets: List[Dict] = None,
+                        model: ReportModel = None) -> str:
         """
         生成多源内容报告
 
@@ -27,26 +114,27 @@ class ReportGenerator:
             papers: 论文列表（已包含分析结果）
             research_interests: 研究方向列表
             tweets: 推文列表（可选）
+            model: 已构建的报告数据模型（可选，不传时现场构建）
 
         Returns:
             报告文件路径
         """
+        if model is None:
+            model = self.build_model(papers, research_interests, tweets)
+
         # 生成文件名
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        filename = f"arxiv_papers_{date_str}.md"
+        filename = f"arxiv_papers_{model.date_str}.md"
         filepath = os.path.join(self.output_dir, filename)
 
-        # 生成报告内容
-        content = self._generate_content(papers, research_interests, date_str, tweets or [])
-
-        # 写入文件
+        # 逐段写入文件，不在内存中拼出完整报告
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+            self.write_markdown(model, f)
 
         print(f"报告已生成: {filepath}")
         return filepath
 
-    def generate_html_report(self, papers: List[Dict], research_interests: List[str], tweets: List[Dict] = None) -> str:
+    def generate_html_report(self, papers: List[Dict], research_interests: List[str], tweets: List[Dict] = None,
+                             model: ReportModel = None) -> str:
         """
         生成HTML格式的报告（用于邮件）
 
@@ -54,252 +142,408 @@ class ReportGenerator:
             papers: 论文列表（已包含分析结果）
             research_interests: 研究方向列表
             tweets: 推文列表（可选）
+            model: 已构建的报告数据模型（可选，不传时现场构建）
 
         Returns:
             HTML内容字符串
         """
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        tweets = tweets or []
+        if model is None:
+            model = self.build_model(papers, research_interests, tweets)
 
         # 生成HTML内容
-        html_content = self._generate_html_content(papers, research_interests, date_str, tweets)
+        html_content = self._generate_html_content(model)
 
         return html_content
 
-    def _generate_content(self, papers: List[Dict], research_interests: List[str], date_str: str, tweets: List[Dict] = None) -> str:
+    def generate_html_file(self, papers: List[Dict], research_interests: List[str], tweets: List[Dict] = None,
+                           model: ReportModel = None, filepath: str = None) -> str:
         """
-        生成报告内容
+        生成HTML格式的报告文件（逐段写入，报告再大内存占用也不随之增长）
 
         Args:
-            papers: 论文列表
+            papers: 论文列表（已包含分析结果）
+            research_interests: 研究方向列表
+            tweets: 推文列表（可选）
+            model: 已构建的报告数据模型（可选，不传时现场构建）
+            filepath: 输出路径（默认为输出目录下的 arxiv_papers_<日期>.html）
+
+        Returns:
+            HTML报告文件路径
+        """
+        if model is None:
+            model = self.build_model(papers, research_interests, tweets)
+        if filepath is None:
+            filepath = os.path.join(self.output_dir, f"arxiv_papers_{model.date_str}.html")
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            self.write_html(model, f)
+
+        return filepath
+
+    def generate_email_html(self, papers: List[Dict], research_interests: List[str], tweets: List[Dict] = None,
+                            model: ReportModel = None, max_bytes: int = EMAIL_MAX_BYTES,
+                            attachment: str = None) -> Tuple[str, bool]:
+        """
+        生成邮件正文HTML：样式已内联、标签间空白已去掉，并控制在 max_bytes 字节（UTF-8）以内
+
+        超出上限时前N条（按 高相关论文 → 中相关论文 → 推文 的顺序）完整展示，其余为紧凑卡片；
+        全部为紧凑卡片仍超出时，靠后的条目省略。完整报告应作为附件（attachment）随邮件发送。
+
+        Args:
+            papers: 论文列表（已包含分析结果）
             research_interests: 研究方向列表
-            date_str: 日期字符串
-            tweets: 推文列表
+            tweets: 推文列表（可选）
+            model: 已构建的报告数据模型（可选，不传时现场构建）
+            max_bytes: 正文字节上限（0 或 None 为不限制）
+            attachment: 完整报告附件的文件名（精简时在邮件中提示）
+
+        Returns:
+            (HTML内容, 是否做了精简)
+        """
+        if model is None:
+            model = self.build_model(papers, research_interests, tweets)
+
+        if not max_bytes:
+            return EMAIL_REPORT_HTML.render(model=model, layout=ReportLayout(model)), False
+        # 完整正文在超出上限时立即停止渲染，报告再大也只占用不超过上限的内存
+        writer = _ByteBudgetWriter(max_bytes)
+        try:
+            EMAIL_REPORT_HTML.stream(writer, model=model, layout=ReportLayout(model))
+            return writer.getvalue(), False
+        except _EmailTooLarge:
+            pass
+
+        full_sizes, compact_sizes = self._measure_email_entries(model)
+        layout = self._fit_email_layout(model, max_bytes, attachment, full_sizes, compact_sizes)
+        while True:
+            # 精简后的正文完整计数（超出部分不保留），估算偏小时按超出的字节数一次收紧到位
+            writer = _ByteBudgetWriter(max_bytes, stop=False)
+            EMAIL_REPORT_HTML.stream(writer, model=model, layout=layout)
+            if not writer.overflowed:
+                return writer.getvalue(), True
+            tightened = self._tighten_email_layout(model, layout, writer.size - max_bytes, full_sizes, compact_sizes)
+            if tightened is None:
+                # 已无可收紧的条目（只剩统计与速览），按原样发送
+                return EMAIL_REPORT_HTML.render(model=model, layout=layout), True
+            layout = tightened
+
+    @staticmethod
+    def _measure_email_entries(model: ReportModel) -> Tuple[List[int], List[int]]:
+        """
+        各条目（按 ReportLayout 的编号顺序）完整与紧凑两种形式的邮件HTML字节数
+
+        Returns:
+            (完整形式字节数列表, 紧凑形式字节数列表)
+        """
+        full_sizes, compact_sizes = [], []
+        for kind, level, item in ReportLayout.iter_entries(model):
+            if kind == 'paper':
+                full_sizes.append(_utf8_len(EMAIL_PAPER_HTML.render(paper=item, relevance=level)))
+                compact_sizes.append(_utf8_len(EMAIL_COMPACT_PAPER_HTML.render(paper=item)))
+            else:
+                full_sizes.append(_utf8_len(EMAIL_TWEET_HTML.render(tweet=item)))
+                compact_sizes.append(_utf8_len(EMAIL_COMPACT_TWEET_HTML.render(tweet=item)))
+        return full_sizes, compact_sizes
+
+    @staticmethod
+    def _tighten_email_layout(model: ReportModel, layout: ReportLayout, excess: int,
+                              full_sizes: List[int], compact_sizes: List[int]) -> Optional[ReportLayout]:
+        """
+        从最后一条开始收紧布局（省略紧凑卡片，或把完整条目改为紧凑/省略），直到按条目大小累计节省 excess 字节
+
+        Args:
+            model: 报告数据模型
+            layout: 当前布局
+            excess: 超出上限的字节数
+            full_sizes: 各条目完整形式的字节数
+            compact_sizes: 各条目紧凑形式的字节数
+
+        Returns:
+            收紧后的布局（无可收紧的条目时为None）
+        """
+        full_limit, shown_limit = layout.full_limit, layout.shown_limit
+        if not (full_limit or shown_limit):
+            return None
+        while excess > 0 and (full_limit or shown_limit):
+            if shown_limit is not None and shown_limit > full_limit:
+                shown_limit -= 1
+                excess -= compact_sizes[shown_limit]
+            elif shown_limit is not None:
+                full_limit -= 1
+                shown_limit -= 1
+                excess -= full_sizes[full_limit]
+            else:
+                full_limit -= 1
+                excess -= full_sizes[full_limit] - compact_sizes[full_limit]
+        return ReportLayout(model, full_limit, shown_limit, layout.attachment)
+
+    def _fit_email_layout(self, model: ReportModel, max_bytes: int, attachment: Optional[str],
+                          full_sizes: List[int], compact_sizes: List[int]) -> ReportLayout:
+        """
+        按各条目完整/紧凑两种形式的字节数，选出不超过上限的最多完整条目数（其余紧凑展示）；
+        其余条目全部紧凑也放不下时，前 EMAIL_MIN_FULL 条完整展示，之后放下尽可能多的紧凑卡片
+
+        Args:
+            model: 报告数据模型
+            max_bytes: 正文字节上限
+            attachment: 完整报告附件的文件名
+            full_sizes: 各条目完整形式的字节数（_measure_email_entries）
+            compact_sizes: 各条目紧凑形式的字节数
+
+        Returns:
+            邮件报告布局
+        """
+
+        # 不含任何条目时的大小（统计、速览、提示等）
+        base = _utf8_len(EMAIL_REPORT_HTML.render(model=model, layout=ReportLayout(model, 0, 0, attachment)))
+        budget = max_bytes - base - _EMAIL_HEADROOM
+
+        # 前 n 条完整 + 其余全部紧凑：n 越大越占空间，取满足预算的最大 n
+        compact_suffix = sum(compact_sizes)
+        full_prefix = 0
+        full_limit = None
+        for n in range(len(full_sizes) + 1):
+            if full_prefix + compact_suffix > budget:
+                break
+            full_limit = n
+            if n < len(full_sizes):
+                full_prefix += full_sizes[n]
+                compact_suffix -= compact_sizes[n]
+        if full_limit is not None:
+            return ReportLayout(model, full_limit, None, attachment)
+
+        full_limit = 0
+        used = 0
+        for size in full_sizes[:EMAIL_MIN_FULL]:
+            if used + size > budget:
+                break
+            used += size
+            full_limit += 1
+        shown_limit = full_limit
+        for size in compact_sizes[full_limit:]:
+            if used + size > budget:
+                break
+            used += size
+            shown_limit += 1
+        return ReportLayout(model, full_limit, shown_limit, attachment)
+
+    @staticmethod
+    def gzip_file(filepath: str) -> str:
+        """
+        压缩文件（作为邮件附件，逐块读写）
+
+        Args:
+            filepath: 原文件路径
+
+        Returns:
+            压缩文件路径（原路径加 .gz）
+        """
+        gz_path = f"{filepath}.gz"
+        with open(filepath, 'rb') as src, gzip.open(gz_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        return gz_path
+
+    def export(self, model: ReportModel, formats: List[str]) -> List[str]:
+        """
+        导出结构化报告（JSONL / Parquet），文件写入输出目录
+
+        Args:
+            model: 报告数据模型
+            formats: 导出格式列表（jsonl / parquet）
+
+        Returns:
+            写入的文件路径列表
+        """
+        return export_report(model, self.output_dir, formats)
+
+    def iter_markdown(self, model: ReportModel) -> Iterator[str]:
+        """
+        逐段产出Markdown报告内容（拼接后与 generate_report 写出的文件相同）
+
+        Args:
+            model: 报告数据模型
+
+        Returns:
+            报告片段的生成器
+        """
+        lines = self._iter_lines(model)
+        first = next(lines, None)
+        if first is None:
+            return
+        yield first
+        for line in lines:
+            yield '\n' + line
+
+    def write_markdown(self, model: ReportModel, fp: TextIO):
+        """
+        把Markdown报告逐段写入文件对象
+
+        Args:
+            model: 报告数据模型
+            fp: 可写的文本文件对象
+        """
+        fp.writelines(self.iter_markdown(model))
+
+    def write_html(self, model: ReportModel, fp: TextIO):
+        """
+        把HTML报告逐段写入文件对象
+
+        Args:
+            model: 报告数据模型
+            fp: 可写的文本文件对象
+        """
+        REPORT_HTML.stream(fp.write, model=model, layout=ReportLayout(model))
+
+    def _generate_content(self, model: ReportModel) -> str:
+        """
+        生成报告内容
+
+        Args:
+            model: 报告数据模型
 
         Returns:
             Markdown格式的报告内容
         """
-        tweets = tweets or []
-        lines = []
+        return '\n'.join(self._iter_lines(model))
+
+    def _iter_lines(self, model: ReportModel) -> Iterator[str]:
+        """
+        逐行产出Markdown报告内容
+
+        Args:
+            model: 报告数据模型
+
+        Returns:
+            报告行的生成器
+        """
+        papers = model.papers
+        tweets = model.tweets
 
         # 标题
-        lines.append(f"# 学术内容日报 - {date_str}\n")
+        yield f"# 学术内容日报 - {model.date_str}\n"
 
         # 研究方向
-        lines.append("## 研究方向\n")
-        for interest in research_interests:
-            lines.append(f"- {interest}")
-        lines.append("")
+        yield "## 研究方向\n"
+        for interest in model.research_interests:
+            yield f"- {interest}"
+        yield ""
 
         # 统计信息
-        lines.append("## 统计信息\n")
-        lines.append(f"- 总论文/文章数: {len(papers)}")
+        yield "## 统计信息\n"
+        yield f"- 总论文/文章数: {len(papers)}"
         if tweets:
-            lines.append(f"- 总推文数: {len(tweets)}")
+            yield f"- 总推文数: {len(tweets)}"
 
         # 按相关性级别统计（仅当有分析结果时显示）
-        relevance_stats = {}
-        for paper in papers:
-            level = paper.get('relevance_level', 'unknown')
-            if level != 'unknown':  # 只统计已分析的论文
-                relevance_stats[level] = relevance_stats.get(level, 0) + 1
-
-        if relevance_stats:  # 只有当有已分析的论文时才显示相关性分布
-            lines.append("- 论文相关性分布:")
-            for level in ['high', 'medium', 'low', 'none']:
-                if level in relevance_stats:
-                    lines.append(f"  - {level}: {relevance_stats[level]}")
+        if model.paper_stats:
+            yield "- 论文相关性分布:"
+            for level in ReportModel.PAPER_LEVELS:
+                if level in model.paper_stats:
+                    yield f"  - {level}: {model.paper_stats[level]}"
 
         # 推文相关性统计
-        if tweets:
-            tweet_stats = {}
-            for tweet in tweets:
-                level = tweet.get('relevance_level', 'unknown')
-                if level != 'unknown':
-                    tweet_stats[level] = tweet_stats.get(level, 0) + 1
-            if tweet_stats:
-                lines.append("- 推文相关性分布:")
-                for level in ['high', 'medium', 'low']:
-                    if level in tweet_stats:
-                        lines.append(f"  - {level}: {tweet_stats[level]}")
-
-        lines.append("")
+        if model.tweet_stats:
+            yield "- 推文相关性分布:"
+            for level in ReportModel.TWEET_LEVELS:
+                if level in model.tweet_stats:
+                    yield f"  - {level}: {model.tweet_stats[level]}"
 
-        # 生成核心发现摘要（论文+推文）
-        high_papers = [p for p in papers if p.get('relevance_level') == 'high']
-        high_tweets = [t for t in tweets if t.get('relevance_level') == 'high']
+        yield ""
 
-        if high_papers or high_tweets:
-            lines.append("## 🔍 核心发现速览\n")
+        # 生成核心发现摘要（论文+推文）
+        if model.high_papers or model.high_tweets:
+            yield "## 🔍 核心发现速览\n"
 
             # 论文摘要
-            if high_papers:
-                summary_by_topic = self._generate_topic_summary(high_papers)
-                lines.extend(summary_by_topic)
+            if model.high_papers:
+                yield from self._generate_topic_summary(model)
 
             # Twitter热点摘要
-            if high_tweets:
-                lines.append("")
-                twitter_summary = self._generate_twitter_summary(high_tweets)
-                lines.extend(twitter_summary)
+            if model.high_tweets:
+                yield ""
+                yield from self._generate_twitter_summary(model)
 
-            lines.append("")
+            yield ""
 
         # 按相关性分组
-        medium_papers = [p for p in papers if p.get('relevance_level') == 'medium']
-        low_papers = [p for p in papers if p.get('relevance_level') == 'low']
-        unanalyzed_papers = [p for p in papers if p.get('relevance_level') in ['unknown', None]]
-
-        # 高相关性论文
-        if high_papers:
-            lines.append("## 强烈推荐 (高相关性)\n")
-            for paper in high_papers:
-                lines.extend(self._format_paper(paper))
-
-        # 中等相关性论文
-        if medium_papers:
-            lines.append("## 推荐阅读 (中等相关性)\n")
-            for paper in medium_papers:
-                lines.extend(self._format_paper(paper))
-
-        # 低相关性论文
-        if low_papers:
-            lines.append("## 可能感兴趣 (低相关性)\n")
-            for paper in low_papers:
-                lines.extend(self._format_paper(paper))
-
-        # 未分析的论文（按日期排序）
-        if unanalyzed_papers:
-            lines.append("## 所有论文 (未分析)\n")
-            # 按更新日期或发布日期排序（最新的在前）
-            unanalyzed_papers.sort(key=lambda x: x.get('updated', x.get('published', '')), reverse=True)
-            for paper in unanalyzed_papers:
-                lines.extend(self._format_paper(paper))
+        sections = [
+            ("## 强烈推荐 (高相关性)\n", model.papers_by_level['high']),
+            ("## 推荐阅读 (中等相关性)\n", model.papers_by_level['medium']),
+            ("## 可能感兴趣 (低相关性)\n", model.papers_by_level['low']),
+            ("## 所有论文 (未分析)\n", model.unanalyzed_papers),
+        ]
+        for heading, section_papers in sections:
+            if section_papers:
+                yield heading
+                for paper in section_papers:
+                    yield from self._format_paper(paper)
 
         # Twitter 推文部分
         if tweets:
-            lines.append("---\n")
-            lines.append("# Twitter 学术动态\n")
-
-            # 按相关性分组
-            high_tweets = [t for t in tweets if t.get('relevance_level') == 'high']
-            medium_tweets = [t for t in tweets if t.get('relevance_level') == 'medium']
-            low_tweets = [t for t in tweets if t.get('relevance_level') == 'low']
-
-            # 高相关推文
-            if high_tweets:
-                lines.append("## 强烈推荐 (高相关性)\n")
-                for tweet in high_tweets:
-                    lines.extend(self._format_tweet(tweet))
-
-            # 中等相关推文
-            if medium_tweets:
-                lines.append("## 值得关注 (中等相关性)\n")
-                for tweet in medium_tweets:
-                    lines.extend(self._format_tweet(tweet))
-
-            # 低相关推文
-            if low_tweets:
-                lines.append("## 可能感兴趣 (低相关性)\n")
-                for tweet in low_tweets:
-                    lines.extend(self._format_tweet(tweet))
-
-        return '\n'.join(lines)
-
-    def _generate_topic_summary(self, papers: List[Dict]) -> List[str]:
+            yield "---\n"
+            yield "# Twitter 学术动态\n"
+
+            tweet_sections = [
+                ("## 强烈推荐 (高相关性)\n", model.tweets_by_level['high']),
+                ("## 值得关注 (中等相关性)\n", model.tweets_by_level['medium']),
+                ("## 可能感兴趣 (低相关性)\n", model.tweets_by_level['low']),
+            ]
+            for heading, section_tweets in tweet_sections:
+                if section_tweets:
+                    yield heading
+                    for tweet in section_tweets:
+                        yield from self._format_tweet(tweet)
+
+
+    def _generate_topic_summary(self, model: ReportModel) -> List[str]:
         """
         生成助手风格的核心发现摘要
 
         Args:
-            papers: 高相关论文列表
+            model: 报告数据模型
 
         Returns:
             摘要文本行列表
         """
         lines = []
-
-        # 按主题分类（基于matched_interests字段）
-        topic_papers = {}
-        for paper in papers:
-            interests = paper.get('matched_interests', [])
-            source = paper.get('journal', paper.get('primary_category', 'ArXiv'))
-
-            # 如果是CNS期刊，添加期刊标记
-            is_cns = any(journal in str(source) for journal in ['Nature', 'Science', 'Cell'])
-
-            if interests:
-                for interest in interests:
-                    if interest not in topic_papers:
-                        topic_papers[interest] = []
-                    topic_papers[interest].append((paper, is_cns))
-            else:
-                # 没有明确主题的归类为"其他"
-                if '其他前沿研究' not in topic_papers:
-                    topic_papers['其他前沿研究'] = []
-                topic_papers['其他前沿研究'].append((paper, is_cns))
+        high_count = len(model.high_papers)
 
         # 生成助手风格的总结
-        lines.append("根据您的研究兴趣，本期为您筛选出 **{}篇高相关论文**。以下是核心发现：\n".format(len(papers)))
-
-        # 按主题输出，每个主题最多推荐2-3篇
-        total_recommended = 0
-        max_total = 10  # 总共不超过10篇
-
-        for topic, topic_papers_list in sorted(topic_papers.items(), key=lambda x: -len(x[1])):
-            if total_recommended >= max_total:
-                break
+        lines.append("根据您的研究兴趣，本期为您筛选出 **{}篇高相关论文**。以下是核心发现：\n".format(high_count))
 
-            # 优先显示CNS期刊文章
-            topic_papers_list.sort(key=lambda x: (not x[1], x[0].get('title', '')))
+        # 按主题输出（主题分组与推荐在模型中已选好）
+        for highlight in model.topic_highlights:
+            lines.append(f"**{highlight.topic}**：本期找到{len(highlight.papers)}篇相关论文，"
+                         f"为您重点推荐以下{len(highlight.picks)}篇：\n")
 
-            # 每个主题推荐的数量
-            recommend_count = min(3, len(topic_papers_list), max_total - total_recommended)
-            if recommend_count == 0:
-                continue
-
-            lines.append(f"**{topic}**：本期找到{len(topic_papers_list)}篇相关论文，为您重点推荐以下{recommend_count}篇：\n")
-
-            for i, (paper, is_cns) in enumerate(topic_papers_list[:recommend_count], 1):
-                total_recommended += 1
+            for i, (paper, is_cns) in enumerate(highlight.picks, 1):
                 title = paper.get('title', '未知标题')
-                source = paper.get('journal') if paper.get('journal') else f"ArXiv {paper.get('primary_category', 'unknown')}"
-
-                # 生成符合GitHub MD规范的锚点（只保留字母数字和连字符）
-                import re
-                anchor = re.sub(r'[^\w\s-]', '', title.lower())  # 移除特殊字符
-                anchor = re.sub(r'[\s_]+', '-', anchor)  # 空格和下划线转为连字符
-                anchor = anchor[:80]  # 限制长度
+                source = source_label(paper)
 
                 # CNS期刊特别标注
                 source_tag = f"**{source}**" if is_cns else source
 
-                # 简短说明（从summary或why_relevant提取）
-                brief = paper.get('summary', paper.get('why_relevant', ''))
-                if brief:
-                    # 提取第一句话或前100字
-                    brief = brief.split('。')[0].split('.')[0][:100].replace('\n', ' ').strip()
-
-                lines.append(f"{i}. [{title}](#{anchor}) ({source_tag})")
+                lines.append(f"{i}. [{title}](#{markdown_anchor(title)}) ({source_tag})")
+                brief = brief_of(paper)
                 if brief:
                     lines.append(f"   - {brief}")
                 lines.append("")
 
             # 如果还有更多论文
-            remaining = len(topic_papers_list) - recommend_count
-            if remaining > 0:
-                lines.append(f"   *另有{remaining}篇{topic}相关论文，详见下文*\n")
+            if highlight.remaining > 0:
+                lines.append(f"   *另有{highlight.remaining}篇{highlight.topic}相关论文，详见下文*\n")
 
-        if total_recommended < len(papers):
-            lines.append(f"\n其余 {len(papers) - total_recommended} 篇高相关论文详见下文「强烈推荐」部分。\n")
+        if model.highlighted_count < high_count:
+            lines.append(f"\n其余 {high_count - model.highlighted_count} 篇高相关论文详见下文「强烈推荐」部分。\n")
 
         return lines
 
-    def _generate_twitter_summary(self, tweets: List[Dict]) -> List[str]:
+    def _generate_twitter_summary(self, model: ReportModel) -> List[str]:
         """
         生成Twitter热点摘要
 
         Args:
-            tweets: 高相关推文列表
+            model: 报告数据模型
 
         Returns:
             摘要文本行列表
@@ -308,42 +552,17 @@ class ReportGenerator:
 
         lines.append("**📱 Twitter学术动态**\n")
 
-        # 分析推文主题
-        topics = {}
-        for tweet in tweets:
-            text = tweet.get('text', '')
-            # 简单的关键词提取（基于常见学术话题）
-            keywords = []
-            topic_keywords = {
-                '自动驾驶': ['自动驾驶', 'autonomous driving', 'self-driving', 'Tesla', 'FSD'],
-                '大语言模型': ['LLM', 'GPT', 'Claude', 'language model', '大语言模型', '大模型'],
-                '强化学习': ['强化学习', 'reinforcement learning', 'RL', 'policy'],
-                '具身智能': ['具身', 'embodied', 'robot', '机器人', 'manipulation'],
-                'VLM/多模态': ['VLM', 'vision language', '多模态', 'multimodal', 'CLIP'],
-            }
-
-            for topic, kws in topic_keywords.items():
-                if any(kw.lower() in text.lower() for kw in kws):
-                    if topic not in topics:
-                        topics[topic] = []
-                    topics[topic].append(tweet)
-                    break
-
         # 生成总结
-        if not topics:
-            lines.append(f"本期收集了{len(tweets)}条与您研究方向相关的学术讨论，涵盖了最新的技术动态和研究进展。")
+        if not model.tweet_topics:
+            lines.append(f"本期收集了{len(model.high_tweets)}条与您研究方向相关的学术讨论，涵盖了最新的技术动态和研究进展。")
         else:
-            topic_summary = []
-            for topic, topic_tweets in sorted(topics.items(), key=lambda x: -len(x[1]))[:3]:
-                topic_summary.append(f"**{topic}**（{len(topic_tweets)}条）")
-
+            topic_summary = [f"**{topic}**（{count}条）" for topic, count in model.top_tweet_topics]
             lines.append(f"本期Twitter学术圈的热点话题包括：{' | '.join(topic_summary)}\n")
 
             # 挑选2-3条有代表性的推文
-            sample_count = min(3, len(tweets))
-            lines.append(f"为您精选{sample_count}条最具代表性的讨论：\n")
+            lines.append(f"为您精选{len(model.tweet_samples)}条最具代表性的讨论：\n")
 
-            for i, tweet in enumerate(tweets[:sample_count], 1):
+            for i, tweet in enumerate(model.tweet_samples, 1):
                 author = tweet.get('author_name', tweet.get('author_username', '未知'))
                 text_preview = tweet.get('text', '')[:100].replace('\n', ' ').strip()
                 if len(tweet.get('text', '')) > 100:
@@ -492,535 +711,14 @@ class ReportGenerator:
 
         return '\n'.join(lines)
 
-    def _generate_paper_anchor(self, paper: Dict, index: int = 0) -> str:
-        """
-        生成论文的唯一锚点ID
-        使用论文URL的hash或索引，确保唯一性和一致性
-
-        Args:
-            paper: 论文信息
-            index: 论文索引（作为备选）
-
-        Returns:
-            锚点ID字符串
-        """
-        import hashlib
-
-        # 优先使用论文URL生成hash作为锚点
-        if paper.get('url'):
-            url_hash = hashlib.md5(paper['url'].encode()).hexdigest()[:12]
-            return f"paper-{url_hash}"
-        elif paper.get('pdf_url'):
-            url_hash = hashlib.md5(paper['pdf_url'].encode()).hexdigest()[:12]
-            return f"paper-{url_hash}"
-        else:
-            # 使用标题hash
-            title = paper.get('title', f'paper-{index}')
-            title_hash = hashlib.md5(title.encode()).hexdigest()[:12]
-            return f"paper-{title_hash}"
-
-    def _generate_html_content(self, papers: List[Dict], research_interests: List[str], date_str: str, tweets: List[Dict] = None) -> str:
+    def _generate_html_content(self, model: ReportModel) -> str:
         """
         生成HTML格式的报告内容
 
         Args:
-            papers: 论文列表
-            research_interests: 研究方向列表
-            date_str: 日期字符串
-            tweets: 推文列表
+            model: 报告数据模型（论文锚点已在构建时生成）
 
         Returns:
             HTML格式的报告内容
         """
-        import html
-        tweets = tweets or []
-
-        # 为每篇论文生成唯一锚点ID并存储（强制重新生成确保一致性）
-        for i, paper in enumerate(papers):
-            paper['anchor_id'] = self._generate_paper_anchor(paper, i)
-
-        # CSS样式
-        css_style = """
-        <style>
-            body {
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', 'Helvetica Neue', Arial, sans-serif;
-                line-height: 1.6;
-                color: #333;
-                max-width: 900px;
-                margin: 0 auto;
-                padding: 20px;
-                background-color: #f5f5f5;
-            }
-            .container {
-                background-color: white;
-                padding: 30px;
-                border-radius: 8px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }
-            h1 {
-                color: #2c3e50;
-                border-bottom: 3px solid #3498db;
-                padding-bottom: 10px;
-            }
-            h2 {
-                color: #34495e;
-                border-bottom: 2px solid #ecf0f1;
-                padding-bottom: 8px;
-                margin-top: 30px;
-            }
-            h3 {
-                color: #16a085;
-                margin-top: 20px;
-            }
-            .stats {
-                background-color: #ecf0f1;
-                padding: 15px;
-                border-radius: 5px;
-                margin: 15px 0;
-            }
-            .stats ul {
-                margin: 0;
-                padding-left: 20px;
-            }
-            .summary {
-                background-color: #e8f4f8;
-                border-left: 4px solid #3498db;
-                padding: 15px;
-                margin: 20px 0;
-            }
-            .summary strong {
-                color: #2980b9;
-            }
-            .paper {
-                border: 1px solid #e0e0e0;
-                border-radius: 5px;
-                padding: 15px;
-                margin: 15px 0;
-                background-color: #fafafa;
-            }
-            .paper h3 {
-                margin-top: 0;
-                color: #2c3e50;
-            }
-            .paper-info {
-                color: #666;
-                font-size: 0.9em;
-                margin: 5px 0;
-            }
-            .paper-abstract {
-                background-color: white;
-                padding: 10px;
-                border-radius: 3px;
-                margin: 10px 0;
-                border-left: 3px solid #3498db;
-            }
-            .tweet {
-                border: 1px solid #e1e8ed;
-                border-radius: 5px;
-                padding: 15px;
-                margin: 15px 0;
-                background-color: #f7f9fa;
-            }
-            .tweet-author {
-                color: #1da1f2;
-                font-weight: bold;
-            }
-            .tweet-content {
-                margin: 10px 0;
-                white-space: pre-wrap;
-            }
-            .cns-badge {
-                background-color: #e74c3c;
-                color: white;
-                padding: 2px 8px;
-                border-radius: 3px;
-                font-size: 0.8em;
-                font-weight: bold;
-                margin-left: 5px;
-            }
-            .high-relevance {
-                border-left: 4px solid #27ae60;
-            }
-            .medium-relevance {
-                border-left: 4px solid #f39c12;
-            }
-            a {
-                color: #3498db;
-                text-decoration: none;
-            }
-            a:hover {
-                text-decoration: underline;
-            }
-            .separator {
-                border-top: 1px solid #ddd;
-                margin: 30px 0;
-            }
-            .emoji {
-                font-size: 1.2em;
-            }
-            .abstract-content {
-                margin: 10px 0;
-                padding: 10px;
-                background-color: white;
-                border-radius: 3px;
-                line-height: 1.8;
-                color: #333;
-            }
-        </style>
-        """
-
-        # HTML开头
-        html_parts = [
-            "<!DOCTYPE html>",
-            "<html lang='zh-CN'>",
-            "<head>",
-            "<meta charset='UTF-8'>",
-            "<meta name='viewport' content='width=device-width, initial-scale=1.0'>",
-            f"<title>学术内容日报 - {date_str}</title>",
-            css_style,
-            "</head>",
-            "<body>",
-            "<div class='container'>"
-        ]
-
-        # 标题
-        html_parts.append(f"<h1>学术内容日报 - {date_str}</h1>")
-
-        # 研究方向
-        html_parts.append("<h2>研究方向</h2>")
-        html_parts.append("<ul>")
-        for interest in research_interests:
-            html_parts.append(f"<li>{html.escape(interest)}</li>")
-        html_parts.append("</ul>")
-
-        # 统计信息
-        html_parts.append("<div class='stats'>")
-        html_parts.append("<h2>统计信息</h2>")
-        html_parts.append("<ul>")
-        html_parts.append(f"<li>总论文/文章数: {len(papers)}</li>")
-        if tweets:
-            html_parts.append(f"<li>总推文数: {len(tweets)}</li>")
-
-        # 论文相关性统计
-        relevance_stats = {}
-        for paper in papers:
-            level = paper.get('relevance_level', 'unknown')
-            if level != 'unknown':
-                relevance_stats[level] = relevance_stats.get(level, 0) + 1
-
-        if relevance_stats:
-            html_parts.append("<li>论文相关性分布:<ul>")
-            for level in ['high', 'medium', 'low', 'none']:
-                if level in relevance_stats:
-                    html_parts.append(f"<li>{level}: {relevance_stats[level]}</li>")
-            html_parts.append("</ul></li>")
-
-        # 推文相关性统计
-        if tweets:
-            tweet_stats = {}
-            for tweet in tweets:
-                level = tweet.get('relevance_level', 'unknown')
-                if level != 'unknown':
-                    tweet_stats[level] = tweet_stats.get(level, 0) + 1
-            if tweet_stats:
-                html_parts.append("<li>推文相关性分布:<ul>")
-                for level in ['high', 'medium', 'low']:
-                    if level in tweet_stats:
-                        html_parts.append(f"<li>{level}: {tweet_stats[level]}</li>")
-                html_parts.append("</ul></li>")
-
-        html_parts.append("</ul>")
-        html_parts.append("</div>")
-
-        # 核心发现摘要
-        high_papers = [p for p in papers if p.get('relevance_level') == 'high']
-        high_tweets = [t for t in tweets if t.get('relevance_level') == 'high']
-
-        if high_papers or high_tweets:
-            html_parts.append("<div class='summary'>")
-            html_parts.append("<h2><span class='emoji'>🔍</span> 核心发现速览</h2>")
-
-            # 论文摘要
-            if high_papers:
-                summary_html = self._generate_topic_summary_html(high_papers)
-                html_parts.append(summary_html)
-
-            # Twitter摘要
-            if high_tweets:
-                twitter_summary_html = self._generate_twitter_summary_html(high_tweets)
-                html_parts.append(twitter_summary_html)
-
-            html_parts.append("</div>")
-
-        # 分组论文
-        medium_papers = [p for p in papers if p.get('relevance_level') == 'medium']
-        low_papers = [p for p in papers if p.get('relevance_level') == 'low']
-
-        # 高相关论文
-        if high_papers:
-            html_parts.append("<h2>强烈推荐 (高相关性)</h2>")
-            for paper in high_papers:
-                html_parts.append(self._format_paper_html(paper, 'high'))
-
-        # 中等相关论文
-        if medium_papers:
-            html_parts.append("<h2>推荐阅读 (中等相关性)</h2>")
-            for paper in medium_papers:
-                html_parts.append(self._format_paper_html(paper, 'medium'))
-
-        # Twitter推文
-        if tweets:
-            html_parts.append("<div class='separator'></div>")
-            html_parts.append("<h1><span class='emoji'>📱</span> Twitter 学术动态</h1>")
-
-            high_tweets_list = [t for t in tweets if t.get('relevance_level') == 'high']
-            medium_tweets_list = [t for t in tweets if t.get('relevance_level') == 'medium']
-
-            if high_tweets_list:
-                html_parts.append("<h2>强烈推荐 (高相关性)</h2>")
-                for tweet in high_tweets_list:
-                    html_parts.append(self._format_tweet_html(tweet))
-
-            if medium_tweets_list:
-                html_parts.append("<h2>值得关注 (中等相关性)</h2>")
-                for tweet in medium_tweets_list:
-                    html_parts.append(self._format_tweet_html(tweet))
-
-        # HTML结尾
-        html_parts.append("</div>")
-        html_parts.append("</body>")
-        html_parts.append("</html>")
-
-        return '\n'.join(html_parts)
-
-    def _generate_topic_summary_html(self, papers: List[Dict]) -> str:
-        """生成论文主题摘要的HTML"""
-        import html
-        import re
-
-        parts = []
-        parts.append(f"<p>根据您的研究兴趣，本期为您筛选出 <strong>{len(papers)}篇高相关论文</strong>。以下是核心发现：</p>")
-
-        # 按主题分类
-        topic_papers = {}
-        for paper in papers:
-            interests = paper.get('matched_interests', [])
-            source = paper.get('journal', paper.get('primary_category', 'ArXiv'))
-            is_cns = any(journal in str(source) for journal in ['Nature', 'Science', 'Cell'])
-
-            if interests:
-                for interest in interests:
-                    if interest not in topic_papers:
-                        topic_papers[interest] = []
-                    topic_papers[interest].append((paper, is_cns))
-
-        total_recommended = 0
-        max_total = 10
-
-        for topic, topic_papers_list in sorted(topic_papers.items(), key=lambda x: -len(x[1])):
-            if total_recommended >= max_total:
-                break
-
-            topic_papers_list.sort(key=lambda x: (not x[1], x[0].get('title', '')))
-            recommend_count = min(3, len(topic_papers_list), max_total - total_recommended)
-
-            parts.append(f"<p><strong>{html.escape(topic)}</strong>：本期找到{len(topic_papers_list)}篇相关论文，为您重点推荐以下{recommend_count}篇：</p>")
-            parts.append("<ol>")
-
-            for paper, is_cns in topic_papers_list[:recommend_count]:
-                total_recommended += 1
-                title = html.escape(paper.get('title', '未知标题'))
-                source = paper.get('journal') if paper.get('journal') else f"ArXiv {paper.get('primary_category', 'unknown')}"
-
-                # 使用预先生成的锚点ID
-                anchor = paper.get('anchor_id', 'unknown')
-
-                cns_badge = '<span class="cns-badge">CNS</span>' if is_cns else ''
-                brief = paper.get('summary', paper.get('why_relevant', ''))
-                if brief:
-                    brief = html.escape(brief.split('。')[0].split('.')[0][:100].strip())
-
-                parts.append(f"<li><a href='#{anchor}'>{title}</a> ({html.escape(source)}) {cns_badge}")
-                if brief:
-                    parts.append(f"<br><small>{brief}</small>")
-                parts.append("</li>")
-
-            parts.append("</ol>")
-
-            remaining = len(topic_papers_list) - recommend_count
-            if remaining > 0:
-                parts.append(f"<p><em>另有{remaining}篇{html.escape(topic)}相关论文，详见下文</em></p>")
-
-        if total_recommended < len(papers):
-            parts.append(f"<p><em>其余 {len(papers) - total_recommended} 篇高相关论文详见下文「强烈推荐」部分。</em></p>")
-
-        return '\n'.join(parts)
-
-    def _generate_twitter_summary_html(self, tweets: List[Dict]) -> str:
-        """生成Twitter摘要的HTML"""
-        import html
-
-        parts = []
-        parts.append("<p><strong><span class='emoji'>📱</span> Twitter学术动态</strong></p>")
-
-        # 分析主题
-        topics = {}
-        topic_keywords = {
-            '自动驾驶': ['自动驾驶', 'autonomous driving', 'self-driving', 'Tesla', 'FSD'],
-            '大语言模型': ['LLM', 'GPT', 'Claude', 'language model', '大语言模型', '大模型'],
-            '强化学习': ['强化学习', 'reinforcement learning', 'RL', 'policy'],
-            '具身智能': ['具身', 'embodied', 'robot', '机器人', 'manipulation'],
-            'VLM/多模态': ['VLM', 'vision language', '多模态', 'multimodal', 'CLIP'],
-        }
-
-        for tweet in tweets:
-            text = tweet.get('text', '')
-            for topic, kws in topic_keywords.items():
-                if any(kw.lower() in text.lower() for kw in kws):
-                    if topic not in topics:
-                        topics[topic] = []
-                    topics[topic].append(tweet)
-                    break
-
-        if topics:
-            topic_summary = [f"<strong>{html.escape(topic)}</strong>（{len(tweets)}条）"
-                           for topic, tweets in sorted(topics.items(), key=lambda x: -len(x[1]))[:3]]
-            parts.append(f"<p>本期Twitter学术圈的热点话题包括：{' | '.join(topic_summary)}</p>")
-
-        sample_count = min(3, len(tweets))
-        parts.append(f"<p>为您精选{sample_count}条最具代表性的讨论：</p>")
-        parts.append("<ol>")
-
-        for tweet in tweets[:sample_count]:
-            author = html.escape(tweet.get('author_name', tweet.get('author_username', '未知')))
-            text_preview = html.escape(tweet.get('text', '')[:100].strip())
-            if len(tweet.get('text', '')) > 100:
-                text_preview += '...'
-
-            parts.append(f"<li><strong>@{author}</strong>: {text_preview}")
-            if tweet.get('why_relevant'):
-                relevance = html.escape(tweet.get('why_relevant', '')[:80])
-                parts.append(f"<br><em>{relevance}</em>")
-            parts.append("</li>")
-
-        parts.append("</ol>")
-        parts.append("<p><em>完整Twitter动态详见下文「Twitter学术动态」部分</em></p>")
-
-        return '\n'.join(parts)
-
-    def _format_paper_html(self, paper: Dict, relevance: str = 'medium') -> str:
-        """格式化单篇论文为HTML"""
-        import html
-        import re
-        import urllib.parse
-
-        # 使用预先生成的锚点ID
-        title = paper.get('title', '未知标题')
-        anchor = paper.get('anchor_id', 'unknown')
-
-        relevance_class = f"{relevance}-relevance"
-
-        parts = [f"<div class='paper {relevance_class}' id='{anchor}'>"]
-        parts.append(f"<h3>{html.escape(title)}</h3>")
-
-        # 基本信息
-        published = paper.get('published') or paper.get('pub_date') or paper.get('date', '未知')
-        parts.append(f"<div class='paper-info'><strong>发布日期:</strong> {html.escape(str(published))}</div>")
-
-        # 作者
-        authors = paper.get('authors', [])
-        if authors:
-            authors_display = ', '.join(authors[:3])
-            if len(authors) > 3:
-                authors_display += f" 等 ({len(authors)}位作者)"
-            parts.append(f"<div class='paper-info'><strong>作者:</strong> {html.escape(authors_display)}</div>")
-
-        # 作者单位（如果有）
-        if paper.get('affiliations'):
-            parts.append(f"<div class='paper-info'><strong>单位:</strong> {html.escape(paper['affiliations'])}</div>")
-
-        # 期刊/类别
-        if paper.get('journal'):
-            journal = paper['journal']
-            is_cns = any(j in journal for j in ['Nature', 'Science', 'Cell'])
-            cns_badge = '<span class="cns-badge">CNS</span>' if is_cns else ''
-            parts.append(f"<div class='paper-info'><strong>期刊:</strong> {html.escape(journal)} {cns_badge}</div>")
-        elif paper.get('primary_category'):
-            parts.append(f"<div class='paper-info'><strong>类别:</strong> {html.escape(paper['primary_category'])}</div>")
-
-        # 相关领域
-        if paper.get('matched_interests'):
-            interests = ', '.join(paper['matched_interests'])
-            parts.append(f"<div class='paper-info'><strong>相关领域:</strong> {html.escape(interests)}</div>")
-
-        # 链接
-        if paper.get('url'):
-            parts.append(f"<div class='paper-info'><strong>论文链接:</strong> <a href='{html.escape(paper['url'])}' target='_blank'>{html.escape(paper['url'])}</a></div>")
-        if paper.get('pdf_url'):
-            parts.append(f"<div class='paper-info'><strong>PDF链接:</strong> <a href='{html.escape(paper['pdf_url'])}' target='_blank'>{html.escape(paper['pdf_url'])}</a></div>")
-
-
-        # 生成唯一ID（用于展开/折叠功能）
-        paper_id = anchor
-
-        # 摘要显示格式：核心内容（一句话）+ 完整摘要
-        if paper.get('abstract_zh') or paper.get('summary'):
-            parts.append("<div class='paper-abstract'>")
-
-            # AI生成的核心内容（显示第一句话作为总结）
-            if paper.get('summary'):
-                summary = paper['summary']
-                # 提取第一句话作为核心内容
-                first_sentence = summary.split('。')[0]
-                if not first_sentence.endswith('。'):
-                    first_sentence = first_sentence.split('.')[0]
-                # 限制长度，避免过长
-                if len(first_sentence) > 200:
-                    first_sentence = first_sentence[:200] + '...'
-
-                parts.append(f"<strong>核心内容:</strong>")
-                parts.append(f"<div class='abstract-content'>{html.escape(first_sentence)}...</div>")
-
-            # 中文摘要（显示完整内容）
-            if paper.get('abstract_zh'):
-                abstract_zh = paper['abstract_zh']
-                parts.append(f"<strong>摘要:</strong>")
-                parts.append(f"<div class='abstract-content'>{html.escape(abstract_zh)}</div>")
-
-            parts.append("</div>")
-
-        parts.append("</div>")
-        return '\n'.join(parts)
-
-    def _format_tweet_html(self, tweet: Dict) -> str:
-        """格式化单条推文为HTML"""
-        import html
-
-        parts = ["<div class='tweet'>"]
-
-        # 作者
-        author = f"@{tweet.get('author_username', 'unknown')}"
-        if tweet.get('author_name'):
-            author = f"{tweet.get('author_name')} ({author})"
-        parts.append(f"<div class='tweet-author'>{html.escape(author)}</div>")
-
-        # 时间
-        parts.append(f"<div class='paper-info'>{html.escape(str(tweet.get('created_at', 'unknown')))}</div>")
-
-        # 内容
-        parts.append(f"<div class='tweet-content'>{html.escape(tweet.get('text', ''))}</div>")
-
-        # 相关性说明
-        if tweet.get('why_relevant'):
-            parts.append(f"<div class='paper-info'><strong>相关性:</strong> {html.escape(tweet['why_relevant'])}</div>")
-
-        # 互动数据
-        if tweet.get('favorite_count') or tweet.get('retweet_count'):
-            parts.append(f"<div class='paper-info'>👍 {tweet.get('favorite_count', 0)} | 🔄 {tweet.get('retweet_count', 0)} | 💬 {tweet.get('reply_count', 0)}</div>")
-
-        # 链接
-        if tweet.get('url'):
-            parts.append(f"<div class='paper-info'><a href='{html.escape(tweet['url'])}' target='_blank'>查看推文</a></div>")
-
-        parts.append("</div>")
-        return '\n'.join(parts)
+        return REPORT_HTML.render(model=model, layout=ReportLayout(model))
@@ -0,0 +1,205 @@
+"""
+报告数据模型
+一次遍历论文和推文，预先计算两种报告（Markdown / HTML）共用的分组、统计、主题索引和锚点
+"""
+import re
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+from topic_matcher import TopicMatcher
+
+# 推文热点话题关键词
+TWEET_TOPIC_KEYWORDS = {
+    '自动驾驶': ['自动驾驶', 'autonomous driving', 'self-driving', 'Tesla', 'FSD'],
+    '大语言模型': ['LLM', 'GPT', 'Claude', 'language model', '大语言模型', '大模型'],
+    '强化学习': ['强化学习', 'reinforcement learning', 'RL', 'policy'],
+    '具身智能': ['具身', 'embodied', 'robot', '机器人', 'manipulation'],
+    'VLM/多模态': ['VLM', 'vision language', '多模态', 'multimodal', 'CLIP'],
+}
+
+DEFAULT_TWEET_MATCHER = TopicMatcher(TWEET_TOPIC_KEYWORDS)
+
+CNS_JOURNALS = ('Nature', 'Science', 'Cell')
+OTHER_TOPIC = '其他前沿研究'
+
+# 核心发现速览中最多推荐的论文数，以及每个主题最多推荐的论文数
+MAX_HIGHLIGHTS = 10
+MAX_PER_TOPIC = 3
+MAX_TWEET_SAMPLES = 3
+
+
+def paper_anchor(paper: Dict, index: int = 0) -> str:
+    """
+    生成论文的唯一锚点ID（HTML报告使用）
+    优先使用论文URL的hash，其次PDF链接、标题
+
+    Args:
+        paper: 论文信息
+        index: 论文索引（没有URL和标题时使用）
+
+    Returns:
+        锚点ID字符串
+    """
+    key = paper.get('url') or paper.get('pdf_url') or paper.get('title', f'paper-{index}')
+    return f"paper-{hashlib.md5(key.encode()).hexdigest()[:12]}"
+
+
+def markdown_anchor(title: str) -> str:
+    """生成符合GitHub Markdown规范的标题锚点（只保留字母数字和连字符）"""
+    anchor = re.sub(r'[^\w\s-]', '', title.lower())
+    anchor = re.sub(r'[\s_]+', '-', anchor)
+    return anchor[:80]
+
+
+def source_label(paper: Dict) -> str:
+    """论文来源标签（期刊名，或 ArXiv 主类别）"""
+    return paper.get('journal') or f"ArXiv {paper.get('primary_category', 'unknown')}"
+
+
+def brief_of(paper: Dict) -> str:
+    """论文的一句话简介（核心内容或相关性说明的第一句，最多100字）"""
+    brief = paper.get('summary', paper.get('why_relevant', ''))
+    if not brief:
+        return ''
+    return brief.split('。')[0].split('.')[0][:100].replace('\n', ' ').strip()
+
+
+class TopicHighlight:
+    """核心发现速览中的一个主题"""
+
+    def __init__(self, topic: str, papers: List[Tuple[Dict, bool]], picks: List[Tuple[Dict, bool]]):
+        """
+        Args:
+            topic: 主题名称
+            papers: 该主题下的全部高相关论文 [(论文, 是否CNS期刊), ...]，CNS期刊优先
+            picks: 推荐展示的论文
+        """
+        self.topic = topic
+        self.papers = papers
+        self.picks = picks
+
+    @property
+    def remaining(self) -> int:
+        return len(self.papers) - len(self.picks)
+
+
+class ReportModel:
+    """
+    报告数据模型
+
+    构建时对论文和推文各只遍历一次，得到：
+    - 按相关性分组的论文/推文（papers_by_level / tweets_by_level）
+    - 相关性分布统计（paper_stats / tweet_stats，只统计已分析的条目）
+    - 每篇论文的锚点（写入 paper['anchor_id']）
+    - 高相关论文的主题索引与速览推荐（topic_highlights，没有 matched_interests 的论文用 paper_matcher 归类）
+    - 高相关推文的热点话题（tweet_topics）
+    Markdown 与 HTML 渲染都只读取这个模型，两种输出的分组和推荐保持一致。
+    """
+
+    PAPER_LEVELS = ('high', 'medium', 'low', 'none')
+    TWEET_LEVELS = ('high', 'medium', 'low')
+
+    def __init__(self, papers: List[Dict], research_interests: List[str], date_str: str,
+                 tweets: Optional[List[Dict]] = None, tweet_matcher: Optional[TopicMatcher] = None,
+                 paper_matcher: Optional[TopicMatcher] = None):
+        """
+        构建报告模型
+
+        Args:
+            papers: 论文列表（已包含分析结果）
+            research_interests: 研究方向列表
+            date_str: 日期字符串
+            tweets: 推文列表（可选）
+            tweet_matcher: 推文热点话题匹配器（默认使用 TWEET_TOPIC_KEYWORDS）
+            paper_matcher: 没有 matched_interests 的高相关论文按标题和摘要归类所用的匹配器
+                （可选，不传或未命中时归入"其他前沿研究"）
+        """
+        tweet_matcher = tweet_matcher or DEFAULT_TWEET_MATCHER
+        self.papers = papers
+        self.tweets = tweets or []
+        self.research_interests = research_interests
+        self.date_str = date_str
+
+        self.papers_by_level: Dict[str, List[Dict]] = {level: [] for level in self.PAPER_LEVELS}
+        self.unanalyzed_papers: List[Dict] = []
+        self.paper_stats: Dict[str, int] = {}
+        self.tweets_by_level: Dict[str, List[Dict]] = {level: [] for level in self.TWEET_LEVELS}
+        self.tweet_stats: Dict[str, int] = {}
+
+        topic_index: Dict[str, List[Tuple[Dict, bool]]] = {}
+        for i, paper in enumerate(papers):
+            paper['anchor_id'] = paper_anchor(paper, i)
+            level = paper.get('relevance_level', 'unknown')
+            if level != 'unknown':
+                self.paper_stats[level] = self.paper_stats.get(level, 0) + 1
+            if level in self.papers_by_level:
+                self.papers_by_level[level].append(paper)
+            elif level in ('unknown', None):
+                self.unanalyzed_papers.append(paper)
+
+            if level == 'high':
+                source = paper.get('journal', paper.get('primary_category', 'ArXiv'))
+                is_cns = any(journal in str(source) for journal in CNS_JOURNALS)
+                topics = paper.get('matched_interests')
+                if not topics:
+                    topic = None
+                    if paper_matcher is not None:
+                        topic = paper_matcher.classify(f"{paper.get('title', '')}\n{paper.get('abstract', '')}")
+                    topics = [topic or OTHER_TOPIC]
+                for topic in topics:
+                    topic_index.setdefault(topic, []).append((paper, is_cns))
+
+        # 未分析的论文按更新日期或发布日期排序（最新的在前）
+        self.unanalyzed_papers.sort(key=lambda x: x.get('updated', x.get('published', '')), reverse=True)
+
+        self.tweet_topics: Dict[str, List[Dict]] = {}
+        for tweet in self.tweets:
+            level = tweet.get('relevance_level', 'unknown')
+            if level != 'unknown':
+                self.tweet_stats[level] = self.tweet_stats.get(level, 0) + 1
+            if level in self.tweets_by_level:
+                self.tweets_by_level[level].append(tweet)
+            if level == 'high':
+                topic = tweet_matcher.classify(tweet.get('text', ''))
+                if topic is not None:
+                    self.tweet_topics.setdefault(topic, []).append(tweet)
+
+        self.topic_highlights = self._select_highlights(topic_index)
+
+    @staticmethod
+    def _select_highlights(topic_index: Dict[str, List[Tuple[Dict, bool]]]) -> List[TopicHighlight]:
+        """按主题挑选速览推荐：论文多的主题在前，每个主题最多3篇（CNS期刊优先），总共不超过10篇"""
+        highlights = []
+        total = 0
+        for topic, topic_papers in sorted(topic_index.items(), key=lambda x: -len(x[1])):
+            if total >= MAX_HIGHLIGHTS:
+                break
+            topic_papers.sort(key=lambda x: (not x[1], x[0].get('title', '')))
+            count = min(MAX_PER_TOPIC, len(topic_papers), MAX_HIGHLIGHTS - total)
+            highlights.append(TopicHighlight(topic, topic_papers, topic_papers[:count]))
+            total += count
+        return highlights
+
+    @property
+    def high_papers(self) -> List[Dict]:
+        return self.papers_by_level['high']
+
+    @property
+    def high_tweets(self) -> List[Dict]:
+        return self.tweets_by_level['high']
+
+    @property
+    def highlighted_count(self) -> int:
+        """速览中推荐的论文数"""
+        return sum(len(h.picks) for h in self.topic_highlights)
+
+    @property
+    def top_tweet_topics(self) -> List[Tuple[str, int]]:
+        """推文最多的3个热点话题 [(话题, 推文数), ...]"""
+        return [(topic, len(tweets)) for topic, tweets in
+                sorted(self.tweet_topics.items(), key=lambda x: -len(x[1]))[:3]]
+
+    @property
+    def tweet_samples(self) -> List[Dict]:
+        """速览中展示的代表性推文"""
+        return self.high_tweets[:MAX_TWEET_SAMPLES]
@@ -0,0 +1,505 @@
+"""
+HTML报告模板
+样式和模板在导入时编译一次，ReportGenerator 渲染时直接使用；
+邮件版本（EMAIL_*）同样在导入时生成：样式预先内联到各元素、去掉标签间的换行
+"""
+from typing import Dict, List, Optional, Tuple
+
+from templating import CSSInliner, Markup, Template, minify_html
+from report_model import CNS_JOURNALS, ReportModel, brief_of, source_label
+
+# 邮件报告样式（内联在 <head> 中）
+REPORT_CSS = Markup("""
+        <style>
+            body {
+                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', 'Helvetica Neue', Arial, sans-serif;
+                line-height: 1.6;
+                color: #333;
+                max-width: 900px;
+                margin: 0 auto;
+                padding: 20px;
+                background-color: #f5f5f5;
+            }
+            .container {
+                background-color: white;
+                padding: 30px;
+                border-radius: 8px;
+                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            }
+            h1 {
+                color: #2c3e50;
+                border-bottom: 3px solid #3498db;
+                padding-bottom: 10px;
+            }
+            h2 {
+                color: #34495e;
+                border-bottom: 2px solid #ecf0f1;
+                padding-bottom: 8px;
+                margin-top: 30px;
+            }
+            h3 {
+                color: #16a085;
+                margin-top: 20px;
+            }
+            .stats {
+                background-color: #ecf0f1;
+                padding: 15px;
+                border-radius: 5px;
+                margin: 15px 0;
+            }
+            .stats ul {
+                margin: 0;
+                padding-left: 20px;
+            }
+            .summary {
+                background-color: #e8f4f8;
+                border-left: 4px solid #3498db;
+                padding: 15px;
+                margin: 20px 0;
+            }
+            .summary strong {
+                color: #2980b9;
+            }
+            .paper {
+                border: 1px solid #e0e0e0;
+                border-radius: 5px;
+                padding: 15px;
+                margin: 15px 0;
+                background-color: #fafafa;
+            }
+            .paper h3 {
+                margin-top: 0;
+                color: #2c3e50;
+            }
+            .paper-info {
+                color: #666;
+                font-size: 0.9em;
+                margin: 5px 0;
+            }
+            .paper-abstract {
+                background-color: white;
+                padding: 10px;
+                border-radius: 3px;
+                margin: 10px 0;
+                border-left: 3px solid #3498db;
+            }
+            .tweet {
+                border: 1px solid #e1e8ed;
+                border-radius: 5px;
+                padding: 15px;
+                margin: 15px 0;
+                background-color: #f7f9fa;
+            }
+            .tweet-author {
+                color: #1da1f2;
+                font-weight: bold;
+            }
+            .tweet-content {
+                margin: 10px 0;
+                white-space: pre-wrap;
+            }
+            .cns-badge {
+                background-color: #e74c3c;
+                color: white;
+                padding: 2px 8px;
+                border-radius: 3px;
+                font-size: 0.8em;
+                font-weight: bold;
+                margin-left: 5px;
+            }
+            .high-relevance {
+                border-left: 4px solid #27ae60;
+            }
+            .medium-relevance {
+                border-left: 4px solid #f39c12;
+            }
+            a {
+                color: #3498db;
+                text-decoration: none;
+            }
+            a:hover {
+                text-decoration: underline;
+            }
+            .separator {
+                border-top: 1px solid #ddd;
+                margin: 30px 0;
+            }
+            .emoji {
+                font-size: 1.2em;
+            }
+            .abstract-content {
+                margin: 10px 0;
+                padding: 10px;
+                background-color: white;
+                border-radius: 3px;
+                line-height: 1.8;
+                color: #333;
+            }
+        </style>
+        """)
+
+CNS_BADGE = Markup('<span class="cns-badge">CNS</span>')
+
+# 邮件中只展示高/中相关的论文和推文
+PAPER_SECTIONS = (('强烈推荐 (高相关性)', 'high'), ('推荐阅读 (中等相关性)', 'medium'))
+TWEET_SECTIONS = (('强烈推荐 (高相关性)', 'high'), ('值得关注 (中等相关性)', 'medium'))
+
+
+class ReportLayout:
+    """
+    报告中各部分展示的条目及展示形式
+
+    条目按 高相关论文 → 中相关论文 → 高相关推文 → 中相关推文 的顺序编号，
+    前 full_limit 条完整展示，之后到第 shown_limit 条以紧凑卡片展示，其余省略（见附件）。
+    两个上限都为None时就是完整报告。
+    """
+
+    def __init__(self, model: ReportModel, full_limit: Optional[int] = None, shown_limit: Optional[int] = None,
+                 attachment: Optional[str] = None):
+        """
+        Args:
+            model: 报告数据模型
+            full_limit: 完整展示的条目数（None为不限）
+            shown_limit: 展示的条目总数（None为不限）
+            attachment: 完整报告附件的文件名（内容有省略或精简时在邮件中提示）
+        """
+        self.full_limit = full_limit
+        self.shown_limit = shown_limit
+        self.attachment = attachment
+        self.omitted_papers = 0
+        self.omitted_tweets = 0
+        index = 0
+        sections = []
+        for kind, section_defs, by_level in (('paper', PAPER_SECTIONS, model.papers_by_level),
+                                             ('tweet', TWEET_SECTIONS, model.tweets_by_level)):
+            built = []
+            for heading, level in section_defs:
+                entries = []
+                for item in by_level[level]:
+                    if shown_limit is not None and index >= shown_limit:
+                        if kind == 'paper':
+                            self.omitted_papers += 1
+                        else:
+                            self.omitted_tweets += 1
+                    else:
+                        entries.append((item, full_limit is None or index < full_limit))
+                    index += 1
+                built.append((heading, level, entries))
+            sections.append(built)
+        self.paper_sections: List[Tuple[str, str, List[Tuple[Dict, bool]]]] = sections[0]
+        self.tweet_sections: List[Tuple[str, str, List[Tuple[Dict, bool]]]] = sections[1]
+        self.total = index
+
+    @property
+    def truncated(self) -> bool:
+        """是否有条目被精简或省略"""
+        return ((self.full_limit is not None and self.full_limit < self.total)
+                or (self.shown_limit is not None and self.shown_limit < self.total))
+
+    @staticmethod
+    def iter_entries(model: ReportModel):
+        """按编号顺序遍历条目：(类型 paper/tweet, 相关性级别, 条目)"""
+        for level in ('high', 'medium'):
+            for paper in model.papers_by_level[level]:
+                yield 'paper', level, paper
+        for level in ('high', 'medium'):
+            for tweet in model.tweets_by_level[level]:
+                yield 'tweet', level, tweet
+
+
+def _authors_display(authors) -> str:
+    """前3位作者，超过3位时注明总人数"""
+    display = ', '.join(authors[:3])
+    if len(authors) > 3:
+        display += f" 等 ({len(authors)}位作者)"
+    return display
+
+
+def _first_sentence(summary: str) -> str:
+    """核心内容的第一句话（最多200字）"""
+    first_sentence = summary.split('。')[0]
+    if not first_sentence.endswith('。'):
+        first_sentence = first_sentence.split('.')[0]
+    if len(first_sentence) > 200:
+        first_sentence = first_sentence[:200] + '...'
+    return first_sentence
+
+
+def _is_cns(journal: str) -> bool:
+    return any(j in journal for j in CNS_JOURNALS)
+
+
+def _tweet_author(tweet) -> str:
+    author = f"@{tweet.get('author_username', 'unknown')}"
+    if tweet.get('author_name'):
+        author = f"{tweet.get('author_name')} ({author})"
+    return author
+
+
+def _preview(text: str, limit: int) -> str:
+    """推文预览（超出长度时加省略号）"""
+    return text[:limit].strip() + ('...' if len(text) > limit else '')
+
+
+PAPER_HTML = Template("""\
+<div class='paper {{ relevance }}-relevance' id='{{ paper.get('anchor_id', 'unknown') }}'>
+<h3>{{ paper.get('title', '未知标题') }}</h3>
+<div class='paper-info'><strong>发布日期:</strong> {{ paper.get('published') or paper.get('pub_date') or paper.get('date', '未知') }}</div>
+{% if paper.get('authors') %}
+<div class='paper-info'><strong>作者:</strong> {{ authors_display(paper['authors']) }}</div>
+{% endif %}
+{% if paper.get('affiliations') %}
+<div class='paper-info'><strong>单位:</strong> {{ paper['affiliations'] }}</div>
+{% endif %}
+{% if paper.get('journal') %}
+<div class='paper-info'><strong>期刊:</strong> {{ paper['journal'] }} {{ CNS_BADGE if is_cns(paper['journal']) else '' }}</div>
+{% elif paper.get('primary_category') %}
+<div class='paper-info'><strong>类别:</strong> {{ paper['primary_category'] }}</div>
+{% endif %}
+{% if paper.get('matched_interests') %}
+<div class='paper-info'><strong>相关领域:</strong> {{ ', '.join(paper['matched_interests']) }}</div>
+{% endif %}
+{% if paper.get('url') %}
+<div class='paper-info'><strong>论文链接:</strong> <a href='{{ paper['url'] }}' target='_blank'>{{ paper['url'] }}</a></div>
+{% endif %}
+{% if paper.get('pdf_url') %}
+<div class='paper-info'><strong>PDF链接:</strong> <a href='{{ paper['pdf_url'] }}' target='_blank'>{{ paper['pdf_url'] }}</a></div>
+{% endif %}
+{% if paper.get('abstract_zh') or paper.get('summary') %}
+<div class='paper-abstract'>
+{% if paper.get('summary') %}
+<strong>核心内容:</strong>
+<div class='abstract-content'>{{ first_sentence(paper['summary']) }}...</div>
+{% endif %}
+{% if paper.get('abstract_zh') %}
+<strong>摘要:</strong>
+<div class='abstract-content'>{{ paper['abstract_zh'] }}</div>
+{% endif %}
+</div>
+{% endif %}
+</div>
+""", params=('paper', 'relevance'), name='paper',
+    authors_display=_authors_display, first_sentence=_first_sentence, is_cns=_is_cns, CNS_BADGE=CNS_BADGE)
+
+TWEET_HTML = Template("""\
+<div class='tweet'>
+<div class='tweet-author'>{{ tweet_author(tweet) }}</div>
+<div class='paper-info'>{{ tweet.get('created_at', 'unknown') }}</div>
+<div class='tweet-content'>{{ tweet.get('text', '') }}</div>
+{% if tweet.get('why_relevant') %}
+<div class='paper-info'><strong>相关性:</strong> {{ tweet['why_relevant'] }}</div>
+{% endif %}
+{% if tweet.get('favorite_count') or tweet.get('retweet_count') %}
+<div class='paper-info'>👍 {{ tweet.get('favorite_count', 0) }} | 🔄 {{ tweet.get('retweet_count', 0) }} | 💬 {{ tweet.get('reply_count', 0) }}</div>
+{% endif %}
+{% if tweet.get('url') %}
+<div class='paper-info'><a href='{{ tweet['url'] }}' target='_blank'>查看推文</a></div>
+{% endif %}
+</div>
+""", params=('tweet',), name='tweet', tweet_author=_tweet_author)
+
+COMPACT_PAPER_HTML = Template("""\
+<div class='compact' id='{{ paper.get('anchor_id', 'unknown') }}'>
+{% if paper.get('url') %}
+<a href='{{ paper['url'] }}' target='_blank'><strong>{{ paper.get('title', '未知标题') }}</strong></a>
+{% else %}
+<strong>{{ paper.get('title', '未知标题') }}</strong>
+{% endif %}
+<span class='paper-info'>({{ source_label(paper) }})</span> {{ CNS_BADGE if is_cns(paper.get('journal') or '') else '' }}
+{% set brief = brief_of(paper) %}
+{% if brief %}
+<br><small>{{ brief }}</small>
+{% endif %}
+</div>
+""", params=('paper',), name='compact_paper',
+    source_label=source_label, brief_of=brief_of, is_cns=_is_cns, CNS_BADGE=CNS_BADGE)
+
+COMPACT_TWEET_HTML = Template("""\
+<div class='compact'>
+<span class='tweet-author'>{{ tweet_author(tweet) }}</span>: {{ preview(tweet.get('text', ''), 120) }}
+{% if tweet.get('url') %}
+<a href='{{ tweet['url'] }}' target='_blank'>查看推文</a>
+{% endif %}
+</div>
+""", params=('tweet',), name='compact_tweet', tweet_author=_tweet_author, preview=_preview)
+
+TOPIC_SUMMARY_HTML = Template("""\
+<p>根据您的研究兴趣，本期为您筛选出 <strong>{{ len(model.high_papers) }}篇高相关论文</strong>。以下是核心发现：</p>
+{% for highlight in model.topic_highlights %}
+<p><strong>{{ highlight.topic }}</strong>：本期找到{{ len(highlight.papers) }}篇相关论文，为您重点推荐以下{{ len(highlight.picks) }}篇：</p>
+<ol>
+{% for paper, cns in highlight.picks %}
+<li><a href='#{{ paper.get('anchor_id', 'unknown') }}'>{{ paper.get('title', '未知标题') }}</a> ({{ source_label(paper) }}) {{ CNS_BADGE if cns else '' }}
+{% set brief = brief_of(paper) %}
+{% if brief %}
+<br><small>{{ brief }}</small>
+{% endif %}
+</li>
+{% endfor %}
+</ol>
+{% if highlight.remaining > 0 %}
+<p><em>另有{{ highlight.remaining }}篇{{ highlight.topic }}相关论文，详见下文</em></p>
+{% endif %}
+{% endfor %}
+{% if model.highlighted_count < len(model.high_papers) %}
+<p><em>其余 {{ len(model.high_papers) - model.highlighted_count }} 篇高相关论文详见下文「强烈推荐」部分。</em></p>
+{% endif %}
+""", params=('model',), name='topic_summary',
+    brief_of=brief_of, source_label=source_label, CNS_BADGE=CNS_BADGE)
+
+TWITTER_SUMMARY_HTML = Template("""\
+<p><strong><span class='emoji'>📱</span> Twitter学术动态</strong></p>
+{% if model.tweet_topics %}
+<p>本期Twitter学术圈的热点话题包括：{% for i, (topic, count) in enumerate(model.top_tweet_topics) %}{% if i %} | {% endif %}<strong>{{ topic }}</strong>（{{ count }}条）{% endfor %}</p>
+{% endif %}
+<p>为您精选{{ len(model.tweet_samples) }}条最具代表性的讨论：</p>
+<ol>
+{% for tweet in model.tweet_samples %}
+<li><strong>@{{ tweet.get('author_name', tweet.get('author_username', '未知')) }}</strong>: {{ preview(tweet.get('text', ''), 100) }}
+{% if tweet.get('why_relevant') %}
+<br><em>{{ tweet['why_relevant'][:80] }}</em>
+{% endif %}
+</li>
+{% endfor %}
+</ol>
+<p><em>完整Twitter动态详见下文「Twitter学术动态」部分</em></p>
+""", params=('model',), name='twitter_summary', preview=_preview)
+
+REPORT_HTML = Template("""\
+<!DOCTYPE html>
+<html lang='zh-CN'>
+<head>
+<meta charset='UTF-8'>
+<meta name='viewport' content='width=device-width, initial-scale=1.0'>
+<title>学术内容日报 - {{ model.date_str }}</title>
+{{ REPORT_CSS }}
+</head>
+<body>
+<div class='container'>
+<h1>学术内容日报 - {{ model.date_str }}</h1>
+<h2>研究方向</h2>
+<ul>
+{% for interest in model.research_interests %}
+<li>{{ interest }}</li>
+{% endfor %}
+</ul>
+<div class='stats'>
+<h2>统计信息</h2>
+<ul>
+<li>总论文/文章数: {{ len(model.papers) }}</li>
+{% if model.tweets %}
+<li>总推文数: {{ len(model.tweets) }}</li>
+{% endif %}
+{% if model.paper_stats %}
+<li>论文相关性分布:<ul>
+{% for level in model.PAPER_LEVELS %}
+{% if level in model.paper_stats %}
+<li>{{ level }}: {{ model.paper_stats[level] }}</li>
+{% endif %}
+{% endfor %}
+</ul></li>
+{% endif %}
+{% if model.tweet_stats %}
+<li>推文相关性分布:<ul>
+{% for level in model.TWEET_LEVELS %}
+{% if level in model.tweet_stats %}
+<li>{{ level }}: {{ model.tweet_stats[level] }}</li>
+{% endif %}
+{% endfor %}
+</ul></li>
+{% endif %}
+</ul>
+</div>
+{% if model.high_papers or model.high_tweets %}
+<div class='summary'>
+<h2><span class='emoji'>🔍</span> 核心发现速览</h2>
+{% if model.high_papers %}
+{% include TOPIC_SUMMARY_HTML(model=model) %}
+{% endif %}
+{% if model.high_tweets %}
+{% include TWITTER_SUMMARY_HTML(model=model) %}
+{% endif %}
+</div>
+{% endif %}
+{% if layout.truncated %}
+<div class='truncated-note'>本期内容较多，邮件中前 {{ layout.full_limit if layout.full_limit is not None else layout.total }} 条完整展示，其余以简要卡片列出{% if layout.omitted_papers or layout.omitted_tweets %}，另有 {{ layout.omitted_papers }} 篇论文、{{ layout.omitted_tweets }} 条推文未列出{% endif %}{% if layout.attachment %}；完整报告见附件 {{ layout.attachment }}{% endif %}。</div>
+{% endif %}
+{% for heading, level, entries in layout.paper_sections %}
+{% if entries %}
+<h2>{{ heading }}</h2>
+{% for paper, full in entries %}
+{% if full %}
+{% include PAPER_HTML(paper=paper, relevance=level) %}
+{% else %}
+{% include COMPACT_PAPER_HTML(paper=paper) %}
+{% endif %}
+{% endfor %}
+{% endif %}
+{% endfor %}
+{% if model.tweets %}
+<div class='separator'></div>
+<h1><span class='emoji'>📱</span> Twitter 学术动态</h1>
+{% for heading, level, entries in layout.tweet_sections %}
+{% if entries %}
+<h2>{{ heading }}</h2>
+{% for tweet, full in entries %}
+{% if full %}
+{% include TWEET_HTML(tweet=tweet) %}
+{% else %}
+{% include COMPACT_TWEET_HTML(tweet=tweet) %}
+{% endif %}
+{% endfor %}
+{% endif %}
+{% endfor %}
+{% endif %}
+</div>
+</body>
+</html>""", params=('model', 'layout'), name='report',
+    REPORT_CSS=REPORT_CSS, PAPER_HTML=PAPER_HTML, TWEET_HTML=TWEET_HTML,
+    COMPACT_PAPER_HTML=COMPACT_PAPER_HTML, COMPACT_TWEET_HTML=COMPACT_TWEET_HTML,
+    TOPIC_SUMMARY_HTML=TOPIC_SUMMARY_HTML, TWITTER_SUMMARY_HTML=TWITTER_SUMMARY_HTML)
+
+# ---------------- 邮件版本 ----------------
+# 邮件客户端（尤其是 Gmail 转发、部分移动端）会丢弃 <style>，样式预先内联到各元素；
+# 紧凑卡片和精简提示的样式只在邮件中用到
+EMAIL_CSS = CSSInliner(REPORT_CSS + """
+            .compact {
+                border-left: 3px solid #ddd;
+                padding: 4px 10px;
+                margin: 8px 0;
+            }
+            .truncated-note {
+                background-color: #fff8e1;
+                border-left: 4px solid #f39c12;
+                padding: 10px 15px;
+                margin: 15px 0;
+            }
+""")
+
+# 各模板在邮件中被 include 时所在的祖先元素
+_IN_CONTAINER = (('body', ()), ('div', ('container',)))
+_IN_SUMMARY = _IN_CONTAINER + (('div', ('summary',)),)
+
+
+def _email_template(template: Template, ancestors=(), **overrides) -> Template:
+    """由普通模板生成邮件版本：内联样式、压缩空白，被 include 的模板替换为邮件版本"""
+    source = minify_html(EMAIL_CSS.inline(template.source, ancestors))
+    return Template(source, template.params, name=f'{template.name}_email',
+                    **{**template.globals, '_inline_style': EMAIL_CSS.inline_style, **overrides})
+
+
+EMAIL_CNS_BADGE = Markup(EMAIL_CSS.inline(CNS_BADGE))
+EMAIL_PAPER_HTML = _email_template(PAPER_HTML, _IN_CONTAINER, CNS_BADGE=EMAIL_CNS_BADGE)
+EMAIL_TWEET_HTML = _email_template(TWEET_HTML, _IN_CONTAINER)
+EMAIL_COMPACT_PAPER_HTML = _email_template(COMPACT_PAPER_HTML, _IN_CONTAINER, CNS_BADGE=EMAIL_CNS_BADGE)
+EMAIL_COMPACT_TWEET_HTML = _email_template(COMPACT_TWEET_HTML, _IN_CONTAINER)
+EMAIL_REPORT_HTML = _email_template(
+    REPORT_HTML,
+    REPORT_CSS=EMAIL_CSS.residual,
+    PAPER_HTML=EMAIL_PAPER_HTML,
+    TWEET_HTML=EMAIL_TWEET_HTML,
+    COMPACT_PAPER_HTML=EMAIL_COMPACT_PAPER_HTML,
+    COMPACT_TWEET_HTML=EMAIL_COMPACT_TWEET_HTML,
+    TOPIC_SUMMARY_HTML=_email_template(TOPIC_SUMMARY_HTML, _IN_SUMMARY, CNS_BADGE=EMAIL_CNS_BADGE),
+    TWITTER_SUMMARY_HTML=_email_template(TWITTER_SUMMARY_HTML, _IN_SUMMARY),
+)
@@ -0,0 +1,693 @@
+"""
+类型化配置
+配置文件加载后一次性校验并转换为不可变的数据类，之后各处读取的都是已转换好的字段；
+所有错误一次性汇总报告，在获取数据等耗时步骤之前失败。fingerprint() 给出稳定的配置指纹，可作为缓存键。
+"""
+import os
+import json
+import hashlib
+from dataclasses import dataclass, field, fields, is_dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import yaml
+
+RELEVANCE_LEVELS = ('high', 'medium', 'low')
+API_TYPES = ('anthropic', 'openai')
+STAGES = ('screen', 'detail', 'tweets')
+# 结构化报告导出格式（report_exporters 也从这里导入）
+EXPORT_FORMATS = ('jsonl', 'parquet')
+
+# 通用环境变量覆盖：ARXIV_AGENT__SOURCES__ARXIV__MAX_RESULTS=50 → sources.arxiv.max_results
+ENV_PREFIX = 'ARXIV_AGENT__'
+# 专用环境变量（敏感信息）：环境变量名 → 配置路径
+ENV_OVERRIDES = (
+    ('EMAIL_SENDER', ('email', 'sender_email')),
+    ('EMAIL_PASSWORD', ('email', 'sender_password')),
+    ('EMAIL_RECEIVER', ('email', 'receiver_email')),
+    ('TWITTER_USERNAME', ('sources', 'twitter', 'username')),
+    ('TWITTER_EMAIL', ('sources', 'twitter', 'email')),
+    ('TWITTER_PASSWORD', ('sources', 'twitter', 'password')),
+)
+# API密钥按顺序取第一个已设置的环境变量，优先于配置文件
+API_KEY_ENVS = ('ANTHROPIC_API_KEY', 'OPENAI_API_KEY', 'API_KEY')
+# 指纹中排除的字段名（密钥、密码等，不影响结果且不应出现在缓存键的输入中）
+SECRET_KEYS = frozenset(('api_key', 'password', 'sender_password', 'bearer_token', 'access_token',
+                         'access_token_secret', 'consumer_secret', 'api_secret'))
+
+
+class ConfigError(ValueError):
+    """配置无效（包含所有发现的问题）"""
+
+    def __init__(self, problems: List[str], source: str = '配置'):
+        self.problems = problems
+        super().__init__(f"{source} 无效:\n" + '\n'.join(f"  - {problem}" for problem in problems))
+
+
+def _secret():
+    return field(default=None, metadata={'secret': True}, repr=False)
+
+
+def _empty_mapping():
+    return field(default_factory=lambda: MappingProxyType({}))
+
+
+@dataclass(frozen=True, slots=True)
+class ArxivSettings:
+    enabled: bool = True
+    categories: Tuple[str, ...] = ()
+    max_results: int = 100
+    days_back: int = 1
+    timeout: float = 900.0
+
+
+@dataclass(frozen=True, slots=True)
+class SourceSettings:
+    """期刊 / Twitter 数据源的通用开关（其余字段由对应获取器读取原始配置）"""
+    enabled: bool = False
+    timeout: float = 600.0
+
+
+@dataclass(frozen=True, slots=True)
+class SourcesSettings:
+    arxiv: ArxivSettings = ArxivSettings()
+    journals: SourceSettings = SourceSettings(timeout=300.0)
+    twitter: SourceSettings = SourceSettings(timeout=600.0)
+
+
+@dataclass(frozen=True, slots=True)
+class StageSettings:
+    """分阶段模型配置（models.screen / detail / tweets），None 表示沿用全局配置"""
+    api_type: Optional[str] = None
+    api_key: Optional[str] = _secret()
+    base_url: Optional[str] = None
+    model: Optional[str] = None
+    max_tokens: Optional[int] = None
+    temperature: float = 0.7
+
+
+@dataclass(frozen=True, slots=True)
+class LLMSettings:
+    api_type: str = 'anthropic'
+    model: str = 'claude-sonnet-4-5-20250929'
+    max_tokens: int = 1024
+    base_url: Optional[str] = None
+    api_key: Optional[str] = _secret()
+    stream_responses: bool = False
+    stream_usage: bool = True
+    escalate_medium: bool = False
+    screen: StageSettings = StageSettings()
+    detail: StageSettings = StageSettings()
+    tweets: StageSettings = StageSettings()
+
+
+@dataclass(frozen=True, slots=True)
+class ResearchSettings:
+    interests: Tuple[str, ...] = ()
+    prompt: Optional[str] = None
+    min_relevance: str = 'medium'
+
+
+@dataclass(frozen=True, slots=True)
+class AnalysisSettings:
+    max_concurrent: int = 5
+    batch_size: int = 25
+    detail_batch_size: int = 8
+    streaming: bool = False
+    flush_timeout: float = 30.0
+    shared_screening: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class OutboxSettings:
+    enabled: bool = False
+    dir: Optional[str] = None
+    max_attempts: int = 8
+    backoff_base: float = 60.0
+    backoff_max: float = 6 * 3600.0
+    flush_timeout: float = 60.0
+
+
+@dataclass(frozen=True, slots=True)
+class EmailSettings:
+    enabled: bool = False
+    smtp_server: Optional[str] = None
+    smtp_port: int = 587
+    use_ssl: bool = False
+    sender_email: Optional[str] = None
+    sender_password: Optional[str] = _secret()
+    receiver_email: str = ''
+    subject_prefix: str = '[ArXiv每日论文]'
+    per_recipient: bool = False
+    max_connections: int = 1
+    max_html_bytes: int = 100_000
+    outbox: OutboxSettings = OutboxSettings()
+
+
+@dataclass(frozen=True, slots=True)
+class ReportSettings:
+    output_dir: str = 'reports'
+    topic_keywords: Mapping[str, Tuple[str, ...]] = _empty_mapping()
+    formats: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class ArchiveSettings:
+    enabled: bool = False
+    site_dir: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ServeSettings:
+    schedule: Tuple[str, ...] = ('10:00',)
+    host: str = '127.0.0.1'
+    port: int = 8765
+    outbox_interval: float = 300.0
+
+
+@dataclass(frozen=True, slots=True)
+class MetricsSettings:
+    manifest: bool = True
+    prometheus_file: Optional[str] = None
+    pricing: Mapping[str, Mapping[str, float]] = _empty_mapping()
+
+
+@dataclass(frozen=True, slots=True)
+class ProfileSettings:
+    """
+    主配置 profiles 列表中的画像：内联画像未设置的字段为None（继承主配置）；
+    引用其他配置文件的画像在加载时解析为该文件中的研究方向、相关性要求和数据源范围
+    """
+    name: str
+    research_interests: Optional[Tuple[str, ...]] = None
+    research_prompt: Optional[str] = None
+    min_relevance: Optional[str] = None
+    receiver_email: Tuple[str, ...] = ()
+    arxiv_categories: Optional[Tuple[str, ...]] = None
+    journals: Optional[Tuple[str, ...]] = None
+    twitter_usernames: Optional[Tuple[str, ...]] = None
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """完整配置（不可变）"""
+    research: ResearchSettings = ResearchSettings()
+    sources: SourcesSettings = SourcesSettings()
+    llm: LLMSettings = LLMSettings()
+    analysis: AnalysisSettings = AnalysisSettings()
+    email: EmailSettings = EmailSettings()
+    report: ReportSettings = ReportSettings()
+    archive: ArchiveSettings = ArchiveSettings()
+    serve: ServeSettings = ServeSettings()
+    metrics: MetricsSettings = MetricsSettings()
+    profiles: Tuple[ProfileSettings, ...] = ()
+    endpoints: Tuple[Mapping[str, Any], ...] = ()
+    hedging: Optional[Mapping[str, Any]] = None
+
+    # 影响分析结果的配置（分析结果缓存的键）
+    ANALYSIS_FIELDS = ('research', 'llm', 'profiles', 'endpoints',
+                       'analysis.batch_size', 'analysis.detail_batch_size', 'analysis.shared_screening')
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any], source: str = '配置') -> 'Settings':
+        """
+        校验并转换原始配置（所有问题汇总后一次性抛出 ConfigError）
+
+        Args:
+            raw: 原始配置字典（已应用环境变量覆盖）
+            source: 配置来源（用于错误信息，如配置文件路径）
+
+        Returns:
+            配置对象
+        """
+        reader = _Reader()
+        settings = reader.settings(raw if raw is not None else {})
+        if reader.problems:
+            raise ConfigError(reader.problems, source)
+        return settings
+
+    def to_dict(self, include_secrets: bool = False) -> Dict[str, Any]:
+        """转换为可JSON序列化的字典（默认不含密钥、密码）"""
+        return _plain(self, include_secrets)
+
+    def fingerprint(self, *paths: str) -> str:
+        """
+        配置指纹：规范化JSON（键排序、不含密钥）的 SHA-256 前16位，内容相同则指纹相同
+
+        Args:
+            *paths: 只计算这些字段（如 'llm'、'analysis.batch_size'），不传时为整个配置
+
+        Returns:
+            十六进制指纹
+        """
+        data = self.to_dict()
+        if paths:
+            selected = {}
+            for path in paths:
+                value = data
+                for key in path.split('.'):
+                    value = value[key]
+                selected[path] = value
+            data = selected
+        canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+    def analysis_fingerprint(self) -> str:
+        """影响分析结果的配置（研究方向、模型、画像、批次组成等）的指纹，并发数、邮件等不计入"""
+        return self.fingerprint(*self.ANALYSIS_FIELDS)
+
+
+def _plain(value, include_secrets: bool):
+    if is_dataclass(value):
+        return {f.name: _plain(getattr(value, f.name), include_secrets) for f in fields(value)
+                if include_secrets or not f.metadata.get('secret')}
+    if isinstance(value, Mapping):
+        return {str(k): _plain(v, include_secrets) for k, v in value.items()
+                if include_secrets or k not in SECRET_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v, include_secrets) for v in value]
+    return value
+
+
+def _freeze(value):
+    """递归转换为不可变容器（字典 → MappingProxyType，列表 → 元组）"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def apply_env_overlays(raw: Dict[str, Any], environ: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """
+    把环境变量覆盖到原始配置上（原地修改并返回）
+
+    - 专用变量：EMAIL_SENDER / EMAIL_PASSWORD / EMAIL_RECEIVER、TWITTER_USERNAME / EMAIL / PASSWORD，
+      ANTHROPIC_API_KEY / OPENAI_API_KEY / API_KEY（优先于配置文件中的 api_key）
+    - 通用变量：ARXIV_AGENT__<路径>，路径各级用双下划线分隔（不区分大小写），
+      值按YAML解析，如 ARXIV_AGENT__SOURCES__ARXIV__MAX_RESULTS=50、ARXIV_AGENT__STREAMING=true
+
+    Args:
+        raw: 原始配置字典
+        environ: 环境变量（默认 os.environ）
+
+    Returns:
+        覆盖后的配置字典
+    """
+    environ = os.environ if environ is None else environ
+
+    def assign(path, value):
+        node = raw
+        for key in path[:-1]:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = node[key] = {}
+            node = child
+        node[path[-1]] = value
+
+    for name in sorted(environ):
+        if name.startswith(ENV_PREFIX) and len(name) > len(ENV_PREFIX):
+            path = [part.lower() for part in name[len(ENV_PREFIX):].split('__') if part]
+            try:
+                value = yaml.safe_load(environ[name])
+            except yaml.YAMLError:
+                value = environ[name]
+            assign(path, value)
+    for name, path in ENV_OVERRIDES:
+        if environ.get(name):
+            assign(path, environ[name])
+    for name in API_KEY_ENVS:
+        if environ.get(name):
+            raw['api_key'] = environ[name].strip()
+            break
+    return raw
+
+
+class _Reader:
+    """逐项读取并转换原始配置，问题记录在 problems 中（不在第一个错误处停止）"""
+
+    def __init__(self):
+        self.problems: List[str] = []
+
+    def _problem(self, path: str, expected: str, value):
+        self.problems.append(f"{path}: 应为{expected}，实际为 {value!r}")
+
+    def section(self, data: Dict, key: str, path: str) -> Dict[str, Any]:
+        value = data.get(key)
+        if value is None:
+            return {}
+        if not isinstance(value, dict):
+            self._problem(path, '映射（key: value）', value)
+            return {}
+        return value
+
+    def string(self, data: Dict, key: str, path: str, default=None, choices=None) -> Optional[str]:
+        value = data.get(key)
+        if value is None or value == '':
+            return default
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            self._problem(path, '字符串', value)
+            return default
+        value = str(value).strip()
+        if choices and value not in choices:
+            self._problem(path, f" {' / '.join(choices)} 之一", value)
+            return default
+        return value
+
+    def integer(self, data: Dict, key: str, path: str, default, minimum: int = None):
+        value = data.get(key)
+        if value is None or value == '':
+            return default
+        try:
+            if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+                raise ValueError
+            result = int(value)
+        except (TypeError, ValueError):
+            self._problem(path, '整数', value)
+            return default
+        if minimum is not None and result < minimum:
+            self._problem(path, f"不小于 {minimum} 的整数", value)
+            return default
+        return result
+
+    def number(self, data: Dict, key: str, path: str, default, minimum: float = None, positive: bool = False):
+        value = data.get(key)
+        if value is None or value == '':
+            return default
+        try:
+            if isinstance(value, bool):
+                raise ValueError
+            result = float(value)
+        except (TypeError, ValueError):
+            self._problem(path, '数字', value)
+            return default
+        if (positive and result <= 0) or (minimum is not None and result < minimum):
+            self._problem(path, '正数' if positive else f"不小于 {minimum} 的数字", value)
+            return default
+        return result
+
+    def boolean(self, data: Dict, key: str, path: str, default: bool) -> bool:
+        value = data.get(key)
+        if value is None:
+            return default
+        if not isinstance(value, bool):
+            self._problem(path, ' true / false', value)
+            return default
+        return value
+
+    def strings(self, data: Dict, key: str, path: str, default=(), split: bool = False) -> Optional[Tuple[str, ...]]:
+        """字符串列表（split=True 时也接受逗号分隔的字符串）"""
+        value = data.get(key)
+        if value is None:
+            return default
+        if isinstance(value, str):
+            if split:
+                return tuple(item.strip() for item in value.split(',') if item.strip())
+            value = [value]
+        if not isinstance(value, list) or any(isinstance(item, (dict, list)) for item in value):
+            self._problem(path, '字符串列表', value)
+            return default
+        return tuple(str(item).strip() for item in value if str(item).strip())
+
+    def settings(self, raw: Dict[str, Any]) -> Settings:
+        if not isinstance(raw, dict):
+            self._problem('(根)', '映射（key: value）', raw)
+            return Settings()
+        return Settings(
+            research=self.research(raw),
+            sources=self.sources(raw),
+            llm=self.llm(raw),
+            analysis=self.analysis(raw),
+            email=self.email(raw),
+            report=self.report(raw),
+            archive=ArchiveSettings(
+                enabled=self.boolean(self.section(raw, 'archive', 'archive'), 'enabled', 'archive.enabled', False),
+                site_dir=self.string(self.section(raw, 'archive', 'archive'), 'site_dir', 'archive.site_dir'),
+            ),
+            serve=self.serve(raw),
+            metrics=self.metrics(raw),
+            profiles=self.profiles(raw),
+            endpoints=self.endpoints(raw),
+            hedging=self.hedging(raw),
+        )
+
+    def research(self, raw) -> ResearchSettings:
+        prompt = raw.get('research_prompt')
+        if prompt is not None and not isinstance(prompt, str):
+            self._problem('research_prompt', '字符串', prompt)
+            prompt = None
+        return ResearchSettings(
+            interests=self.strings(raw, 'research_interests', 'research_interests'),
+            prompt=prompt.strip() if prompt and prompt.strip() else None,
+            min_relevance=self.string(raw, 'min_relevance', 'min_relevance', 'medium', RELEVANCE_LEVELS),
+        )
+
+    @staticmethod
+    def _arxiv_key(raw: Dict, arxiv: Dict, key: str, legacy_key: str = None) -> Tuple[Dict, str, str]:
+        """sources.arxiv 中的配置项，未设置（或为 0 / 空）时向后兼容旧的顶层配置"""
+        if arxiv.get(key):
+            return arxiv, key, f'sources.arxiv.{key}'
+        legacy_key = legacy_key or key
+        return raw, legacy_key, legacy_key
+
+    def sources(self, raw) -> SourcesSettings:
+        sources = self.section(raw, 'sources', 'sources')
+        arxiv = self.section(sources, 'arxiv', 'sources.arxiv')
+        journals = self.section(sources, 'journals', 'sources.journals')
+        twitter = self.section(sources, 'twitter', 'sources.twitter')
+        return SourcesSettings(
+            arxiv=ArxivSettings(
+                enabled=self.boolean(arxiv, 'enabled', 'sources.arxiv.enabled', True),
+                categories=self.strings(*self._arxiv_key(raw, arxiv, 'categories', 'arxiv_categories')),
+                max_results=self.integer(*self._arxiv_key(raw, arxiv, 'max_results'), 100, minimum=1),
+                days_back=self.integer(*self._arxiv_key(raw, arxiv, 'days_back'), 1, minimum=1),
+                timeout=self.number(arxiv, 'timeout', 'sources.arxiv.timeout', 900.0, positive=True),
+            ),
+            journals=SourceSettings(
+                enabled=self.boolean(journals, 'enabled', 'sources.journals.enabled', False),
+                timeout=self.number(journals, 'timeout', 'sources.journals.timeout', 300.0, positive=True),
+            ),
+            twitter=SourceSettings(
+                enabled=self.boolean(twitter, 'enabled', 'sources.twitter.enabled', False),
+                timeout=self.number(twitter, 'timeout', 'sources.twitter.timeout', 600.0, positive=True),
+            ),
+        )
+
+    def stage(self, models: Dict, stage: str) -> StageSettings:
+        data = self.section(models, stage, f'models.{stage}')
+        path = f'models.{stage}'
+        return StageSettings(
+            api_type=self.string(data, 'api_type', f'{path}.api_type', None, API_TYPES),
+            api_key=self.string(data, 'api_key', f'{path}.api_key'),
+            base_url=self.string(data, 'base_url', f'{path}.base_url'),
+            model=self.string(data, 'model', f'{path}.model'),
+            max_tokens=self.integer(data, 'max_tokens', f'{path}.max_tokens', None, minimum=1),
+            temperature=self.number(data, 'temperature', f'{path}.temperature', 0.7, minimum=0),
+        )
+
+    def llm(self, raw) -> LLMSettings:
+        models = self.section(raw, 'models', 'models')
+        return LLMSettings(
+            api_type=self.string(raw, 'api_type', 'api_type', 'anthropic', API_TYPES),
+            # 向后兼容旧的 claude_model / claude_max_tokens
+            model=(self.string(raw, 'model', 'model') or
+                   self.string(raw, 'claude_model', 'claude_model', 'claude-sonnet-4-5-20250929')),
+            max_tokens=(self.integer(raw, 'max_tokens', 'max_tokens', None, minimum=1) or
+                        self.integer(raw, 'claude_max_tokens', 'claude_max_tokens', 1024, minimum=1)),
+            base_url=self.string(raw, 'api_base_url', 'api_base_url'),
+            api_key=self.string(raw, 'api_key', 'api_key'),
+            stream_responses=self.boolean(raw, 'stream_responses', 'stream_responses', False),
+            stream_usage=self.boolean(raw, 'stream_usage', 'stream_usage', True),
+            escalate_medium=self.boolean(models, 'escalate_medium', 'models.escalate_medium', False),
+            screen=self.stage(models, 'screen'),
+            detail=self.stage(models, 'detail'),
+            tweets=self.stage(models, 'tweets'),
+        )
+
+    def analysis(self, raw) -> AnalysisSettings:
+        return AnalysisSettings(
+            max_concurrent=self.integer(raw, 'max_concurrent', 'max_concurrent', 5, minimum=1),
+            batch_size=self.integer(raw, 'batch_size', 'batch_size', 25, minimum=1),
+            detail_batch_size=self.integer(raw, 'detail_batch_size', 'detail_batch_size', 8, minimum=1),
+            streaming=self.boolean(raw, 'streaming', 'streaming', False),
+            flush_timeout=self.number(raw, 'flush_timeout', 'flush_timeout', 30.0, positive=True),
+            shared_screening=self.boolean(raw, 'shared_screening', 'shared_screening', True),
+        )
+
+    def email(self, raw) -> EmailSettings:
+        email = self.section(raw, 'email', 'email')
+        outbox = self.section(email, 'outbox', 'email.outbox')
+        settings = EmailSettings(
+            enabled=self.boolean(email, 'enabled', 'email.enabled', False),
+            smtp_server=self.string(email, 'smtp_server', 'email.smtp_server'),
+            smtp_port=self.integer(email, 'smtp_port', 'email.smtp_port', 587, minimum=1),
+            use_ssl=self.boolean(email, 'use_ssl', 'email.use_ssl', False),
+            sender_email=self.string(email, 'sender_email', 'email.sender_email'),
+            sender_password=self.string(email, 'sender_password', 'email.sender_password'),
+            receiver_email=', '.join(self.strings(email, 'receiver_email', 'email.receiver_email', split=True)),
+            subject_prefix=self.string(email, 'subject_prefix', 'email.subject_prefix', '[ArXiv每日论文]'),
+            per_recipient=self.boolean(email, 'per_recipient', 'email.per_recipient', False),
+            max_connections=self.integer(email, 'max_connections', 'email.max_connections', 1, minimum=1),
+            max_html_bytes=self.integer(email, 'max_html_bytes', 'email.max_html_bytes', 100_000, minimum=0),
+            outbox=OutboxSettings(
+                enabled=self.boolean(outbox, 'enabled', 'email.outbox.enabled', False),
+                dir=self.string(outbox, 'dir', 'email.outbox.dir'),
+                max_attempts=self.integer(outbox, 'max_attempts', 'email.outbox.max_attempts', 8, minimum=1),
+                backoff_base=self.number(outbox, 'backoff_base', 'email.outbox.backoff_base', 60.0, positive=True),
+                backoff_max=self.number(outbox, 'backoff_max', 'email.outbox.backoff_max', 6 * 3600.0, positive=True),
+                flush_timeout=self.number(outbox, 'flush_timeout', 'email.outbox.flush_timeout', 60.0, minimum=0),
+            ),
+        )
+        if settings.enabled:
+            # 发送邮件必需的字段在加载时检查，不要等到分析完成后才发现
+            for key in ('smtp_server', 'sender_email'):
+                if not getattr(settings, key):
+                    self.problems.append(f"email.{key}: 启用邮件（email.enabled: true）时必须设置")
+        return settings
+
+    def report(self, raw) -> ReportSettings:
+        report = self.section(raw, 'report', 'report')
+        topics = self.section(report, 'topic_keywords', 'report.topic_keywords')
+        topic_keywords = {}
+        for topic, keywords in topics.items():
+            topic_keywords[str(topic)] = self.strings(topics, topic, f'report.topic_keywords.{topic}')
+        formats = tuple(fmt.lower() for fmt in self.strings(report, 'formats', 'report.formats', split=True))
+        for fmt in formats:
+            if fmt not in EXPORT_FORMATS:
+                self._problem('report.formats', f" {' / '.join(EXPORT_FORMATS)} 中的格式", fmt)
+        return ReportSettings(
+            output_dir=self.string(raw, 'output_dir', 'output_dir', 'reports'),
+            topic_keywords=MappingProxyType(topic_keywords),
+            formats=tuple(fmt for fmt in formats if fmt in EXPORT_FORMATS),
+        )
+
+    def serve(self, raw) -> ServeSettings:
+        serve = self.section(raw, 'serve', 'serve')
+        schedule = self.strings(serve, 'schedule', 'serve.schedule', ('10:00',))
+        for item in schedule:
+            hour, _, minute = item.partition(':')
+            if not (hour.isdigit() and minute.isdigit() and int(hour) < 24 and int(minute) < 60):
+                self._problem('serve.schedule', ' HH:MM 格式的时间', item)
+        return ServeSettings(
+            schedule=schedule,
+            host=self.string(serve, 'host', 'serve.host', '127.0.0.1'),
+            port=self.integer(serve, 'port', 'serve.port', 8765, minimum=1),
+            outbox_interval=self.number(serve, 'outbox_interval', 'serve.outbox_interval', 300.0, positive=True),
+        )
+
+    def metrics(self, raw) -> MetricsSettings:
+        metrics = self.section(raw, 'metrics', 'metrics')
+        pricing = self.section(metrics, 'pricing', 'metrics.pricing')
+        prices = {}
+        for model, entry in pricing.items():
+            path = f'metrics.pricing.{model}'
+            if not isinstance(entry, dict):
+                self._problem(path, '{input, output, cached} 单价映射', entry)
+                continue
+            prices[str(model)] = MappingProxyType({key: self.number(entry, key, f'{path}.{key}', 0.0, minimum=0)
+                                                   for key in entry})
+        return MetricsSettings(
+            manifest=self.boolean(metrics, 'manifest', 'metrics.manifest', True),
+            prometheus_file=self.string(metrics, 'prometheus_file', 'metrics.prometheus_file'),
+            pricing=MappingProxyType(prices),
+        )
+
+    def profile_file(self, config_path: str, path: str) -> Optional[ProfileSettings]:
+        """读取并校验另一个配置文件中的画像（与 ResearchProfile.from_config 取相同的字段）"""
+        if not os.path.exists(config_path):
+            self.problems.append(f"{path}: 画像配置文件不存在: {config_path}")
+            return None
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                raw = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError) as e:
+            self.problems.append(f"{path}: 画像配置文件无法读取: {config_path}（{e}）")
+            return None
+        if not isinstance(raw, dict):
+            self._problem(f"{path}（{config_path}）", '映射（key: value）', raw)
+            return None
+        raw = apply_env_overlays(raw)
+        # 画像配置文件中的 profiles 不会被加载（load_profiles 不递归）
+        raw.pop('profiles', None)
+        reader = _Reader()
+        settings = reader.settings(raw)
+        self.problems.extend(f"{path}（{config_path}）.{problem}" for problem in reader.problems)
+
+        sources = settings.sources
+        raw_sources = reader.section(raw, 'sources', 'sources')
+        journals = reader.section(raw_sources, 'journals', 'sources.journals')
+        twitter = reader.section(raw_sources, 'twitter', 'sources.twitter')
+        return ProfileSettings(
+            name=reader.string(raw, 'profile_name', 'profile_name', config_path),
+            research_interests=settings.research.interests,
+            research_prompt=settings.research.prompt,
+            min_relevance=settings.research.min_relevance,
+            receiver_email=tuple(email.strip() for email in settings.email.receiver_email.split(',') if email.strip()),
+            arxiv_categories=sources.arxiv.categories if sources.arxiv.enabled else (),
+            journals=(reader.strings(journals, 'selected_journals', 'sources.journals.selected_journals', None)
+                      if sources.journals.enabled else ()),
+            twitter_usernames=(reader.strings(twitter, 'following_usernames', 'sources.twitter.following_usernames', None)
+                               if sources.twitter.enabled else ()),
+        )
+
+    def profiles(self, raw) -> Tuple[ProfileSettings, ...]:
+        entries = raw.get('profiles') or []
+        if not isinstance(entries, list):
+            self._problem('profiles', '列表', entries)
+            return ()
+        profiles = []
+        for i, entry in enumerate(entries, 1):
+            path = f'profiles[{i}]'
+            if isinstance(entry, str):
+                profile = self.profile_file(entry, path)
+                if profile is not None:
+                    profiles.append(profile)
+                continue
+            if not isinstance(entry, dict):
+                self._problem(path, '画像配置（映射）或配置文件路径', entry)
+                continue
+            prompt = entry.get('research_prompt')
+            profiles.append(ProfileSettings(
+                name=self.string(entry, 'name', f'{path}.name', f'profile{i}'),
+                research_interests=self.strings(entry, 'research_interests', f'{path}.research_interests', None),
+                research_prompt=prompt.strip() if isinstance(prompt, str) and prompt.strip() else None,
+                min_relevance=self.string(entry, 'min_relevance', f'{path}.min_relevance', None, RELEVANCE_LEVELS),
+                receiver_email=self.strings(entry, 'receiver_email', f'{path}.receiver_email', split=True),
+                arxiv_categories=self.strings(entry, 'arxiv_categories', f'{path}.arxiv_categories', None),
+                journals=self.strings(entry, 'journals', f'{path}.journals', None),
+                twitter_usernames=self.strings(entry, 'twitter_usernames', f'{path}.twitter_usernames', None),
+            ))
+        names = [p.name for p in profiles]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            self.problems.append(f"profiles: 研究画像名称重复: {', '.join(duplicates)}")
+        return tuple(profiles)
+
+    def endpoints(self, raw) -> Tuple[Mapping[str, Any], ...]:
+        entries = raw.get('endpoints') or []
+        if not isinstance(entries, list):
+            self._problem('endpoints', '列表', entries)
+            return ()
+        endpoints = []
+        for i, entry in enumerate(entries, 1):
+            path = f'endpoints[{i}]'
+            if not isinstance(entry, dict):
+                self._problem(path, '端点配置（映射）', entry)
+                continue
+            self.string(entry, 'api_type', f'{path}.api_type', None, API_TYPES)
+            self.number(entry, 'weight', f'{path}.weight', 1.0, positive=True)
+            self.integer(entry, 'failure_threshold', f'{path}.failure_threshold', 3, minimum=1)
+            self.number(entry, 'cooldown', f'{path}.cooldown', 30.0, minimum=0)
+            self.boolean(entry, 'stream_usage', f'{path}.stream_usage', True)
+            endpoints.append(_freeze(entry))
+        return tuple(endpoints)
+
+    def hedging(self, raw) -> Optional[Mapping[str, Any]]:
+        hedging = self.section(raw, 'hedging', 'hedging')
+        if not self.boolean(hedging, 'enabled', 'hedging.enabled', False):
+            return None
+        delay = hedging.get('delay')
+        if delay is not None and delay != 'auto':
+            self.number(hedging, 'delay', 'hedging.delay', None, positive=True)
+        self.number(hedging, 'budget', 'hedging.budget', 0.1, minimum=0)
+        return _freeze(hedging)
@@ -0,0 +1,308 @@
+"""
+数据源编排模块
+并发获取 ArXiv、学术期刊与 Twitter 内容
+"""
+import os
+import time
+import asyncio
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Callable, Iterator, AsyncIterator
+
+from config_loader import ConfigLoader
+from tracing import NULL_TRACER
+
+
+def _import_optional(module_name: str, attr: str):
+    """
+    按需导入可选依赖中的类（只在对应数据源启用时才加载 arxiv/feedparser/tweepy/selenium 等重量级模块）
+
+    Returns:
+        导入的对象；依赖未安装时返回None
+    """
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        return None
+    return getattr(module, attr)
+
+
+class SourceOrchestrator:
+    """数据源编排器：在独立线程中并发运行各个同步获取器，并为每个数据源设置超时"""
+
+    def __init__(self, config: ConfigLoader, days_back: int = None, tracer=None):
+        """
+        初始化编排器
+
+        Args:
+            config: 配置加载器
+            days_back: ArXiv搜索天数（覆盖配置文件，可选）
+            tracer: 运行计时器（可选，每个数据源记录为一个 fetch:<名称> 区间）
+        """
+        self.config = config
+        self.days_back = days_back if days_back else config.get_days_back()
+        self.enabled_sources = config.get_enabled_sources()
+        self.tracer = tracer or NULL_TRACER
+
+    async def fetch_all_async(self) -> Dict[str, List[Dict]]:
+        """
+        并发获取所有启用的数据源
+
+        某个数据源超时或出错时只丢弃该数据源的结果，不影响其他数据源。
+
+        Returns:
+            {'papers': 论文/文章列表, 'tweets': 推文列表}
+        """
+        fetchers = {
+            'arxiv': self._fetch_arxiv,
+            'journals': self._fetch_journals,
+            'twitter': self._fetch_twitter,
+        }
+        names = [name for name in fetchers if name in self.enabled_sources]
+
+        # 使用独立线程池而不是默认执行器：超时后不等待卡住的线程，直接继续后续流程
+        executor = ThreadPoolExecutor(max_workers=max(len(names), 1), thread_name_prefix='source')
+        try:
+            results = await asyncio.gather(*[
+                self._run_source(name, fetchers[name], executor)
+                for name in names
+            ])
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        fetched = dict(zip(names, results))
+        return {
+            'papers': fetched.get('arxiv', []) + fetched.get('journals', []),
+            'tweets': fetched.get('twitter', []),
+        }
+
+    async def fetch_tweets_async(self) -> List[Dict]:
+        """
+        单独获取 Twitter 推文（流式模式下与论文流并行运行）
+
+        Returns:
+            推文列表
+        """
+        if 'twitter' not in self.enabled_sources:
+            return []
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='source')
+        try:
+            return await self._run_source('twitter', self._fetch_twitter, executor)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def stream_papers_async(self) -> AsyncIterator[Dict]:
+        """
+        以异步生成器形式逐篇产出 ArXiv 论文和期刊文章
+
+        各数据源在独立线程中边获取边产出，超时的数据源会被提前结束，
+        已产出的内容保留。
+
+        Yields:
+            论文/文章信息
+        """
+        producers = {
+            'arxiv': self._iter_arxiv,
+            'journals': self._iter_journals,
+        }
+        names = [name for name in producers if name in self.enabled_sources]
+        if not names:
+            return
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stop = threading.Event()
+        finished = object()
+        counts = {name: 0 for name in names}
+        deadlines = {name: loop.time() + self.config.get_source_timeout(name) for name in names}
+        start = loop.time()
+        span_start = time.perf_counter()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # 事件循环已关闭，消费者已不再需要数据
+                stop.set()
+
+        def produce(name: str, factory: Callable[[], Iterator[Dict]]):
+            try:
+                for item in factory():
+                    if stop.is_set():
+                        break
+                    put((name, item))
+            except Exception as e:
+                put((name, e))
+            finally:
+                put((name, finished))
+
+        executor = ThreadPoolExecutor(max_workers=len(names), thread_name_prefix='source')
+        for name in names:
+            loop.run_in_executor(executor, produce, name, producers[name])
+
+        active = set(names)
+        try:
+            while active:
+                remaining = min(deadlines[name] for name in active) - loop.time()
+                try:
+                    name, item = await asyncio.wait_for(queue.get(), timeout=max(remaining, 0))
+                except asyncio.TimeoutError:
+                    now = loop.time()
+                    for name in [n for n in active if deadlines[n] <= now]:
+                        active.discard(name)
+                        self.tracer.add_span(f'fetch:{name}', span_start, time.perf_counter(), cat='fetch',
+                                             track=f'source:{name}', items=counts[name], status='timeout')
+                        print(f"⚠️  {name}: 超过 {self.config.get_source_timeout(name)} 秒未完成，"
+                              f"保留已获取的 {counts[name]} 篇，停止该数据源")
+                    continue
+
+                if name not in active:
+                    continue
+                if item is finished:
+                    active.discard(name)
+                    self.tracer.add_span(f'fetch:{name}', span_start, time.perf_counter(), cat='fetch',
+                                         track=f'source:{name}', items=counts[name])
+                    print(f"⏱️  {name}: 完成，共 {counts[name]} 篇，用时 {loop.time() - start:.1f} 秒")
+                elif isinstance(item, Exception):
+                    print(f"⚠️  {name}: 获取失败: {type(item).__name__}: {item}")
+                else:
+                    counts[name] += 1
+                    yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run_source(self, name: str, func: Callable[[], List[Dict]],
+                          executor: ThreadPoolExecutor) -> List[Dict]:
+        """
+        在线程中运行单个数据源，并应用超时
+
+        Args:
+            name: 数据源名称
+            func: 同步获取函数
+            executor: 线程池
+
+        Returns:
+            获取到的内容列表（超时或失败时为空列表）
+        """
+        timeout = self.config.get_source_timeout(name)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        with self.tracer.span(f'fetch:{name}', cat='fetch', track=f'source:{name}') as span:
+            try:
+                items = await asyncio.wait_for(loop.run_in_executor(executor, func), timeout=timeout)
+            except asyncio.TimeoutError:
+                print(f"⚠️  {name}: 超过 {timeout} 秒未完成，已跳过该数据源")
+                span['status'] = 'timeout'
+                return []
+            except Exception as e:
+                print(f"⚠️  {name}: 获取失败: {type(e).__name__}: {e}")
+                span['status'] = 'error'
+                return []
+            span['items'] = len(items or [])
+
+        print(f"⏱️  {name}: 完成，用时 {loop.time() - start:.1f} 秒")
+        return items or []
+
+    def _fetch_arxiv(self) -> List[Dict]:
+        """获取 ArXiv 论文"""
+        print("[arxiv] 搜索 ArXiv 论文")
+        from arxiv_searcher import ArxivSearcher
+        searcher = ArxivSearcher(
+            categories=self.config.get_arxiv_categories(),
+            max_results=self.config.get_max_results()
+        )
+        papers = searcher.search_recent_papers(days_back=self.days_back)
+        print(f"✅ ArXiv: 找到 {len(papers)} 篇论文")
+        if len(papers) == 0:
+            print("  ⚠️  警告：ArXiv 搜索返回 0 篇论文！")
+            print("  可能的原因：")
+            print("  1. 配置问题（参数类型错误）")
+            print("  2. 日期范围问题")
+            print("  3. ArXiv API 访问问题")
+        return papers
+
+    def _iter_arxiv(self) -> Iterator[Dict]:
+        """逐篇产出 ArXiv 论文"""
+        print("[arxiv] 搜索 ArXiv 论文（流式）")
+        from arxiv_searcher import ArxivSearcher
+        searcher = ArxivSearcher(
+            categories=self.config.get_arxiv_categories(),
+            max_results=self.config.get_max_results()
+        )
+        return searcher.iter_recent_papers(days_back=self.days_back)
+
+    def _iter_journals(self) -> Iterator[Dict]:
+        """逐篇产出 CNS 期刊文章"""
+        print("[journals] 获取 CNS 期刊文章（流式）")
+        from journal_fetcher import JournalFetcher
+        journal_config = self.config.get_journal_config()
+        journal_fetcher = JournalFetcher(selected_journals=journal_config.get('selected_journals', None))
+        return journal_fetcher.iter_recent_articles(days_back=journal_config.get('days_back', 7))
+
+    def _fetch_journals(self) -> List[Dict]:
+        """获取 CNS 期刊文章"""
+        print("[journals] 获取 CNS 期刊文章")
+        from journal_fetcher import JournalFetcher
+        journal_config = self.config.get_journal_config()
+        journal_fetcher = JournalFetcher(selected_journals=journal_config.get('selected_journals', None))
+        articles = journal_fetcher.fetch_recent_articles(days_back=journal_config.get('days_back', 7))
+        print(f"✅ 期刊: 找到 {len(articles)} 篇文章")
+        return articles
+
+    def _fetch_twitter(self) -> List[Dict]:
+        """获取 Twitter 推文（支持API v2、RSS、Selenium三种方式）"""
+        print("[twitter] 获取 Twitter 推文")
+        twitter_config = self.config.get_twitter_config()
+        following_usernames = twitter_config.get('following_usernames', [])
+
+        if not following_usernames:
+            print("⚠️  未配置 following_usernames，跳过")
+            return []
+
+        fetch_kwargs = {
+            'usernames': following_usernames,
+            'tweets_per_user': twitter_config.get('tweets_per_user', 3),
+            'days_back': twitter_config.get('days_back', 1),
+        }
+
+        # 优先使用Twitter API v2（如果配置了bearer_token）
+        bearer_token = twitter_config.get('bearer_token') or os.getenv('TWITTER_BEARER_TOKEN')
+
+        TwitterAPIv2Fetcher = _import_optional('twitter_api_v2_fetcher', 'TwitterAPIv2Fetcher') if bearer_token else None
+        if bearer_token and TwitterAPIv2Fetcher:
+            print("使用方式：Twitter API v2（官方API）")
+            tweets = TwitterAPIv2Fetcher(bearer_token=bearer_token).get_tweets_from_list(**fetch_kwargs)
+            print(f"✅ Twitter API: 找到 {len(tweets)} 条推文")
+            return tweets
+
+        TwitterRSSFetcher = _import_optional('twitter_rss_fetcher', 'TwitterRSSFetcher')
+        if TwitterRSSFetcher:
+            print("使用方式：Nitter RSS（免费爬虫）")
+            print("⚠️  注意：Nitter实例可能不稳定")
+            tweets = TwitterRSSFetcher().get_tweets_from_list(**fetch_kwargs)
+            if tweets:
+                print(f"✅ Twitter RSS: 找到 {len(tweets)} 条推文")
+            else:
+                print("⚠️  未获取到推文（Nitter实例可能不可用）")
+            return tweets
+
+        TwitterSeleniumScraper = _import_optional('twitter_selenium_scraper', 'TwitterSeleniumScraper')
+        if TwitterSeleniumScraper:
+            print("使用方式：Selenium浏览器爬虫")
+            print("⚠️  注意：需要Chrome浏览器，速度较慢")
+            tweets = TwitterSeleniumScraper(headless=True).get_tweets_from_list(**fetch_kwargs)
+            print(f"✅ Selenium: 找到 {len(tweets)} 条推文")
+            return tweets
+
+        print("⚠️  Twitter功能未配置：")
+        print("   方案1：配置 Twitter API v2（推荐，免费10,000条/月）")
+        print("         在 config.yaml 或 .env 中设置 bearer_token")
+        print("   方案2：安装 feedparser（RSS方式，不稳定）")
+        print("         运行: pip install feedparser")
+        print("   方案3：安装 selenium（浏览器爬虫，较慢但可用）")
+        print("         运行: pip install selenium webdriver-manager")
+        return []
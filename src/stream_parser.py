@@ -0,0 +1,74 @@
+"""
+流式响应解析
+把逐段到达的LLM输出按【论文X】标记切分成完整的论文文本块
+"""
+import re
+from typing import List, Optional, Tuple
+
+
+class PaperBlockParser:
+    """
+    【论文X】文本块的增量解析器
+
+    每当下一个【论文Y】标记出现，上一篇论文的文本块即视为完整并立即产出；
+    流正常结束时调用 close() 产出最后一块。流被截断时最后一块可能不完整，不应调用 close()。
+    """
+
+    MARKER = re.compile(r'【论文(\d+)】')
+    # 一个标记的最大长度，用于只回看缓冲区尾部，避免每次都从头扫描
+    MAX_MARKER_LEN = 16
+
+    def __init__(self):
+        self._buffer = ''
+        self._current: Optional[int] = None
+        self._marker_end = 0
+
+    def feed(self, text: str) -> List[Tuple[int, str]]:
+        """
+        输入一段新文本
+
+        Args:
+            text: 新到达的文本片段
+
+        Returns:
+            本次变为完整的 [(论文编号, 文本块), ...]，文本块以【论文X】标记开头
+        """
+        start = max(self._marker_end, len(self._buffer) - self.MAX_MARKER_LEN)
+        self._buffer += text
+
+        blocks = []
+        while True:
+            match = self.MARKER.search(self._buffer, start)
+            if not match:
+                break
+            if self._current is not None:
+                blocks.append((self._current, self._buffer[:match.start()]))
+            self._current = int(match.group(1))
+            self._buffer = self._buffer[match.start():]
+            self._marker_end = match.end() - match.start()
+            start = self._marker_end
+        return blocks
+
+    def close(self) -> List[Tuple[int, str]]:
+        """
+        流正常结束，产出最后一个文本块
+
+        Returns:
+            [(论文编号, 文本块)]；没有任何标记时为空列表
+        """
+        if self._current is None:
+            return []
+        block = (self._current, self._buffer)
+        self._buffer = ''
+        self._current = None
+        self._marker_end = 0
+        return [block]
+
+
+class StreamInterrupted(Exception):
+    """流式响应中途失败；results 为失败前已完整解析的结果，error 为原始错误"""
+
+    def __init__(self, results: list, error: Exception):
+        super().__init__(str(error))
+        self.results = results
+        self.error = error
@@ -0,0 +1,290 @@
+"""
+预编译的HTML模板
+模板在导入时编译成 Python 函数，渲染时只执行该函数，输出默认转义
+
+语法（Jinja2 的一个很小的子集）：
+- {{ 表达式 }}：输出表达式的值（HTML转义）；{{ 表达式|safe }} 不转义
+- {% if 条件 %} / {% elif 条件 %} / {% else %} / {% endif %}
+- {% for 变量 in 表达式 %} / {% endfor %}
+- {% set 变量 = 表达式 %}
+- {% include 模板(参数=值, ...) %}：在当前位置渲染另一个模板
+表达式就是 Python 表达式，可以使用模板参数和构造时传入的全局名称；
+块标签后紧跟的一个换行会被去掉（相当于 Jinja2 的 trim_blocks）。
+
+CSSInliner 和 minify_html 在编译前对模板源码做变换（邮件用：样式写进各元素的 style 属性、去掉标签间的换行），
+同样只在构造模板时执行一次。
+"""
+import re
+import html
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r'\{\{\s*(.+?)\s*\}\}|\{%\s*(.+?)\s*%\}\n?', re.S)
+
+
+class Markup(str):
+    """已经是安全HTML的字符串，输出时不再转义"""
+
+
+def escape(value) -> str:
+    """HTML转义（Markup 原样返回）"""
+    if isinstance(value, Markup):
+        return value
+    return html.escape(str(value))
+
+
+class Template:
+    """
+    预编译模板
+
+    构造时把模板源码翻译成一个 Python 函数并编译，之后每次渲染都直接调用该函数，
+    不再解析模板。渲染结果通过 write 回调逐段输出，可以写入列表、文件或其他流。
+    """
+
+    def __init__(self, source: str, params: Iterable[str] = (), name: str = 'template', **globals_):
+        """
+        编译模板
+
+        Args:
+            source: 模板源码
+            params: 模板参数名（渲染时以关键字参数传入）
+            name: 模板名称（用于报错）
+            **globals_: 模板表达式中可用的全局名称（函数、常量、被 include 的模板等）
+        """
+        self.name = name
+        self.params = tuple(params)
+        self.source = source
+        self.globals = globals_
+        self.code = self._translate(source)
+        namespace = {'_e': escape, '_str': str, **globals_}
+        exec(compile(self.code, f'<template {name}>', 'exec'), namespace)
+        self._render = namespace['_render']
+
+    def _translate(self, source: str) -> str:
+        """把模板源码翻译成 _render(_w, 参数...) 函数的 Python 源码"""
+        # 转义函数绑定为默认参数，渲染时按局部变量查找
+        signature = ', '.join(('_w',) + self.params + ('_e=_e', '_str=_str'))
+        lines = [f"def _render({signature}):"]
+        stack = []
+        depth = 1
+
+        def emit(line: str):
+            lines.append('    ' * depth + line)
+
+        pos = 0
+        for match in _TOKEN_RE.finditer(source):
+            if match.start() > pos:
+                emit(f"_w({source[pos:match.start()]!r})")
+            pos = match.end()
+
+            expression, statement = match.group(1), match.group(2)
+            if expression is not None:
+                if expression.endswith('|safe'):
+                    emit(f"_w(_str({expression[:-5].strip()}))")
+                else:
+                    emit(f"_w(_e({expression}))")
+                continue
+
+            keyword, _, rest = statement.partition(' ')
+            if keyword in ('if', 'for'):
+                emit(f"{statement}:")
+                stack.append(keyword)
+                depth += 1
+                emit("pass")
+            elif keyword in ('elif', 'else'):
+                if not stack or stack[-1] != 'if':
+                    raise ValueError(f"模板 {self.name}: {keyword} 没有对应的 if")
+                depth -= 1
+                emit(f"{statement}:")
+                depth += 1
+                emit("pass")
+            elif keyword in ('endif', 'endfor'):
+                if not stack or stack.pop() != keyword[3:]:
+                    raise ValueError(f"模板 {self.name}: {keyword} 没有对应的 {keyword[3:]}")
+                depth -= 1
+            elif keyword == 'set':
+                emit(rest.strip())
+            elif keyword == 'include':
+                template, _, args = rest.strip().partition('(')
+                args = args.rstrip()[:-1].strip()
+                emit(f"{template}._render(_w{', ' + args if args else ''})")
+            else:
+                raise ValueError(f"模板 {self.name}: 不支持的标签 {{% {statement} %}}")
+
+        if pos < len(source):
+            emit(f"_w({source[pos:]!r})")
+        if stack:
+            raise ValueError(f"模板 {self.name}: {stack[-1]} 没有结束")
+        if len(lines) == 1:
+            emit("pass")
+        return '\n'.join(lines) + '\n'
+
+    def render(self, **context) -> str:
+        """渲染为字符串"""
+        parts = []
+        self._render(parts.append, **context)
+        return ''.join(parts)
+
+    def stream(self, write: Callable[[str], Optional[int]], **context):
+        """
+        逐段渲染到 write 回调（如文件对象的 write）
+
+        Args:
+            write: 接收字符串片段的回调
+            **context: 模板参数
+        """
+        self._render(write, **context)
+
+
+_CSS_RULE_RE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+_SIMPLE_SELECTOR_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9]*)?((?:\.[\w-]+)*)$')
+# 模板源码中的模板标签与HTML标签（模板标签优先，避免把 {% if a < b %} 中的 < 当成标签）
+_SOURCE_TOKEN_RE = re.compile(
+    r'(\{\{.*?\}\}|\{%.*?%\})|<(/?)([a-zA-Z][a-zA-Z0-9]*)((?:\{\{.*?\}\}|[^>])*)>', re.S)
+_CLASS_ATTR_RE = re.compile(r"""\sclass=(['"])(.*?)\1""", re.S)
+_VOID_TAGS = frozenset(('area', 'br', 'col', 'hr', 'img', 'input', 'link', 'meta', 'source', 'wbr'))
+
+# 元素在模板源码中的位置：[(标签名, (类名, ...)), ...]，从外到内
+Ancestors = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+def _attr(value: str) -> str:
+    """双引号属性值的转义（样式中的单引号保持原样，如字体名）"""
+    return html.escape(value, quote=False).replace('"', '&quot;')
+
+
+class CSSInliner:
+    """
+    CSS内联
+
+    构造时把样式表解析为规则（只支持标签、类和后代选择器，这也是报告样式用到的全部），
+    inline() 按元素在模板源码中的标签、类名和祖先元素把匹配的声明写进 style 属性。
+    伪类（如 a:hover）等无法内联的规则保留在 residual 中，仍以 <style> 输出。
+    同一 (标签, 类名, 祖先) 的样式只计算一次。
+    """
+
+    def __init__(self, css: str):
+        """
+        解析样式表
+
+        Args:
+            css: 样式表（可以带 <style> 标签）
+        """
+        css = re.sub(r'</?style[^>]*>', '', css)
+        self._rules: List[Tuple[Tuple[int, int], int, List[Tuple[Optional[str], frozenset]], List[Tuple[str, str]]]] = []
+        residual = []
+        for order, (selectors, body) in enumerate(_CSS_RULE_RE.findall(css)):
+            declarations = []
+            for declaration in body.split(';'):
+                prop, _, value = declaration.partition(':')
+                if prop.strip() and value.strip():
+                    declarations.append((prop.strip(), ' '.join(value.split())))
+            for selector in selectors.split(','):
+                selector = ' '.join(selector.split())
+                parts = [_SIMPLE_SELECTOR_RE.match(part) for part in selector.split(' ')]
+                if not all(parts):
+                    residual.append(f"{selector}{{{';'.join(f'{p}:{v}' for p, v in declarations)}}}")
+                    continue
+                compounds = [(m.group(1), frozenset(m.group(2).split('.')[1:])) for m in parts]
+                specificity = (sum(len(classes) for _, classes in compounds),
+                               sum(1 for tag, _ in compounds if tag))
+                self._rules.append((specificity, order, compounds, declarations))
+        self._rules.sort(key=lambda rule: (rule[0], rule[1]))
+        self.residual = Markup(f"<style>{''.join(residual)}</style>" if residual else '')
+
+    @staticmethod
+    def _matches(compound, tag: str, classes) -> bool:
+        rule_tag, rule_classes = compound
+        return (rule_tag is None or rule_tag == tag) and rule_classes <= set(classes)
+
+    @lru_cache(maxsize=None)
+    def style_for(self, tag: str, classes: Tuple[str, ...], ancestors: Ancestors = ()) -> str:
+        """
+        元素的内联样式
+
+        Args:
+            tag: 标签名
+            classes: 类名
+            ancestors: 祖先元素，从外到内
+
+        Returns:
+            "属性:值;..."，没有匹配的规则时为空字符串
+        """
+        merged: Dict[str, str] = {}
+        for _, _, compounds, declarations in self._rules:
+            if not self._matches(compounds[-1], tag, classes):
+                continue
+            # 后代选择器：其余部分从内到外依次匹配祖先
+            position = len(ancestors)
+            for compound in reversed(compounds[:-1]):
+                while position and not self._matches(compound, *ancestors[position - 1]):
+                    position -= 1
+                if not position:
+                    break
+                position -= 1
+            else:
+                for prop, value in declarations:
+                    merged.pop(prop, None)
+                    merged[prop] = value
+        return ';'.join(f'{prop}:{value}' for prop, value in merged.items())
+
+    def inline(self, source: str, ancestors: Ancestors = ()) -> str:
+        """
+        给模板源码中的元素加上内联样式（类名中含模板表达式时，静态部分仍参与匹配）
+
+        Args:
+            source: 模板源码
+            ancestors: 模板被渲染时所在的祖先元素（被 include 的模板）
+
+        Returns:
+            新的模板源码
+        """
+        stack = list(ancestors)
+        parts = []
+        pos = 0
+        for match in _SOURCE_TOKEN_RE.finditer(source):
+            closing, tag, attrs = match.group(2), match.group(3), match.group(4)
+            if tag is None:
+                continue
+            tag = tag.lower()
+            if closing:
+                for i in range(len(stack) - 1, len(ancestors) - 1, -1):
+                    if stack[i][0] == tag:
+                        del stack[i:]
+                        break
+                continue
+            class_match = _CLASS_ATTR_RE.search(attrs)
+            classes = ()
+            if class_match:
+                classes = tuple(name for name in re.sub(r'\{\{.*?\}\}', ' ', class_match.group(2)).split()
+                                if not name.startswith('-') and not name.endswith('-'))
+            style = self.style_for(tag, classes, tuple(stack))
+            if style:
+                parts.append(source[pos:match.start(4)])
+                if class_match and '{{' in class_match.group(2):
+                    # 动态类名（如 {{ relevance }}-relevance）：保留 class，渲染时按完整类名查样式（同样有缓存）
+                    expression = ' + '.join(
+                        repr(piece) if i % 2 == 0 else f'_str({piece.strip()})'
+                        for i, piece in enumerate(re.split(r'\{\{(.*?)\}\}', class_match.group(2))) if piece)
+                    parts.append(attrs.rstrip('/'))
+                    parts.append(f' style="{{{{ _inline_style({tag!r}, tuple(({expression}).split()), '
+                                 f'{tuple(stack)!r})|safe }}}}"')
+                else:
+                    parts.append(_CLASS_ATTR_RE.sub('', attrs).rstrip('/'))
+                    parts.append(f' style="{_attr(style)}"')
+                parts.append('/>' if attrs.endswith('/') else '>')
+                pos = match.end()
+            if tag not in _VOID_TAGS and not attrs.endswith('/'):
+                stack.append((tag, classes))
+        parts.append(source[pos:])
+        return ''.join(parts)
+
+    def inline_style(self, tag: str, classes: Tuple[str, ...], ancestors: Ancestors = ()) -> Markup:
+        """渲染时为动态类名的元素查样式（模板全局 _inline_style）"""
+        return Markup(_attr(self.style_for(tag, classes, ancestors)))
+
+
+def minify_html(source: str) -> str:
+    """去掉模板源码中标签之间的换行和缩进（只删除紧挨着标签、含换行的空白，不影响文本内容）"""
+    source = re.sub(r'(?<=>|\})[ \t]*\n\s*(?=<|\{%)', '', source)
+    return re.sub(r'(?<=>)\s+$', '', source)
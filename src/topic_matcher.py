@@ -0,0 +1,93 @@
+"""
+主题匹配
+主题关键词预先统一转为小写，为论文或推文归类时文本只转换一次
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def interest_keywords(interest: str) -> List[str]:
+    """
+    研究方向对应的关键词：方向本身，以及括号内外的两部分
+    例如 "VLM (Vision Language Models)" → ["VLM (Vision Language Models)", "VLM", "Vision Language Models"]
+
+    Args:
+        interest: 研究方向
+
+    Returns:
+        关键词列表
+    """
+    keywords = [interest.strip()]
+    match = re.match(r'^(.*?)\s*[(（](.*?)[)）]\s*$', interest)
+    if match:
+        keywords.extend(part.strip() for part in match.groups() if part.strip())
+    return keywords
+
+
+class TopicMatcher:
+    """
+    主题匹配器
+
+    关键词在构建时统一转为小写、去重并按主题顺序排好；文本只转一次小写，
+    依次做子串查找，命中即返回（不区分大小写的子串匹配，排在前面的主题优先）。
+    CPython 的 re 对多个字面量的分支没有做 trie 优化，实测一个大的 kw1|kw2|... 正则
+    比逐个关键词的 C 层子串查找慢 3~7 倍，所以这里不用正则。
+    """
+
+    def __init__(self, topics: Dict[str, Iterable[str]]):
+        """
+        编译主题关键词
+
+        Args:
+            topics: {主题: [关键词, ...]}，排在前面的主题优先
+        """
+        self.topics = list(topics)
+        seen = set()
+        # [(主题, (小写关键词, ...)), ...]，同一关键词只保留在最前面的主题中
+        self._groups: List[Tuple[str, Tuple[str, ...]]] = []
+        for topic, keywords in topics.items():
+            lowered = []
+            for keyword in keywords:
+                keyword = str(keyword).strip().lower()
+                if keyword and keyword not in seen:
+                    seen.add(keyword)
+                    lowered.append(keyword)
+            if lowered:
+                self._groups.append((topic, tuple(lowered)))
+
+    @classmethod
+    def from_interests(cls, research_interests: List[str],
+                       extra_topics: Optional[Dict[str, Iterable[str]]] = None) -> 'TopicMatcher':
+        """
+        由研究方向（及额外的主题关键词）构建匹配器
+
+        Args:
+            research_interests: 研究方向列表（每个方向是一个主题）
+            extra_topics: 额外的 {主题: [关键词, ...]}，与同名研究方向的关键词合并
+
+        Returns:
+            主题匹配器
+        """
+        topics: Dict[str, List[str]] = {interest: interest_keywords(interest) for interest in research_interests}
+        for topic, keywords in (extra_topics or {}).items():
+            topics.setdefault(topic, []).extend(keywords)
+        return cls(topics)
+
+    def classify(self, text: str) -> Optional[str]:
+        """
+        文本所属的主题（命中多个主题时取排在最前的）
+
+        Args:
+            text: 待归类的文本
+
+        Returns:
+            主题名称，没有命中时返回None
+        """
+        if not text:
+            return None
+        text = text.lower()
+        for topic, keywords in self._groups:
+            for keyword in keywords:
+                if keyword in text:
+                    return topic
+        return None
@@ -0,0 +1,254 @@
+"""
+运行计时
+把流水线各步骤（各数据源获取、第一/二阶段、推文分析、报告渲染、邮件）记录为计时区间，
+输出汇总表和 Chrome Trace 格式的时间线（chrome://tracing 或 https://ui.perfetto.dev 打开），
+可选地为各步骤采集 cProfile / pyinstrument 结果和 tracemalloc 峰值内存
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional
+
+
+def _current_track() -> str:
+    """当前区间所在的时间线轨道：asyncio 任务名，不在任务中时为线程名"""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return task.get_name()
+    return threading.current_thread().name
+
+
+class NullTracer:
+    """未开启计时时使用的空实现"""
+
+    enabled = False
+
+    def span(self, name: str, cat: str = 'step', capture: bool = False, track: Optional[str] = None, **args):
+        # 与 RunTracer.span 一样产出一个可写入附加信息的字典
+        return nullcontext({})
+
+    def add_span(self, name: str, start: float, end: float, cat: str = 'step', track: Optional[str] = None, **args):
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+class RunTracer:
+    """
+    运行计时器
+
+    每个区间记录开始/结束时间和所在轨道（asyncio 任务或线程），并发的批次落在不同轨道上，
+    在时间线中可以直接看到它们的重叠情况。
+
+    capture=True 的区间（各主要步骤）额外采集 cProfile / pyinstrument 和 tracemalloc 峰值内存。
+    这些采集器是进程级的，同一时间只能有一个区间在采集，重叠的采集区间会被跳过并在结果中注明；
+    cProfile 和 pyinstrument 只采样事件循环所在线程，数据源在线程池中的解析耗时不会出现在其中。
+    """
+
+    enabled = True
+
+    def __init__(self, profiler: Optional[str] = None, memory: bool = False):
+        """
+        初始化计时器
+
+        Args:
+            profiler: 步骤级性能分析器（None / 'cprofile' / 'pyinstrument'）
+            memory: 是否用 tracemalloc 记录各步骤的峰值内存（会明显拖慢运行）
+        """
+        if profiler not in (None, 'cprofile', 'pyinstrument'):
+            raise ValueError(f"不支持的性能分析器: {profiler}")
+        if profiler == 'pyinstrument':
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                raise ImportError("使用 pyinstrument 需要先安装: pip install pyinstrument")
+
+        self.profiler = profiler
+        self.memory = memory
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._capturing = False
+        self.spans: List[Dict[str, Any]] = []
+        # {区间序号: (性能分析器类型, 性能分析器对象)}
+        self.profiles: Dict[int, tuple] = {}
+
+        if memory:
+            import tracemalloc
+            tracemalloc.start()
+
+    @contextmanager
+    def span(self, name: str, cat: str = 'step', capture: bool = False, track: Optional[str] = None, **args):
+        """
+        记录一个计时区间
+
+        Args:
+            name: 区间名称
+            cat: 类别（step / fetch / stage / llm / report）
+            capture: 是否为该区间采集性能分析和峰值内存
+            track: 时间线轨道（默认为当前 asyncio 任务或线程）
+            **args: 附加信息（写入时间线）
+        """
+        record = {'name': name, 'cat': cat, 'track': track or _current_track(), 'args': dict(args)}
+        profiler = None
+        if capture:
+            with self._lock:
+                if self._capturing:
+                    record['args']['capture'] = 'skipped (overlapping capture)'
+                    capture = False
+                else:
+                    self._capturing = True
+
+        if capture:
+            if self.memory:
+                import tracemalloc
+                tracemalloc.reset_peak()
+            profiler = self._start_profiler()
+
+        start = time.perf_counter()
+        try:
+            yield record['args']
+        finally:
+            end = time.perf_counter()
+            if capture:
+                if profiler is not None and self.profiler == 'pyinstrument':
+                    profiler.stop()
+                elif profiler is not None:
+                    profiler.disable()
+                if self.memory:
+                    import tracemalloc
+                    record['args']['peak_memory_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+                with self._lock:
+                    self._capturing = False
+            self._append(record, start, end, profiler)
+
+    def add_span(self, name: str, start: float, end: float, cat: str = 'step', track: Optional[str] = None, **args):
+        """
+        记录一个已经结束的区间（用于无法用 with 包住的过程，如流式数据源）
+
+        Args:
+            name: 区间名称
+            start: 开始时间（time.perf_counter()）
+            end: 结束时间（time.perf_counter()）
+            cat: 类别
+            track: 时间线轨道（默认为当前 asyncio 任务或线程）
+            **args: 附加信息
+        """
+        self._append({'name': name, 'cat': cat, 'track': track or _current_track(), 'args': dict(args)}, start, end)
+
+    def _start_profiler(self):
+        if self.profiler == 'cprofile':
+            import cProfile
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # 已有其他性能分析器在运行（如外部的 python -m cProfile）
+                return None
+            return profiler
+        if self.profiler == 'pyinstrument':
+            from pyinstrument import Profiler
+            profiler = Profiler(async_mode='enabled')
+            profiler.start()
+            return profiler
+        return None
+
+    def _append(self, record: Dict[str, Any], start: float, end: float, profiler=None):
+        record['start'] = start - self._origin
+        record['duration'] = end - start
+        with self._lock:
+            self.spans.append(record)
+            if profiler is not None:
+                self.profiles[len(self.spans) - 1] = (self.profiler, profiler)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """按区间名称汇总（次数、总耗时、最长耗时、峰值内存）"""
+        with self._lock:
+            spans = list(self.spans)
+        rows: Dict[str, Dict[str, Any]] = {}
+        for span in sorted(spans, key=lambda s: s['start']):
+            row = rows.setdefault(span['name'], {'name': span['name'], 'cat': span['cat'], 'count': 0,
+                                                 'total': 0.0, 'max': 0.0, 'peak_memory_mb': None})
+            row['count'] += 1
+            row['total'] += span['duration']
+            row['max'] = max(row['max'], span['duration'])
+            peak = span['args'].get('peak_memory_mb')
+            if peak is not None:
+                row['peak_memory_mb'] = max(row['peak_memory_mb'] or 0.0, peak)
+        return list(rows.values())
+
+    def format_table(self) -> str:
+        """格式化为汇总表"""
+        header = f"{'区间':<28}{'次数':>6}{'总耗时(s)':>12}{'最长(s)':>10}{'峰值内存(MB)':>14}"
+        lines = [header, '-' * 72]
+        for row in self.summary():
+            peak = f"{row['peak_memory_mb']:.1f}" if row['peak_memory_mb'] is not None else '-'
+            lines.append(f"{row['name']:<28}{row['count']:>6}{row['total']:>12.3f}{row['max']:>10.3f}{peak:>14}")
+        return '\n'.join(lines)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """转换为 Chrome Trace 事件格式"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s['start'])
+        pid = os.getpid()
+        tids: Dict[str, int] = {}
+        events = []
+        for span in spans:
+            tid = tids.setdefault(span['track'], len(tids) + 1)
+            events.append({
+                'name': span['name'],
+                'cat': span['cat'],
+                'ph': 'X',
+                'ts': round(span['start'] * 1e6, 1),
+                'dur': round(span['duration'] * 1e6, 1),
+                'pid': pid,
+                'tid': tid,
+                'args': span['args'],
+            })
+        for track, tid in tids.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': track}})
+            events.append({'name': 'thread_sort_index', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'sort_index': tid}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, path: str) -> List[str]:
+        """
+        写入时间线；有性能分析结果时写入同名目录
+
+        Args:
+            path: 时间线JSON路径
+
+        Returns:
+            写入的文件路径列表
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+        written = [path]
+
+        if self.profiles:
+            profile_dir = os.path.splitext(path)[0]
+            os.makedirs(profile_dir, exist_ok=True)
+            for index, (kind, profiler) in sorted(self.profiles.items()):
+                slug = re.sub(r'[^\w.-]+', '_', self.spans[index]['name']).strip('_')
+                if kind == 'cprofile':
+                    profile_path = os.path.join(profile_dir, f"{index:03d}_{slug}.prof")
+                    profiler.dump_stats(profile_path)
+                else:
+                    profile_path = os.path.join(profile_dir, f"{index:03d}_{slug}.html")
+                    with open(profile_path, 'w', encoding='utf-8') as f:
+                        f.write(profiler.output_html())
+                written.append(profile_path)
+        return written
+
+    def close(self):
+        """停止 tracemalloc"""
+        if self.memory:
+            import tracemalloc
+            tracemalloc.stop()
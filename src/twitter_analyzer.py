@@ -2,10 +2,13 @@
 Twitter内容分析模块
 使用LLM分析推文的相关性
 """
+import time
 import asyncio
 import httpx
 from typing import List, Dict, Optional
-from llm_client import LLMClient
+from llm_client import LLMClient, open_async_client
+from tracing import NULL_TRACER
+from usage_metrics import UsageTracker
 
 
 class TwitterAnalyzer:
@@ -18,7 +21,13 @@ class TwitterAnalyzer:
         max_tokens: int = 1024,
         base_url: Optional[str] = None,
         api_type: str = "anthropic",
-        max_concurrent: int = 5
+        max_concurrent: int = 5,
+        temperature: float = 0.7,
+        response_max_tokens: Optional[int] = None,
+        hedging: Optional[Dict] = None,
+        endpoints: Optional[List[Dict]] = None,
+        metrics: Optional[UsageTracker] = None,
+        tracer=None
     ):
         """
         初始化分析器
@@ -30,15 +39,27 @@ class TwitterAnalyzer:
             base_url: 自定义API端点
             api_type: API类型 ("anthropic" 或 "openai")
             max_concurrent: 最大并发请求数
+            temperature: 温度参数
+            response_max_tokens: 每次分析调用的最大输出token数（默认2048）
+            hedging: 对冲请求配置（可选，见 LLMClient）
+            endpoints: 多端点配置（可选，见 LLMClient）
+            metrics: 用量统计器（可选，记为 tweets 阶段）
+            tracer: 运行计时器（可选，记录推文分析及每个批次的区间）
         """
         self.llm_client = LLMClient(
             api_type=api_type,
             api_key=api_key,
             base_url=base_url,
             model=model,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            hedging=hedging,
+            endpoints=endpoints,
+            metrics=metrics
         )
         self.max_concurrent = max_concurrent
+        self.temperature = temperature
+        self.response_max_tokens = response_max_tokens or 2048
+        self.tracer = tracer or NULL_TRACER
 
     async def _call_api_async(self, prompt: str, client: httpx.AsyncClient, max_tokens: int = None) -> str:
         """调用LLM API"""
@@ -46,11 +67,13 @@ class TwitterAnalyzer:
             prompt=prompt,
             client=client,
             max_tokens=max_tokens,
-            temperature=0.7
+            temperature=self.temperature,
+            stage='tweets'
         )
 
     async def analyze_tweets_async(self, tweets: List[Dict], research_interests: List[str] = None,
-                                   research_prompt: str = None) -> List[Dict]:
+                                   research_prompt: str = None, client: httpx.AsyncClient = None,
+                                   semaphore=None) -> List[Dict]:
         """
         异步分析推文的相关性
 
@@ -58,6 +81,8 @@ class TwitterAnalyzer:
             tweets: 推文列表
             research_interests: 研究方向列表
             research_prompt: 研究兴趣描述
+            client: 共享的httpx异步客户端（可选，不提供则自行创建）
+            semaphore: 共享的并发控制器（可选，不提供则按 max_concurrent 自行创建）
 
         Returns:
             带有分析结果的推文列表
@@ -73,13 +98,10 @@ class TwitterAnalyzer:
         else:
             research_description = f"用户的研究方向：{', '.join(research_interests)}"
 
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrent)
+        start = time.perf_counter()
 
-        async with httpx.AsyncClient(
-            limits=httpx.Limits(max_connections=self.max_concurrent * 2,
-                              max_keepalive_connections=self.max_concurrent),
-            timeout=httpx.Timeout(60.0, connect=10.0)
-        ) as client:
+        async with open_async_client(self.max_concurrent, client) as client:
             # 分批处理（每批10条）
             batch_size = 10
             batches = []
@@ -100,6 +122,8 @@ class TwitterAnalyzer:
                 all_results.extend(results)
                 print(f"  [{i}/{len(batches)}] ✓ 完成批次 {i}")
 
+        self.tracer.add_span('tweets', start, time.perf_counter(), cat='stage', tweets=len(tweets), batches=len(batches))
+
         # 合并分析结果到推文
         for i, tweet in enumerate(tweets):
             if i < len(all_results):
@@ -122,17 +146,18 @@ class TwitterAnalyzer:
     async def _analyze_tweet_batch_async(self, tweets_batch: List[Dict], research_description: str,
                                         client: httpx.AsyncClient, semaphore: asyncio.Semaphore) -> List[Dict]:
         """批量分析推文"""
-        async with semaphore:
-            # 构建批量分析提示词
-            tweets_text = ""
-            for i, tweet in enumerate(tweets_batch):
-                tweets_text += f"\n【推文{i}】\n"
-                tweets_text += f"作者: @{tweet['author_username']} ({tweet['author_name']})\n"
-                tweets_text += f"粉丝数: {tweet['author_followers']}\n"
-                tweets_text += f"内容: {tweet['text']}\n"
-                tweets_text += f"互动: 👍{tweet['favorite_count']} 🔄{tweet['retweet_count']} 💬{tweet['reply_count']}\n"
-
-            prompt = f"""你是一个AI研究助手。请判断以下Twitter推文是否与用户的研究方向相关。
+        with self.tracer.span('tweet batch', cat='llm', tweets=len(tweets_batch)):
+            async with semaphore:
+                # 构建批量分析提示词
+                tweets_text = ""
+                for i, tweet in enumerate(tweets_batch):
+                    tweets_text += f"\n【推文{i}】\n"
+                    tweets_text += f"作者: @{tweet['author_username']} ({tweet['author_name']})\n"
+                    tweets_text += f"粉丝数: {tweet['author_followers']}\n"
+                    tweets_text += f"内容: {tweet['text']}\n"
+                    tweets_text += f"互动: 👍{tweet['favorite_count']} 🔄{tweet['retweet_count']} 💬{tweet['reply_count']}\n"
+
+                prompt = f"""你是一个AI研究助手。请判断以下Twitter推文是否与用户的研究方向相关。
 
 {research_description}
 
@@ -147,62 +172,62 @@ class TwitterAnalyzer:
 - 技术讨论、论文分享、会议信息、研究动态都可能相关
 - 业界新闻如果与研究方向相关也算相关"""
 
-            try:
-                response_text = await self._call_api_async(prompt, client, max_tokens=2048)
-
-                # 解析响应
-                results = []
-                lines = response_text.strip().split('\n')
-
-                for line in lines:
-                    line = line.strip()
-                    if '【推文' in line and '】' in line:
-                        try:
-                            # 提取推文编号
-                            tweet_idx = int(line.split('【推文')[1].split('】')[0])
-
-                            # 提取相关性
-                            relevance = 'none'
-                            if '相关性' in line:
-                                if '高' in line.split('相关性')[1].split('|')[0]:
-                                    relevance = 'high'
-                                elif '中' in line.split('相关性')[1].split('|')[0]:
-                                    relevance = 'medium'
-                                elif '低' in line.split('相关性')[1].split('|')[0]:
-                                    relevance = 'low'
-
-                            # 提取原因
-                            reason = ''
-                            if '原因' in line:
-                                reason = line.split('原因:')[-1].strip()
-
-                            results.append({
-                                'relevance_level': relevance,
-                                'is_relevant': relevance in ['high', 'medium'],
-                                'relevance_reason': reason
-                            })
-
-                        except (ValueError, IndexError) as e:
-                            results.append({
-                                'relevance_level': 'unknown',
-                                'is_relevant': False,
-                                'relevance_reason': '解析失败'
-                            })
-
-                # 确保结果数量与推文数量一致
-                while len(results) < len(tweets_batch):
-                    results.append({
+                try:
+                    response_text = await self._call_api_async(prompt, client, max_tokens=self.response_max_tokens)
+
+                    # 解析响应
+                    results = []
+                    lines = response_text.strip().split('\n')
+
+                    for line in lines:
+                        line = line.strip()
+                        if '【推文' in line and '】' in line:
+                            try:
+                                # 提取推文编号
+                                tweet_idx = int(line.split('【推文')[1].split('】')[0])
+
+                                # 提取相关性
+                                relevance = 'none'
+                                if '相关性' in line:
+                                    if '高' in line.split('相关性')[1].split('|')[0]:
+                                        relevance = 'high'
+                                    elif '中' in line.split('相关性')[1].split('|')[0]:
+                                        relevance = 'medium'
+                                    elif '低' in line.split('相关性')[1].split('|')[0]:
+                                        relevance = 'low'
+
+                                # 提取原因
+                                reason = ''
+                                if '原因' in line:
+                                    reason = line.split('原因:')[-1].strip()
+
+                                results.append({
+                                    'relevance_level': relevance,
+                                    'is_relevant': relevance in ['high', 'medium'],
+                                    'relevance_reason': reason
+                                })
+
+                            except (ValueError, IndexError) as e:
+                                results.append({
+                                    'relevance_level': 'unknown',
+                                    'is_relevant': False,
+                                    'relevance_reason': '解析失败'
+                                })
+
+                    # 确保结果数量与推文数量一致
+                    while len(results) < len(tweets_batch):
+                        results.append({
+                            'relevance_level': 'unknown',
+                            'is_relevant': False,
+                            'relevance_reason': '未分析'
+                        })
+
+                    return results
+
+                except Exception as e:
+                    print(f"  ⚠️  批量分析推文时出错: {e}")
+                    return [{
                         'relevance_level': 'unknown',
                         'is_relevant': False,
-                        'relevance_reason': '未分析'
-                    })
-
-                return results
-
-            except Exception as e:
-                print(f"  ⚠️  批量分析推文时出错: {e}")
-                return [{
-                    'relevance_level': 'unknown',
-                    'is_relevant': False,
-                    'relevance_reason': f'分析失败: {e}'
-                } for _ in tweets_batch]
+                        'relevance_reason': f'分析失败: {e}'
+                    } for _ in tweets_batch]
@@ -0,0 +1,221 @@
+"""
+LLM用量统计
+按阶段（screen / detail / tweets）汇总请求数、token、延迟和费用，
+输出汇总表、JSON运行清单以及 Prometheus 文本格式
+"""
+import json
+import math
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class StageUsage:
+    """单个阶段的累计用量"""
+
+    def __init__(self):
+        self.calls = 0
+        self.requests = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+        self.cost = 0.0
+        self.latencies: List[float] = []
+        self.status_counts: Dict[str, int] = {}
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        samples = sorted(self.latencies)
+        rank = max(math.ceil(percentile / 100 * len(samples)) - 1, 0)
+        return samples[min(rank, len(samples) - 1)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'requests': self.requests,
+            'retries': max(self.requests - self.calls, 0),
+            'errors': self.errors,
+            'status': dict(self.status_counts),
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'cached_tokens': self.cached_tokens,
+            'latency_seconds': {
+                'count': len(self.latencies),
+                'total': round(sum(self.latencies), 3),
+                'p50': _round(self.latency_percentile(50)),
+                'p90': _round(self.latency_percentile(90)),
+                'max': _round(max(self.latencies) if self.latencies else None),
+            },
+            'cost': round(self.cost, 6),
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
+
+
+class UsageTracker:
+    """
+    LLM用量统计器
+
+    LLMClient 每发出一次HTTP请求记录一条（请求数、状态、延迟、token），
+    每次 chat_completion / stream_completion 调用记录一次逻辑调用；
+    请求数减去调用数即为换端点、对冲等产生的额外请求。
+    """
+
+    def __init__(self, pricing: Optional[Dict[str, Dict[str, float]]] = None):
+        """
+        初始化统计器
+
+        Args:
+            pricing: 各模型单价（每百万token），如 {'gpt-4o': {'input': 2.5, 'output': 10, 'cached': 1.25}}
+        """
+        self.pricing = pricing or {}
+        self._lock = threading.Lock()
+        self.stages: Dict[str, StageUsage] = {}
+
+    def reset(self):
+        """清空统计（常驻模式下每次运行开始时调用）"""
+        with self._lock:
+            self.stages = {}
+
+    def _stage(self, stage: Optional[str]) -> StageUsage:
+        name = stage or 'other'
+        if name not in self.stages:
+            self.stages[name] = StageUsage()
+        return self.stages[name]
+
+    def record_call(self, stage: Optional[str]):
+        """记录一次逻辑调用"""
+        with self._lock:
+            self._stage(stage).calls += 1
+
+    def record_request(self, stage: Optional[str], model: str, status: str, latency: float,
+                       usage: Optional[Dict[str, int]] = None):
+        """
+        记录一次HTTP请求
+
+        Args:
+            stage: 阶段名称
+            model: 模型名称
+            status: 'ok'、HTTP状态码或错误类型
+            latency: 耗时（秒）
+            usage: {'input_tokens', 'output_tokens', 'cached_tokens'}（可选）
+        """
+        usage = usage or {}
+        with self._lock:
+            stats = self._stage(stage)
+            stats.requests += 1
+            stats.status_counts[status] = stats.status_counts.get(status, 0) + 1
+            if status != 'ok':
+                # 被取消的请求（如对冲中落败的一方）不算失败
+                if status != 'cancelled':
+                    stats.errors += 1
+                return
+
+            stats.latencies.append(latency)
+            input_tokens = int(usage.get('input_tokens') or 0)
+            output_tokens = int(usage.get('output_tokens') or 0)
+            cached_tokens = int(usage.get('cached_tokens') or 0)
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+            stats.cached_tokens += cached_tokens
+
+            price = self.pricing.get(model)
+            if price:
+                # 缓存命中的输入token按缓存单价计费（未配置时按普通输入单价）
+                uncached = max(input_tokens - cached_tokens, 0)
+                stats.cost += (uncached * float(price.get('input', 0))
+                               + cached_tokens * float(price.get('cached', price.get('input', 0)))
+                               + output_tokens * float(price.get('output', 0))) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """按阶段汇总的用量（含合计）"""
+        with self._lock:
+            stages = {name: stats.to_dict() for name, stats in self.stages.items()}
+            total = StageUsage()
+            for stats in self.stages.values():
+                total.calls += stats.calls
+                total.requests += stats.requests
+                total.errors += stats.errors
+                total.input_tokens += stats.input_tokens
+                total.output_tokens += stats.output_tokens
+                total.cached_tokens += stats.cached_tokens
+                total.cost += stats.cost
+                total.latencies.extend(stats.latencies)
+                for status, count in stats.status_counts.items():
+                    total.status_counts[status] = total.status_counts.get(status, 0) + count
+        return {'stages': stages, 'total': total.to_dict()}
+
+    def format_table(self) -> str:
+        """格式化为汇总表"""
+        data = self.to_dict()
+        rows = list(data['stages'].items()) + [('合计', data['total'])]
+        header = f"{'阶段':<8}{'调用':>6}{'请求':>6}{'失败':>6}{'输入tok':>10}{'输出tok':>10}{'缓存tok':>10}{'p50(s)':>8}{'p90(s)':>8}{'费用':>10}"
+        lines = [header, '-' * 82]
+        for name, stats in rows:
+            latency = stats['latency_seconds']
+            p50 = f"{latency['p50']:.1f}" if latency['p50'] is not None else '-'
+            p90 = f"{latency['p90']:.1f}" if latency['p90'] is not None else '-'
+            cost = f"{stats['cost']:.4f}" if self.pricing else '-'
+            lines.append(f"{name:<8}{stats['calls']:>6}{stats['requests']:>6}{stats['errors']:>6}"
+                         f"{stats['input_tokens']:>10}{stats['output_tokens']:>10}{stats['cached_tokens']:>10}"
+                         f"{p50:>8}{p90:>8}{cost:>10}")
+        return '\n'.join(lines)
+
+    def to_prometheus(self, prefix: str = 'arxiv_agent_llm') -> str:
+        """导出为 Prometheus 文本格式"""
+        data = self.to_dict()['stages']
+        lines = [
+            f"# HELP {prefix}_calls_total LLM calls per stage",
+            f"# TYPE {prefix}_calls_total counter",
+        ]
+        lines += [f'{prefix}_calls_total{{stage="{stage}"}} {stats["calls"]}' for stage, stats in data.items()]
+
+        lines += [f"# HELP {prefix}_requests_total HTTP requests per stage and status",
+                  f"# TYPE {prefix}_requests_total counter"]
+        for stage, stats in data.items():
+            for status, count in stats['status'].items():
+                lines.append(f'{prefix}_requests_total{{stage="{stage}",status="{status}"}} {count}')
+
+        lines += [f"# HELP {prefix}_tokens_total Tokens per stage and type",
+                  f"# TYPE {prefix}_tokens_total counter"]
+        for stage, stats in data.items():
+            for kind in ('input', 'output', 'cached'):
+                lines.append(f'{prefix}_tokens_total{{stage="{stage}",type="{kind}"}} {stats[kind + "_tokens"]}')
+
+        lines += [f"# HELP {prefix}_latency_seconds Successful request latency per stage",
+                  f"# TYPE {prefix}_latency_seconds summary"]
+        for stage, stats in data.items():
+            latency = stats['latency_seconds']
+            for quantile, key in (('0.5', 'p50'), ('0.9', 'p90')):
+                if latency[key] is not None:
+                    lines.append(f'{prefix}_latency_seconds{{stage="{stage}",quantile="{quantile}"}} {latency[key]}')
+            lines.append(f'{prefix}_latency_seconds_sum{{stage="{stage}"}} {latency["total"]}')
+            lines.append(f'{prefix}_latency_seconds_count{{stage="{stage}"}} {latency["count"]}')
+
+        if self.pricing:
+            lines += [f"# HELP {prefix}_cost_total Estimated cost per stage",
+                      f"# TYPE {prefix}_cost_total counter"]
+            lines += [f'{prefix}_cost_total{{stage="{stage}"}} {stats["cost"]}' for stage, stats in data.items()]
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """写入 Prometheus 文本文件（可配合 node_exporter 的 textfile collector）"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+
+    def write_manifest(self, path: str, run_info: Dict[str, Any]):
+        """
+        写入JSON运行清单
+
+        Args:
+            path: 输出路径
+            run_info: 本次运行的其他信息（参数、论文数量、报告路径等）
+        """
+        manifest = dict(run_info)
+        manifest['llm_usage'] = self.to_dict()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
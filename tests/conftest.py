@@ -0,0 +1,7 @@
+"""
+pytest 配置
+
+test_twitter_api.py / test_twitter_following.py 是需要真实 Twitter 账号和 config.yaml 的手动检查脚本，
+不作为单元测试收集（直接用 python 运行）
+"""
+collect_ignore = ['test_twitter_api.py', 'test_twitter_following.py']
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+测试公平并发限流器：总并发不超过上限，多个通道排队时按通道轮转分配额度
+
+运行: python -m pytest tests/test_concurrency.py
+"""
+import os
+import sys
+import asyncio
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from concurrency import FairLimiter
+
+
+async def _run_lanes(limit: int, lanes: dict, hold: float = 0.01):
+    """各通道同时提交任务，返回获得额度的顺序和观测到的最大并发数"""
+    limiter = FairLimiter(limit)
+    order = []
+    active = 0
+    peak = 0
+
+    async def job(lane: str, i: int):
+        nonlocal active, peak
+        async with limiter.lane(lane):
+            order.append(f'{lane}{i}')
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(hold)
+            active -= 1
+
+    # 先提交的通道排在前面：papers 的全部批次先于 tweets 排队
+    tasks = [asyncio.create_task(job(lane, i)) for lane, count in lanes.items() for i in range(count)]
+    await asyncio.gather(*tasks)
+    return order, peak
+
+
+def test_lanes_alternate_instead_of_starving():
+    order, peak = asyncio.run(_run_lanes(1, {'papers': 6, 'tweets': 3}))
+
+    assert peak == 1
+    # 第一个任务直接拿到额度，之后每次归还的额度按通道轮转：两个通道都在排队时交替获得，推文不会等到论文全部完成
+    assert order == ['papers0', 'papers1', 'tweets0', 'papers2', 'tweets1', 'papers3', 'tweets2',
+                     'papers4', 'papers5']
+
+
+def test_total_concurrency_is_bounded():
+    order, peak = asyncio.run(_run_lanes(3, {'a': 10, 'b': 10, 'c': 10}))
+
+    assert peak == 3
+    assert sorted(order) == sorted(f'{lane}{i}' for lane in 'abc' for i in range(10))
+    # 三个通道都在排队期间，任意连续 3 次分配恰好各轮到一次
+    lanes = [name[0] for name in order]
+    assert all(set(lanes[i:i + 3]) == set('abc') for i in range(4, 22))
+
+
+def test_cancelled_waiter_does_not_leak_capacity():
+    async def scenario():
+        limiter = FairLimiter(1)
+        release = asyncio.Event()
+
+        async def holder():
+            async with limiter.lane('a'):
+                await release.wait()
+
+        async def waiter():
+            async with limiter.lane('b'):
+                pass
+
+        first = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        queued.cancel()
+        release.set()
+        await first
+        await asyncio.gather(queued, return_exceptions=True)
+
+        # 被取消的等待者既不占用额度，也不会让额度多出来
+        async with limiter.lane('c'):
+            assert limiter._active == 1
+        return limiter._active
+
+    assert asyncio.run(scenario()) == 0
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+测试邮件发件箱：入队与到期判断、指数退避、投递锁、失败重试与移入 failed/，以及投递被取消时会话保持到发送完成（不连接SMTP服务器）
+
+运行: python -m pytest tests/test_email_outbox.py
+"""
+import os
+import sys
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from email_outbox import EmailOutbox
+
+
+class FakeSender:
+    """
+    模拟 EmailSender：记录会话和发送的邮件
+
+    fail_times 为前几次发送抛出的异常次数；block=True 时 send_message 等待 release 后才返回
+    """
+
+    def __init__(self, max_connections=1, fail_times=0, block=False):
+        self.max_connections = max_connections
+        self.fail_times = fail_times
+        self.block = block
+        self.sent = []
+        self.sessions = 0
+        self.session_open = False
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.closed = threading.Event()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self):
+        self.sessions += 1
+        self.session_open = True
+        try:
+            yield self
+        finally:
+            self.session_open = False
+            self.closed.set()
+
+    def send_message(self, data, receivers):
+        assert self.session_open
+        self.started.set()
+        if self.block:
+            self.release.wait(5)
+        with self._lock:
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                raise ConnectionError('smtp down')
+            self.sent.append((data, list(receivers)))
+
+
+def _outbox(tmp_path, **kwargs) -> EmailOutbox:
+    return EmailOutbox(str(tmp_path / 'outbox'), **kwargs)
+
+
+def test_enqueue_writes_message_and_meta(tmp_path):
+    outbox = _outbox(tmp_path)
+
+    message_id = outbox.enqueue(b'raw message', ['a@example.com'], label='日报')
+
+    (entry,) = outbox.pending()
+    assert entry['id'] == message_id
+    assert entry['receivers'] == ['a@example.com']
+    assert entry['attempts'] == 0
+    with open(os.path.join(outbox.pending_dir, f'{message_id}.eml'), 'rb') as f:
+        assert f.read() == b'raw message'
+    assert not [name for name in os.listdir(outbox.pending_dir) if name.endswith('.tmp')]
+
+
+def test_due_respects_next_attempt_time(tmp_path):
+    outbox = _outbox(tmp_path)
+    message_id = outbox.enqueue(b'x', ['a@example.com'])
+    (entry,) = outbox.pending()
+    entry['next_attempt_at'] = time.time() + 600
+    outbox._write_meta(outbox.pending_dir, entry)
+
+    assert outbox.due() == []
+    assert [e['id'] for e in outbox.due(now=time.time() + 601)] == [message_id]
+
+
+def test_backoff_doubles_with_jitter_and_cap(tmp_path):
+    outbox = _outbox(tmp_path, backoff_base=60, backoff_max=300)
+
+    for attempts, base in [(1, 60), (2, 120), (3, 240), (4, 300), (10, 300)]:
+        for _ in range(50):
+            assert base * 0.8 <= outbox.backoff(attempts) <= base * 1.2
+
+
+def test_existing_lock_skips_message(tmp_path):
+    outbox = _outbox(tmp_path)
+    message_id = outbox.enqueue(b'x', ['a@example.com'])
+    lock_path = outbox._lock(message_id)
+    sender = FakeSender()
+
+    # 另一个进程正在投递这封邮件
+    counts = asyncio.run(outbox.deliver(sender))
+
+    assert counts['skipped'] == 1
+    assert sender.sent == []
+    assert os.path.exists(lock_path)
+    assert [e['id'] for e in outbox.pending()] == [message_id]
+
+
+def test_stale_lock_is_taken_over(tmp_path):
+    outbox = _outbox(tmp_path)
+    message_id = outbox.enqueue(b'x', ['a@example.com'])
+    lock_path = outbox._lock(message_id)
+    old = time.time() - outbox.STALE_LOCK_SECONDS - 10
+    os.utime(lock_path, (old, old))
+    sender = FakeSender()
+
+    counts = asyncio.run(outbox.deliver(sender))
+
+    assert counts['sent'] == 1
+    assert not os.path.exists(lock_path)
+    assert outbox.pending() == []
+
+
+def test_failure_schedules_retry(tmp_path):
+    outbox = _outbox(tmp_path, backoff_base=60)
+    outbox.enqueue(b'x', ['a@example.com'])
+    sender = FakeSender(fail_times=1)
+
+    before = time.time()
+    assert asyncio.run(outbox.deliver(sender))['retry'] == 1
+
+    (entry,) = outbox.pending()
+    assert entry['attempts'] == 1
+    assert entry['last_error'] == 'ConnectionError: smtp down'
+    assert before + 48 <= entry['next_attempt_at'] <= time.time() + 72
+    # 没到重试时间不投递；force 时忽略退避
+    assert asyncio.run(outbox.deliver(sender)) == {'sent': 0, 'retry': 0, 'failed': 0, 'skipped': 0}
+    assert asyncio.run(outbox.deliver(sender, force=True))['sent'] == 1
+    assert outbox.pending() == []
+    assert not os.listdir(outbox.pending_dir)
+
+
+def test_moves_to_failed_after_max_attempts(tmp_path):
+    outbox = _outbox(tmp_path, max_attempts=2)
+    message_id = outbox.enqueue(b'raw message', ['a@example.com'])
+    sender = FakeSender(fail_times=5)
+
+    assert asyncio.run(outbox.deliver(sender, force=True))['retry'] == 1
+    assert asyncio.run(outbox.deliver(sender, force=True))['failed'] == 1
+
+    assert outbox.pending() == []
+    assert not os.listdir(outbox.pending_dir)
+    (entry,) = outbox.failed()
+    assert entry['id'] == message_id and entry['attempts'] == 2
+    with open(os.path.join(outbox.failed_dir, f'{message_id}.eml'), 'rb') as f:
+        assert f.read() == b'raw message'
+
+
+@pytest.mark.parametrize('max_connections', [1, 3])
+def test_deliver_uses_one_session(tmp_path, max_connections):
+    outbox = _outbox(tmp_path)
+    for i in range(5):
+        outbox.enqueue(f'message {i}'.encode(), [f'{i}@example.com'])
+    sender = FakeSender(max_connections=max_connections)
+
+    counts = asyncio.run(outbox.deliver(sender))
+
+    assert counts == {'sent': 5, 'retry': 0, 'failed': 0, 'skipped': 0}
+    assert sender.sessions == 1
+    assert sorted(data for data, _ in sender.sent) == [f'message {i}'.encode() for i in range(5)]
+    assert outbox.pending() == []
+
+
+def test_cancelled_deliver_keeps_session_until_sent(tmp_path):
+    outbox = _outbox(tmp_path)
+    outbox.enqueue(b'x', ['a@example.com'])
+    sender = FakeSender(block=True)
+
+    async def run():
+        task = asyncio.create_task(outbox.deliver(sender))
+        await asyncio.to_thread(sender.started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # 等待被取消后，在途的邮件仍在同一个会话中发送
+        assert sender.session_open
+        sender.release.set()
+        await asyncio.to_thread(sender.closed.wait, 5)
+
+    asyncio.run(run())
+
+    assert len(sender.sent) == 1
+    assert outbox.pending() == []
+    assert not os.listdir(outbox.pending_dir)
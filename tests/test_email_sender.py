@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+测试 SMTP 连接复用（本地 aiosmtpd 模拟服务器，不连接真实邮箱）
+
+需要先安装: pip install pytest aiosmtpd（以及用于生成自签名证书的 openssl 命令）
+运行: python -m pytest tests/test_email_sender.py
+"""
+import os
+import ssl
+import sys
+import shutil
+import socket
+import subprocess
+
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from email_sender import EmailSender
+
+pytest.importorskip('aiosmtpd')
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import SMTP, AuthResult
+
+PASSWORD = 'pw'
+
+
+class RecordingHandler:
+    """记录收到的邮件；fail_next > 0 时以 421 拒收（服务器主动断开），模拟空闲连接被关闭"""
+
+    def __init__(self):
+        self.messages = []
+        self.logins = 0
+        self.fail_next = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.fail_next:
+            self.fail_next -= 1
+            return '421 closing idle connection'
+        self.messages.append(envelope.rcpt_tos)
+        return '250 OK'
+
+    def authenticate(self, server, session, envelope, mechanism, auth_data):
+        self.logins += 1
+        return AuthResult(success=auth_data.password == PASSWORD.encode())
+
+
+class StartTLSController(Controller):
+    """要求 STARTTLS 后登录（与 EmailSender 非SSL模式的流程一致）"""
+
+    def __init__(self, handler: RecordingHandler, tls_context: ssl.SSLContext, **kwargs):
+        self.tls_context = tls_context
+        super().__init__(handler, **kwargs)
+
+    def factory(self):
+        return SMTP(self.handler, tls_context=self.tls_context, require_starttls=True,
+                    authenticator=self.handler.authenticate, auth_require_tls=True)
+
+
+@pytest.fixture(scope='module')
+def tls_context(tmp_path_factory):
+    if not shutil.which('openssl'):
+        pytest.skip('需要 openssl 命令生成自签名证书')
+    directory = tmp_path_factory.mktemp('smtp_tls')
+    cert, key = str(directory / 'cert.pem'), str(directory / 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                    '-subj', '/CN=127.0.0.1', '-keyout', key, '-out', cert],
+                   check=True, capture_output=True)
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+@pytest.fixture
+def smtp_server(tls_context):
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    handler = RecordingHandler()
+    controller = StartTLSController(handler, tls_context, hostname='127.0.0.1', port=port)
+    controller.start()
+    try:
+        yield handler, port
+    finally:
+        controller.stop()
+
+
+def test_session_reuses_one_login(smtp_server):
+    handler, port = smtp_server
+    sender = EmailSender('127.0.0.1', port, 'me@example.com', PASSWORD)
+
+    with sender.session():
+        for i in range(3):
+            assert sender.send_html_report([f'user{i}@example.com'], '测试', html_content='<p>hi</p>')
+
+    assert handler.logins == 1
+    assert handler.messages == [['user0@example.com'], ['user1@example.com'], ['user2@example.com']]
+
+
+def test_without_session_logs_in_per_send(smtp_server):
+    handler, port = smtp_server
+    sender = EmailSender('127.0.0.1', port, 'me@example.com', PASSWORD)
+
+    for _ in range(2):
+        assert sender.send_html_report(['user@example.com'], '测试', html_content='<p>hi</p>')
+
+    assert handler.logins == 2
+
+
+def test_per_recipient_bounded_by_max_connections(smtp_server):
+    handler, port = smtp_server
+    sender = EmailSender('127.0.0.1', port, 'me@example.com', PASSWORD, max_connections=4, per_recipient=True)
+    receivers = [f'user{i}@example.com' for i in range(28)]
+
+    with sender.session():
+        assert sender.send_html_report(receivers, '测试', html_content='<p>hi</p>')
+
+    # 每个收件人单独一封，登录次数不超过连接数上限
+    assert sorted(rcpt for rcpts in handler.messages for rcpt in rcpts) == sorted(receivers)
+    assert all(len(rcpts) == 1 for rcpts in handler.messages)
+    assert 1 <= handler.logins <= 4
+
+
+def test_reconnects_after_421(smtp_server):
+    handler, port = smtp_server
+    sender = EmailSender('127.0.0.1', port, 'me@example.com', PASSWORD)
+
+    with sender.session():
+        assert sender.send_html_report(['first@example.com'], '测试', html_content='<p>hi</p>')
+        handler.fail_next = 1
+        assert sender.send_html_report(['second@example.com'], '测试', html_content='<p>hi</p>')
+
+    # 421 后重新连接、登录并重发，邮件不丢失
+    assert handler.logins == 2
+    assert handler.messages == [['first@example.com'], ['second@example.com']]
+
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+测试多端点客户端：故障切换、熔断与半开探测、哪些错误计入熔断，以及按阶段计算的对冲请求（用假的请求函数，不发出网络请求）
+
+运行: python -m pytest tests/test_llm_client.py
+"""
+import os
+import sys
+import time
+import asyncio
+
+import httpx
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from llm_client import LLMAPIError, LLMClient
+
+A = 'https://a.example.com/v1'
+B = 'https://b.example.com/v1'
+
+
+def _client(behaviors, **endpoint_settings) -> LLMClient:
+    """
+    构建两个端点的客户端；behaviors[base_url] 为异常（抛出）或None（成功），也可以是依次使用的列表
+
+    Returns:
+        客户端，client.calls 记录依次请求的端点
+    """
+    client = LLMClient(api_key='test-key', api_type='openai', model='m',
+                       endpoints=[{'base_url': A, **endpoint_settings}, {'base_url': B, **endpoint_settings}])
+    client.calls = []
+
+    async def call_openai(prompt, http_client, max_tokens, temperature, endpoint):
+        client.calls.append(endpoint.base_url)
+        behavior = behaviors.get(endpoint.base_url)
+        if isinstance(behavior, list):
+            behavior = behavior.pop(0) if behavior else None
+        if behavior is not None:
+            raise behavior
+        return f'ok from {endpoint.base_url}', {}
+
+    client._call_openai = call_openai
+    return client
+
+
+def _endpoint(client: LLMClient, base_url: str):
+    return next(e for e in client.endpoints if e.base_url == base_url)
+
+
+def _prefer(client: LLMClient, base_url: str):
+    """让第一次选择固定落在指定端点，之后按原逻辑选择"""
+    select = client._select_endpoint
+
+    def prefer(exclude):
+        endpoint = _endpoint(client, base_url)
+        if id(endpoint) not in exclude and endpoint.available(time.monotonic()):
+            return endpoint
+        return select(exclude)
+
+    return prefer
+
+
+def test_fails_over_to_other_endpoint():
+    client = _client({A: LLMAPIError('overloaded', 503)})
+    client._select_endpoint = _prefer(client, A)
+
+    assert asyncio.run(client.chat_completion('p', None)) == f'ok from {B}'
+    assert client.calls == [A, B]
+    assert _endpoint(client, A).consecutive_failures == 1
+    assert _endpoint(client, B).consecutive_failures == 0
+
+
+@pytest.mark.parametrize('error', [LLMAPIError('rate limited', 429), LLMAPIError('bad gateway', 502),
+                                   httpx.ConnectError('refused'), httpx.ReadTimeout('slow'),
+                                   asyncio.TimeoutError()],
+                         ids=['429', '502', 'connect', 'timeout', 'asyncio-timeout'])
+def test_retryable_errors_count_toward_breaker(error):
+    client = _client({A: error, B: error})
+
+    with pytest.raises(type(error)):
+        asyncio.run(client.chat_completion('p', None))
+
+    assert sorted(client.calls) == [A, B]
+    assert all(e.consecutive_failures == 1 for e in client.endpoints)
+
+
+@pytest.mark.parametrize('status', [400, 401, 404, 413, 422])
+def test_client_errors_raise_without_failover(status):
+    client = _client({A: LLMAPIError('bad request', status), B: LLMAPIError('bad request', status)})
+
+    with pytest.raises(LLMAPIError) as excinfo:
+        asyncio.run(client.chat_completion('p', None))
+
+    # 提示词本身的问题换端点也一样：只请求一次，不影响端点健康状态
+    assert excinfo.value.status_code == status
+    assert len(client.calls) == 1
+    assert all(e.consecutive_failures == 0 and not e.open_until for e in client.endpoints)
+
+
+def test_breaker_opens_after_threshold():
+    client = _client({A: LLMAPIError('down', 500)}, failure_threshold=2, cooldown=60)
+    client._select_endpoint = _prefer(client, A)
+
+    for _ in range(2):
+        assert asyncio.run(client.chat_completion('p', None)) == f'ok from {B}'
+
+    a = _endpoint(client, A)
+    assert a.open_until > time.monotonic()
+    assert not a.available(time.monotonic())
+    # 熔断期间请求直接发往其他端点
+    client.calls.clear()
+    del client._select_endpoint
+    asyncio.run(client.chat_completion('p', None))
+    assert client.calls == [B]
+
+
+def test_half_open_allows_single_probe_and_recovers():
+    client = _client({}, failure_threshold=1, cooldown=60)
+    a, b = _endpoint(client, A), _endpoint(client, B)
+    a.record_failure(time.monotonic())
+    # 模拟冷却结束
+    a.open_until = time.monotonic() - 1
+    b.outstanding = 10
+
+    assert client._select_endpoint(set()) is a
+    assert a.probing
+    # 探测请求返回之前，半开的端点不再接收其他请求
+    assert client._select_endpoint(set()) is b
+
+    a.record_success()
+    assert not a.open_until and not a.probing
+    assert a.available(time.monotonic())
+
+
+def test_failed_probe_reopens_breaker():
+    client = _client({A: LLMAPIError('still down', 503)}, failure_threshold=3, cooldown=60)
+    a, b = _endpoint(client, A), _endpoint(client, B)
+    for _ in range(3):
+        a.record_failure(time.monotonic())
+    a.open_until = time.monotonic() - 1
+    b.outstanding = 10
+
+    assert asyncio.run(client.chat_completion('p', None)) == f'ok from {B}'
+
+    assert client.calls == [A, B]
+    assert not a.probing
+    assert a.open_until > time.monotonic()
+
+
+def test_client_error_releases_probe():
+    client = _client({A: LLMAPIError('bad request', 400)}, failure_threshold=1, cooldown=60)
+    a, b = _endpoint(client, A), _endpoint(client, B)
+    a.record_failure(time.monotonic())
+    a.open_until = time.monotonic() - 1
+    b.outstanding = 10
+
+    with pytest.raises(LLMAPIError):
+        asyncio.run(client.chat_completion('p', None))
+
+    # 4xx 说明端点能正常响应：释放探测名额，下一个请求可以再次探测
+    assert not a.probing
+    assert a.available(time.monotonic())
+
+
+def test_all_endpoints_open_picks_earliest_recovery():
+    client = _client({}, failure_threshold=1, cooldown=60)
+    a, b = _endpoint(client, A), _endpoint(client, B)
+    now = time.monotonic()
+    a.record_failure(now)
+    b.record_failure(now)
+    b.open_until = now + 5
+
+    assert client._select_endpoint(set()) is b
+
+
+
+def test_hedge_delay_is_tracked_per_stage():
+    client = LLMClient(api_key='test-key', api_type='openai', model='m',
+                       hedging={'enabled': True, 'min_samples': 5, 'percentile': 90})
+    for i in range(10):
+        client._record_latency('screen', 1.0 + i * 0.1)
+        client._record_latency('detail', 20.0 + i)
+
+    # 短的筛选请求和长的详细分析请求各自计算分位数，互不影响
+    assert client._hedge_delay('screen') == pytest.approx(1.8)
+    assert client._hedge_delay('detail') == pytest.approx(28.0)
+    # 样本不足的阶段不对冲
+    assert client._hedge_delay('tweets') is None
+
+
+def test_slow_request_is_hedged_and_backup_wins():
+    client = LLMClient(api_key='test-key', api_type='openai', model='m',
+                       hedging={'enabled': True, 'delay': 0.05, 'budget': 1.0})
+    delays = [1.0, 0.0]
+
+    async def call_openai(prompt, http_client, max_tokens, temperature, endpoint):
+        await asyncio.sleep(delays.pop(0))
+        return 'done', {}
+
+    client._call_openai = call_openai
+
+    assert asyncio.run(client.chat_completion('p', None, stage='detail')) == 'done'
+    assert client.hedge_stats()['hedged'] == 1
+    assert client.hedge_stats()['hedge_wins'] == 1
+    assert 'detail' in client.hedge_stats()['current_delay']
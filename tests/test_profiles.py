@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+测试多研究画像：画像加载、数据源范围判断，以及把各画像的数据源范围合并进主配置
+
+运行: python -m pytest tests/test_profiles.py
+"""
+import os
+import sys
+
+import pytest
+import yaml
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config_loader import ConfigLoader
+from profiles import ResearchProfile, load_profiles, merge_source_scope
+from settings import ConfigError
+
+
+def _write(path, data) -> str:
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(data, f, allow_unicode=True)
+    return str(path)
+
+
+def _main_config(tmp_path, profiles, sources=None) -> ConfigLoader:
+    data = {
+        'api_key': 'test-key',
+        'research_interests': ['Computer Vision'],
+        'sources': sources or {'arxiv': {'enabled': True, 'categories': ['cs.CV']}},
+        'profiles': profiles,
+    }
+    return ConfigLoader(_write(tmp_path / 'config.yaml', data))
+
+
+def _profile_file(tmp_path, name, sources) -> str:
+    return _write(tmp_path / f'{name}.yaml', {
+        'profile_name': name,
+        'research_interests': ['Robot Learning'],
+        'sources': sources,
+    })
+
+
+def test_inline_profiles_inherit_unset_fields(tmp_path):
+    config = _main_config(tmp_path, [
+        {'name': 'vision', 'arxiv_categories': ['cs.CV'], 'min_relevance': 'high'},
+        {'name': 'bio', 'research_interests': ['Protein Design'], 'journals': ['Nature']},
+    ])
+
+    vision, bio = load_profiles(config)
+
+    assert vision.research_interests == ['Computer Vision']
+    assert vision.min_relevance == 'high'
+    assert bio.research_interests == ['Protein Design']
+    assert bio.min_relevance == 'medium'
+
+
+def test_accepts_by_source_scope():
+    profile = ResearchProfile('p', ['x'], arxiv_categories=['cs.RO'], journals=['Nature'], twitter_usernames=['karpathy'])
+    unrestricted = ResearchProfile('q', ['x'])
+
+    assert profile.accepts({'categories': ['cs.RO', 'cs.LG']})
+    assert not profile.accepts({'categories': ['cs.CV']})
+    assert profile.accepts({'primary_category': 'cs.RO'})
+    assert profile.accepts({'source_type': 'journal', 'journal': 'Nature'})
+    assert not profile.accepts({'source_type': 'journal', 'journal': 'Cell'})
+    assert profile.accepts_tweet({'author_username': 'karpathy'})
+    assert not profile.accepts_tweet({'author_username': 'someone'})
+    assert unrestricted.accepts({'categories': ['q-bio.BM']})
+    assert unrestricted.accepts_tweet({'author_username': 'someone'})
+
+
+def test_duplicate_profile_names_are_rejected(tmp_path):
+    with pytest.raises(ConfigError, match='研究画像名称重复'):
+        _main_config(tmp_path, [{'name': 'a'}, {'name': 'a'}])
+
+
+def test_merge_adds_explicit_categories_and_journals(tmp_path):
+    config = _main_config(tmp_path, [
+        {'name': 'robotics', 'arxiv_categories': ['cs.RO']},
+        {'name': 'bio', 'journals': ['Nature', 'Cell']},
+    ])
+
+    merge_source_scope(config, load_profiles(config))
+
+    assert config.get_arxiv_categories() == ['cs.CV', 'cs.RO']
+    assert config.get_enabled_sources() == ['arxiv', 'journals']
+    assert config.get_journal_config()['selected_journals'] == ['Cell', 'Nature']
+
+
+def test_merge_keeps_all_journals_when_already_unrestricted(tmp_path):
+    config = _main_config(tmp_path, [{'name': 'bio', 'journals': ['Nature']}], sources={
+        'arxiv': {'enabled': True, 'categories': ['cs.CV']},
+        'journals': {'enabled': True},
+    })
+
+    merge_source_scope(config, load_profiles(config))
+
+    assert not config.get_journal_config().get('selected_journals')
+
+
+def test_profile_file_enabling_all_journals_widens_main_scope(tmp_path):
+    alice = _profile_file(tmp_path, 'alice', {'arxiv': {'enabled': False}, 'journals': {'enabled': True}})
+    config = _main_config(tmp_path, [alice], sources={
+        'arxiv': {'enabled': True, 'categories': ['cs.CV']},
+        'journals': {'enabled': True, 'selected_journals': ['Nature']},
+    })
+
+    (profile,) = load_profiles(config)
+    merge_source_scope(config, [profile])
+
+    # 画像要求全部期刊：主配置不再只获取 Nature
+    assert profile.journals is None
+    assert 'journals' in config.get_enabled_sources()
+    assert not config.get_journal_config().get('selected_journals')
+    # 画像关闭了 arXiv，不分析共享论文集中的 arXiv 论文
+    assert not profile.accepts({'categories': ['cs.CV']})
+    assert profile.accepts({'source_type': 'journal', 'journal': 'Cell'})
+
+
+def test_profile_file_enabling_twitter_turns_it_on(tmp_path):
+    alice = _profile_file(tmp_path, 'alice', {
+        'arxiv': {'enabled': False},
+        'twitter': {'enabled': True, 'following_usernames': ['karpathy', 'ylecun']},
+    })
+    config = _main_config(tmp_path, [{'name': 'vision'}, alice])
+
+    profiles = load_profiles(config)
+    merge_source_scope(config, profiles)
+
+    assert 'twitter' in config.get_enabled_sources()
+    assert config.get_twitter_config()['following_usernames'] == ['karpathy', 'ylecun']
+    assert profiles[1].accepts_tweet({'author_username': 'ylecun'})
+
+
+def test_merge_is_idempotent(tmp_path):
+    alice = _profile_file(tmp_path, 'alice', {'twitter': {'enabled': True, 'following_usernames': ['karpathy']}})
+    config = _main_config(tmp_path, [{'name': 'robotics', 'arxiv_categories': ['cs.RO']}, alice])
+    profiles = load_profiles(config)
+
+    # 常驻模式每次运行都会合并一次
+    merge_source_scope(config, profiles)
+    first = config.settings
+    merge_source_scope(config, profiles)
+
+    assert config.settings == first
+
+
+def test_twitter_without_usernames_is_rejected(tmp_path):
+    alice = _profile_file(tmp_path, 'alice', {'twitter': {'enabled': True}})
+    config = _main_config(tmp_path, [alice])
+
+    with pytest.raises(ConfigError, match='following_usernames'):
+        merge_source_scope(config, load_profiles(config))
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+测试类型化配置：校验问题一次性汇总、环境变量覆盖，以及配置指纹的稳定性与取值范围（不含密钥）
+
+运行: python -m pytest tests/test_settings.py
+"""
+import os
+import sys
+from dataclasses import FrozenInstanceError
+
+import pytest
+import yaml
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config_loader import ConfigLoader
+from settings import ConfigError, Settings, apply_env_overlays
+
+
+def _raw(**overrides):
+    raw = {
+        'api_key': 'secret-key',
+        'research_interests': ['Robotics', 'Computer Vision'],
+        'sources': {'arxiv': {'enabled': True, 'categories': ['cs.RO'], 'max_results': 50}},
+        'batch_size': 20,
+    }
+    raw.update(overrides)
+    return raw
+
+
+def test_defaults_and_legacy_keys():
+    settings = Settings.from_dict({'arxiv_categories': ['cs.CV'], 'days_back': 3, 'claude_model': 'old-model'})
+
+    assert settings.sources.arxiv.categories == ('cs.CV',)
+    assert settings.sources.arxiv.days_back == 3
+    assert settings.sources.arxiv.max_results == 100
+    assert settings.llm.model == 'old-model'
+    assert settings.analysis.batch_size == 25
+    with pytest.raises(FrozenInstanceError):
+        settings.analysis.batch_size = 1
+
+
+def test_all_problems_are_reported_together():
+    raw = _raw(
+        api_type='gemini',
+        batch_size=0,
+        max_concurrent='many',
+        streaming='yes',
+        sources={'arxiv': {'max_results': 1.5}},
+        email={'enabled': True},
+        serve={'schedule': ['25:00']},
+        report={'formats': 'jsonl, csv'},
+    )
+
+    with pytest.raises(ConfigError) as excinfo:
+        Settings.from_dict(raw, 'config.yaml')
+
+    problems = excinfo.value.problems
+    for path in ('api_type', 'batch_size', 'max_concurrent', 'streaming', 'sources.arxiv.max_results',
+                 'email.smtp_server', 'email.sender_email', 'serve.schedule', 'report.formats'):
+        assert any(problem.startswith(path) for problem in problems), path
+    assert str(excinfo.value).startswith('config.yaml 无效')
+
+
+def test_non_mapping_root_is_rejected():
+    with pytest.raises(ConfigError, match='根'):
+        Settings.from_dict(['not', 'a', 'mapping'])
+
+
+def test_env_overlays_use_nested_paths_and_yaml_values():
+    raw = _raw()
+    environ = {
+        'ARXIV_AGENT__SOURCES__ARXIV__MAX_RESULTS': '10',
+        'ARXIV_AGENT__STREAMING': 'true',
+        'ARXIV_AGENT__EMAIL__OUTBOX__ENABLED': 'true',
+        'ARXIV_AGENT__RESEARCH_INTERESTS': '[NLP]',
+        'ARXIV_AGENT__': 'ignored',
+        'UNRELATED': 'x',
+    }
+
+    settings = Settings.from_dict(apply_env_overlays(raw, environ))
+
+    assert settings.sources.arxiv.max_results == 10
+    # 同一节中未覆盖的字段保留
+    assert settings.sources.arxiv.categories == ('cs.RO',)
+    assert settings.analysis.streaming is True
+    assert settings.email.outbox.enabled is True
+    assert settings.research.interests == ('NLP',)
+
+
+def test_dedicated_env_vars_override_secrets():
+    raw = apply_env_overlays(_raw(), {
+        'OPENAI_API_KEY': ' env-key ',
+        'API_KEY': 'later-key',
+        'EMAIL_PASSWORD': 'pw',
+        'TWITTER_USERNAME': 'me',
+    })
+
+    assert raw['api_key'] == 'env-key'
+    assert raw['email']['sender_password'] == 'pw'
+    assert raw['sources']['twitter']['username'] == 'me'
+
+
+def test_invalid_env_overlay_is_reported():
+    raw = apply_env_overlays(_raw(), {'ARXIV_AGENT__BATCH_SIZE': 'lots'})
+
+    with pytest.raises(ConfigError, match='batch_size'):
+        Settings.from_dict(raw)
+
+
+def test_fingerprint_is_stable_and_ignores_secrets():
+    settings = Settings.from_dict(_raw())
+    reordered = dict(reversed(list(_raw().items())))
+
+    assert settings.fingerprint() == Settings.from_dict(reordered).fingerprint()
+    assert len(settings.fingerprint()) == 16
+    assert 'api_key' not in settings.to_dict()
+    assert settings.to_dict(include_secrets=True)['llm']['api_key'] == 'secret-key'
+    # 换密钥不影响指纹
+    other_key = Settings.from_dict(_raw(api_key='another-key', email={'sender_password': 'pw'}))
+    assert other_key.fingerprint() == settings.fingerprint()
+    assert Settings.from_dict(_raw(batch_size=10)).fingerprint() != settings.fingerprint()
+
+
+def test_analysis_fingerprint_only_covers_analysis_fields():
+    settings = Settings.from_dict(_raw())
+
+    # 并发数、输出目录等不影响分析结果
+    unrelated = Settings.from_dict(_raw(max_concurrent=20, output_dir='elsewhere'))
+    assert unrelated.analysis_fingerprint() == settings.analysis_fingerprint()
+    assert unrelated.fingerprint() != settings.fingerprint()
+    for changed in (_raw(model='other-model'), _raw(batch_size=10), _raw(research_interests=['NLP']),
+                    _raw(profiles=[{'name': 'p'}])):
+        assert Settings.from_dict(changed).analysis_fingerprint() != settings.analysis_fingerprint()
+
+
+def test_fingerprint_follows_profile_file(tmp_path):
+    profile_path = tmp_path / 'alice.yaml'
+    config_path = tmp_path / 'config.yaml'
+    config_path.write_text(yaml.safe_dump(_raw(profiles=[str(profile_path)])), encoding='utf-8')
+
+    profile_path.write_text(yaml.safe_dump({'profile_name': 'alice', 'research_interests': ['Robotics'],
+                                            'api_key': 'alice-key'}), encoding='utf-8')
+    first = ConfigLoader(str(config_path))
+    profile_path.write_text(yaml.safe_dump({'profile_name': 'alice', 'research_interests': ['Robotics'],
+                                            'api_key': 'other-key'}), encoding='utf-8')
+    same = ConfigLoader(str(config_path))
+    profile_path.write_text(yaml.safe_dump({'profile_name': 'alice', 'research_interests': ['NLP']}),
+                            encoding='utf-8')
+    changed = ConfigLoader(str(config_path))
+
+    assert first.settings.profiles[0].research_interests == ('Robotics',)
+    assert same.settings.analysis_fingerprint() == first.settings.analysis_fingerprint()
+    assert changed.settings.analysis_fingerprint() != first.settings.analysis_fingerprint()
+
+
+def test_profile_file_problems_name_the_file(tmp_path):
+    profile_path = tmp_path / 'alice.yaml'
+    profile_path.write_text(yaml.safe_dump({'min_relevance': 'very'}), encoding='utf-8')
+
+    with pytest.raises(ConfigError) as excinfo:
+        Settings.from_dict(_raw(profiles=[str(profile_path), str(tmp_path / 'missing.yaml')]))
+
+    problems = excinfo.value.problems
+    assert any(problem.startswith(f'profiles[1]（{profile_path}）.min_relevance') for problem in problems)
+    assert any(problem.startswith('profiles[2]') and '不存在' in problem for problem in problems)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+测试多画像共享筛选：一次调用为所有画像筛选、按画像范围写回、详细分析只做一次、回复缺项时重新筛选
+
+运行: python -m pytest tests/test_shared_screening.py
+"""
+import os
+import re
+import sys
+import asyncio
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from llm_analyzer import LLMAnalyzer
+from profiles import ResearchProfile
+
+
+class ScriptedAnalyzer(LLMAnalyzer):
+    """
+    论文标题包含画像研究方向（小写）时判为高相关，否则无关
+
+    max_lines 限制前 truncated_replies 次筛选回复的行数，模拟输出被截断
+    """
+
+    def __init__(self, max_lines=None, truncated_replies=1, **kwargs):
+        super().__init__(api_key='test-key', api_type='openai', **kwargs)
+        self.max_lines = max_lines
+        self.truncated_replies = truncated_replies
+        self.calls = []
+
+    async def _call_api_async(self, prompt, client, max_tokens=None, stage='screen'):
+        papers = re.findall(r'【论文(\d+)】\n标题[:：]\s*(.*)', prompt)
+        self.calls.append((stage, [int(idx) for idx, _ in papers], max_tokens))
+        if stage == 'detail':
+            return '\n'.join(f"【论文{idx}】\n1. 作者单位：未在摘要中说明\n2. 摘要中文翻译：译文{idx}\n3. 核心内容：总结{idx}"
+                             for idx, _ in papers)
+        profiles = re.findall(r'【画像(\d+)】(.*)', prompt.split('论文列表')[0])
+        lines = [
+            f"【论文{idx}】【画像{no}】相关性: 高 | 匹配领域: {topic}" if topic.lower() in title
+            else f"【论文{idx}】【画像{no}】相关性: 无关 | 匹配领域: 无"
+            for idx, title in papers for no, topic in profiles
+        ]
+        if self.max_lines is not None and self.truncated_replies > 0:
+            self.truncated_replies -= 1
+            lines = lines[:self.max_lines]
+        return '\n'.join(lines)
+
+
+def _papers():
+    return [
+        {'title': 'robot grasping', 'abstract': 'a', 'categories': ['cs.RO']},
+        {'title': 'vision transformer', 'abstract': 'b', 'categories': ['cs.CV']},
+        {'title': 'robot vision', 'abstract': 'c', 'categories': ['cs.RO', 'cs.CV']},
+        {'title': 'protein folding', 'abstract': 'd', 'categories': ['q-bio.BM']},
+    ]
+
+
+def _profiles():
+    return [
+        ResearchProfile('robotics', ['Robot']),
+        ResearchProfile('vision', ['Vision'], arxiv_categories=['cs.CV']),
+    ]
+
+
+def test_one_call_screens_all_profiles_and_respects_scope():
+    analyzer = ScriptedAnalyzer(batch_size=10)
+    papers = _papers()
+
+    results = asyncio.run(analyzer.multi_profile_analyze_papers_async(papers, _profiles()))
+
+    screen_calls = [indices for stage, indices, _ in analyzer.calls if stage == 'screen']
+    assert screen_calls == [[0, 1, 2, 3]]
+    robotics = {p['title']: p['relevance_level'] for p in results['robotics']}
+    vision = {p['title']: p['relevance_level'] for p in results['vision']}
+    assert robotics == {'robot grasping': 'high', 'vision transformer': 'none', 'robot vision': 'high',
+                        'protein folding': 'none'}
+    # vision 画像只关注 cs.CV，范围外的论文不出现在结果中
+    assert vision == {'vision transformer': 'high', 'robot vision': 'high'}
+    # 共享的论文集不会被改写
+    assert all('relevance_level' not in p for p in papers)
+
+
+def test_detail_analysis_runs_once_per_paper():
+    analyzer = ScriptedAnalyzer(batch_size=10, detail_batch_size=10)
+
+    results = asyncio.run(analyzer.multi_profile_analyze_papers_async(_papers(), _profiles()))
+
+    detailed = [idx for stage, indices, _ in analyzer.calls if stage == 'detail' for idx in indices]
+    # robot vision 对两个画像都相关，也只详细分析一次
+    assert sorted(detailed) == [0, 1, 2]
+    summaries = {p['title']: p.get('summary') for p in results['vision']}
+    assert summaries == {'vision transformer': '总结1', 'robot vision': '总结2'}
+
+
+def test_missing_pairs_are_rescreened():
+    # 第一次回复只有 3 行（共 6 个组合），其余组合重新筛选后得到与完整回复相同的结果
+    analyzer = ScriptedAnalyzer(max_lines=3, batch_size=10)
+
+    results = asyncio.run(analyzer.multi_profile_analyze_papers_async(_papers(), _profiles()))
+
+    screen_calls = [indices for stage, indices, _ in analyzer.calls if stage == 'screen']
+    assert len(screen_calls) == 2
+    assert screen_calls[1] == [1, 2, 3]
+    robotics = {p['title']: p['relevance_level'] for p in results['robotics']}
+    vision = {p['title']: p['relevance_level'] for p in results['vision']}
+    assert robotics == {'robot grasping': 'high', 'vision transformer': 'none', 'robot vision': 'high',
+                        'protein folding': 'none'}
+    assert vision == {'vision transformer': 'high', 'robot vision': 'high'}
+
+
+def test_pairs_missing_after_rescreening_are_kept_as_low():
+    # 每次回复都只有 1 行：重新筛选两轮后仍然缺少的组合按低相关保留，而不是当作无关丢弃
+    analyzer = ScriptedAnalyzer(max_lines=1, truncated_replies=99, batch_size=10)
+
+    results = asyncio.run(analyzer.multi_profile_analyze_papers_async(_papers(), _profiles()))
+
+    assert len([stage for stage, _, _ in analyzer.calls if stage == 'screen']) == 3
+    robotics = {p['title']: p['relevance_level'] for p in results['robotics']}
+    vision = {p['title']: p['relevance_level'] for p in results['vision']}
+    # 三次回复分别给出（论文0, robotics）、（论文1, robotics）以及重复的（论文1, robotics）
+    assert robotics == {'robot grasping': 'high', 'vision transformer': 'none', 'robot vision': 'low',
+                        'protein folding': 'low'}
+    assert vision == {'vision transformer': 'low', 'robot vision': 'low'}
+
+
+def test_batch_shrinks_with_profile_count():
+    analyzer = ScriptedAnalyzer(batch_size=25)
+
+    assert analyzer.profile_batch_size(1) == 25
+    assert analyzer.profile_batch_size(10) == 16
+    assert analyzer.profile_batch_size(1000) == 1
+
+    profiles = [ResearchProfile(f'p{i}', [f'topic{i}']) for i in range(10)]
+    papers = [{'title': f'paper {i}', 'abstract': 'x', 'categories': ['cs.LG']} for i in range(40)]
+    asyncio.run(analyzer.multi_profile_analyze_papers_async(papers, profiles))
+
+    screen_calls = [(indices, max_tokens) for stage, indices, max_tokens in analyzer.calls if stage == 'screen']
+    assert sorted(len(indices) for indices, _ in screen_calls) == [8, 16, 16]
+    assert all(max_tokens <= 8192 for _, max_tokens in screen_calls)
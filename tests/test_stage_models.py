@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+测试分阶段模型：筛选 / 详细分析使用各自的模型和参数，中相关论文交给详细分析模型复核（不调用真实API）
+
+运行: python -m pytest tests/test_stage_models.py
+"""
+import os
+import re
+import sys
+import asyncio
+
+import yaml
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config_loader import ConfigLoader
+from llm_analyzer import LLMAnalyzer
+
+
+def _analyzer(stage_settings=None, **kwargs) -> LLMAnalyzer:
+    return LLMAnalyzer(api_key='test-key', api_type='openai', model='base-model',
+                       base_url='https://api.example.com/v1', stage_settings=stage_settings, **kwargs)
+
+
+def _record_calls(analyzer: LLMAnalyzer, replies):
+    """替换各阶段客户端的 chat_completion，记录 (模型, 阶段, max_tokens, temperature)，按模型返回回复"""
+    calls = []
+    for llm_client, _, _ in analyzer.stages.values():
+        async def chat_completion(prompt, client, max_tokens=None, temperature=0.7, stage=None, _llm=llm_client):
+            calls.append((_llm.model, stage, max_tokens, temperature))
+            return replies(_llm.model, prompt)
+        llm_client.chat_completion = chat_completion
+    return calls
+
+
+def test_stages_share_default_client_without_overrides():
+    analyzer = _analyzer(escalate_medium=True)
+
+    assert analyzer.stages['screen'][0] is analyzer.stages['detail'][0] is analyzer.llm_client
+    # 两个阶段是同一个模型时复核没有意义
+    assert not analyzer.escalate_medium
+
+
+def test_stage_model_override_keeps_connection_and_endpoints():
+    analyzer = _analyzer({'screen': {'model': 'small-model', 'temperature': 0.2, 'max_tokens': None},
+                          'detail': {'model': 'base-model', 'max_tokens': 4096}},
+                         endpoints=[{'base_url': 'https://a.example.com/v1'}, {'base_url': 'https://b.example.com/v1'}])
+
+    screen_client, screen_max_tokens, screen_temperature = analyzer.stages['screen']
+    detail_client, detail_max_tokens, _ = analyzer.stages['detail']
+    assert screen_client.model == 'small-model'
+    assert (screen_max_tokens, screen_temperature) == (None, 0.2)
+    # 与全局配置相同的字段不算覆盖：详细分析沿用默认客户端
+    assert detail_client is analyzer.llm_client
+    assert detail_max_tokens == 4096
+    # 只换模型时保留多端点配置
+    assert len(screen_client.endpoints) == 2
+
+
+def test_stage_connection_override_drops_global_endpoints():
+    analyzer = _analyzer({'detail': {'base_url': 'https://strong.example.com/v1', 'model': 'strong-model'}},
+                         endpoints=[{'base_url': 'https://a.example.com/v1'}, {'base_url': 'https://b.example.com/v1'}])
+
+    detail_client = analyzer.stages['detail'][0]
+    assert [endpoint.base_url for endpoint in detail_client.endpoints] == ['https://strong.example.com/v1']
+    assert detail_client.model == 'strong-model'
+
+
+def test_calls_use_stage_model_and_parameters():
+    analyzer = _analyzer({'screen': {'model': 'small-model', 'temperature': 0.3},
+                          'detail': {'model': 'strong-model', 'max_tokens': 4096}})
+    calls = _record_calls(analyzer, lambda model, prompt: 'ok')
+
+    asyncio.run(analyzer._call_api_async('p', None, max_tokens=3072, stage='screen'))
+    asyncio.run(analyzer._call_api_async('p', None, max_tokens=1024, stage='detail'))
+
+    # 阶段配置了 max_tokens 时以阶段配置为准，否则使用调用处的默认值
+    assert calls == [('small-model', 'screen', 3072, 0.3), ('strong-model', 'detail', 4096, 0.7)]
+
+
+def test_medium_papers_are_escalated_to_detail_model():
+    analyzer = _analyzer({'screen': {'model': 'small-model'}, 'detail': {'model': 'strong-model'}},
+                         escalate_medium=True)
+
+    def replies(model, prompt):
+        indices = re.findall(r'【论文(\d+)】\n标题', prompt)
+        # 小模型把所有论文判为中相关，强模型复核后论文0为高相关、论文1为无关
+        if model == 'small-model':
+            return '\n'.join(f"【论文{idx}】相关性: 中 | 匹配领域: Robotics" for idx in indices)
+        return '\n'.join(f"【论文{idx}】相关性: {'高' if idx == '0' else '无关'} | 匹配领域: 无" for idx in indices)
+
+    calls = _record_calls(analyzer, replies)
+    batch = [(0, {'title': 'a', 'abstract': 'x'}), (1, {'title': 'b', 'abstract': 'y'}), (2, {'title': 'c', 'abstract': 'z'})]
+
+    results = asyncio.run(analyzer._screen_batch_async(batch, ['Robotics'], None, asyncio.Semaphore(1)))
+
+    assert [model for model, _, _, _ in calls] == ['small-model', 'strong-model']
+    assert sorted((idx, relevance) for idx, relevance, _ in results) == [(0, 'high'), (1, 'none'), (2, 'none')]
+
+
+def test_config_stage_settings(tmp_path):
+    path = tmp_path / 'config.yaml'
+    path.write_text(yaml.safe_dump({
+        'api_key': 'test-key',
+        'research_interests': ['Robotics'],
+        'models': {'screen': {'model': 'small-model', 'temperature': 0.3}, 'escalate_medium': True},
+    }), encoding='utf-8')
+    config = ConfigLoader(str(path))
+
+    assert config.get_stage_llm_config('screen') == {'model': 'small-model', 'max_tokens': None, 'temperature': 0.3}
+    assert config.get_stage_llm_config('detail') == {'max_tokens': None, 'temperature': 0.7}
+    assert config.is_escalation_enabled()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+测试流式两阶段分析：边获取边筛选，未满批次超时提前发出（用脚本化的假模型，不调用真实API）
+
+运行: python -m pytest tests/test_stream_analysis.py
+"""
+import os
+import re
+import sys
+import asyncio
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from llm_analyzer import LLMAnalyzer
+
+
+class ScriptedAnalyzer(LLMAnalyzer):
+    """标题含 robot 的论文判为高相关，其余无关；记录每次调用的阶段和论文编号"""
+
+    def __init__(self, **kwargs):
+        super().__init__(api_key='test-key', api_type='openai', **kwargs)
+        self.calls = []
+
+    async def _call_api_async(self, prompt, client, max_tokens=None, stage='screen'):
+        papers = re.findall(r'【论文(\d+)】\n标题[:：]\s*(.*)', prompt)
+        self.calls.append((stage, [int(idx) for idx, _ in papers]))
+        if stage == 'screen':
+            return '\n'.join(
+                f"【论文{idx}】相关性: 高 | 匹配领域: Robotics" if 'robot' in title
+                else f"【论文{idx}】相关性: 无关 | 匹配领域: 无"
+                for idx, title in papers
+            )
+        return '\n'.join(f"【论文{idx}】\n1. 作者单位：未在摘要中说明\n2. 摘要中文翻译：译文{idx}\n3. 核心内容：总结{idx}"
+                         for idx, _ in papers)
+
+
+def _paper(title: str) -> dict:
+    return {'title': title, 'abstract': f'Abstract of {title}.', 'authors': ['A'], 'categories': ['cs.RO']}
+
+
+async def _stream(papers, pause_after=None, pause=0.0):
+    for i, paper in enumerate(papers):
+        yield paper
+        if i == pause_after:
+            await asyncio.sleep(pause)
+
+
+def test_stream_analyzes_all_papers_in_arrival_order():
+    analyzer = ScriptedAnalyzer(batch_size=2, detail_batch_size=2)
+    titles = ['robot grasping', 'protein folding', 'robot navigation', 'galaxy survey', 'robot locomotion']
+
+    papers = asyncio.run(analyzer.two_stage_analyze_stream_async(_stream([_paper(t) for t in titles]), ['Robotics']))
+
+    assert [p['title'] for p in papers] == titles
+    assert [p['relevance_level'] for p in papers] == ['high', 'none', 'high', 'none', 'high']
+    # 只有相关论文进入第二阶段，详细分析结果按到达顺序的索引写回
+    assert [p.get('summary') for p in papers] == ['总结0', None, '总结2', None, '总结4']
+    screened = sorted(idx for stage, indices in analyzer.calls if stage == 'screen' for idx in indices)
+    detailed = sorted(idx for stage, indices in analyzer.calls if stage == 'detail' for idx in indices)
+    assert screened == [0, 1, 2, 3, 4]
+    assert detailed == [0, 2, 4]
+    assert all(len(indices) <= 2 for _, indices in analyzer.calls)
+
+
+def test_partial_batch_is_flushed_when_stream_stalls():
+    analyzer = ScriptedAnalyzer(batch_size=10, detail_batch_size=10)
+    papers = [_paper('robot arm'), _paper('robot hand')]
+
+    # 第一篇到达后数据源停顿，超过 flush_timeout 后未满的批次应提前发出，而不是等到数据流结束
+    result = asyncio.run(analyzer.two_stage_analyze_stream_async(
+        _stream(papers, pause_after=0, pause=0.3), ['Robotics'], flush_timeout=0.05
+    ))
+
+    assert [indices for stage, indices in analyzer.calls if stage == 'screen'] == [[0], [1]]
+    assert all(p['is_relevant'] for p in result)
+
+
+def test_empty_stream_makes_no_calls():
+    analyzer = ScriptedAnalyzer()
+
+    assert asyncio.run(analyzer.two_stage_analyze_stream_async(_stream([]), ['Robotics'])) == []
+    assert analyzer.calls == []
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+测试第二阶段流式响应：SSE 解析、【论文X】文本块的增量切分、流中断时保留已完成的论文（httpx.MockTransport，不发出网络请求）
+
+运行: python -m pytest tests/test_streaming.py
+"""
+import os
+import sys
+import json
+import asyncio
+
+import httpx
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import llm_analyzer
+from llm_analyzer import LLMAnalyzer
+from llm_client import LLMAPIError, LLMClient
+from stream_parser import PaperBlockParser
+
+DETAIL_TEXT = ''.join(
+    f"【论文{idx}】\n1. 作者单位：未在摘要中说明\n2. 摘要中文翻译：译文{idx}\n3. 核心内容：总结{idx}\n"
+    for idx in (3, 7, 12)
+)
+
+
+def _chunks(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _sse(events) -> str:
+    return ''.join(f"data: {event if isinstance(event, str) else json.dumps(event)}\n\n" for event in events)
+
+
+def _openai_events(text: str, usage=True):
+    events = [{'choices': [{'delta': {'content': chunk}}]} for chunk in _chunks(text, 7)]
+    if usage:
+        events.append({'choices': [], 'usage': {'prompt_tokens': 11, 'completion_tokens': 22}})
+    return events + ['[DONE]']
+
+
+async def _collect(client: LLMClient, handler, **kwargs):
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+        return [text async for text in client.stream_completion('p', http_client, **kwargs)]
+
+
+@pytest.mark.parametrize('size', [1, 3, 5, 16, 1000])
+def test_parser_blocks_do_not_depend_on_chunking(size):
+    parser = PaperBlockParser()
+    blocks = []
+    for chunk in _chunks(DETAIL_TEXT, size):
+        blocks.extend(parser.feed(chunk))
+    # 流正常结束之前，最后一篇论文不产出
+    assert [idx for idx, _ in blocks] == [3, 7]
+    blocks.extend(parser.close())
+
+    assert [idx for idx, _ in blocks] == [3, 7, 12]
+    assert ''.join(block for _, block in blocks) == DETAIL_TEXT
+    assert all(block.startswith(f'【论文{idx}】') for idx, block in blocks)
+
+
+def test_parser_without_markers_yields_nothing():
+    parser = PaperBlockParser()
+
+    assert parser.feed('没有标记的文本') == []
+    assert parser.close() == []
+
+
+def test_openai_stream_yields_text_and_requests_usage():
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, text=_sse(_openai_events(DETAIL_TEXT)))
+
+    client = LLMClient(api_key='test-key', api_type='openai', model='m')
+
+    assert ''.join(asyncio.run(_collect(client, handler))) == DETAIL_TEXT
+    assert requests[0]['stream'] is True
+    assert requests[0]['stream_options'] == {'include_usage': True}
+
+
+def test_openai_stream_usage_can_be_disabled():
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, text=_sse(_openai_events('ok', usage=False)))
+
+    client = LLMClient(api_key='test-key', api_type='openai', model='m', stream_usage=False)
+
+    assert asyncio.run(_collect(client, handler)) == ['ok']
+    assert 'stream_options' not in requests[0]
+
+
+def test_anthropic_stream_yields_text_deltas():
+    events = [{'type': 'message_start', 'message': {'usage': {'input_tokens': 5}}}]
+    events += [{'type': 'content_block_delta', 'delta': {'text': chunk}} for chunk in _chunks(DETAIL_TEXT, 9)]
+    events += [{'type': 'message_delta', 'usage': {'output_tokens': 40}}, {'type': 'message_stop'}]
+    client = LLMClient(api_key='test-key', api_type='anthropic', model='m')
+
+    text = asyncio.run(_collect(client, lambda request: httpx.Response(200, text=_sse(events))))
+
+    assert ''.join(text) == DETAIL_TEXT
+
+
+def test_stream_fails_over_before_first_text():
+    endpoints = [{'base_url': 'https://a.example.com'}, {'base_url': 'https://b.example.com'}]
+    client = LLMClient(api_key='test-key', api_type='anthropic', model='m', endpoints=endpoints)
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.host)
+        if len(seen) == 1:
+            error = {'type': 'error', 'error': {'type': 'overloaded_error', 'message': 'busy'}}
+            return httpx.Response(200, text=_sse([error]))
+        return httpx.Response(200, text=_sse([{'type': 'content_block_delta', 'delta': {'text': 'ok'}}]))
+
+    assert asyncio.run(_collect(client, handler)) == ['ok']
+    assert len(seen) == 2 and seen[0] != seen[1]
+
+
+def test_stream_client_error_is_not_retried():
+    endpoints = [{'base_url': 'https://a.example.com/v1'}, {'base_url': 'https://b.example.com/v1'}]
+    client = LLMClient(api_key='test-key', api_type='openai', model='m', endpoints=endpoints)
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.host)
+        return httpx.Response(400, text='context length exceeded')
+
+    with pytest.raises(LLMAPIError) as excinfo:
+        asyncio.run(_collect(client, handler))
+    assert excinfo.value.status_code == 400
+    assert len(seen) == 1
+
+
+def test_interrupted_stream_keeps_finished_papers(monkeypatch):
+    analyzer = LLMAnalyzer(api_key='test-key', api_type='openai', model='m', stream_responses=True)
+    attempts = []
+    cut = DETAIL_TEXT.index('【论文12】') + len('【论文12】') + 5
+
+    async def stream_completion(prompt, client, max_tokens=None, temperature=0.7, stage=None):
+        attempts.append(prompt)
+        if len(attempts) == 1:
+            # 第一次：输出到第三篇论文中途时连接中断
+            for chunk in _chunks(DETAIL_TEXT[:cut], 10):
+                yield chunk
+            raise httpx.ReadError('connection reset')
+        for chunk in _chunks(DETAIL_TEXT[DETAIL_TEXT.index('【论文12】'):], 10):
+            yield chunk
+
+    analyzer.stages['detail'][0].stream_completion = stream_completion
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr(llm_analyzer.asyncio, 'sleep', lambda seconds: real_sleep(0))
+    streamed = []
+    batch = [(idx, {'title': f't{idx}', 'abstract': 'x', 'authors': []}) for idx in (3, 7, 12)]
+
+    results = asyncio.run(analyzer._batch_analyze_detailed_async(
+        batch, None, asyncio.Semaphore(1), on_result=lambda idx, details: streamed.append(idx)
+    ))
+
+    assert sorted(idx for idx, _ in results) == [3, 7, 12]
+    assert {idx: details['summary'] for idx, details in results} == {3: '总结3', 7: '总结7', 12: '总结12'}
+    # 已完成的论文在流中逐篇回调，重试只请求剩下的一篇
+    assert streamed == [3, 7, 12]
+    assert '【论文12】' in attempts[1] and '【论文3】' not in attempts[1]
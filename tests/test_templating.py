@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+测试预编译模板（自动转义、|safe、控制标签、include、标签不配对时的报错）以及报告模板的 HTML 注入防护
+
+运行: python -m pytest tests/test_templating.py
+"""
+import os
+import sys
+
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from templating import Markup, Template, escape
+from report_templates import PAPER_HTML, EMAIL_PAPER_HTML, COMPACT_PAPER_HTML, EMAIL_COMPACT_PAPER_HTML
+from report_generator import ReportGenerator
+
+INJECTED_TITLE = "<script>alert('x')</script>"
+INJECTED_URL = "https://arxiv.org/abs/1' onmouseover='alert(1)"
+
+
+def _render(source: str, params=(), **context) -> str:
+    return Template(source, params=params, name='test').render(**context)
+
+
+def test_expressions_are_escaped_by_default():
+    assert _render("<p>{{ value }}</p>", ['value'], value="<b>&'\"") == "<p>&lt;b&gt;&amp;&#x27;&quot;</p>"
+
+
+def test_safe_filter_and_markup_skip_escaping():
+    assert _render("{{ value|safe }}", ['value'], value="<b>bold</b>") == "<b>bold</b>"
+    assert _render("{{ value }}", ['value'], value=Markup("<i>ok</i>")) == "<i>ok</i>"
+    assert escape(Markup("<i>ok</i>")) == "<i>ok</i>"
+
+
+def test_if_elif_else():
+    source = "{% if n > 1 %}many{% elif n == 1 %}one{% else %}none{% endif %}"
+    assert [_render(source, ['n'], n=n) for n in (2, 1, 0)] == ['many', 'one', 'none']
+
+
+def test_for_and_set():
+    source = "{% set total = 0 %}{% for item in items %}[{{ item }}]{% set total = total + item %}{% endfor %}={{ total }}"
+    assert _render(source, ['items'], items=[1, 2, 3]) == "[1][2][3]=6"
+    assert _render(source, ['items'], items=[]) == "=0"
+
+
+def test_block_tags_trim_following_newline():
+    source = "{% for x in xs %}\n{{ x }}\n{% endfor %}\nend"
+    assert _render(source, ['xs'], xs=['a', 'b']) == "a\nb\nend"
+
+
+def test_include_passes_arguments_and_keeps_escaping():
+    item = Template("<li>{{ label }}</li>", params=['label'], name='item')
+    page = Template("<ul>{% for x in xs %}{% include ITEM(label=x) %}{% endfor %}</ul>", params=['xs'],
+                    name='page', ITEM=item)
+    assert page.render(xs=['a', '<b>']) == "<ul><li>a</li><li>&lt;b&gt;</li></ul>"
+
+
+def test_stream_matches_render():
+    template = Template("{% for x in xs %}{{ x }},{% endfor %}", params=['xs'])
+    parts = []
+    template.stream(parts.append, xs=[1, 2])
+    assert ''.join(parts) == template.render(xs=[1, 2]) == "1,2,"
+
+
+@pytest.mark.parametrize('source', [
+    "{% if x %}open",
+    "{% for x in xs %}open",
+    "{% endif %}",
+    "{% if x %}{% endfor %}",
+    "{% for x in xs %}{% else %}{% endfor %}",
+    "{% elif x %}",
+])
+def test_unbalanced_tags_raise(source):
+    with pytest.raises(ValueError):
+        Template(source, params=['x', 'xs'])
+
+
+def test_unsupported_tag_raises():
+    with pytest.raises(ValueError, match='不支持的标签'):
+        Template("{% while x %}")
+
+
+@pytest.mark.parametrize('template', [PAPER_HTML, EMAIL_PAPER_HTML], ids=['file', 'email'])
+def test_paper_title_and_url_cannot_inject_html(template):
+    paper = {'title': INJECTED_TITLE, 'url': INJECTED_URL, 'authors': ['<img src=x onerror=alert(1)>'],
+             'published': '2025-10-19', 'summary': '</div><script>bad()</script>'}
+    output = template.render(paper=paper, relevance='high')
+    assert '<script>' not in output
+    assert '<img' not in output
+    assert "' onmouseover='" not in output
+    assert "&lt;script&gt;alert(&#x27;x&#x27;)&lt;/script&gt;" in output
+
+
+@pytest.mark.parametrize('template', [COMPACT_PAPER_HTML, EMAIL_COMPACT_PAPER_HTML], ids=['file', 'email'])
+def test_compact_paper_cannot_inject_html(template):
+    output = template.render(paper={'title': INJECTED_TITLE, 'url': INJECTED_URL})
+    assert '<script>' not in output
+    assert "' onmouseover='" not in output
+
+
+def test_full_report_escapes_paper_fields(tmp_path):
+    generator = ReportGenerator(output_dir=str(tmp_path))
+    papers = [{'title': INJECTED_TITLE, 'url': INJECTED_URL, 'authors': ['A'], 'published': '2025-10-19',
+               'relevance_level': 'high', 'matched_interests': ['<b>interest</b>'], 'summary': 'ok'}]
+    model = generator.build_model(papers, ['<b>interest</b>'])
+
+    path = generator.generate_html_file(papers, [], model=model)
+    with open(path, encoding='utf-8') as f:
+        file_html = f.read()
+    email_html, _ = generator.generate_email_html(papers, [], model=model)
+
+    for output in (file_html, email_html):
+        assert '<script>alert' not in output
+        assert "' onmouseover='" not in output
+        assert '<b>interest</b>' not in output
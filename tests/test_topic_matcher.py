@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+测试主题匹配：与原来逐条关键词匹配的推文话题归类结果一致、研究方向关键词拆分，以及报告模型中论文主题的归类
+
+运行: python -m pytest tests/test_topic_matcher.py
+"""
+import os
+import sys
+import random
+
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from report_model import OTHER_TOPIC, TWEET_TOPIC_KEYWORDS, ReportModel
+from topic_matcher import TopicMatcher, interest_keywords
+
+
+def _old_classify(text):
+    """原来 ReportModel 中的推文话题归类：每条推文对每个关键词都转一次小写再查找"""
+    text = text.lower()
+    for topic, keywords in TWEET_TOPIC_KEYWORDS.items():
+        if any(kw.lower() in text for kw in keywords):
+            return topic
+    return None
+
+
+def _random_texts(count=500, seed=0):
+    rng = random.Random(seed)
+    keywords = [kw for kws in TWEET_TOPIC_KEYWORDS.values() for kw in kws]
+    fillers = ['hello', 'world', '今天', '论文', 'new', 'paper', 'ok', '!', ' ', '\n', 'Rl', 'gp', 'Tesl']
+    texts = []
+    for _ in range(count):
+        words = rng.choices(fillers, k=rng.randint(0, 8)) + rng.sample(keywords, k=rng.randint(0, 3))
+        rng.shuffle(words)
+        # 随机改变大小写
+        texts.append(''.join(w.upper() if rng.random() < 0.3 else w for w in words))
+    return texts
+
+
+EDGE_TEXTS = [
+    '',
+    'nothing relevant here',
+    'TESLA FSD v13 is out',
+    # 同时命中多个话题时取排在前面的
+    'A robot powered by GPT',
+    'multimodal RL policy',
+    'world models',          # 'world' 含有 'rl'
+    'Claude 和 多模态',
+    'CLIP',
+    '具身智能与大模型',
+]
+
+
+@pytest.mark.parametrize('text', EDGE_TEXTS)
+def test_matches_old_classifier_on_edge_cases(text):
+    assert TopicMatcher(TWEET_TOPIC_KEYWORDS).classify(text) == _old_classify(text)
+
+
+def test_matches_old_classifier_on_random_texts():
+    matcher = TopicMatcher(TWEET_TOPIC_KEYWORDS)
+
+    for text in _random_texts():
+        assert matcher.classify(text) == _old_classify(text), text
+
+
+def test_duplicate_keywords_stay_with_first_topic():
+    matcher = TopicMatcher({'a': ['Robot', 'x'], 'b': ['robot ', 'y'], 'c': ['', '  ']})
+
+    assert matcher.classify('ROBOT arm') == 'a'
+    assert matcher.classify('y') == 'b'
+    # 没有有效关键词的主题被忽略
+    assert matcher.topics == ['a', 'b', 'c']
+    assert [topic for topic, _ in matcher._groups] == ['a', 'b']
+
+
+def test_interest_keywords_splits_parentheses():
+    assert interest_keywords('VLM (Vision Language Models)') == [
+        'VLM (Vision Language Models)', 'VLM', 'Vision Language Models']
+    assert interest_keywords('具身智能（Embodied AI）') == ['具身智能（Embodied AI）', '具身智能', 'Embodied AI']
+    assert interest_keywords(' Robotics ') == ['Robotics']
+
+
+def test_from_interests_merges_extra_topics():
+    matcher = TopicMatcher.from_interests(
+        ['VLM (Vision Language Models)', 'Robotics'],
+        {'Robotics': ['manipulation'], 'Diffusion': ['denoising']},
+    )
+
+    assert matcher.topics == ['VLM (Vision Language Models)', 'Robotics', 'Diffusion']
+    assert matcher.classify('new vision language models benchmark') == 'VLM (Vision Language Models)'
+    assert matcher.classify('dexterous MANIPULATION') == 'Robotics'
+    assert matcher.classify('denoising scores') == 'Diffusion'
+    assert matcher.classify('protein folding') is None
+
+
+def test_report_model_paper_topics():
+    papers = [
+        {'title': 'a', 'relevance_level': 'high', 'matched_interests': ['Robotics']},
+        {'title': 'robot grasping', 'abstract': 'x', 'relevance_level': 'high'},
+        {'title': 'protein folding', 'abstract': 'y', 'relevance_level': 'high'},
+    ]
+    matcher = TopicMatcher.from_interests(['Robotics'], {'Robotics': ['robot']})
+
+    without_matcher = ReportModel([dict(p) for p in papers], ['Robotics'], '2024-01-01')
+    with_matcher = ReportModel([dict(p) for p in papers], ['Robotics'], '2024-01-01', paper_matcher=matcher)
+
+    def topics(model):
+        return {h.topic: sorted(paper['title'] for paper, _ in h.papers) for h in model.topic_highlights}
+
+    # 没有 paper_matcher 时与原来一致：没有 matched_interests 的论文归入"其他"
+    assert topics(without_matcher) == {'Robotics': ['a'], OTHER_TOPIC: ['protein folding', 'robot grasping']}
+    assert topics(with_matcher) == {'Robotics': ['a', 'robot grasping'], OTHER_TOPIC: ['protein folding']}
+
+
+def test_report_model_tweet_topics_match_old_classifier():
+    tweets = [{'text': text, 'relevance_level': 'high'} for text in _random_texts(100, seed=1)]
+    expected = {}
+    for tweet in tweets:
+        topic = _old_classify(tweet['text'])
+        if topic is not None:
+            expected.setdefault(topic, []).append(tweet)
+
+    model = ReportModel([], [], '2024-01-01', tweets=tweets)
+
+    assert model.tweet_topics == expected
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+启动耗时基准测试
+
+使用 `python -X importtime` 测量导入 main.py 的耗时，并检查重量级可选依赖
+（arxiv、feedparser、bs4、tweepy、selenium、httpx）没有在启动时被加载。
+这些模块只应在对应数据源或分析步骤启用时才导入。
+
+使用方法：
+    python tools/bench_startup.py                      # 打印耗时最多的导入
+    python tools/bench_startup.py --budget-ms 300      # 超过预算时返回非零退出码
+    python tools/bench_startup.py --output startup.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List
+
+# 启动时不允许加载的重量级模块
+HEAVY_MODULES = ['arxiv', 'feedparser', 'bs4', 'tweepy', 'selenium', 'httpx', 'webdriver_manager']
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import_time(module: str = 'main') -> List[Dict]:
+    """
+    在子进程中以 -X importtime 导入模块
+
+    Args:
+        module: 要导入的模块名
+
+    Returns:
+        [{'module', 'self_us', 'cumulative_us'}, ...]（按导入顺序）
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        # 格式: "import time: <self us> | <cumulative us> | <缩进的模块名>"
+        self_us, cumulative_us, name = [part.strip() for part in line.replace('import time:', '', 1).split('|')]
+        records.append({
+            'module': name,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+        })
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测量 main.py 的启动导入耗时')
+    parser.add_argument('--module', default='main', help='要测量的模块（默认: main）')
+    parser.add_argument('--budget-ms', type=float, help='导入总耗时预算（毫秒），超出则返回非零退出码')
+    parser.add_argument('--top', type=int, default=15, help='显示耗时最多的前N个导入')
+    parser.add_argument('--output', type=str, help='将结果写入JSON文件')
+    args = parser.parse_args()
+
+    records = measure_import_time(args.module)
+    top_level = [r for r in records if r['module'] == args.module]
+    total_ms = top_level[-1]['cumulative_us'] / 1000 if top_level else 0.0
+
+    loaded = {r['module'].split('.')[0] for r in records}
+    heavy_loaded = sorted(m for m in HEAVY_MODULES if m in loaded)
+
+    print(f"导入 {args.module} 总耗时: {total_ms:.1f} ms")
+    print(f"\n耗时最多的 {args.top} 个导入（累计）:")
+    for record in sorted(records, key=lambda r: -r['cumulative_us'])[:args.top]:
+        print(f"  {record['cumulative_us'] / 1000:8.1f} ms  {record['module']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'module': args.module,
+                'python': sys.version.split()[0],
+                'total_ms': round(total_ms, 1),
+                'heavy_modules_loaded': heavy_loaded,
+                'imports': records,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入: {args.output}")
+
+    failed = False
+    if heavy_loaded:
+        print(f"\n❌ 启动时加载了重量级模块: {', '.join(heavy_loaded)}")
+        print("   这些模块应只在对应数据源或分析步骤启用时导入")
+        failed = True
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\n❌ 启动耗时 {total_ms:.1f} ms 超出预算 {args.budget_ms:.1f} ms")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("\n✅ 启动导入检查通过")
+
+
+if __name__ == '__main__':
+    main()
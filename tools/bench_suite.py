@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+端到端基准测试
+
+生成不同规模的合成语料（ArXiv论文、期刊RSS、推文），依次测量：
+    fetch     ArXiv检索结果解析 + 期刊RSS解析（feedparser + BeautifulSoup）
+    dedup     按URL去重
+    analysis  两阶段论文分析 + 推文分析（对接进程内的模拟LLM服务，见 mock_llm_server.py）
+    report    Markdown 与 HTML 报告渲染
+
+每个规模在独立子进程中运行，记录各阶段耗时、吞吐、峰值RSS以及LLM各阶段延迟，
+结果以JSON行追加到结果文件（带 git commit），可在不同提交之间对比。
+
+使用方法：
+    python tools/bench_suite.py                                   # 默认规模 100,1000,10000
+    python tools/bench_suite.py --sizes 100,1000 --stages fetch,dedup,report
+    python tools/bench_suite.py --latency lognormal:0.05,0.5 --concurrency 10
+    python tools/bench_suite.py --compare                         # 与结果文件中上一个提交对比
+    python tools/bench_suite.py --compare --fail-threshold 20     # 任一阶段变慢超过20%时返回非零退出码
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import resource
+import tempfile
+import subprocess
+import contextlib
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+STAGES = ['fetch', 'dedup', 'analysis', 'report']
+CATEGORIES = ['cs.AI', 'cs.LG', 'cs.CL', 'cs.CV', 'stat.ML']
+JOURNALS = ['Nature', 'Nature Machine Intelligence', 'Science Robotics', 'Cell Systems']
+RESEARCH_INTERESTS = ['large language models', 'reinforcement learning', 'computer vision']
+WORDS = ('model learning neural network data training graph transformer attention language vision robot policy '
+         'reward diffusion generative benchmark dataset optimization inference agent reasoning retrieval').split()
+
+
+# ---------------------------------------------------------------------- 合成语料
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(n_words)).capitalize()
+
+
+def generate_corpus(n_papers: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    生成合成语料
+
+    Args:
+        n_papers: ArXiv论文数量（去重后）
+        seed: 随机种子
+
+    Returns:
+        {'arxiv': {类别: [检索结果对象]}, 'rss': {期刊: RSS XML}, 'tweets': [推文]}
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+
+    arxiv_results = {category: [] for category in CATEGORIES}
+    for i in range(n_papers):
+        primary = CATEGORIES[i % len(CATEGORIES)]
+        # 约20%的论文交叉列入另一个类别，用于覆盖去重逻辑
+        categories = [primary] + ([rng.choice(CATEGORIES)] if rng.random() < 0.2 else [])
+        published = now - timedelta(hours=rng.randint(0, 20))
+        result = SimpleNamespace(
+            title=_sentence(rng, 10),
+            authors=[SimpleNamespace(name=f"Author {rng.randint(1, 5000)}") for _ in range(rng.randint(1, 8))],
+            summary=' '.join(_sentence(rng, 18) + '.' for _ in range(8)),
+            entry_id=f"http://arxiv.org/abs/2510.{i:05d}v1",
+            pdf_url=f"http://arxiv.org/pdf/2510.{i:05d}v1",
+            published=published,
+            updated=published,
+            categories=sorted(set(categories)),
+            primary_category=primary,
+        )
+        for category in set(categories):
+            arxiv_results[category].append(result)
+
+    # 每个类别末尾附带一段过期论文，触发连续跳过后的提前停止
+    for category in CATEGORIES:
+        arxiv_results[category].sort(key=lambda r: r.updated, reverse=True)
+        old = now - timedelta(days=30)
+        arxiv_results[category] += [SimpleNamespace(
+            title='old', authors=[], summary='', entry_id=f"http://arxiv.org/abs/old-{category}-{k}",
+            pdf_url='', published=old, updated=old, categories=[category], primary_category=category,
+        ) for k in range(50)]
+
+    rss = {}
+    n_articles = max(n_papers // 10, len(JOURNALS))
+    for j, journal in enumerate(JOURNALS):
+        items = []
+        for k in range(j, n_articles, len(JOURNALS)):
+            pub_date = format_datetime(now - timedelta(hours=rng.randint(0, 100)))
+            items.append(
+                f"<item><title>{_sentence(rng, 9)}</title>"
+                f"<link>https://example.org/{journal.replace(' ', '-').lower()}/{k}</link>"
+                f"<author>Author {k}</author><pubDate>{pub_date}</pubDate>"
+                f"<description><![CDATA[<p>{_sentence(rng, 40)}. <b>{_sentence(rng, 20)}</b>.</p>]]></description>"
+                f"</item>"
+            )
+        rss[journal] = (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                        f'<title>{journal}</title>{"".join(items)}</channel></rss>')
+
+    tweets = [{
+        'id': str(i),
+        'author_username': f"user{i % 200}",
+        'author_name': f"User {i % 200}",
+        'author_followers': rng.randint(10, 100000),
+        'text': _sentence(rng, 30),
+        'created_at': now.strftime('%Y-%m-%d %H:%M'),
+        'favorite_count': rng.randint(0, 500),
+        'retweet_count': rng.randint(0, 100),
+        'reply_count': rng.randint(0, 50),
+        'url': f"https://x.com/user{i % 200}/status/{i}",
+    } for i in range(max(n_papers // 20, 10))]
+
+    return {'arxiv': arxiv_results, 'rss': rss, 'tweets': tweets}
+
+
+class _FakeSearch:
+    """替代 arxiv.Search，按查询的类别返回合成检索结果"""
+
+    corpus: Dict[str, List] = {}
+
+    def __init__(self, query: str, **kwargs):
+        self.category = query.split(':', 1)[1]
+
+    def results(self):
+        return iter(self.corpus.get(self.category, []))
+
+
+# ---------------------------------------------------------------------- 各阶段
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位为KB，macOS 上为字节
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def bench_fetch(corpus: Dict[str, Any], state: Dict[str, Any]) -> int:
+    """ArXiv结果解析与期刊RSS解析"""
+    import arxiv_searcher
+    from journal_fetcher import JournalFetcher
+
+    real_arxiv = arxiv_searcher.arxiv
+    _FakeSearch.corpus = corpus['arxiv']
+    arxiv_searcher.arxiv = SimpleNamespace(
+        Search=_FakeSearch,
+        SortCriterion=real_arxiv.SortCriterion,
+        SortOrder=real_arxiv.SortOrder,
+        UnexpectedEmptyPageError=real_arxiv.UnexpectedEmptyPageError,
+    )
+    try:
+        searcher = arxiv_searcher.ArxivSearcher(CATEGORIES, max_results=10 ** 6)
+        papers = list(searcher.iter_recent_papers(days_back=1))
+    finally:
+        arxiv_searcher.arxiv = real_arxiv
+
+    fetcher = JournalFetcher(JOURNALS)
+    cutoff = datetime.now() - timedelta(days=7)
+    articles = []
+    for journal, xml in corpus['rss'].items():
+        articles.extend(fetcher._fetch_from_rss(journal, xml, cutoff))
+
+    state['papers'] = papers + articles
+    state['tweets'] = corpus['tweets']
+    return sum(len(results) for results in corpus['arxiv'].values()) + len(articles)
+
+
+def bench_dedup(corpus: Dict[str, Any], state: Dict[str, Any]) -> int:
+    """按URL去重（输入包含交叉列入的重复论文）"""
+    from arxiv_searcher import ArxivSearcher
+
+    papers = state['papers']
+    duplicates = [dict(p) for p in papers[::5]]
+    candidates = papers + duplicates
+    state['papers'] = ArxivSearcher(CATEGORIES)._deduplicate_papers(candidates)
+    return len(candidates)
+
+
+def bench_analysis(corpus: Dict[str, Any], state: Dict[str, Any], options: Dict[str, Any]) -> int:
+    """两阶段论文分析 + 推文分析（模拟LLM）"""
+    from mock_llm_server import MockLLMServer
+    from llm_analyzer import LLMAnalyzer
+    from twitter_analyzer import TwitterAnalyzer
+    from analysis_pipeline import AnalysisPipeline
+    from usage_metrics import UsageTracker
+
+    server = MockLLMServer(port=0, latency=options['latency'], per_token_ms=options['per_token_ms'],
+                           seed=options['seed'])
+    base_url = server.start() + '/v1'
+    usage = UsageTracker()
+    llm_settings = dict(api_key='mock', model='mock', base_url=base_url, api_type='openai',
+                        max_concurrent=options['concurrency'], metrics=usage)
+    try:
+        analyzer = LLMAnalyzer(batch_size=options['batch_size'], detail_batch_size=options['detail_batch_size'],
+                               **llm_settings)
+        pipeline = AnalysisPipeline(analyzer, TwitterAnalyzer(**llm_settings),
+                                    max_concurrent=options['concurrency'])
+        papers, tweets = asyncio.run(pipeline.analyze_async(
+            [dict(p) for p in state['papers']], [dict(t) for t in state['tweets']], RESEARCH_INTERESTS))
+    finally:
+        server.stop()
+
+    state['papers'] = analyzer.filter_relevant_papers(papers, min_relevance='medium')
+    state['tweets'] = [t for t in tweets if t.get('relevance_level') in ('high', 'medium')]
+    state['llm_usage'] = usage.to_dict()
+    state['mock_server'] = dict(server.stats, errors=dict(server.stats['errors']))
+    return len(papers) + len(tweets)
+
+
+def bench_report(corpus: Dict[str, Any], state: Dict[str, Any]) -> int:
+    """Markdown 与 HTML 报告渲染"""
+    from report_generator import ReportGenerator
+
+    papers = state['papers']
+    if 'llm_usage' not in state:
+        # 未运行分析阶段时，按固定比例填充分析结果
+        levels = ['high', 'medium', 'medium', 'low']
+        papers = [dict(p, relevance_level=levels[i % len(levels)], is_relevant=True,
+                       matched_interests=[RESEARCH_INTERESTS[i % len(RESEARCH_INTERESTS)]],
+                       abstract_zh='模拟的中文摘要翻译。' * 10, summary='模拟的核心内容。', affiliations='未在摘要中说明')
+                  for i, p in enumerate(papers)]
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        generator = ReportGenerator(output_dir=output_dir)
+        started = time.perf_counter()
+        model = generator.build_model(papers, RESEARCH_INTERESTS, state['tweets'])
+        model_done = time.perf_counter()
+        generator.generate_report(papers, RESEARCH_INTERESTS, state['tweets'], model=model)
+        markdown_done = time.perf_counter()
+        html_path = generator.generate_html_file(papers, RESEARCH_INTERESTS, state['tweets'], model=model)
+        html_done = time.perf_counter()
+        email_html, _ = generator.generate_email_html(papers, RESEARCH_INTERESTS, state['tweets'], model=model)
+        email_done = time.perf_counter()
+        state['html_bytes'] = os.path.getsize(html_path)
+        state['email_bytes'] = len(email_html.encode('utf-8'))
+    state['report_breakdown'] = {
+        'model': round(model_done - started, 4),
+        'markdown': round(markdown_done - model_done, 4),
+        'html': round(html_done - markdown_done, 4),
+        'email': round(email_done - html_done, 4),
+    }
+    return len(papers) + len(state['tweets'])
+
+
+def run_size(n_papers: int, stages: List[str], options: Dict[str, Any]) -> Dict[str, Any]:
+    """在当前进程中运行一个规模的全部阶段"""
+    started = time.perf_counter()
+    corpus = generate_corpus(n_papers, seed=options['seed'])
+    result = {
+        'size': n_papers,
+        'corpus_seconds': round(time.perf_counter() - started, 3),
+        'stages': {},
+    }
+    state: Dict[str, Any] = {}
+
+    # 未运行 fetch 时直接使用合成数据作为输入
+    if 'fetch' not in stages:
+        state['papers'] = [{'title': r.title, 'abstract': r.summary, 'url': r.entry_id, 'authors': [],
+                            'primary_category': r.primary_category, 'categories': r.categories,
+                            'published': r.published.strftime('%Y-%m-%d')}
+                           for r in {id(r): r for rs in corpus['arxiv'].values() for r in rs
+                                     if r.title != 'old'}.values()]
+        state['tweets'] = corpus['tweets']
+
+    runners = {
+        'fetch': lambda: bench_fetch(corpus, state),
+        'dedup': lambda: bench_dedup(corpus, state),
+        'analysis': lambda: bench_analysis(corpus, state, options),
+        'report': lambda: bench_report(corpus, state),
+    }
+    for stage in stages:
+        started = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            items = runners[stage]()
+        elapsed = time.perf_counter() - started
+        result['stages'][stage] = {
+            'seconds': round(elapsed, 4),
+            'items': items,
+            'items_per_sec': round(items / elapsed, 1) if elapsed > 0 else None,
+            'peak_rss_mb': _peak_rss_mb(),
+        }
+
+    result['peak_rss_mb'] = _peak_rss_mb()
+    if 'llm_usage' in state:
+        result['llm_usage'] = state['llm_usage']
+        result['mock_server'] = state['mock_server']
+    if 'html_bytes' in state:
+        result['html_bytes'] = state['html_bytes']
+        result['email_bytes'] = state['email_bytes']
+        result['report_breakdown'] = state['report_breakdown']
+    return result
+
+
+# ---------------------------------------------------------------------- 结果与对比
+
+def _git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_results(path: str) -> List[Dict[str, Any]]:
+    """读取结果文件（JSON行）"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: Optional[float]) -> bool:
+    """
+    打印与基线的对比
+
+    Returns:
+        是否有阶段变慢超过阈值
+    """
+    regressed = False
+    print(f"\n规模 {current['size']}: {baseline.get('commit')} → {current.get('commit')}")
+    print(f"  {'阶段':<10}{'基线(s)':>10}{'当前(s)':>10}{'变化':>9}{'峰值RSS(MB)':>16}")
+    for stage, stats in current['stages'].items():
+        base = baseline['stages'].get(stage)
+        if not base:
+            continue
+        change = (stats['seconds'] - base['seconds']) / base['seconds'] * 100 if base['seconds'] else 0.0
+        flag = ''
+        if threshold is not None and change > threshold:
+            flag = '  ❌'
+            regressed = True
+        print(f"  {stage:<10}{base['seconds']:>10.3f}{stats['seconds']:>10.3f}{change:>+8.1f}%"
+              f"{base['peak_rss_mb']:>8.1f} → {stats['peak_rss_mb']:<6.1f}{flag}")
+    return regressed
+
+
+def print_result(result: Dict[str, Any]):
+    print(f"\n规模 {result['size']}（峰值RSS {result['peak_rss_mb']} MB）")
+    for stage, stats in result['stages'].items():
+        print(f"  {stage:<10}{stats['seconds']:>9.3f} s  {stats['items']:>8} 项  "
+              f"{stats['items_per_sec'] or 0:>10.1f} 项/s  RSS {stats['peak_rss_mb']} MB")
+    for stage, usage in (result.get('llm_usage') or {}).get('stages', {}).items():
+        latency = usage['latency_seconds']
+        print(f"    LLM {stage:<7} 调用 {usage['calls']:>5}  p50 {latency['p50'] or 0:.3f} s  "
+              f"p90 {latency['p90'] or 0:.3f} s  max {latency['max'] or 0:.3f} s")
+    if result.get('report_breakdown'):
+        breakdown = result['report_breakdown']
+        print(f"    报告 模型 {breakdown['model']:.3f} s  Markdown {breakdown['markdown']:.3f} s  "
+              f"HTML {breakdown['html']:.3f} s（{result['html_bytes'] / 1024:.0f} KB）"
+              + (f"  邮件正文 {breakdown['email']:.3f} s（{result['email_bytes'] / 1024:.0f} KB）"
+                 if 'email' in breakdown else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='端到端基准测试（合成语料 + 模拟LLM）')
+    parser.add_argument('--sizes', default='100,1000,10000', help='论文数量（逗号分隔，默认: 100,1000,10000）')
+    parser.add_argument('--stages', default=','.join(STAGES), help=f"要运行的阶段（默认: {','.join(STAGES)}）")
+    parser.add_argument('--latency', default='fixed:0.02', help='模拟LLM的延迟分布（默认: fixed:0.02）')
+    parser.add_argument('--per-token-ms', type=float, default=0.0, help='模拟LLM每个输出token的生成耗时（毫秒）')
+    parser.add_argument('--concurrency', type=int, default=5, help='最大并发请求数（默认: 5）')
+    parser.add_argument('--batch-size', type=int, default=25, help='第一阶段每批论文数（默认: 25）')
+    parser.add_argument('--detail-batch-size', type=int, default=8, help='第二阶段每批论文数（默认: 8）')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--output', default=os.path.join(PROJECT_ROOT, 'bench_results.jsonl'),
+                        help='结果文件（JSON行，追加写入）')
+    parser.add_argument('--compare', action='store_true', help='与结果文件中上一个不同提交的结果对比')
+    parser.add_argument('--fail-threshold', type=float, help='任一阶段变慢超过该百分比时返回非零退出码')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        print(f"错误: 未知阶段 {', '.join(unknown)}（可选: {', '.join(STAGES)}）")
+        sys.exit(1)
+    options = {
+        'latency': args.latency,
+        'per_token_ms': args.per_token_ms,
+        'concurrency': args.concurrency,
+        'batch_size': args.batch_size,
+        'detail_batch_size': args.detail_batch_size,
+        'seed': args.seed,
+    }
+
+    if args.worker is not None:
+        # 子进程：运行单个规模，把结果以JSON输出到最后一行
+        print(json.dumps(run_size(args.worker, stages, options), ensure_ascii=False))
+        return
+
+    commit = _git_commit()
+    previous = load_results(args.output)
+    results = []
+    for size in [int(s) for s in args.sizes.split(',') if s.strip()]:
+        print(f"运行规模 {size} ...", flush=True)
+        # 每个规模使用独立子进程，峰值RSS互不影响
+        command = [sys.executable, os.path.abspath(__file__), '--worker', str(size), '--stages', ','.join(stages),
+                   '--latency', args.latency, '--per-token-ms', str(args.per_token_ms),
+                   '--concurrency', str(args.concurrency), '--batch-size', str(args.batch_size),
+                   '--detail-batch-size', str(args.detail_batch_size), '--seed', str(args.seed)]
+        proc = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"❌ 规模 {size} 运行失败:\n{proc.stderr[-3000:]}")
+            sys.exit(1)
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result.update({
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'options': options,
+        })
+        results.append(result)
+        print_result(result)
+
+    with open(args.output, 'a', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False) + '\n')
+    print(f"\n结果已追加到: {args.output}")
+
+    if args.compare:
+        regressed = False
+        for result in results:
+            baselines = [r for r in previous if r['size'] == result['size'] and r.get('commit') != commit
+                         and r.get('options') == options]
+            if not baselines:
+                print(f"\n规模 {result['size']}: 没有可对比的基线（需要其他提交在相同参数下的结果）")
+                continue
+            regressed |= compare(result, baselines[-1], args.fail_threshold)
+        if regressed:
+            print(f"\n❌ 有阶段变慢超过 {args.fail_threshold}%")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+离线模拟LLM服务
+
+同时提供 Anthropic（POST /v1/messages）和 OpenAI 兼容（POST /chat/completions、/v1/chat/completions）
+两种接口，用于在不花钱、不依赖服务商延迟的情况下测试并发、批次大小等性能相关改动。
+
+- 模拟响应：按提示词类型（第一阶段筛选、多画像筛选、第二阶段详细分析、推文分析）返回
+  固定格式的【论文X】/【推文X】响应，相关性由论文标题的哈希决定，结果可复现
+- 延迟分布：fixed / uniform / normal / lognormal，另可按输出token数增加生成耗时
+- 错误注入：按比例返回 429 / 5xx
+- 录制与回放：把真实API的响应按（模型, 提示词）哈希保存，之后离线回放
+- 支持 stream: true（SSE）
+- GET /stats 返回请求数、错误数和最大并发数
+
+使用方法：
+    python tools/mock_llm_server.py                                          # 监听 127.0.0.1:8900
+    python tools/mock_llm_server.py --latency lognormal:2,0.5 --per-token-ms 5 --error-rate 0.05
+    python tools/mock_llm_server.py --record recordings/ --upstream https://api.openai.com/v1 --upstream-key $OPENAI_API_KEY
+    python tools/mock_llm_server.py --replay recordings/
+
+然后在 config.yaml 中设置：
+    api_type: openai
+    base_url: http://127.0.0.1:8900/v1
+    api_key: mock
+（api_type 为 anthropic 时 base_url 设为 http://127.0.0.1:8900）
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+import urllib.request
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+
+class LatencyModel:
+    """
+    请求延迟分布
+
+    格式:
+        none                    无延迟
+        fixed:秒                固定延迟
+        uniform:最小,最大       均匀分布
+        normal:均值,标准差      正态分布（截断到0以上）
+        lognormal:中位数,sigma  对数正态分布（长尾，接近真实API）
+    """
+
+    def __init__(self, spec: str = 'none'):
+        self.spec = spec
+        name, _, params = spec.partition(':')
+        self.kind = name.strip().lower()
+        self.params = [float(p) for p in params.split(',') if p.strip()]
+
+        expected = {'none': 0, 'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+        if self.kind not in expected or len(self.params) != expected[self.kind]:
+            raise ValueError(f"无效的延迟分布: {spec}（示例: fixed:0.5、uniform:0.2,1.5、lognormal:2,0.5）")
+
+    def sample(self, rng: random.Random) -> float:
+        """采样一次延迟（秒）"""
+        if self.kind == 'none':
+            return 0.0
+        if self.kind == 'fixed':
+            return self.params[0]
+        if self.kind == 'uniform':
+            return rng.uniform(*self.params)
+        if self.kind == 'normal':
+            return max(rng.gauss(*self.params), 0.0)
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(median), sigma)
+
+
+def prompt_key(model: str, prompt: str) -> str:
+    """录制/回放使用的键：模型与提示词的哈希"""
+    return hashlib.sha256(f"{model}\n{prompt}".encode('utf-8')).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算token数（用于模拟 usage 字段和生成耗时）"""
+    return max(1, math.ceil(len(text) / 3))
+
+
+class CannedResponder:
+    """按提示词类型生成固定格式的模拟响应"""
+
+    def __init__(self, high_ratio: float = 0.1, medium_ratio: float = 0.2, low_ratio: float = 0.2):
+        """
+        Args:
+            high_ratio: 判为高相关的比例
+            medium_ratio: 判为中相关的比例
+            low_ratio: 判为低相关的比例（其余为无关）
+        """
+        self.thresholds = (high_ratio, high_ratio + medium_ratio, high_ratio + medium_ratio + low_ratio)
+
+    def _relevance(self, *keys: str) -> str:
+        digest = hashlib.md5('\n'.join(keys).encode('utf-8')).hexdigest()
+        value = int(digest[:8], 16) / 0xFFFFFFFF
+        if value < self.thresholds[0]:
+            return '高'
+        if value < self.thresholds[1]:
+            return '中'
+        if value < self.thresholds[2]:
+            return '低'
+        return '无关'
+
+    def respond(self, prompt: str) -> str:
+        """生成响应文本"""
+        papers = re.findall(r'【论文(\d+)】\n标题[:：]\s*(.*)', prompt)
+
+        if '【推文' in prompt:
+            tweets = re.findall(r'【推文(\d+)】\n作者: (.*)\n(?:.*\n)*?内容: (.*)', prompt)
+            return '\n'.join(
+                f"【推文{idx}】相关性: {self._relevance(author, text)}  |  原因: 模拟响应"
+                for idx, author, text in tweets
+            )
+
+        if '作者单位' in prompt:
+            return '\n\n'.join(
+                f"【论文{idx}】\n"
+                f"1. 作者单位：未在摘要中说明\n"
+                f"2. 摘要中文翻译：这是论文《{title.strip()}》的模拟中文翻译。{'该研究提出了一种新方法。' * 8}\n"
+                f"3. 核心内容：模拟的核心内容概述（论文{idx}）。"
+                for idx, title in papers
+            )
+
+        if '【画像' in prompt:
+            profiles = sorted({int(k) for k in re.findall(r'【画像(\d+)】', prompt.split('论文列表')[0])})
+            return '\n'.join(
+                f"【论文{idx}】【画像{k}】相关性: {self._relevance(title, str(k))}  |  匹配领域: "
+                f"{'模拟领域' if self._relevance(title, str(k)) in ('高', '中') else '无'}"
+                for idx, title in papers for k in profiles
+            )
+
+        if papers:
+            return '\n'.join(
+                f"【论文{idx}】相关性: {self._relevance(title)}  |  匹配领域: "
+                f"{'模拟领域' if self._relevance(title) in ('高', '中') else '无'}"
+                for idx, title in papers
+            )
+
+        return 'OK'
+
+
+class MockLLMServer:
+    """模拟LLM服务（可在其他脚本中于后台线程启动）"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8900, latency: str = 'none', per_token_ms: float = 0.0,
+                 error_rate: float = 0.0, error_codes: Tuple[int, ...] = (429, 500, 503), seed: int = 0,
+                 responder: Optional[CannedResponder] = None, record_dir: Optional[str] = None,
+                 upstream: Optional[str] = None, upstream_key: Optional[str] = None,
+                 replay_dir: Optional[str] = None, strict_replay: bool = False, replay_latency: bool = False):
+        """
+        初始化模拟服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口（0 表示随机端口）
+            latency: 请求延迟分布（见 LatencyModel）
+            per_token_ms: 每个输出token额外增加的生成耗时（毫秒）
+            error_rate: 返回错误的比例
+            error_codes: 注入的错误状态码
+            seed: 随机种子（延迟与错误注入可复现）
+            responder: 模拟响应生成器
+            record_dir: 录制目录（需同时指定 upstream）
+            upstream: 录制时转发到的真实API地址（OpenAI 兼容接口为 .../v1，Anthropic 为 https://api.anthropic.com）
+            upstream_key: 真实API密钥
+            replay_dir: 回放目录
+            strict_replay: 回放时找不到录制结果是否返回错误（否则使用模拟响应）
+            replay_latency: 回放时是否使用录制时的真实延迟（否则使用 latency 分布）
+        """
+        self.host = host
+        self.port = port
+        self.latency = LatencyModel(latency)
+        self.per_token_ms = per_token_ms
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.rng = random.Random(seed)
+        self.responder = responder or CannedResponder()
+        self.record_dir = record_dir
+        self.upstream = upstream.rstrip('/') if upstream else None
+        self.upstream_key = upstream_key
+        self.replay_dir = replay_dir
+        self.strict_replay = strict_replay
+        self.replay_latency = replay_latency
+
+        if record_dir and not self.upstream:
+            raise ValueError("录制模式需要指定 upstream")
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': {}, 'in_flight': 0, 'max_in_flight': 0,
+                      'replayed': 0, 'recorded': 0, 'output_tokens': 0}
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2] if self._httpd else (self.host, self.port)
+        return f"http://{host}:{port}"
+
+    # ------------------------------------------------------------------ 生命周期
+
+    def start(self) -> str:
+        """在后台线程启动服务，返回服务地址"""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='mock-llm', daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        """停止服务"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def serve_forever(self):
+        """前台运行，直到 Ctrl+C"""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._httpd.daemon_threads = True
+        print(f"模拟LLM服务已启动: {self.base_url}")
+        print(f"  - Anthropic: POST {self.base_url}/v1/messages")
+        print(f"  - OpenAI:    POST {self.base_url}/v1/chat/completions")
+        print(f"  - 统计:      GET  {self.base_url}/stats")
+        print(f"  - 延迟分布: {self.latency.spec}，每token {self.per_token_ms} ms，错误率 {self.error_rate:.0%}")
+        if self.record_dir:
+            print(f"  - 录制模式: 转发到 {self.upstream}，保存到 {self.record_dir}")
+        if self.replay_dir:
+            print(f"  - 回放模式: {self.replay_dir}")
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n正在停止...")
+        finally:
+            self._httpd.server_close()
+
+    # ------------------------------------------------------------------ 请求处理
+
+    def _sample(self) -> Tuple[float, Optional[int]]:
+        """采样本次请求的延迟和注入的错误码"""
+        with self._lock:
+            delay = self.latency.sample(self.rng)
+            error = self.rng.choice(self.error_codes) if self.error_rate and self.rng.random() < self.error_rate else None
+        return delay, error
+
+    def _generate(self, api_type: str, body: Dict[str, Any]) -> Tuple[str, Optional[float], Optional[Dict]]:
+        """
+        生成响应文本
+
+        Returns:
+            (文本, 录制时的真实延迟（秒，仅回放时有）, 录制的usage)
+        """
+        model = body.get('model', '')
+        prompt = '\n'.join(
+            m['content'] if isinstance(m.get('content'), str) else
+            ''.join(part.get('text', '') for part in m.get('content') or [])
+            for m in body.get('messages', [])
+        )
+        key = prompt_key(model, prompt)
+
+        if self.replay_dir:
+            path = os.path.join(self.replay_dir, f"{key}.json")
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    record = json.load(f)
+                with self._lock:
+                    self.stats['replayed'] += 1
+                return record['text'], record.get('latency'), record.get('usage')
+            if self.strict_replay:
+                raise KeyError(f"没有录制结果: {key}")
+
+        if self.record_dir:
+            started = time.perf_counter()
+            text, usage = self._forward(api_type, body)
+            latency = time.perf_counter() - started
+            with open(os.path.join(self.record_dir, f"{key}.json"), 'w', encoding='utf-8') as f:
+                json.dump({'model': model, 'api_type': api_type, 'text': text, 'usage': usage,
+                           'latency': round(latency, 3)}, f, ensure_ascii=False, indent=2)
+            with self._lock:
+                self.stats['recorded'] += 1
+            return text, None, usage
+
+        return self.responder.respond(prompt), None, None
+
+    def _forward(self, api_type: str, body: Dict[str, Any]) -> Tuple[str, Dict]:
+        """录制模式：把请求转发到真实API（非流式）"""
+        body = dict(body, stream=False)
+        if api_type == 'anthropic':
+            url = f"{self.upstream}/v1/messages"
+            headers = {'x-api-key': self.upstream_key or '', 'anthropic-version': '2023-06-01',
+                       'content-type': 'application/json'}
+        else:
+            url = f"{self.upstream}/chat/completions"
+            headers = {'Authorization': f"Bearer {self.upstream_key or ''}", 'Content-Type': 'application/json'}
+
+        request = urllib.request.Request(url, data=json.dumps(body).encode('utf-8'), headers=headers, method='POST')
+        with urllib.request.urlopen(request, timeout=120) as response:
+            result = json.loads(response.read().decode('utf-8'))
+        if api_type == 'anthropic':
+            return result['content'][0]['text'], result.get('usage')
+        return result['choices'][0]['message']['content'], result.get('usage')
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _send_json(self, code: int, payload: Dict[str, Any], extra_headers: Dict[str, str] = None):
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (extra_headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == '/stats':
+                    with server._lock:
+                        self._send_json(200, dict(server.stats, errors=dict(server.stats['errors'])))
+                else:
+                    self._send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                path = self.path.split('?')[0]
+                if path == '/v1/messages':
+                    api_type = 'anthropic'
+                elif path in ('/chat/completions', '/v1/chat/completions'):
+                    api_type = 'openai'
+                else:
+                    self._send_json(404, {'error': 'not found'})
+                    return
+
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length).decode('utf-8') or '{}')
+
+                with server._lock:
+                    server.stats['requests'] += 1
+                    server.stats['in_flight'] += 1
+                    server.stats['max_in_flight'] = max(server.stats['max_in_flight'], server.stats['in_flight'])
+                try:
+                    self._handle(api_type, body)
+                finally:
+                    with server._lock:
+                        server.stats['in_flight'] -= 1
+
+            def _handle(self, api_type: str, body: Dict[str, Any]):
+                delay, error = server._sample()
+                time.sleep(delay)
+
+                if error is not None:
+                    with server._lock:
+                        server.stats['errors'][str(error)] = server.stats['errors'].get(str(error), 0) + 1
+                    headers = {'retry-after': '1'} if error == 429 else {}
+                    self._send_json(error, _error_payload(api_type, error), headers)
+                    return
+
+                try:
+                    text, recorded_latency, usage = server._generate(api_type, body)
+                except KeyError as e:
+                    self._send_json(500, _error_payload(api_type, 500, str(e)))
+                    return
+                except (urllib.error.URLError, OSError) as e:
+                    self._send_json(502, _error_payload(api_type, 502, f"上游请求失败: {e}"))
+                    return
+
+                prompt_tokens = estimate_tokens(json.dumps(body.get('messages', []), ensure_ascii=False))
+                output_tokens = estimate_tokens(text)
+                with server._lock:
+                    server.stats['output_tokens'] += output_tokens
+
+                if recorded_latency is not None and server.replay_latency:
+                    generation = max(recorded_latency - delay, 0.0)
+                else:
+                    generation = output_tokens * server.per_token_ms / 1000
+
+                if body.get('stream'):
+                    include_usage = bool((body.get('stream_options') or {}).get('include_usage'))
+                    self._stream(api_type, body.get('model', ''), text, generation, prompt_tokens, output_tokens,
+                                 include_usage)
+                    return
+
+                time.sleep(generation)
+                self._send_json(200, _message_payload(api_type, body.get('model', ''), text,
+                                                      usage or _usage(api_type, prompt_tokens, output_tokens)))
+
+            def _stream(self, api_type: str, model: str, text: str, generation: float,
+                        prompt_tokens: int, output_tokens: int, include_usage: bool = False):
+                """
+                以SSE分块返回，生成耗时均匀分布在各块之间
+
+                与 OpenAI 一致，OpenAI 兼容接口只在请求带 stream_options.include_usage 时
+                才在 [DONE] 之前多发一个 choices 为空、只含 usage 的块
+                """
+                chunks = [text[i:i + 20] for i in range(0, len(text), 20)] or ['']
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+
+                def send(event: Optional[str], payload: Any):
+                    data = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+                    line = (f"event: {event}\n" if event else '') + f"data: {data}\n\n"
+                    self.wfile.write(line.encode('utf-8'))
+                    self.wfile.flush()
+
+                if api_type == 'anthropic':
+                    send('message_start', {'type': 'message_start', 'message': {
+                        'id': 'msg_mock', 'type': 'message', 'role': 'assistant', 'model': model, 'content': [],
+                        'usage': {'input_tokens': prompt_tokens, 'output_tokens': 0}}})
+                    send('content_block_start', {'type': 'content_block_start', 'index': 0,
+                                                 'content_block': {'type': 'text', 'text': ''}})
+                    for chunk in chunks:
+                        time.sleep(generation / len(chunks))
+                        send('content_block_delta', {'type': 'content_block_delta', 'index': 0,
+                                                     'delta': {'type': 'text_delta', 'text': chunk}})
+                    send('content_block_stop', {'type': 'content_block_stop', 'index': 0})
+                    send('message_delta', {'type': 'message_delta', 'delta': {'stop_reason': 'end_turn'},
+                                           'usage': {'output_tokens': output_tokens}})
+                    send('message_stop', {'type': 'message_stop'})
+                else:
+                    for chunk in chunks:
+                        time.sleep(generation / len(chunks))
+                        send(None, {'id': 'chatcmpl-mock', 'object': 'chat.completion.chunk', 'model': model,
+                                    'choices': [{'index': 0, 'delta': {'content': chunk}, 'finish_reason': None}]})
+                    send(None, {'id': 'chatcmpl-mock', 'object': 'chat.completion.chunk', 'model': model,
+                                'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})
+                    if include_usage:
+                        send(None, {'id': 'chatcmpl-mock', 'object': 'chat.completion.chunk', 'model': model,
+                                    'choices': [], 'usage': _usage('openai', prompt_tokens, output_tokens)})
+                    send(None, '[DONE]')
+                self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _usage(api_type: str, prompt_tokens: int, output_tokens: int) -> Dict[str, int]:
+    if api_type == 'anthropic':
+        return {'input_tokens': prompt_tokens, 'output_tokens': output_tokens}
+    return {'prompt_tokens': prompt_tokens, 'completion_tokens': output_tokens,
+            'total_tokens': prompt_tokens + output_tokens}
+
+
+def _message_payload(api_type: str, model: str, text: str, usage: Dict[str, int]) -> Dict[str, Any]:
+    if api_type == 'anthropic':
+        return {'id': 'msg_mock', 'type': 'message', 'role': 'assistant', 'model': model,
+                'content': [{'type': 'text', 'text': text}], 'stop_reason': 'end_turn', 'usage': usage}
+    return {'id': 'chatcmpl-mock', 'object': 'chat.completion', 'model': model,
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+            'usage': usage}
+
+
+def _error_payload(api_type: str, code: int, message: str = None) -> Dict[str, Any]:
+    message = message or ('rate limited (mock)' if code == 429 else 'server error (mock)')
+    if api_type == 'anthropic':
+        kind = 'rate_limit_error' if code == 429 else 'api_error'
+        return {'type': 'error', 'error': {'type': kind, 'message': message}}
+    return {'error': {'message': message, 'type': 'mock_error', 'code': code}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='离线模拟LLM服务（Anthropic / OpenAI 兼容接口）')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址（默认: 127.0.0.1）')
+    parser.add_argument('--port', type=int, default=8900, help='监听端口（默认: 8900）')
+    parser.add_argument('--latency', default='none',
+                        help='请求延迟分布: none / fixed:秒 / uniform:最小,最大 / normal:均值,标准差 / lognormal:中位数,sigma')
+    parser.add_argument('--per-token-ms', type=float, default=0.0, help='每个输出token增加的生成耗时（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回错误的比例（0-1）')
+    parser.add_argument('--error-codes', default='429,500,503', help='注入的错误状态码（逗号分隔）')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--high', type=float, default=0.1, help='模拟筛选中高相关的比例')
+    parser.add_argument('--medium', type=float, default=0.2, help='模拟筛选中中相关的比例')
+    parser.add_argument('--low', type=float, default=0.2, help='模拟筛选中低相关的比例')
+    parser.add_argument('--record', metavar='DIR', help='录制模式：转发到 --upstream 并保存响应')
+    parser.add_argument('--upstream', help='录制时转发到的真实API地址')
+    parser.add_argument('--upstream-key', default=os.getenv('UPSTREAM_API_KEY'),
+                        help='真实API密钥（默认读取环境变量 UPSTREAM_API_KEY）')
+    parser.add_argument('--replay', metavar='DIR', help='回放模式：返回录制的响应')
+    parser.add_argument('--strict', action='store_true', help='回放时找不到录制结果返回错误（默认使用模拟响应）')
+    parser.add_argument('--replay-latency', action='store_true', help='回放时使用录制时的真实延迟')
+    args = parser.parse_args()
+
+    try:
+        server = MockLLMServer(
+            host=args.host,
+            port=args.port,
+            latency=args.latency,
+            per_token_ms=args.per_token_ms,
+            error_rate=args.error_rate,
+            error_codes=tuple(int(code) for code in args.error_codes.split(',') if code.strip()),
+            seed=args.seed,
+            responder=CannedResponder(args.high, args.medium, args.low),
+            record_dir=args.record,
+            upstream=args.upstream,
+            upstream_key=args.upstream_key,
+            replay_dir=args.replay,
+            strict_replay=args.strict,
+            replay_latency=args.replay_latency,
+        )
+    except ValueError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()